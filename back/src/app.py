@@ -112,6 +112,10 @@ class MyApp:
         # extension instance to bind it to the Flask application instance (app)
         util_database.init_app(app)
         util_migrate.init(app, db)
+        # 画布缓存依赖的会话监听需在每个进程（包括 Celery worker）中注册
+        from parts.app.node_run.graph_cache import register_session_listeners
+
+        register_session_listeners()
         util_redis.init_app(app)
         util_storage.init_app(app)
         util_celery.init_app(app)
@@ -1072,6 +1072,52 @@ def batch_register_users(name_file, work_tenant_id):
     )
 
 
+@click.command("backfill-app-statistics", help="根据历史会话与调用记录回填应用按日统计汇总")
+@click.option("--app-id", default=None, help="只回填指定应用，默认回填所有有会话的应用")
+@click.option("--start-date", default=None, help="起始日期(YYYY-MM-DD)，默认为应用最早的记录日期")
+@click.option("--end-date", default=None, help="结束日期(YYYY-MM-DD)，默认为昨天")
+@click.option("--call-type", default="release", show_default=True, help="调用类型")
+@click.option("--overwrite", is_flag=True, default=False, help="重新生成已存在的按日汇总")
+def backfill_app_statistics(app_id, start_date, end_date, call_type, overwrite):
+    """
+    回填应用按日统计汇总（含去重草图），之后任意区间的统计均由按日汇总合并得到。
+    """
+    from datetime import date
+
+    from parts.conversation.model import Conversation
+    from parts.cost_audit.service import CostService
+
+    start_date = date.fromisoformat(start_date) if start_date else None
+    end_date = date.fromisoformat(end_date) if end_date else None
+    if app_id:
+        app_ids = [app_id]
+    else:
+        app_ids = [
+            row.app_id
+            for row in db.session.query(Conversation.app_id).distinct()
+            if row.app_id
+        ]
+
+    total_days = 0
+    for current_app_id in app_ids:
+        try:
+            days = CostService.ensure_daily_rollups(
+                current_app_id, start_date, end_date, call_type, overwrite
+            )
+        except Exception as e:
+            db.session.rollback()
+            click.echo(click.style(f"应用 {current_app_id} 回填失败: {e}", fg="red"))
+            continue
+        total_days += days
+        click.echo(click.style(f"应用 {current_app_id} 回填 {days} 天", fg="green"))
+
+    click.echo(
+        click.style(
+            f"回填完成，应用数: {len(app_ids)}，生成按日汇总: {total_days}", fg="blue"
+        )
+    )
+
+
 @click.command('init-apps', help='初始化内置应用')
 @click.option("--offline-only", is_flag=True, help="只内置无需联网的APP")
 def init_apps(offline_only):
@@ -1336,3 +1382,4 @@ def register_commands(app):
     app.cli.add_command(init_apps)
     app.cli.add_command(init_mcp_service)
     app.cli.add_command(init_infer_service)
+    app.cli.add_command(backfill_app_statistics)
@@ -5,10 +5,11 @@ from pydantic_settings import SettingsConfigDict
 
 from configs.dataset_config import DatabaseConfig
 from configs.mail_config import MailConfig
+from configs.performance_config import PerformanceConfig
 from configs.redis_config import RedisConfig
 
 
-class LazyConfig(MailConfig, DatabaseConfig, RedisConfig):
+class LazyConfig(MailConfig, DatabaseConfig, RedisConfig, PerformanceConfig):
     model_config = SettingsConfigDict(frozen=True, extra="ignore")
     DEBUG: bool = Field(default=False, description="whether to enable debug mode.")
 
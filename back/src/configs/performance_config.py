@@ -0,0 +1,351 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Additional Notice:
+# When modifying, redistributing, or creating derivative works of this software,
+# you must retain the original LazyCraft logo and the GitHub link icon that directs
+# to the official repository: https://github.com/LazyAGI/LazyLLM
+
+from typing import Literal
+
+from pydantic import (Field, NonNegativeFloat, NonNegativeInt, PositiveFloat,
+                      PositiveInt)
+from pydantic_settings import BaseSettings
+
+
+class PerformanceConfig(BaseSettings):
+    """Performance tuning configs"""
+
+    STREAM_RELAY_MAX_WAIT: PositiveFloat = Field(
+        description="Max seconds a stream relay waits for new chunks before re-checking the queue",
+        default=0.05,
+    )
+
+    STREAM_RELAY_BATCH_SIZE: PositiveInt = Field(
+        description="Max number of stream chunks dequeued at once", default=64
+    )
+
+    GRAPH_CACHE_ENABLED: bool = Field(
+        description="Whether to cache converted workflow graphs", default=True
+    )
+
+    GRAPH_CACHE_LOCAL_SIZE: NonNegativeInt = Field(
+        description="Max number of converted graphs kept in the in-process LRU",
+        default=256,
+    )
+
+    GRAPH_CACHE_TTL: PositiveInt = Field(
+        description="Seconds a converted graph stays in shared Redis, bounding staleness from writes outside the app",
+        default=600,
+    )
+
+    ENGINE_POOL_ENABLED: bool = Field(
+        description="Whether stopped release-mode engines are kept warm for reuse",
+        default=True,
+    )
+
+    ENGINE_POOL_MODEL_BUDGET: NonNegativeInt = Field(
+        description="Number of local models (roughly GPUs) pooled engines may hold, idle engines are evicted beyond it;"
+        " an engine without local models counts as one",
+        default=8,
+    )
+
+    ENGINE_POOL_PREWARM_LIMIT: NonNegativeInt = Field(
+        description="Number of most-used published apps started first when restarting apps",
+        default=20,
+    )
+
+    ENGINE_POOL_PREWARM_DAYS: PositiveInt = Field(
+        description="Days of release calls used to rank apps for pre-warming",
+        default=7,
+    )
+
+    COST_AUDIT_WRITER_ENABLED: bool = Field(
+        description="Whether cost audit records on the request path are written by the buffered writer",
+        default=True,
+    )
+
+    COST_AUDIT_QUEUE_SIZE: PositiveInt = Field(
+        description="Max number of cost audit records waiting in the buffered writer",
+        default=10000,
+    )
+
+    COST_AUDIT_BATCH_SIZE: PositiveInt = Field(
+        description="Max number of cost audit records inserted in one commit",
+        default=500,
+    )
+
+    COST_AUDIT_FLUSH_INTERVAL: PositiveFloat = Field(
+        description="Max seconds a cost audit record waits before being flushed",
+        default=1.0,
+    )
+
+    COST_AUDIT_OVERFLOW_POLICY: Literal["sync", "drop"] = Field(
+        description="What to do when the writer queue is full: write synchronously or drop the record",
+        default="sync",
+    )
+
+    APP_TENANT_CACHE_TTL: PositiveInt = Field(
+        description="Seconds an app to tenant mapping stays in the in-process cache",
+        default=300,
+    )
+
+    EVALUATION_CONCURRENCY: PositiveInt = Field(
+        description="Default number of in-flight model calls per evaluation task",
+        default=8,
+    )
+
+    EVALUATION_WORKER_POOL_SIZE: PositiveInt = Field(
+        description="Threads in the process-wide pool shared by all evaluation tasks",
+        default=32,
+    )
+
+    EVALUATION_COMMIT_BATCH_SIZE: PositiveInt = Field(
+        description="Evaluation rows written to the database per commit",
+        default=50,
+    )
+
+    MODEL_UPLOAD_BUFFER_SIZE: PositiveInt = Field(
+        description="Bytes read from a model upload chunk per write when streaming it to disk",
+        default=1024 * 1024,
+    )
+
+    BLOB_HASH_BUFFER_SIZE: PositiveInt = Field(
+        description="Bytes read per block when hashing files for the content-addressed blob store",
+        default=1024 * 1024,
+    )
+
+    BLOB_GC_MIN_AGE: PositiveInt = Field(
+        description="Seconds an unreferenced blob must sit untouched before garbage collection removes it",
+        default=24 * 3600,
+    )
+
+    AMS_STATUS_CACHE_TTL: PositiveFloat = Field(
+        description="Seconds an AMS inference service status stays fresh in the in-process cache",
+        default=10.0,
+    )
+
+    AMS_STATUS_REFRESH_INTERVAL: PositiveFloat = Field(
+        description="Seconds between background refreshes of recently listed AMS service statuses",
+        default=5.0,
+    )
+
+    AMS_STATUS_CONCURRENCY: PositiveInt = Field(
+        description="Concurrent AMS status requests, also the size of the pooled HTTP session",
+        default=16,
+    )
+
+    FINETUNE_LOG_RANGE_LIMIT: PositiveInt = Field(
+        description="Maximum bytes of a fine-tune log returned by one range or tail request",
+        default=64 * 1024,
+    )
+
+    FINETUNE_STATUS_CONCURRENCY: PositiveInt = Field(
+        description="Fine-tune jobs whose status is checked concurrently by one polling round",
+        default=8,
+    )
+
+    FINETUNE_STATUS_ROUND_TIMEOUT: PositiveFloat = Field(
+        description="Seconds one polling round waits before deferring queued checks"
+        " and leaving running ones in the background",
+        default=120.0,
+    )
+
+    FINETUNE_STATUS_MIN_INTERVAL: PositiveFloat = Field(
+        description="Seconds between status checks of a fine-tune job that has just started",
+        default=15.0,
+    )
+
+    FINETUNE_STATUS_MAX_INTERVAL: PositiveFloat = Field(
+        description="Upper bound in seconds between status checks of a long-running or failing fine-tune job",
+        default=300.0,
+    )
+
+    FINETUNE_STATUS_INTERVAL_RATIO: PositiveFloat = Field(
+        description="Status check interval as a fraction of how long the fine-tune job has been running",
+        default=0.05,
+    )
+
+    FINETUNE_STATUS_LOCK_TTL: PositiveInt = Field(
+        description="Seconds a fine-tune job stays locked by one status check that never finishes",
+        default=1800,
+    )
+
+    MODEL_CREDENTIAL_CACHE_TTL: PositiveFloat = Field(
+        description="Seconds a tenant's online model API keys stay cached for graph conversion",
+        default=60.0,
+    )
+
+    MODEL_COPY_WORKERS: PositiveInt = Field(
+        description="Files of a local model copied in parallel when reflink and hardlink are unavailable",
+        default=4,
+    )
+
+    MODEL_COPY_BUFFER_SIZE: PositiveInt = Field(
+        description="Bytes moved per read/write or sendfile call when copying model files",
+        default=8 * 1024 * 1024,
+    )
+
+    MODEL_COPY_PROGRESS_INTERVAL: NonNegativeFloat = Field(
+        description="Minimum seconds between model copy progress messages sent over websocket",
+        default=0.5,
+    )
+
+    MODEL_COPY_ALLOW_HARDLINK: bool = Field(
+        description="Allow model copies to hardlink source files when reflink is unsupported;"
+        " hardlinked copies share data with the source, so in-place edits of either change both",
+        default=False,
+    )
+
+    DB_ENGINE_POOL_SIZE: PositiveInt = Field(
+        description="Pooled connections kept per user database engine in db_manage",
+        default=5,
+    )
+
+    DB_ENGINE_MAX_OVERFLOW: NonNegativeInt = Field(
+        description="Extra connections a user database engine may open beyond its pool size",
+        default=5,
+    )
+
+    DB_ENGINE_POOL_TIMEOUT: PositiveFloat = Field(
+        description="Seconds to wait for a free pooled connection to a user database",
+        default=30.0,
+    )
+
+    DB_ENGINE_POOL_RECYCLE: PositiveInt = Field(
+        description="Seconds after which a pooled user database connection is reopened",
+        default=1800,
+    )
+
+    DB_ENGINE_IDLE_TIMEOUT: PositiveFloat = Field(
+        description="Seconds an unused user database engine is kept before its pool is disposed",
+        default=600.0,
+    )
+
+    DB_ENGINE_MAX_ENGINES: PositiveInt = Field(
+        description="Maximum user database engines kept per process; least recently used idle ones are disposed first",
+        default=64,
+    )
+
+    DB_METADATA_CACHE_TTL: PositiveFloat = Field(
+        description="Seconds a reflected user table definition is reused before reflecting again",
+        default=300.0,
+    )
+
+    DB_TABLE_EXACT_COUNT_THRESHOLD: PositiveInt = Field(
+        description="Estimated row count above which user table browsing reports"
+        " the catalog estimate instead of COUNT(*)",
+        default=100000,
+    )
+
+    DB_IMPORT_CHUNK_SIZE: PositiveInt = Field(
+        description="Rows read from an import upload and validated together",
+        default=5000,
+    )
+
+    DB_IMPORT_BATCH_SIZE: PositiveInt = Field(
+        description="Rows written and committed per batch when importing into a user table",
+        default=2000,
+    )
+
+    DB_IMPORT_MAX_ERROR_ROWS: PositiveInt = Field(
+        description="Maximum failed import rows reported in detail; all failures are still counted",
+        default=1000,
+    )
+
+    MCP_SESSION_IDLE_TIMEOUT: PositiveFloat = Field(
+        description="Seconds an unused MCP session (STDIO subprocess or SSE connection) is kept open",
+        default=300.0,
+    )
+
+    MCP_SESSION_MAX_CONCURRENCY: PositiveInt = Field(
+        description="Concurrent requests allowed on one pooled MCP session",
+        default=4,
+    )
+
+    MCP_SESSION_MAX_SESSIONS: PositiveInt = Field(
+        description="Maximum pooled MCP sessions per process; least recently used idle ones are closed first",
+        default=32,
+    )
+
+    MCP_SESSION_HEALTH_INTERVAL: PositiveFloat = Field(
+        description="Idle seconds after which a pooled MCP session is pinged before being reused",
+        default=60.0,
+    )
+
+    MCP_TOOLS_CACHE_TTL: PositiveFloat = Field(
+        description="Seconds a cached MCP list_tools result is reused",
+        default=300.0,
+    )
+
+    IDE_SANDBOX_POOL_SIZE: PositiveInt = Field(
+        description="Number of pre-warmed worker processes executing IDE tool code",
+        default=2,
+    )
+
+    IDE_SANDBOX_MAX_CALLS: PositiveInt = Field(
+        description="Calls handled by one IDE sandbox worker before it is replaced",
+        default=100,
+    )
+
+    IDE_SANDBOX_MAX_RSS_MB: PositiveFloat = Field(
+        description="Resident memory in MB above which an IDE sandbox worker is replaced after its call",
+        default=1024.0,
+    )
+
+    IDE_SANDBOX_CALL_TIMEOUT: PositiveFloat = Field(
+        description="Seconds one IDE tool call may run before the forked process executing it is killed",
+        default=120.0,
+    )
+
+    IDE_SANDBOX_START_TIMEOUT: PositiveFloat = Field(
+        description="Seconds to wait for a new IDE sandbox worker to finish importing lazyllm",
+        default=60.0,
+    )
+
+    IDE_SANDBOX_ACQUIRE_TIMEOUT: PositiveFloat = Field(
+        description="Seconds an IDE tool call waits for an idle sandbox worker before failing",
+        default=60.0,
+    )
+
+    IDE_SANDBOX_PRELOAD_MODULES: str = Field(
+        description="Comma-separated modules imported by IDE sandbox workers at startup",
+        default="json,datetime,pytz,requests",
+    )
+
+    PROGRESS_BUS_INTERVAL: NonNegativeFloat = Field(
+        description="Seconds over which progress messages of one task are coalesced"
+        " before fan-out; 0 sends every message",
+        default=0.5,
+    )
+
+    PROGRESS_BUS_STATE_TTL: PositiveInt = Field(
+        description="Seconds the last progress state and log history of a task are kept for late subscribers",
+        default=3600,
+    )
+
+    PROGRESS_BUS_HISTORY_SIZE: PositiveInt = Field(
+        description="Recent log entries per task replayed to late subscribers",
+        default=500,
+    )
+
+    CONVERSATION_HISTORY_MAX_TURNS: PositiveInt = Field(
+        description="Most recent completed turns of a conversation kept in the history cache and sent to the app",
+        default=100,
+    )
+
+    CONVERSATION_HISTORY_TTL: PositiveInt = Field(
+        description="Seconds an idle conversation's cached history and turn counter are kept",
+        default=86400,
+    )
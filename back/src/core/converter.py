@@ -505,6 +505,9 @@ class Converter:
                 )
 
         sorted_edges = []
+        appended_edges = set()
+        # 已经展开过的节点: 再次展开不会新增任何边, 跳过以避免并行分支导致的指数级递归
+        visited_ids = set()
 
         def _internal_append(match_id):
             """递归添加匹配的边到排序列表。
@@ -516,15 +519,20 @@ class Converter:
                 ValueError: 当处理连线时出错。
             """
             while match_id:
+                if match_id in visited_ids:
+                    break
+                visited_ids.add(match_id)
                 if match_id in self.aggregator_ids:
                     onedata = mapping[match_id][0]
-                    if onedata not in sorted_edges:
+                    if onedata not in appended_edges:
+                        appended_edges.add(onedata)
                         sorted_edges.append(onedata)
                     match_id = None if onedata[0] == start_id else onedata[0]
                 else:
                     try:
                         for onedata in mapping[match_id]:
-                            if onedata not in sorted_edges:
+                            if onedata not in appended_edges:
+                                appended_edges.add(onedata)
                                 sorted_edges.append(onedata)
                             _internal_append(
                                 None if onedata[0] == start_id else onedata[0]
@@ -692,16 +700,24 @@ class Converter:
         Raises:
             ValueError: 当构建分支路径时出错，如分支节点到聚合节点直接连接等。
         """
-        case_map_pathset = {}
+        # 每个节点到聚合节点的路径数（只需区分 0/1/多条），按逆拓扑序一次计算完成，
+        # 不再逐条枚举 fork -> aggr 的全部路径（嵌套分支时路径数呈指数增长）
+        reaching = nx.ancestors(ggg, aggr_id)
+        path_counts = {aggr_id: 1}
+        for node_id in reversed(list(nx.topological_sort(ggg.subgraph(reaching)))):
+            path_counts[node_id] = min(
+                2, sum(path_counts.get(succ, 0) for succ in ggg.successors(node_id))
+            )
 
+        case_map_pathset = {}
         try:
-            for path_infos in nx.all_simple_paths(ggg, source=fork_id, target=aggr_id):
-                path_infos = path_infos[1:-1]
-                if len(path_infos) == 0:
+            for normal_id in ggg.successors(fork_id):  # 非ifs/switch的第一个元素
+                if not path_counts.get(normal_id):
+                    continue
+                if normal_id == aggr_id:
                     raise ValueError(
                         "构建分支路径时出错, 分支节点到聚合节点不可以直接连接"
                     )
-                normal_id = path_infos[0]  # 非ifs/switch的第一个元素
 
                 # 初始化
                 if not case_map_pathset:
@@ -713,7 +729,14 @@ class Converter:
                     }
 
                 case_id = self.id_map_basenode[fork_id].get_input_caseid(normal_id)
-                case_map_pathset[case_id].append(path_infos)
+                path_set = case_map_pathset[case_id]
+                if path_counts[normal_id] > 1:
+                    # 多条路径只需保留数量, 由 _parse_case_set 判定为不支持
+                    path_set.extend([None] * path_counts[normal_id])
+                else:
+                    path_set.append(
+                        self._walk_single_path(ggg, normal_id, aggr_id, path_counts)
+                    )
         except Exception:
             raise ValueError("构建分支路径时出错")
 
@@ -722,6 +745,28 @@ class Converter:
             result[case_id] = self._parse_case_set(ggg, fork_id, aggr_id, path_set)
         return result
 
+    @staticmethod
+    def _walk_single_path(ggg, start_id, end_id, path_counts):
+        """沿唯一路径从 start_id 走到 end_id。
+
+        Args:
+            ggg: NetworkX 有向图对象。
+            start_id: 起始节点 ID，到 end_id 仅有一条路径。
+            end_id: 结束节点 ID。
+            path_counts: 各节点到 end_id 的路径数。
+
+        Returns:
+            list: 路径上的节点列表，不含 end_id。
+        """
+        path = []
+        node_id = start_id
+        while node_id != end_id:
+            path.append(node_id)
+            node_id = next(
+                succ for succ in ggg.successors(node_id) if path_counts.get(succ)
+            )
+        return path
+
     def _parse_case_set(self, ggg, start_id, end_id, path_set):
         """解析分支情况的路径集合。
 
@@ -18,8 +18,8 @@
 # to the official repository: https://github.com/LazyAGI/LazyLLM
 
 import functools
+import logging
 import os
-import shutil
 import zipfile
 
 import sqlalchemy
@@ -29,26 +29,31 @@ from libs.timetools import TimeTools
 from models.model_account import Tenant
 from parts.knowledge_base.model import FileRecord
 from parts.knowledge_base.model import KnowledgeBase as kb
+from utils.storage.blob_store import blob_store, link_or_copy
 from utils.util_database import db
 
 
 class PrettyFile:
-    def __init__(self, file_path):
+    def __init__(self, file_path, file_md5=None):
         """初始化文件处理对象。
 
         Args:
             file_path: 文件的路径。
+            file_md5: 上传时已计算的 MD5，提供时不再重复计算。
         """
         self.file_path = file_path
+        self._file_md5 = file_md5
 
-    @functools.cached_property
+    @property
     def file_md5(self):
-        """计算并缓存文件的 MD5 值。
+        """计算并缓存文件的 MD5 值，上传时已计算的直接返回。
 
         Returns:
             str: 文件的 MD5 哈希值。
         """
-        return FileTools.calculate_md5(self.file_path)
+        if not self._file_md5:
+            self._file_md5 = blob_store.hash_file(self.file_path)
+        return self._file_md5
 
     @functools.cached_property
     def postfix(self):
@@ -72,7 +77,7 @@ class PrettyFile:
         """将文件信息保存到数据库。
 
         如果是 ZIP 文件，会先解压并递归处理解压后的所有文件。
-        如果文件已存在（通过 MD5 判断），则复用已有记录。
+        文件内容存入按 MD5 寻址的 blob 存储，相同内容的文件共享同一份数据。
 
         Args:
             user_id: 用户 ID。
@@ -96,24 +101,11 @@ class PrettyFile:
                     child_file_list = PrettyFile(child_file_path).save_to_db(user_id)
                     file_list.extend(child_file_list)
         else:
-            file_md5 = self.file_md5
+            # 内容存入blob存储，文件路径替换为指向blob的链接，相同内容只占一份磁盘
+            file_md5 = blob_store.put_file(self.file_path, self.file_md5)
             save_db_path = self.file_path
             filename = os.path.basename(self.file_path)
 
-            existing_file = (
-                db.session.query(FileRecord).filter_by(file_md5=file_md5).first()
-            )
-            if existing_file:
-                os.remove(self.file_path)  # 同md5文件存在,删除新的文件
-                save_db_path = (
-                    existing_file.file_path
-                )  # 改写为旧文件的地址,但是文件名保持为filename
-                if not os.path.exists(save_db_path):  # 修复商汤的移动知识库文件处理
-                    first = os.path.dirname(save_db_path)
-                    second = "default/__data/sources"  # 商汤的知识库一旦被使用,会擅自挪动目录内的文件
-                    third = os.path.basename(save_db_path)
-                    save_db_path = os.path.join(first, second, third)
-
             file_record = FileRecord.init_as_knowledge(
                 user_id, filename, save_db_path, file_md5
             )
@@ -179,9 +171,10 @@ class FileService:
                 new_path = os.path.join(knowledge_base.path, os.path.basename(old_path))
                 os.makedirs(os.path.dirname(new_path), exist_ok=True)
                 if old_path != new_path:
-                    shutil.copy(
-                        old_path, new_path
-                    ) 
+                    if blob_store.exists(file_record.file_md5):
+                        blob_store.materialize(file_record.file_md5, new_path)
+                    else:
+                        link_or_copy(old_path, new_path)
 
                 file_record.file_path = new_path
                 file_record.used = True
@@ -213,9 +206,15 @@ class FileService:
         filename = FileTools.get_filename(file_obj)
         file_path = os.path.join(storage_path, filename)
 
-        file_obj.save(file_path)  # 保存文件
+        pretty_file = PrettyFile(file_path)
+        if pretty_file.postfix == ".zip":
+            file_obj.save(file_path)  # 保存文件，解压后逐个处理
+        else:
+            # 边接收边计算MD5写入blob存储
+            file_md5 = blob_store.put_stream(file_obj.stream, file_path)
+            pretty_file = PrettyFile(file_path, file_md5)
 
-        file_list = PrettyFile(file_path).save_to_db(user_id)
+        file_list = pretty_file.save_to_db(user_id)
         # 资源库文件大小同步至用户组空间下
         file_path_list = [file.file_path for file in file_list]
         Tenant.save_used_storage(
@@ -277,7 +276,8 @@ class FileService:
         """批量删除文件的数据库记录。
 
         删除文件在数据库中的记录，并恢复租户的存储空间使用量。
-        注意：目前不删除实际的文件，以防同样 MD5 的文件被误删。
+        不再被任何记录引用的文件路径随之删除；文件内容保存在 blob 存储中，
+        由 :meth:`collect_blob_garbage` 在没有记录引用后回收。
 
         Args:
             file_ids: 要删除的文件 ID 列表。
@@ -298,14 +298,56 @@ class FileService:
         # 恢复已使用的存储空间
         Tenant.restore_used_storage(self.current_tenant_id, total_size)
 
+        file_paths = {
+            path
+            for (path,) in db.session.query(FileRecord.file_path).filter(
+                FileRecord.id.in_(file_ids)
+            )
+        }
+
         # 使用批量删除
-        # 目前没有删除文件实体,以防同样md5的文件被误删; 后续可以优化,节省磁盘空间
         delete_stmt = sqlalchemy.delete(FileRecord).where(FileRecord.id.in_(file_ids))
         result = db.session.execute(delete_stmt)
         deleted_count = result.rowcount
         db.session.commit()
+
+        # 早期相同md5的记录会共用同一路径，仍被其他记录引用的路径保留
+        shared_paths = {
+            path
+            for (path,) in db.session.query(FileRecord.file_path).filter(
+                FileRecord.file_path.in_(file_paths)
+            )
+        }
+        for path in file_paths - shared_paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logging.warning(f"删除文件失败: {path}, {e}")
         return deleted_count
 
+    @staticmethod
+    def collect_blob_garbage(min_age=None):
+        """回收没有文件记录引用的 blob。
+
+        Args:
+            min_age: 只回收超过该秒数未被使用的 blob，默认使用全局配置。
+
+        Returns:
+            int: 删除的 blob 数量。
+        """
+
+        def referenced(digests):
+            return {
+                file_md5
+                for (file_md5,) in db.session.query(FileRecord.file_md5)
+                .filter(FileRecord.file_md5.in_(digests))
+                .distinct()
+            }
+
+        return blob_store.collect_garbage(referenced, min_age)
+
     @staticmethod
     def get_file_size_by_knowledge_base_id(knowledge_base_id):
         """获取知识库中的文件数量。
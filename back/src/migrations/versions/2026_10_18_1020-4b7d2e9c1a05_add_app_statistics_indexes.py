@@ -0,0 +1,105 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Additional Notice:
+# When modifying, redistributing, or creating derivative works of this software,
+# you must retain the original LazyCraft logo and the GitHub link icon that directs
+# to the official repository: https://github.com/LazyAGI/LazyLLM
+
+"""
+数据库迁移: add app statistics indexes
+
+==========================================
+自动生成的数据库迁移文件
+==========================================
+
+迁移信息:
+---------
+- 修订版本: 4b7d2e9c1a05
+- 基于版本: def28d16b22a
+- 创建时间: 2026-10-18 10:20:00.000000
+- 迁移描述: add app statistics indexes
+
+重要说明:
+---------
+⚠️  在生产环境执行前，请务必：
+   1. 在测试环境中完整验证所有迁移操作
+   2. 备份生产数据库
+   3. 确认迁移操作的可逆性
+   4. 评估大表操作的性能影响
+   5. 准备回滚计划
+
+📋 使用方法:
+   - 升级到此版本: flask db upgrade
+   - 降级到上一版本: flask db downgrade
+   - 查看当前版本: flask db current
+   - 查看迁移历史: flask db history
+
+🔍 如有疑问，请联系数据库管理员或开发团队。
+"""
+
+# =============================================================================
+# 导入必要的模块
+# =============================================================================
+
+from alembic import op
+import sqlalchemy as sa
+from models import StringUUID
+
+# =============================================================================
+# 迁移版本标识符
+# =============================================================================
+
+# 这些标识符由 Alembic 自动管理，请勿手动修改
+revision = '4b7d2e9c1a05'
+down_revision = 'def28d16b22a'
+branch_labels = None
+depends_on = None
+
+
+# =============================================================================
+# 数据库升级操作
+# =============================================================================
+
+def upgrade():
+    """
+    执行数据库升级操作。
+
+    为应用统计的按应用、时间区间聚合查询添加复合索引。
+
+    ⚠️  安全提醒：
+       - conversation、cost_audits 为大表，索引创建可能需要较长时间，请在维护窗口内执行
+    """
+    with op.batch_alter_table('conversation', schema=None) as batch_op:
+        batch_op.create_index('conversation_app_created_idx', ['app_id', 'created_at'], unique=False)
+
+    with op.batch_alter_table('cost_audits', schema=None) as batch_op:
+        batch_op.create_index('cost_audit_app_call_created_idx', ['app_id', 'call_type', 'created_at'], unique=False)
+
+
+# =============================================================================
+# 数据库降级操作
+# =============================================================================
+
+def downgrade():
+    """
+    执行数据库降级操作。
+
+    删除 upgrade() 中创建的索引，不涉及数据变更。
+    """
+    with op.batch_alter_table('cost_audits', schema=None) as batch_op:
+        batch_op.drop_index('cost_audit_app_call_created_idx')
+
+    with op.batch_alter_table('conversation', schema=None) as batch_op:
+        batch_op.drop_index('conversation_app_created_idx')
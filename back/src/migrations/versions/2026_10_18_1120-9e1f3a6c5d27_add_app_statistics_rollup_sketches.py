@@ -0,0 +1,109 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Additional Notice:
+# When modifying, redistributing, or creating derivative works of this software,
+# you must retain the original LazyCraft logo and the GitHub link icon that directs
+# to the official repository: https://github.com/LazyAGI/LazyLLM
+
+"""
+数据库迁移: add app statistics rollup sketches
+
+==========================================
+自动生成的数据库迁移文件
+==========================================
+
+迁移信息:
+---------
+- 修订版本: 9e1f3a6c5d27
+- 基于版本: 4b7d2e9c1a05
+- 创建时间: 2026-10-18 11:20:00.000000
+- 迁移描述: add app statistics rollup sketches
+
+重要说明:
+---------
+⚠️  在生产环境执行前，请务必：
+   1. 在测试环境中完整验证所有迁移操作
+   2. 备份生产数据库
+   3. 确认迁移操作的可逆性
+   4. 评估大表操作的性能影响
+   5. 准备回滚计划
+
+📋 使用方法:
+   - 升级到此版本: flask db upgrade
+   - 降级到上一版本: flask db downgrade
+   - 查看当前版本: flask db current
+   - 查看迁移历史: flask db history
+
+🔍 如有疑问，请联系数据库管理员或开发团队。
+"""
+
+# =============================================================================
+# 导入必要的模块
+# =============================================================================
+
+from alembic import op
+import sqlalchemy as sa
+from models import StringUUID
+
+# =============================================================================
+# 迁移版本标识符
+# =============================================================================
+
+# 这些标识符由 Alembic 自动管理，请勿手动修改
+revision = '9e1f3a6c5d27'
+down_revision = '4b7d2e9c1a05'
+branch_labels = None
+depends_on = None
+
+
+# =============================================================================
+# 数据库升级操作
+# =============================================================================
+
+def upgrade():
+    """
+    执行数据库升级操作。
+
+    为 app_statistics 添加可合并的去重草图与耗时直方图字段，
+    以及按应用、调用类型、日期查询的复合索引。
+    已有统计行的新字段为空，可通过 flask backfill-app-statistics 回填。
+    """
+    with op.batch_alter_table('app_statistics', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('system_user_sketch', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('web_user_sketch', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('system_session_sketch', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('web_session_sketch', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('cost_time_histogram', sa.Text(), nullable=True))
+        batch_op.create_index('app_statistics_app_call_date_idx', ['app_id', 'call_type', 'stat_date'], unique=False)
+
+
+# =============================================================================
+# 数据库降级操作
+# =============================================================================
+
+def downgrade():
+    """
+    执行数据库降级操作。
+
+    删除 upgrade() 中添加的索引与字段，已生成的草图数据会丢失，
+    降级后区间统计需重新回填。
+    """
+    with op.batch_alter_table('app_statistics', schema=None) as batch_op:
+        batch_op.drop_index('app_statistics_app_call_date_idx')
+        batch_op.drop_column('cost_time_histogram')
+        batch_op.drop_column('web_session_sketch')
+        batch_op.drop_column('system_session_sketch')
+        batch_op.drop_column('web_user_sketch')
+        batch_op.drop_column('system_user_sketch')
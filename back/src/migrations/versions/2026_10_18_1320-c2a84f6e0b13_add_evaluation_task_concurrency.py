@@ -0,0 +1,96 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Additional Notice:
+# When modifying, redistributing, or creating derivative works of this software,
+# you must retain the original LazyCraft logo and the GitHub link icon that directs
+# to the official repository: https://github.com/LazyAGI/LazyLLM
+
+"""
+数据库迁移: add evaluation task concurrency
+
+==========================================
+自动生成的数据库迁移文件
+==========================================
+
+迁移信息:
+---------
+- 修订版本: c2a84f6e0b13
+- 基于版本: 9e1f3a6c5d27
+- 创建时间: 2026-10-18 13:20:00.000000
+- 迁移描述: add evaluation task concurrency
+
+重要说明:
+---------
+⚠️  在生产环境执行前，请务必：
+   1. 在测试环境中完整验证所有迁移操作
+   2. 备份生产数据库
+   3. 确认迁移操作的可逆性
+   4. 评估大表操作的性能影响
+   5. 准备回滚计划
+
+📋 使用方法:
+   - 升级到此版本: flask db upgrade
+   - 降级到上一版本: flask db downgrade
+   - 查看当前版本: flask db current
+   - 查看迁移历史: flask db history
+
+🔍 如有疑问，请联系数据库管理员或开发团队。
+"""
+
+# =============================================================================
+# 导入必要的模块
+# =============================================================================
+
+from alembic import op
+import sqlalchemy as sa
+from models import StringUUID
+
+# =============================================================================
+# 迁移版本标识符
+# =============================================================================
+
+# 这些标识符由 Alembic 自动管理，请勿手动修改
+revision = 'c2a84f6e0b13'
+down_revision = '9e1f3a6c5d27'
+branch_labels = None
+depends_on = None
+
+
+# =============================================================================
+# 数据库升级操作
+# =============================================================================
+
+def upgrade():
+    """
+    执行数据库升级操作。
+
+    为评测任务添加并发数字段，为空时使用全局配置。
+    """
+    with op.batch_alter_table('evaluation_tasks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('concurrency', sa.Integer(), nullable=True))
+
+
+# =============================================================================
+# 数据库降级操作
+# =============================================================================
+
+def downgrade():
+    """
+    执行数据库降级操作。
+
+    删除 upgrade() 中添加的并发数字段。
+    """
+    with op.batch_alter_table('evaluation_tasks', schema=None) as batch_op:
+        batch_op.drop_column('concurrency')
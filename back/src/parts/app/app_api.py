@@ -788,7 +788,7 @@ class AppReportApi(Resource):
             "fine_tune": "fine_tune",
             "evaluation": "evaluation",
         }.get(mode, mode)
-        CostService.add(user_id, app_id, tokens, call_type, track_id, cost_time)
+        CostService.add_buffered(user_id, app_id, tokens, call_type, track_id, cost_time)
 
         # 2. 数据回流
         try:
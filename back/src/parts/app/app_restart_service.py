@@ -20,13 +20,16 @@
 import json
 import logging
 import time
-from typing import List, Dict, Any
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
 
-from sqlalchemy import and_
+from sqlalchemy import and_, func
 
+from configs import lazy_config
 from models.model_account import Account
 from parts.app.app_service import AppService, WorkflowService
 from parts.app.node_run.app_run_service import AppRunService, EventHandler
+from parts.cost_audit.model import CostAudit
 from utils.util_database import db
 
 from .model import App
@@ -223,31 +226,50 @@ class AppRestartService:
             self.logger.error(f"重启应用 {app.name} 时发生异常: {e}")
             return False
     
-    def restart_all_running_apps(self) -> Dict[str, Any]:
-        """重启所有已启动的应用。
+    def sort_apps_by_usage(self, apps: List[App]) -> List[App]:
+        """按最近的发布态调用次数对应用降序排序。
         
+        Args:
+            apps (List[App]): 应用列表
+            
         Returns:
-            Dict[str, Any]: 重启结果统计
+            List[App]: 排序后的应用列表，统计失败时保持原顺序
         """
-        self.logger.info("开始重启所有已启动的应用")
-        
-        # 获取所有已启动的应用
-        running_apps = self.get_all_running_apps()
+        if not apps:
+            return apps
+        since = datetime.now() - timedelta(days=lazy_config.ENGINE_POOL_PREWARM_DAYS)
+        try:
+            rows = (
+                db.session.query(CostAudit.app_id, func.count(CostAudit.id))
+                .filter(
+                    CostAudit.app_id.in_([str(app.id) for app in apps]),
+                    CostAudit.call_type == "release",
+                    CostAudit.created_at >= since,
+                )
+                .group_by(CostAudit.app_id)
+                .all()
+            )
+        except Exception as e:
+            self.logger.warning(f"统计应用调用次数失败: {e}")
+            return apps
         
-        if not running_apps:
-            self.logger.info("没有找到已启动的应用")
-            return {
-                "total": 0,
-                "success": 0,
-                "failed": 0,
-                "results": []
-            }
+        usage = {app_id: count for app_id, count in rows}
+        return sorted(apps, key=lambda app: usage.get(str(app.id), 0), reverse=True)
+    
+    def _restart_apps(self, apps: List[App]) -> Dict[str, Any]:
+        """依次重启应用并汇总结果。
         
+        Args:
+            apps (List[App]): 应用列表
+            
+        Returns:
+            Dict[str, Any]: 重启结果统计
+        """
         results = []
         success_count = 0
         failed_count = 0
         
-        for app in running_apps:
+        for app in apps:
             try:
                 success = self.restart_app(app)
                 results.append({
@@ -271,11 +293,73 @@ class AppRestartService:
                 })
                 failed_count += 1
         
+        return {
+            "total": len(apps),
+            "success": success_count,
+            "failed": failed_count,
+            "results": results
+        }
+    
+    def prewarm_popular_apps(
+        self, apps: Optional[List[App]] = None, limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """预热最常用的已发布应用。
+        
+        按最近的调用次数选出前 limit 个已启动的应用并优先启动，
+        使部署后的第一批请求落在已启动的引擎上。
+        
+        Args:
+            apps (List[App], optional): 候选应用，默认为所有已启动的应用
+            limit (int, optional): 预热数量，默认为 ENGINE_POOL_PREWARM_LIMIT
+            
+        Returns:
+            Dict[str, Any]: 预热结果统计
+        """
+        if apps is None:
+            apps = self.get_all_running_apps()
+        if limit is None:
+            limit = lazy_config.ENGINE_POOL_PREWARM_LIMIT
+        
+        popular_apps = self.sort_apps_by_usage(apps)[:limit]
+        self.logger.info(f"开始预热 {len(popular_apps)} 个常用应用")
+        return self._restart_apps(popular_apps)
+    
+    def restart_all_running_apps(self) -> Dict[str, Any]:
+        """重启所有已启动的应用。
+        
+        最常用的应用先通过预热步骤启动，其余应用随后依次启动。
+        
+        Returns:
+            Dict[str, Any]: 重启结果统计
+        """
+        self.logger.info("开始重启所有已启动的应用")
+        
+        # 获取所有已启动的应用
+        running_apps = self.get_all_running_apps()
+        
+        if not running_apps:
+            self.logger.info("没有找到已启动的应用")
+            return {
+                "total": 0,
+                "success": 0,
+                "failed": 0,
+                "results": []
+            }
+        
+        prewarm_summary = self.prewarm_popular_apps(running_apps)
+        prewarmed_ids = {item["app_id"] for item in prewarm_summary["results"]}
+        rest_summary = self._restart_apps(
+            [app for app in running_apps if app.id not in prewarmed_ids]
+        )
+        
+        success_count = prewarm_summary["success"] + rest_summary["success"]
+        failed_count = prewarm_summary["failed"] + rest_summary["failed"]
         result_summary = {
             "total": len(running_apps),
             "success": success_count,
             "failed": failed_count,
-            "results": results
+            "prewarmed": prewarm_summary["total"],
+            "results": prewarm_summary["results"] + rest_summary["results"]
         }
         
         self.logger.info(f"应用重启完成: 总计 {len(running_apps)} 个，成功 {success_count} 个，失败 {failed_count} 个")
@@ -32,9 +32,15 @@ from lazyllm.engine import LightEngine
 from configs import lazy_config
 from libs.filetools import FileTools
 from parts.db_manage.service import DBManageService
+from parts.mcp.session_pool import install_mcp_tool_constructor
 from parts.tools.model import ToolAuth
 
+from .graph_cache import GraphCache
 from .lazy_converter import LazyConverter
+from .stream_relay import StreamRelay
+
+# MCPTool 节点复用进程级 MCP 会话，避免每次调用都启动子进程并握手
+install_mcp_tool_constructor()
 
 
 class EngineExecutor:
@@ -245,22 +251,13 @@ class EngineExecutor:
             Converted graph data
         """
         try:
-            if self._node_id:
-                graph_data = LazyConverter.convert_workflow_single_node_to_lazy(
-                    workflow, self._node_id, app_id=self._engine_id
-                )
-            else:
-                graph_data = LazyConverter.convert_workflow_to_lazy(
-                    workflow, app_id=self._engine_id
-                )
-
-            check_res = LazyConverter.is_graph_can_run(graph_data)
-            if not check_res:
-                raise ValueError(
-                    "Graph data processing failed: There are nodes that have failed to build"
-                )
-
-            self._validate_graph_data(graph_data)
+            graph_data = GraphCache.get_or_convert(
+                workflow,
+                lambda: self._convert_workflow(workflow),
+                node_id=self._node_id,
+                engine_id=self._engine_id,
+                **self._get_conversion_identity(),
+            )
             self._logger.info(
                 f"Graph data processing completed: nodes={len(graph_data.get('nodes', []))}, "
                 f"edges={len(graph_data.get('edges', []))}"
@@ -271,6 +268,37 @@ class EngineExecutor:
             self._logger.error(f"Graph data processing failed: {e}")
             raise ValueError(f"Graph data processing failed: {e}")
 
+    def _convert_workflow(self, workflow) -> dict[str, Any]:
+        """转换并校验画布数据"""
+        if self._node_id:
+            graph_data = LazyConverter.convert_workflow_single_node_to_lazy(
+                workflow, self._node_id, app_id=self._engine_id
+            )
+        else:
+            graph_data = LazyConverter.convert_workflow_to_lazy(
+                workflow, app_id=self._engine_id
+            )
+
+        check_res = LazyConverter.is_graph_can_run(graph_data)
+        if not check_res:
+            raise ValueError(
+                "Graph data processing failed: There are nodes that have failed to build"
+            )
+
+        self._validate_graph_data(graph_data)
+        return graph_data
+
+    @staticmethod
+    def _get_conversion_identity() -> dict[str, str]:
+        """转换结果依赖当前用户（工具节点）和租户（模型api_key）"""
+        try:
+            return {
+                "user_id": str(current_user.id),
+                "tenant_id": str(current_user.current_tenant_id),
+            }
+        except Exception:
+            return {"user_id": "", "tenant_id": ""}
+
     def add_server_resource_if_needed(
         self, resources: list[dict[str, Any]]
     ) -> list[dict[str, Any]]:
@@ -447,15 +475,7 @@ class EngineExecutor:
                 )
 
                 # Process streaming output
-                stream_result = ""
-                while True:
-                    tid = lazyllm.FileSystemQueue().sid
-                    if value := lazyllm.FileSystemQueue()._dequeue(tid):
-                        part_result = "".join(value)
-                        stream_result += part_result
-                        yield part_result
-                    elif future.done():
-                        break
+                yield from StreamRelay().relay(future)
 
                 # Get final result
                 final_result = future.result()
@@ -25,6 +25,7 @@ from collections.abc import Generator
 from typing import Any, Optional, Union
 
 import parts.data.data_reflux_service as reflux
+from configs import lazy_config
 from libs.timetools import TimeTools
 from models.model_account import Account
 from parts.app.node_run.debug_session_manager import DebugSessionManager
@@ -32,9 +33,41 @@ from parts.app.node_run.event_serializer import EasyEncoder
 from utils.util_redis import redis_client
 
 from .engine_executor import EngineExecutor
+from .engine_pool import EnginePool
 from .node_base import BaseNode
 from .run_context import RunContext
 
+# 调试详情以有序集合保存：score = 节点拓扑位置 * _DETAIL_SCORE_SPAN + 写入序号，
+# 同一节点的多条记录保持写入顺序。member 以写入序号为前缀，保证重复记录不会被合并。
+# 写入的 detail/token key 会登记到 key 注册表，多轮对话的最新轮次以计数器维护，
+# 清理和查询最新轮次时都无需 KEYS 扫描。
+_DETAIL_SCORE_SPAN = 1 << 32
+
+# 清理时每批 UNLINK 的 key 数量
+_CLEANUP_BATCH_SIZE = 500
+
+# 调试历史按轮次分别保存：每轮最多保留的记录数、最多保留的轮次数和每轮的过期时间
+_HISTORY_RECORDS_PER_TURN = 100
+_HISTORY_MAX_TURNS = 100
+_HISTORY_TTL = 1 * 24 * 3600
+
+_SET_DETAIL_SCRIPT = redis_client.register_script(
+    """
+local pos = redis.call('HGET', KEYS[2], ARGV[1])
+if not pos then
+    pos = redis.call('HLEN', KEYS[2])
+end
+local seq = redis.call('ZCARD', KEYS[1]) + 1
+redis.call('ZADD', KEYS[1], tonumber(pos) * tonumber(ARGV[4]) + seq, string.format('%010d:', seq) .. ARGV[2])
+redis.call('SADD', KEYS[4], KEYS[1], KEYS[3])
+local turn = tonumber(ARGV[5])
+if turn >= 1 and turn > tonumber(redis.call('GET', KEYS[5]) or '-1') then
+    redis.call('SET', KEYS[5], turn)
+end
+return redis.call('INCRBY', KEYS[3], ARGV[3])
+"""
+)
+
 
 class EngineStatus:
     """引擎状态枚举。
@@ -82,6 +115,10 @@ class RedisStateManager:
         self._detail_key = f"run_detail:{key_prefix}"
         self._detail_total_token_key = f"run_detail_total_token:{key_prefix}"
         self._detail_history_key = f"run_detail_history:{key_prefix}"
+        self._detail_history_turns_key = f"run_detail_history_turns:{key_prefix}"
+        self._detail_order_key = f"run_detail_order:{key_prefix}"
+        self._detail_registry_key = f"run_detail_keys:{key_prefix}"
+        self._latest_turn_key = f"run_detail_latest_turn:{key_prefix}"
 
     def _get_detail_key_with_turn(self, turn_number: int = -1) -> str:
         """获取包含turn_number的detail key
@@ -117,6 +154,14 @@ class RedisStateManager:
             # 多轮对话在key中加入turn_number
             return f"run_detail_total_token:{key_prefix}:turn_{turn_number}"
 
+    def _get_detail_history_key_with_turn(self, turn_number: str) -> str:
+        """获取某一轮调试历史的Redis key"""
+        return f"{self._detail_history_key}:turn_{turn_number}"
+
+    @staticmethod
+    def _history_turn_score(turn_number: str) -> int:
+        return int(turn_number) if turn_number.isdigit() else 0
+
     # ==================== Public Methods ====================
 
     def get_status(self) -> dict[str, Any]:
@@ -178,11 +223,20 @@ class RedisStateManager:
             Exception: 当保存失败时抛出
         """
         try:
-            redis_client.set(self._graph_key, json.dumps(graph_data))
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.set(self._graph_key, json.dumps(graph_data))
             if original_graph_data:
-                redis_client.set(
-                    self._original_graph_key, json.dumps(original_graph_data)
+                pipe.set(self._original_graph_key, json.dumps(original_graph_data))
+                # 预先计算节点拓扑位置，set_detail 据此直接定位，无需每次重排
+                sorted_nodes = self.topological_sort(
+                    original_graph_data.get("edges", [])
+                )
+                pipe.delete(self._detail_order_key)
+                pipe.hset(
+                    self._detail_order_key,
+                    mapping={node: index for index, node in enumerate(sorted_nodes)},
                 )
+            pipe.execute()
         except Exception as e:
             self._logger.error(f"Failed to save graph data: {e}")
 
@@ -222,10 +276,12 @@ class RedisStateManager:
 
         zero_in_degree = deque([start_node])
         sorted_nodes = []
+        visited = set()
 
         while zero_in_degree:
             node = zero_in_degree.popleft()
-            if node not in sorted_nodes:
+            if node not in visited:
+                visited.add(node)
                 sorted_nodes.append(node)
 
             for neighbor in graph[node]:
@@ -235,7 +291,7 @@ class RedisStateManager:
 
         # 确保所有节点都出现在排序结果中
         all_nodes = nodes.union({start_node, end_node})
-        unsorted_nodes = all_nodes - set(sorted_nodes)
+        unsorted_nodes = all_nodes - visited
 
         # 将未排序的节点添加到结果中
         sorted_nodes.extend(unsorted_nodes)
@@ -301,31 +357,16 @@ class RedisStateManager:
             self._logger.error(f"Failed to get total tokens: {e}")
             return 0
 
-    def _sort_details_by_node_order(self, details):
-        """根据节点顺序对详情数据进行排序
-
-        Args:
-            details (list): 详情数据列表
-
-        Returns:
-            list: 按节点顺序排序后的数据列表
-        """
-        if not self.sorted_nodes:
-            return details
-
-        def get_sort_key(item):
-            node_id = item.get("node_id")
-            if node_id in self.sorted_nodes:
-                return self.sorted_nodes.index(node_id)
-            else:
-                # 不在排序列表中的节点放在最后
-                return len(self.sorted_nodes)
-
-        return sorted(details, key=get_sort_key)
+    @staticmethod
+    def _decode_detail_members(members):
+        """去掉有序集合 member 的写入序号前缀并反序列化"""
+        return [json.loads(member.partition(b":")[2]) for member in members]
 
     def set_detail(self, new_data, turn_number: int = -1):
         """设置调试详情数据
 
+        按节点拓扑位置写入有序集合，每次调用只需一次 Redis 往返。
+
         Args:
             new_data: 调试数据
             turn_number (int): 对话轮次，-1表示单轮对话，>=1表示多轮对话
@@ -334,57 +375,33 @@ class RedisStateManager:
         total_token_key = self._get_detail_total_token_key_with_turn(turn_number)
 
         if new_data is None:
-            redis_client.delete(detail_key)
-            redis_client.delete(total_token_key)
-        else:
-            redis_client.rpush(detail_key, json.dumps(new_data))
+            redis_client.delete(detail_key, total_token_key)
+            return
 
-            # 根据节点顺序对数据进行排序
-            try:
-                # 如果存在原始图数据，则进行拓扑排序
-                if not self.sorted_nodes and redis_client.exists(
-                    self._original_graph_key
-                ):
-                    bytes_data = redis_client.get(self._original_graph_key)
-                    original_graph_data = json.loads(bytes_data) if bytes_data else {}
-                    self.sorted_nodes = self.topological_sort(
-                        original_graph_data.get("edges", [])
-                    )
-                    logging.info(f"sorted_nodes: {self.sorted_nodes}")
-
-                if self.sorted_nodes:
-                    # 获取所有数据
-                    all_details = self.get_detail(turn_number)
-                    if all_details:
-                        # 按节点顺序排序
-                        sorted_details = self._sort_details_by_node_order(all_details)
-
-                        # 清空原列表并重新插入排序后的数据
-                        redis_client.delete(detail_key)
-                        for detail in sorted_details:
-                            redis_client.rpush(detail_key, json.dumps(detail))
-            except Exception as e:
-                self._logger.error(f"Failed to sort details by node order: {e}")
-
-            try:
-                current_total = redis_client.get(total_token_key)
-                if current_total is not None:
-                    # 如果 current_total 是字节序列，需要先解码
-                    if isinstance(current_total, bytes):
-                        current_total = int(current_total.decode("utf-8"))
-                    else:
-                        current_total = int(str(current_total))
-                else:
-                    current_total = 0
-            except (ValueError, TypeError):
-                current_total = 0
-
-            new_total = (
-                current_total
-                + new_data.get("prompt_tokens", 0)
-                + new_data.get("completion_tokens", 0)
-            )
-            redis_client.set(total_token_key, new_total)
+        tokens = new_data.get("prompt_tokens", 0) + new_data.get(
+            "completion_tokens", 0
+        )
+        try:
+            turn = int(turn_number)
+        except (TypeError, ValueError):
+            turn = -1
+        _SET_DETAIL_SCRIPT(
+            keys=[
+                detail_key,
+                self._detail_order_key,
+                total_token_key,
+                self._detail_registry_key,
+                self._latest_turn_key,
+            ],
+            args=[
+                str(new_data.get("node_id") or ""),
+                json.dumps(new_data),
+                int(tokens or 0),
+                _DETAIL_SCORE_SPAN,
+                turn,
+            ],
+            client=redis_client,
+        )
 
     def save_current_detail_to_history(self, turn_number: int = -1):
         """将当前交互的调试信息保存到历史记录中
@@ -401,69 +418,48 @@ class RedisStateManager:
             if not current_details:
                 return
 
-            # 按turn_number分组保存到历史记录，保持时间顺序
+            # 按turn_number分组，忽略停止数据和单轮对话数据（turn_number为-1）
+            grouped_details = defaultdict(list)
             for detail in current_details:
-                self._save_detail_history(detail)
-
-        except Exception as e:
-            self._logger.error(f"Failed to save current detail to history: {e}")
-
-    def _save_detail_history(self, new_data):
-        """保存调试数据到历史记录，按turn_number分组"""
-        try:
-            # 忽略停止数据，不保存到历史记录
-            if isinstance(new_data, dict) and new_data.get("type") == "session_end":
-                return
-
-            # 获取turn_number，如果不存在则使用默认值
-            turn_number = str(new_data.get("turn_number", "1"))
-            # 忽略单轮对话数据（turn_number为-1），不保存到历史记录
-            if turn_number == "-1":
+                if detail.get("type") == "session_end":
+                    continue
+                detail_turn = str(detail.get("turn_number", "1"))
+                if detail_turn == "-1":
+                    continue
+                grouped_details[detail_turn].append(json.dumps(detail))
+
+            if not grouped_details:
                 return
 
-            # 获取现有的历史数据
-            history_data = self._get_detail_history_dict()
-
-            # 如果该turn_number不存在，创建新的列表
-            if turn_number not in history_data:
-                history_data[turn_number] = []
-
-            # 添加新数据到对应turn_number的列表中
-            history_data[turn_number].append(new_data)
-
-            # 限制每个turn_number组的数据量（最多100条）
-            if len(history_data[turn_number]) > 100:
-                history_data[turn_number] = history_data[turn_number][-100:]
-
-            # 限制总的turn_number组数量（最多100个组）
-            if len(history_data) > 100:
-                # 删除最早的turn_number组
-                oldest_turn = min(
-                    history_data.keys(), key=lambda x: int(x) if x.isdigit() else 0
+            # 整轮一次性写入：追加、截断并设置该轮的过期时间，同时登记轮次索引
+            pipe = redis_client.pipeline(transaction=False)
+            for detail_turn, records in grouped_details.items():
+                history_key = self._get_detail_history_key_with_turn(detail_turn)
+                pipe.rpush(history_key, *records)
+                pipe.ltrim(history_key, -_HISTORY_RECORDS_PER_TURN, -1)
+                pipe.expire(history_key, _HISTORY_TTL)
+                pipe.zadd(
+                    self._detail_history_turns_key,
+                    {detail_turn: self._history_turn_score(detail_turn)},
                 )
-                del history_data[oldest_turn]
-
-            # 保存回Redis，设置1天过期时间
-            redis_client.setex(
-                self._detail_history_key, 1 * 24 * 3600, json.dumps(history_data)
+            pipe.zrange(self._detail_history_turns_key, 0, -_HISTORY_MAX_TURNS - 1)
+            pipe.zremrangebyrank(
+                self._detail_history_turns_key, 0, -_HISTORY_MAX_TURNS - 1
             )
+            pipe.expire(self._detail_history_turns_key, _HISTORY_TTL)
+            evicted_turns = pipe.execute()[-3]
+
+            # 超出轮次上限时删除最早的轮次
+            if evicted_turns:
+                redis_client.unlink(
+                    *[
+                        self._get_detail_history_key_with_turn(turn.decode())
+                        for turn in evicted_turns
+                    ]
+                )
 
         except Exception as e:
-            self._logger.error(f"Failed to save detail history: {e}")
-
-    def _get_detail_history_dict(self):
-        """获取历史数据的字典格式"""
-        try:
-            bytes_data = redis_client.get(self._detail_history_key)
-            if bytes_data is None:
-                return {}
-
-            data = json.loads(bytes_data)
-            return data if isinstance(data, dict) else {}
-
-        except Exception as e:
-            self._logger.error(f"Failed to get detail history dict: {e}")
-            return {}
+            self._logger.error(f"Failed to save current detail to history: {e}")
 
     def get_detail(self, turn_number: int = -1, conversation_type: str = "single"):
         """获取调试详情数据
@@ -483,8 +479,7 @@ class RedisStateManager:
             turn_number = latest_turn
 
         detail_key = self._get_detail_key_with_turn(turn_number)
-        bytesdata_list = redis_client.lrange(detail_key, 0, 1000)
-        return [json.loads(bytesdata) for bytesdata in bytesdata_list]
+        return self._decode_detail_members(redis_client.zrange(detail_key, 0, 1000))
 
     def get_detail_history(self, limit=None):
         """获取历史调试数据，按turn_number分组
@@ -492,48 +487,91 @@ class RedisStateManager:
         Args:
             limit: 限制返回的turn_number组数量，None表示返回全部数据
         """
-        history_data = self._get_detail_history_dict()
+        # 只读取最后limit个轮次
+        start = -limit if limit else 0
+        try:
+            turns = [
+                turn.decode()
+                for turn in redis_client.zrange(
+                    self._detail_history_turns_key, start, -1
+                )
+            ]
+            if not turns:
+                return {}
 
-        if limit is None:
+            pipe = redis_client.pipeline(transaction=False)
+            for turn_number in turns:
+                pipe.lrange(self._get_detail_history_key_with_turn(turn_number), 0, -1)
+            history_data = {}
+            for turn_number, records in zip(turns, pipe.execute()):
+                # 单轮数据已过期时跳过
+                if records:
+                    history_data[turn_number] = [json.loads(item) for item in records]
             return history_data
+        except Exception as e:
+            self._logger.error(f"Failed to get detail history: {e}")
+            return {}
 
-        # 如果指定了limit，则限制返回的turn_number组数量
-        # 按turn_number排序，返回最后limit个组
-        sorted_turns = sorted(
-            history_data.keys(), key=lambda x: int(x) if x.isdigit() else 0
-        )
-        limited_turns = (
-            sorted_turns[-limit:] if len(sorted_turns) > limit else sorted_turns
-        )
-
-        limited_data = {}
-        for turn_number in limited_turns:
-            limited_data[turn_number] = history_data[turn_number]
-
-        return limited_data
-
-    # 删除 detail_history_key 和 重置调试会话
-    def delete_detail_history(self, user_id: str):
-        redis_client.delete(self._detail_history_key)
-
-        # 清理所有turn_number相关的detail key
-        key_prefix = f"{self._mode}-{self._app_id}"
-        pattern = f"run_detail:{key_prefix}*"
+    @staticmethod
+    def _unlink_keys(keys) -> None:
+        """分批 UNLINK key 并一次性流水线提交，避免单条命令长时间占用 Redis"""
+        pipe = redis_client.pipeline(transaction=False)
+        batch = []
+        for key in keys:
+            batch.append(key)
+            if len(batch) >= _CLEANUP_BATCH_SIZE:
+                pipe.unlink(*batch)
+                batch = []
+        if batch:
+            pipe.unlink(*batch)
+        pipe.execute()
+
+    def _cleanup_detail_keys(self) -> None:
+        """清理所有turn_number相关的detail key和total token key
+
+        优先使用写入时登记的 key 注册表；注册表不存在时（旧版本写入的数据）
+        退化为 SCAN 匹配。
+        """
         try:
-            keys_to_delete = redis_client.keys(pattern)
-            for key in keys_to_delete:
-                redis_client.delete(key)
-        except Exception:
-            pass
+            registered_keys = redis_client.smembers(self._detail_registry_key)
+            if registered_keys:
+                self._unlink_keys(registered_keys)
+            else:
+                key_prefix = f"{self._mode}-{self._app_id}"
+                for pattern in (
+                    f"run_detail:{key_prefix}*",
+                    f"run_detail_total_token:{key_prefix}*",
+                ):
+                    self._unlink_keys(
+                        redis_client.scan_iter(
+                            match=pattern, count=_CLEANUP_BATCH_SIZE
+                        )
+                    )
+            redis_client.unlink(self._detail_registry_key, self._latest_turn_key)
+        except Exception as e:
+            self._logger.error(f"Failed to cleanup detail keys: {e}")
 
-        # 清理所有turn_number相关的total token key
-        pattern = f"run_detail_total_token:{key_prefix}*"
+    def _cleanup_history_keys(self) -> None:
+        """清理所有轮次的调试历史及其轮次索引"""
         try:
-            keys_to_delete = redis_client.keys(pattern)
-            for key in keys_to_delete:
-                redis_client.delete(key)
-        except Exception:
-            pass
+            turns = redis_client.zrange(self._detail_history_turns_key, 0, -1)
+            self._unlink_keys(
+                [
+                    self._detail_history_key,
+                    self._detail_history_turns_key,
+                    *[
+                        self._get_detail_history_key_with_turn(turn.decode())
+                        for turn in turns
+                    ],
+                ]
+            )
+        except Exception as e:
+            self._logger.error(f"Failed to cleanup detail history: {e}")
+
+    # 删除调试历史和 重置调试会话
+    def delete_detail_history(self, user_id: str):
+        self._cleanup_history_keys()
+        self._cleanup_detail_keys()
 
         draft_session_manager = DebugSessionManager(
             self._app_id, user_id, mode=self._mode
@@ -560,7 +598,7 @@ class RedisStateManager:
             turn_number = latest_turn
 
         detail_key = self._get_detail_key_with_turn(turn_number)
-        return redis_client.llen(detail_key)
+        return redis_client.zcard(detail_key)
 
     def get_detail_since(
         self, last_index: int, turn_number: int = -1, conversation_type: str = "single"
@@ -584,9 +622,10 @@ class RedisStateManager:
             turn_number = latest_turn
 
         detail_key = self._get_detail_key_with_turn(turn_number)
-        # redis lrange 是闭区间，所以下标要+1
-        bytesdata_list = redis_client.lrange(detail_key, last_index + 1, -1)
-        return [json.loads(bytesdata) for bytesdata in bytesdata_list]
+        # redis zrange 是闭区间，所以下标要+1
+        return self._decode_detail_members(
+            redis_client.zrange(detail_key, last_index + 1, -1)
+        )
 
     def cleanup(self) -> None:
         """Clean up all Redis data"""
@@ -596,34 +635,17 @@ class RedisStateManager:
             self._original_graph_key,
             self._status_key,
             self._extras_key,
-            self._detail_history_key,
+            self._detail_order_key,
         ]
 
-        # 清理所有turn_number相关的detail key
-        key_prefix = f"{self._mode}-{self._app_id}"
-        pattern = f"run_detail:{key_prefix}*"
-        try:
-            keys_to_delete = redis_client.keys(pattern)
-            for key in keys_to_delete:
-                redis_client.delete(key)
-        except Exception:
-            pass
+        self._cleanup_detail_keys()
+        self._cleanup_history_keys()
 
-        # 清理所有turn_number相关的total token key
-        pattern = f"run_detail_total_token:{key_prefix}*"
+        # 清理基础key
         try:
-            keys_to_delete = redis_client.keys(pattern)
-            for key in keys_to_delete:
-                redis_client.delete(key)
+            redis_client.unlink(*redis_keys)
         except Exception:
             pass
-
-        # 清理基础key
-        for key in redis_keys:
-            try:
-                redis_client.delete(key)
-            except Exception:
-                pass
         self._logger.info("Redis data cleanup completed")
 
     @staticmethod
@@ -675,30 +697,8 @@ class RedisStateManager:
             int: 最大的turn_number，如果没有多轮对话数据则返回-1
         """
         try:
-            key_prefix = f"{self._mode}-{self._app_id}"
-            pattern = f"run_detail:{key_prefix}:turn_*"
-            keys = redis_client.keys(pattern)
-
-            if not keys:
-                return -1
-
-            # 从key中提取turn_number
-            turn_numbers = []
-            for key in keys:
-                # 确保key是字符串类型
-                if isinstance(key, bytes):
-                    key = key.decode("utf-8")
-
-                if ":turn_" in key:
-                    try:
-                        turn_str = key.split(":turn_")[-1]
-                        turn_num = int(turn_str)
-                        turn_numbers.append(turn_num)
-                    except (ValueError, IndexError):
-                        continue
-
-            return max(turn_numbers) if turn_numbers else -1
-
+            latest_turn = redis_client.get(self._latest_turn_key)
+            return int(latest_turn) if latest_turn is not None else -1
         except Exception as e:
             self._logger.error(f"Failed to get latest turn number: {e}")
             return -1
@@ -732,6 +732,7 @@ class EngineManager:
 
         # Cache graph data
         self._graph_data: Optional[dict[str, Any]] = None
+        self._model_footprint = 1
 
         # Logger configuration
         self._logger = logging.getLogger(f"EngineManager.{self._executor.engine_id}")
@@ -922,6 +923,7 @@ class EngineManager:
 
         # Save graph data and extra information
         self._graph_data = graph_data
+        self._model_footprint = EnginePool.model_footprint(workflow)
         self.redis_manager.save_graph_data(graph_data, workflow)
         self._set_extras(graph_data)
 
@@ -930,6 +932,15 @@ class EngineManager:
 
     # ==================== 生命周期管理 - 公共接口 ====================
 
+    @property
+    def use_engine_pool(self) -> bool:
+        """Check if the engine is kept in the warm engine pool"""
+        return (
+            self.is_release_mode
+            and not self.node_id
+            and lazy_config.ENGINE_POOL_ENABLED
+        )
+
     def start_engine(self) -> str:
         """Start LightEngine"""
         if not self._graph_data:
@@ -941,8 +952,7 @@ class EngineManager:
             # Set starting status
             self.set_status(EngineStatus.STARTING)
 
-            # Start engine
-            engine_gid = self._executor.start_engine(self._graph_data)
+            engine_gid = self._start_or_reuse_engine()
 
             # Set running status and URLs
             web_url, api_url = self._executor.get_engine_urls()
@@ -953,15 +963,42 @@ class EngineManager:
             self.set_status(EngineStatus.ERROR, error=str(e))
             raise
 
-    def stop_engine(self) -> None:
-        """Stop LightEngine"""
+    def _start_or_reuse_engine(self) -> str:
+        """启动引擎，发布态下优先复用引擎池中画布相同的引擎"""
+        if not self.use_engine_pool:
+            return self._executor.start_engine(self._graph_data)
+
+        gid = self._executor.engine_id
+        graph_hash = EnginePool.graph_hash(self._graph_data)
+        if EnginePool.acquire(gid, graph_hash) and self._executor.is_engine_running():
+            self._logger.info(f"Reusing pooled LightEngine: {gid}")
+            return gid
+
+        engine_gid = self._executor.start_engine(self._graph_data)
+        EnginePool.register(engine_gid, graph_hash, self._model_footprint)
+        return engine_gid
+
+    def stop_engine(self, keep_warm: bool = False) -> None:
+        """Stop LightEngine
+
+        Args:
+            keep_warm: 发布态下是否将引擎保留在引擎池中以便再次启动时复用，
+                仅用于重启/重新部署，显式停止、下线和清理时必须释放
+        """
         try:
-            self._executor.stop_engine()
+            gid = self._executor.engine_id
+            if keep_warm and self.use_engine_pool and EnginePool.park(gid):
+                self._logger.info(f"LightEngine parked in engine pool: {gid}")
+            else:
+                self._executor.stop_engine()
+                EnginePool.discard(gid)
         finally:
             self.set_status(EngineStatus.STOP)
 
     def is_engine_running(self) -> bool:
         """Check if engine is running"""
+        if EnginePool.is_idle(self._executor.engine_id):
+            return False
         return self._executor.is_engine_running()
 
     # ==================== 状态管理 - 公共接口 ====================
@@ -969,13 +1006,15 @@ class EngineManager:
     def get_engine_status(self) -> dict[str, Any]:
         """获取引擎状态（包含实时校验）"""
         redis_status = self._redis_state.get_status()
-        is_engine_running = self._executor.is_engine_running()
+        is_engine_running = self.is_engine_running()
 
         # 校正状态不一致的情况
-        if redis_status.get("status") == EngineStatus.RUNNING and not is_engine_running:
+        if redis_status.get("status") == EngineStatus.START and not is_engine_running:
             self._redis_state.set_status(EngineStatus.STOP)
-            return {"status": EngineStatus.STOP}
+            redis_status = {"status": EngineStatus.STOP}
 
+        if self.use_engine_pool:
+            redis_status["engine_pool"] = EnginePool.stats()
         return redis_status
 
     # ==================== 任务执行 - 公共接口 ====================
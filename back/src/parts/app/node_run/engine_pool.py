@@ -0,0 +1,183 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Additional Notice:
+# When modifying, redistributing, or creating derivative works of this software,
+# you must retain the original LazyCraft logo and the GitHub link icon that directs
+# to the official repository: https://github.com/LazyAGI/LazyLLM
+
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from lazyllm.engine import LightEngine
+
+from configs import lazy_config
+
+logger = logging.getLogger(__name__)
+
+# 与 App.is_local_model_type 一致，这些节点会在引擎内部署本地模型服务
+LOCAL_MODEL_KINDS = ("stt", "vqa", "sd", "tts", "localembedding")
+
+
+class EnginePool:
+    """进程级的发布态引擎池。
+
+    以引擎 gid 为 key 记录已启动的引擎及其画布哈希。应用停止时引擎只是被标记为空闲并保留，
+    再次以相同画布启动时直接复用；画布变化或超出模型预算时，按 LRU 顺序释放空闲引擎。
+    模型服务运行在引擎启动的子进程中，因此预算按画布中的本地模型数（也即显卡占用）计算。
+    使用中的引擎不会被淘汰。
+    """
+
+    _entries: "OrderedDict[str, dict[str, Any]]" = OrderedDict()
+    _lock = threading.Lock()
+    _stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def graph_hash(graph_data: dict) -> str:
+        """计算已转换画布的哈希"""
+        canonical = json.dumps(
+            graph_data,
+            sort_keys=True,
+            ensure_ascii=False,
+            separators=(",", ":"),
+            default=str,
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def model_footprint(workflow: Any) -> int:
+        """估算引擎占用的模型数
+
+        与 App.refer_model_count 的口径一致，统计画布（含子画布）中的本地模型节点，
+        无本地模型的引擎按1计，保证空闲引擎的数量同样受预算约束。
+        """
+        count = 0
+        stack = [workflow]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, dict):
+                kind = item.get("payload__kind") or item.get("type")
+                if isinstance(kind, str) and kind.lower() in LOCAL_MODEL_KINDS:
+                    count += 1
+                stack.extend(item.values())
+            elif isinstance(item, list):
+                stack.extend(item)
+        return max(count, 1)
+
+    @classmethod
+    def acquire(cls, gid: str, graph_hash: str) -> bool:
+        """尝试复用池中的引擎
+
+        Args:
+            gid (str): 引擎ID
+            graph_hash (str): 待启动画布的哈希
+
+        Returns:
+            bool: 命中时返回True，引擎重新标记为使用中
+        """
+        with cls._lock:
+            entry = cls._entries.get(gid)
+            if entry is not None and entry["graph_hash"] == graph_hash:
+                entry["idle"] = False
+                cls._entries.move_to_end(gid)
+                cls._stats["hits"] += 1
+                return True
+            # 画布已变化，旧引擎由调用方重新启动时释放，不能再被淘汰流程释放
+            cls._entries.pop(gid, None)
+            cls._stats["misses"] += 1
+            return False
+
+    @classmethod
+    def register(cls, gid: str, graph_hash: str, models: int) -> None:
+        """登记新启动的引擎
+
+        Args:
+            gid (str): 引擎ID
+            graph_hash (str): 画布哈希
+            models (int): 引擎占用的模型数，见 model_footprint
+        """
+        with cls._lock:
+            cls._entries[gid] = {
+                "graph_hash": graph_hash,
+                "models": max(int(models), 1),
+                "idle": False,
+            }
+            cls._entries.move_to_end(gid)
+            cls._evict_over_budget()
+
+    @classmethod
+    def park(cls, gid: str) -> bool:
+        """将引擎标记为空闲并保留
+
+        Returns:
+            bool: 引擎在池中时返回True，调用方无需再释放引擎
+        """
+        with cls._lock:
+            entry = cls._entries.get(gid)
+            if entry is None:
+                return False
+            entry["idle"] = True
+            cls._entries.move_to_end(gid)
+            cls._evict_over_budget()
+            return gid in cls._entries
+
+    @classmethod
+    def discard(cls, gid: str) -> None:
+        """移除已释放的引擎"""
+        with cls._lock:
+            cls._entries.pop(gid, None)
+
+    @classmethod
+    def is_idle(cls, gid: str) -> bool:
+        """引擎是否处于空闲保留状态"""
+        with cls._lock:
+            entry = cls._entries.get(gid)
+            return entry is not None and entry["idle"]
+
+    @classmethod
+    def _evict_over_budget(cls) -> None:
+        # 在锁内释放引擎，避免同一 gid 被淘汰的同时又被重新启动
+        budget = lazy_config.ENGINE_POOL_MODEL_BUDGET
+        total = sum(entry["models"] for entry in cls._entries.values())
+        for gid in [gid for gid, entry in cls._entries.items() if entry["idle"]]:
+            if total <= budget:
+                break
+            total -= cls._entries.pop(gid)["models"]
+            cls._stats["evictions"] += 1
+            try:
+                LightEngine().release_node(gid)
+                logger.info(f"Evicted pooled LightEngine: {gid}")
+            except Exception as e:
+                logger.exception(f"Failed to release pooled LightEngine {gid}: {e}")
+
+    @classmethod
+    def stats(cls) -> dict[str, Any]:
+        """获取本进程引擎池的占用和命中统计"""
+        with cls._lock:
+            stats = dict(cls._stats)
+            stats["engines"] = len(cls._entries)
+            stats["idle"] = sum(1 for entry in cls._entries.values() if entry["idle"])
+            stats["models"] = sum(entry["models"] for entry in cls._entries.values())
+            stats["budget"] = lazy_config.ENGINE_POOL_MODEL_BUDGET
+        return stats
+
+    @classmethod
+    def clear(cls) -> None:
+        """清空登记信息（不释放引擎）"""
+        with cls._lock:
+            cls._entries.clear()
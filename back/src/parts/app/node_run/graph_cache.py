@@ -0,0 +1,312 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Additional Notice:
+# When modifying, redistributing, or creating derivative works of this software,
+# you must retain the original LazyCraft logo and the GitHub link icon that directs
+# to the official repository: https://github.com/LazyAGI/LazyLLM
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from configs import lazy_config
+from utils.util_redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+# 依赖版本计数器的过期时间，需长于缓存条目的过期时间，避免计数器重置后旧条目被误判为有效
+_DEPENDENCY_VERSION_TTL = 7 * 24 * 3600
+
+# 转换过程中会读取的数据表，以及表中一行变更时需要失效的依赖
+_DEPENDENCY_TABLES = {
+    "models_hub": lambda row: [("lazymodel", row.id), ("lazymodel", "*")],
+    "lazymodel_config_info": lambda row: [("model_config", row.model_id)],
+    "tool": lambda row: [("tool", row.id)],
+    "tool_api": lambda row: [("tool_http", row.id)],
+    "tool_auth": lambda row: [("tool_auth", row.tool_id)],
+    "mcp_tools": lambda row: [("mcp_tool", row.id)],
+    "mcp_server": lambda row: [("mcp_server", row.id)],
+    "newworkflows": lambda row: [("workflow", row.app_id)],
+    "database_info": lambda row: [("database", row.id)],
+}
+
+_recorder = threading.local()
+
+
+def dependency_key(kind: str, ident: Any) -> str:
+    return f"graph_dep:{kind}:{ident}"
+
+
+def _decode_version(value) -> int:
+    return int(value) if value is not None else 0
+
+
+def record_graph_dependency(kind: str, ident: Any) -> None:
+    """登记画布转换过程中读取的数据库资源。
+
+    必须在读取资源之前调用：此时记录的版本号早于读取的数据，
+    读取之后发生的变更一定会使缓存条目失效。
+
+    Args:
+        kind (str): 资源类型，如 lazymodel、tool、workflow
+        ident: 资源ID，"*" 表示依赖整张表
+    """
+    stack = getattr(_recorder, "stack", None)
+    if not stack:
+        return
+
+    key = dependency_key(kind, ident)
+    dependencies = stack[-1]
+    if key in dependencies:
+        return
+    try:
+        dependencies[key] = _decode_version(redis_client.get(key))
+    except Exception as e:
+        # 无法读取版本时标记为不可缓存
+        logger.warning(f"Failed to read graph dependency version {key}: {e}")
+        dependencies[key] = None
+
+
+def bump_graph_dependencies(keys) -> None:
+    """使依赖这些资源的已转换画布失效"""
+    if not keys:
+        return
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.incr(key)
+            pipe.expire(key, _DEPENDENCY_VERSION_TTL)
+        pipe.execute()
+    except Exception as e:
+        logger.error(f"Failed to bump graph dependencies: {e}")
+
+
+def _collect_changed_dependencies(session, flush_context):
+    changed = session.info.setdefault("graph_dep_keys", set())
+    for row in [*session.new, *session.dirty, *session.deleted]:
+        resolver = _DEPENDENCY_TABLES.get(getattr(row, "__tablename__", None))
+        if resolver is None:
+            continue
+        try:
+            changed.update(dependency_key(kind, ident) for kind, ident in resolver(row))
+        except Exception as e:
+            logger.warning(f"Failed to resolve graph dependency for {row}: {e}")
+
+
+def _bump_changed_dependencies(session):
+    bump_graph_dependencies(session.info.pop("graph_dep_keys", None))
+
+
+def _discard_changed_dependencies(session):
+    session.info.pop("graph_dep_keys", None)
+
+
+_SESSION_LISTENERS = (
+    ("after_flush", _collect_changed_dependencies),
+    ("after_commit", _bump_changed_dependencies),
+    ("after_rollback", _discard_changed_dependencies),
+)
+
+
+def register_session_listeners() -> None:
+    """在 ORM 会话上注册依赖变更的监听，重复调用无副作用。
+
+    监听只在注册过的进程中生效，应用启动时（包括 Celery worker）调用，
+    否则这些进程中的数据修改不会使其他进程缓存的画布失效。
+    """
+    for identifier, listener in _SESSION_LISTENERS:
+        if not event.contains(Session, identifier, listener):
+            event.listen(Session, identifier, listener)
+
+
+class GraphCache:
+    """已转换画布的内容寻址缓存。
+
+    缓存 key 由画布 JSON 的规范化哈希和转换上下文（租户、用户、单节点ID等）组成；
+    条目中保存转换时读取的资源版本，命中时逐一校验，资源变更后自动失效。
+    进程内 LRU 作为一级缓存，Redis 作为进程间共享的二级缓存。
+    """
+
+    _local: "OrderedDict[str, bytes]" = OrderedDict()  # JSON 序列化后的条目
+    _lock = threading.Lock()
+    _stats = {"local_hits": 0, "redis_hits": 0, "misses": 0, "stale": 0}
+
+    @staticmethod
+    def make_key(workflow: dict, **context) -> str:
+        """计算画布的内容哈希
+
+        Args:
+            workflow (dict): 画布数据
+            **context: 影响转换结果的上下文
+
+        Returns:
+            str: 缓存key
+        """
+        canonical = json.dumps(
+            {"workflow": workflow, "context": context},
+            sort_keys=True,
+            ensure_ascii=False,
+            separators=(",", ":"),
+            default=str,
+        )
+        digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        return f"graph_cache:{digest}"
+
+    @classmethod
+    def _count(cls, name: str) -> None:
+        with cls._lock:
+            cls._stats[name] += 1
+
+    @classmethod
+    def stats(cls) -> dict[str, int]:
+        """获取本进程的命中统计"""
+        with cls._lock:
+            stats = dict(cls._stats)
+            stats["local_size"] = len(cls._local)
+        return stats
+
+    @classmethod
+    def clear_local(cls) -> None:
+        with cls._lock:
+            cls._local.clear()
+
+    @classmethod
+    def _put_local(cls, key: str, payload: bytes) -> None:
+        with cls._lock:
+            cls._local[key] = payload
+            cls._local.move_to_end(key)
+            while len(cls._local) > lazy_config.GRAPH_CACHE_LOCAL_SIZE:
+                cls._local.popitem(last=False)
+
+    @classmethod
+    def _drop_local(cls, key: str) -> None:
+        with cls._lock:
+            cls._local.pop(key, None)
+
+    @staticmethod
+    def _is_valid(entry: dict) -> bool:
+        if time.time() - entry["created_at"] > lazy_config.GRAPH_CACHE_TTL:
+            return False
+        dependencies = entry["dependencies"]
+        if not dependencies:
+            return True
+        keys = list(dependencies.keys())
+        versions = redis_client.mget(keys)
+        return all(
+            dependencies[key] == _decode_version(version)
+            for key, version in zip(keys, versions)
+        )
+
+    @classmethod
+    def get(cls, key: str) -> Optional[dict]:
+        """读取缓存，返回画布数据的独立副本；未命中或已失效时返回None"""
+        with cls._lock:
+            payload = cls._local.get(key)
+            if payload is not None:
+                cls._local.move_to_end(key)
+        tier = "local_hits"
+
+        if payload is None:
+            payload = redis_client.get(key)
+            tier = "redis_hits"
+        if payload is None:
+            cls._count("misses")
+            return None
+
+        entry = json.loads(payload)
+        if not cls._is_valid(entry):
+            cls._drop_local(key)
+            cls._count("stale")
+            cls._count("misses")
+            return None
+
+        if tier == "redis_hits":
+            cls._put_local(key, payload)
+        cls._count(tier)
+        return entry["graph"]
+
+    @classmethod
+    def set(cls, key: str, graph: dict, dependencies: dict[str, int]) -> None:
+        """写入缓存，依赖版本未知时不缓存"""
+        if any(version is None for version in dependencies.values()):
+            return
+        try:
+            # 缓存保存在共享的 Redis 中，只使用 JSON 这类不会执行代码的格式；
+            # 含有 JSON 无法原样表示的对象（如元组、自定义类型）的画布不缓存
+            payload = json.dumps(
+                {
+                    "graph": graph,
+                    "dependencies": dependencies,
+                    "created_at": time.time(),
+                },
+                ensure_ascii=False,
+                separators=(",", ":"),
+            ).encode("utf-8")
+            if json.loads(payload)["graph"] != graph:
+                return
+            cls._put_local(key, payload)
+            redis_client.setex(key, lazy_config.GRAPH_CACHE_TTL, payload)
+        except Exception as e:
+            logger.warning(f"Failed to store graph cache {key}: {e}")
+
+    @classmethod
+    def get_or_convert(
+        cls, workflow: dict, convert: Callable[[], dict], **context
+    ) -> dict:
+        """命中缓存时直接返回，否则执行转换并写入缓存
+
+        Args:
+            workflow (dict): 画布数据
+            convert (Callable): 转换函数，返回转换后的画布
+            **context: 影响转换结果的上下文
+
+        Returns:
+            dict: 转换后的画布，调用方可自由修改
+        """
+        if not lazy_config.GRAPH_CACHE_ENABLED:
+            return convert()
+
+        key = cls.make_key(workflow, **context)
+        try:
+            graph = cls.get(key)
+        except Exception as e:
+            logger.warning(f"Failed to read graph cache {key}: {e}")
+            graph = None
+        if graph is not None:
+            return graph
+
+        stack = getattr(_recorder, "stack", None)
+        if stack is None:
+            stack = _recorder.stack = []
+        stack.append({})
+        try:
+            graph = convert()
+        finally:
+            dependencies = stack.pop()
+        if stack:
+            # 嵌套转换的依赖同样属于外层画布
+            stack[-1].update(dependencies)
+
+        # 写入时已序列化，调用方后续修改返回值不会影响缓存
+        cls.set(key, graph, dependencies)
+        return graph
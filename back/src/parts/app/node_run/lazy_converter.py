@@ -35,8 +35,22 @@ def print_and_log(msg):
     # logging.info(msg)
 
 
+def _nodes_reaching(graph: nx.DiGraph, b: str) -> set:
+    # 能到达 b 的所有节点（含 b 自身）
+    return nx.ancestors(graph, b) | {b}
+
+
+def _last_path_to(graph: nx.DiGraph, node: str, b: str, reaching: set) -> list:
+    # 深度优先枚举时最后一条 node -> b 的路径: 每一步都取最后一个能到达 b 的后继
+    path = [node]
+    while node != b:
+        node = next(v for v in reversed(list(graph[node])) if v in reaching)
+        path.append(node)
+    return path
+
+
 def get_simple_paths_with_key(graph: nx.DiGraph, a: str, b: str):
-    # 找出从 a 到 b 的所有边路径
+    # 按分支 key 给出从 a 到 b 的路径（不含 a，含 b）
     # G = nx.DiGraph()
     # G.add_edges_from([
     #     ("A", "N1", {'key': True}),
@@ -49,14 +63,18 @@ def get_simple_paths_with_key(graph: nx.DiGraph, a: str, b: str):
     # ])
     # print(get_simple_paths_with_key(G, "A", "B"))
     # => {True: ['N1', 'N2', 'B'], False: ['N3', 'B']}
-    all_edges = list(nx.all_simple_edge_paths(graph, a, b))
-    all_keys = [
-        [graph[begin][end]["key"] for begin, end in edges if len(graph[begin][end]) > 0]
-        for edges in all_edges
-    ]
+    #
+    # 与逐条枚举 nx.all_simple_edge_paths 的结果一致: 同一 key 有多条路径时取枚举顺序中的最后一条,
+    # 但只需一次反向可达性计算和每个分支一次线性遍历, 避免分支内并行结构导致的路径数指数增长.
+    # 分支节点的出边均来自原始连线, 因此第一条边必然带有 key.
+    reaching = _nodes_reaching(graph, b)
+    key_map_first = {}
+    for succ in graph.successors(a):
+        if succ in reaching:
+            key_map_first[graph[a][succ]["key"]] = succ
     return {
-        keys[0]: [end for (begin, end) in edges]
-        for keys, edges in zip(all_keys, all_edges)
+        key: _last_path_to(graph, succ, b, reaching)
+        for key, succ in key_map_first.items()
     }
 
 
@@ -75,14 +93,16 @@ def compress_a_to_b(graph: nx.DiGraph, a: str, b: str):
     # compress_a_to_b(G, "A", "B")
     # print(G.edges)
     # [('A', 'X'), ('A', 'Y')]
-    paths = list(nx.all_simple_edge_paths(graph, a, b))
-    all_edges = [edge for path in paths for edge in path]
 
-    # 提取中间节点（不含 a 和 b）
-    middle_nodes = {v for path in paths for (_, v, *_) in path[:-1]}
+    # 提取中间节点（不含 a 和 b）: 从 a 可达且能到达 b 的节点, 即 a 支配、b 后支配的区域
+    reaching = _nodes_reaching(graph, b)
+    middle_nodes = nx.descendants(graph, a) & reaching
+    middle_nodes.discard(b)
 
     # 删除路径上的所有边
-    graph.remove_edges_from((u, v) for (u, v, *_) in all_edges)
+    graph.remove_edges_from(
+        [(u, v) for u in (a, *middle_nodes) for v in graph[u] if v in reaching]
+    )
 
     # 删除中间节点
     graph.remove_nodes_from(middle_nodes)
@@ -30,6 +30,8 @@ from sqlalchemy.orm.exc import NoResultFound
 from parts.mcp.model import McpTool
 from parts.tools.model import Tool, ToolAuth, ToolHttp
 
+from .graph_cache import record_graph_dependency
+
 # 操作符映射
 OP_MAP = {
     ">": ast.Gt(),
@@ -84,6 +86,16 @@ def track_new_attrs(func):
 @dataclass
 class BaseRunContext:
     id_map_basenode: dict[str, "BaseNode"] = field(default_factory=dict)
+    _credential_resolver: Any = field(default=None, repr=False)
+
+    @property
+    def credential_resolver(self):
+        """本次转换内各节点共享的模型凭证解析器，首次使用时创建"""
+        if self._credential_resolver is None:
+            from parts.models_hub.credential_cache import ModelCredentialResolver
+
+            self._credential_resolver = ModelCredentialResolver()
+        return self._credential_resolver
 
 
 class BaseNode:
@@ -300,15 +312,16 @@ class BaseNode:
             raise ValueError(f"未被识别的引用类型: {_type}")
 
     def get_model_apikey_by_id(self, online_id):
-        from parts.models_hub.service import ModelService
-
         self.set_used_refer("model", online_id)
-        return ModelService.get_model_apikey_by_id(online_id) if online_id else {}
+        if not online_id:
+            return {}
+        record_graph_dependency("lazymodel", online_id)
+        record_graph_dependency("model_config", online_id)
+        return self.run_context.credential_resolver.get_model_apikey_by_id(online_id)
 
     def get_model_apikey_by_name(self, model_name):
-        from parts.models_hub.service import ModelService
-
-        online_id = ModelService.get_model_id_by_name(model_name)
+        record_graph_dependency("lazymodel", "*")
+        online_id = self.run_context.credential_resolver.get_model_id_by_name(model_name)
         if not online_id:
             return {}
 
@@ -317,6 +330,7 @@ class BaseNode:
     def get_db_info(self, database_id):
         from parts.db_manage.service import DBManageService
 
+        record_graph_dependency("database", database_id)
         return DBManageService.get_builtin_database_info(database_id=database_id)
 
     def get_input_caseid(self, target_id):
@@ -628,12 +642,15 @@ class HttpToolNode(BaseNode):
         authentication_type = ""
         is_share = False
         tool_api_id = ""
+        record_graph_dependency("tool", provider_id)
         tool_instance = Tool.query.get(provider_id)
         if tool_instance:
             tool_api_id = tool_instance.tool_api_id
+            record_graph_dependency("tool_http", tool_api_id)
             tool_api_instance = ToolHttp.query.get(tool_instance.tool_api_id)
             if tool_api_instance:
                 authentication_type = tool_api_instance.auth_method
+                record_graph_dependency("tool_auth", tool_instance.id)
                 tool_auth_instance = ToolAuth.query.filter_by(
                     tool_id=tool_instance.id,
                     tool_api_id=tool_api_instance.id,
@@ -960,6 +977,7 @@ class SubgraphNode(BaseNode):
         if not self.patent_graph:
             from parts.app.model import Workflow
 
+            record_graph_dependency("workflow", self.app_id)
             sub_workflow = Workflow.default_getone(self.app_id, None)
             self.patent_graph = sub_workflow.flat_graph_dict
         self.patent_data = self.get_data().get("config__patent_data", {})
@@ -1148,6 +1166,7 @@ class McpToolNode(BaseNode):
         self.mcp_server_id = self.get_data().get("payload__mcp_server_id")
 
         try:
+            record_graph_dependency("mcp_tool", self.mcp_tool_id)
             mcp_tool = McpTool.query.get(self.mcp_tool_id)
             if not mcp_tool:
                 logging.error(f"没有找到MCP工具: {self.mcp_tool_id}")
@@ -1160,6 +1179,7 @@ class McpToolNode(BaseNode):
                 f"MCP工具和MCP服务不匹配: {self.mcp_tool_id} vs {self.mcp_server_id}"
             )
             raise ValueError("MCP工具和MCP服务不匹配")
+        record_graph_dependency("mcp_server", mcp_tool.mcp_server_id)
         mcp_server = mcp_tool.mcp_server
         if not mcp_server:
             logging.error(f"没有找到MCP服务: {self.mcp_server_id}")
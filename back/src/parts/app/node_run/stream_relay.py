@@ -0,0 +1,127 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Additional Notice:
+# When modifying, redistributing, or creating derivative works of this software,
+# you must retain the original LazyCraft logo and the GitHub link icon that directs
+# to the official repository: https://github.com/LazyAGI/LazyLLM
+
+import threading
+from collections.abc import Generator
+from concurrent.futures import Future
+from typing import Optional
+
+import lazyllm
+
+from configs import lazy_config
+
+
+class StreamRelay:
+    """流式分片转发器。
+
+    从 lazyllm FileSystemQueue 中批量取出引擎产生的流式分片并转发给调用方。
+    同进程内的 enqueue 会立即唤醒等待中的转发器；跨进程写入的分片
+    则依靠有上限的等待时间兜底，避免空转占满 CPU。
+    """
+
+    _events: dict[str, set[threading.Event]] = {}
+    _events_lock = threading.Lock()
+    _hooked_queues: set[int] = set()
+
+    def __init__(
+        self, max_wait: Optional[float] = None, batch_size: Optional[int] = None
+    ):
+        """初始化转发器。
+
+        Args:
+            max_wait (float, optional): 单次等待新分片的最长秒数
+            batch_size (int, optional): 单次最多取出的分片数量
+        """
+        self._max_wait = (
+            lazy_config.STREAM_RELAY_MAX_WAIT if max_wait is None else max_wait
+        )
+        self._batch_size = (
+            lazy_config.STREAM_RELAY_BATCH_SIZE if batch_size is None else batch_size
+        )
+
+    @classmethod
+    def _install_enqueue_hook(cls, queue) -> None:
+        """在队列实例上挂载 enqueue 通知，每个队列实例只挂载一次"""
+        with cls._events_lock:
+            if id(queue) in cls._hooked_queues:
+                return
+            cls._hooked_queues.add(id(queue))
+
+        original_enqueue = queue._enqueue
+
+        def notifying_enqueue(sid, message, *args, **kwargs):
+            result = original_enqueue(sid, message, *args, **kwargs)
+            cls._notify(sid)
+            return result
+
+        queue._enqueue = notifying_enqueue
+
+    @classmethod
+    def _notify(cls, sid: str) -> None:
+        with cls._events_lock:
+            events = list(cls._events.get(sid, ()))
+        for event in events:
+            event.set()
+
+    @classmethod
+    def _subscribe(cls, sid: str) -> threading.Event:
+        event = threading.Event()
+        with cls._events_lock:
+            cls._events.setdefault(sid, set()).add(event)
+        return event
+
+    @classmethod
+    def _unsubscribe(cls, sid: str, event: threading.Event) -> None:
+        with cls._events_lock:
+            events = cls._events.get(sid)
+            if events is not None:
+                events.discard(event)
+                if not events:
+                    del cls._events[sid]
+
+    def relay(self, future: Future) -> Generator[str, None, None]:
+        """转发当前 sid 下的流式分片，直到 future 完成且队列已取空。
+
+        Args:
+            future (Future): 引擎执行任务
+
+        Yields:
+            str: 一次取出的分片拼接结果
+        """
+        queue = lazyllm.FileSystemQueue()
+        self._install_enqueue_hook(queue)
+        sid = queue.sid
+        event = self._subscribe(sid)
+        future.add_done_callback(lambda _: event.set())
+
+        try:
+            while True:
+                # 先清除信号再取数据，取数期间到达的分片会重新置位，不会丢失唤醒
+                event.clear()
+                if chunks := queue._dequeue(sid, limit=self._batch_size):
+                    yield "".join(chunks)
+                    continue
+                if future.done():
+                    # 任务结束前最后写入的分片
+                    while chunks := queue._dequeue(sid, limit=self._batch_size):
+                        yield "".join(chunks)
+                    break
+                event.wait(self._max_wait)
+        finally:
+            self._unsubscribe(sid, event)
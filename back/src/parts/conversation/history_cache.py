@@ -0,0 +1,241 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Additional Notice:
+# When modifying, redistributing, or creating derivative works of this software,
+# you must retain the original LazyCraft logo and the GitHub link icon that directs
+# to the official repository: https://github.com/LazyAGI/LazyLLM
+
+"""会话历史与轮次号缓存
+
+每次对话都要按会话重建历史并查询最新轮次号，长会话下每一轮的数据库读取和处理量
+随会话长度线性增长。这里在 Redis 中为每个会话维护：
+
+- 轮次计数器：INCR 原子分配轮次号，并发发送的消息不会得到相同的轮次；
+- 历史列表：最多保留最近 ``max_turns`` 轮已完成的问答，回复写入数据库后追加。
+
+缓存未命中时从数据库回源并写入缓存。历史列表以空字符串作为首元素，
+表示该会话的历史已加载（新会话的历史可能为空）；追加只作用于已加载的列表。
+回源期间若有新回复追加，版本号变化，本次回源结果不写入缓存，避免缓存缺少该轮。
+Redis 不可用时直接查询数据库，行为与缓存前一致。
+"""
+
+import json
+import logging
+from collections import OrderedDict
+from typing import Optional
+
+from redis.exceptions import RedisError
+from sqlalchemy.sql import func
+
+from configs import lazy_config
+from utils.util_database import db
+from utils.util_redis import redis_client
+
+from .model import Conversation
+
+# 应用回复的发送者标识
+MACHINE_SENDER = "lazyllm"
+# 历史列表首元素，表示会话历史已加载
+_LOADED_MARKER = ""
+
+_NEXT_TURN_SCRIPT = redis_client.register_script(
+    """
+if ARGV[1] ~= '' then
+    redis.call('SET', KEYS[1], ARGV[1], 'NX')
+end
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return false
+end
+local turn = redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return turn
+"""
+)
+
+_APPEND_SCRIPT = redis_client.register_script(
+    """
+redis.call('INCR', KEYS[2])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('RPUSH', KEYS[1], ARGV[1])
+local max_turns = tonumber(ARGV[2])
+if redis.call('LLEN', KEYS[1]) > max_turns + 1 then
+    redis.call('LTRIM', KEYS[1], -max_turns, -1)
+    redis.call('LPUSH', KEYS[1], '')
+end
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+)
+
+_FILL_SCRIPT = redis_client.register_script(
+    """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+if (redis.call('GET', KEYS[2]) or '') ~= ARGV[1] then
+    return 0
+end
+redis.call('RPUSH', KEYS[1], '', unpack(ARGV, 3))
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+)
+
+
+class ConversationHistory:
+    """会话历史与轮次号缓存
+
+    未显式传入的参数在使用时读取 ``lazy_config`` 中的 CONVERSATION_HISTORY_* 配置。
+    """
+
+    def __init__(self, max_turns: Optional[int] = None, ttl: Optional[int] = None):
+        self._max_turns = max_turns
+        self._ttl = ttl
+
+    def _option(self, value, name):
+        return value if value is not None else getattr(lazy_config, name)
+
+    @property
+    def max_turns(self) -> int:
+        return self._option(self._max_turns, "CONVERSATION_HISTORY_MAX_TURNS")
+
+    @property
+    def ttl(self) -> int:
+        return self._option(self._ttl, "CONVERSATION_HISTORY_TTL")
+
+    @staticmethod
+    def _keys(sessionid: str) -> tuple[str, str, str]:
+        return (
+            f"conversation_turn:{sessionid}",
+            f"conversation_history:{sessionid}",
+            f"conversation_history_version:{sessionid}",
+        )
+
+    # ---------------- 轮次号 ----------------
+
+    @staticmethod
+    def _db_last_turn(sessionid: str, answered: bool = False) -> int:
+        query = db.session.query(func.max(Conversation.turn_number)).filter(
+            Conversation.sessionid == sessionid
+        )
+        if answered:
+            query = query.filter(Conversation.from_who == MACHINE_SENDER)
+        return query.scalar() or 0
+
+    def next_turn(self, sessionid: str) -> int:
+        """为会话的新消息分配轮次号"""
+        turn_key = self._keys(sessionid)[0]
+        try:
+            turn = _NEXT_TURN_SCRIPT(keys=[turn_key], args=["", self.ttl], client=redis_client)
+            if turn is None:
+                # 计数器不存在时以数据库中的最大轮次为起点，SET NX 保证只初始化一次
+                last_turn = self._db_last_turn(sessionid)
+                turn = _NEXT_TURN_SCRIPT(keys=[turn_key], args=[last_turn, self.ttl], client=redis_client)
+            return int(turn)
+        except RedisError as e:
+            logging.warning(f"会话轮次缓存不可用，改为查询数据库: {e}")
+            return self._db_last_turn(sessionid) + 1
+
+    # ---------------- 历史 ----------------
+
+    def _load_from_db(self, sessionid: str) -> list[list]:
+        """从数据库读取最近 max_turns 轮的记录，返回 [轮次, 问题, 回复] 列表"""
+        max_turns = self.max_turns
+        # 以最后一个有回复的轮次为窗口终点，进行中的轮次不占用历史条数
+        last_turn = self._db_last_turn(sessionid, answered=True)
+        rows = (
+            db.session.query(Conversation.turn_number, Conversation.from_who, Conversation.content)
+            .filter(Conversation.sessionid == sessionid)
+            .filter(Conversation.turn_number > last_turn - max_turns)
+            .order_by(Conversation.created_at.asc(), Conversation.id.asc())
+            .all()
+        )
+        turns = OrderedDict()
+        for turn_number, from_who, content in rows:
+            pair = turns.setdefault(turn_number, [None, None])
+            pair[1 if from_who == MACHINE_SENDER else 0] = content
+        # 只保留问题和回复都不为空的轮次
+        records = [
+            [turn_number, question, answer]
+            for turn_number, (question, answer) in turns.items()
+            if question and answer
+        ]
+        return records[-max_turns:]
+
+    def get(self, sessionid: str) -> list[list[str]]:
+        """返回会话中已完成轮次的 [问题, 回复] 列表，按轮次排序"""
+        _, history_key, version_key = self._keys(sessionid)
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.lrange(history_key, 0, -1)
+            pipe.get(version_key)
+            cached, version = pipe.execute()
+        except RedisError as e:
+            logging.warning(f"会话历史缓存不可用，改为查询数据库: {e}")
+            return [pair for _, *pair in self._load_from_db(sessionid)]
+
+        if cached:
+            records = [json.loads(item) for item in cached[1:]]
+        else:
+            records = self._load_from_db(sessionid)
+            try:
+                _FILL_SCRIPT(
+                    keys=[history_key, version_key],
+                    args=[
+                        version.decode() if isinstance(version, bytes) else (version or ""),
+                        self.ttl,
+                        *(json.dumps(record, ensure_ascii=False) for record in records),
+                    ],
+                    client=redis_client,
+                )
+            except RedisError as e:
+                logging.warning(f"写入会话历史缓存失败: {e}")
+        # 并发的轮次可能乱序完成，按轮次号排序
+        records.sort(key=lambda record: record[0])
+        return [[question, answer] for _, question, answer in records]
+
+    def append(self, sessionid: str, turn_number: int, question, answer) -> None:
+        """回复写入数据库后追加该轮问答；会话历史尚未加载时只更新版本号"""
+        if not (question and answer):
+            # 与数据库回源一致，问题或回复为空的轮次不计入历史，但仍需使进行中的回源失效
+            record = None
+        else:
+            record = json.dumps([turn_number, question, answer], ensure_ascii=False)
+        _, history_key, version_key = self._keys(sessionid)
+        try:
+            if record is None:
+                pipe = redis_client.pipeline(transaction=False)
+                pipe.incr(version_key)
+                pipe.expire(version_key, self.ttl)
+                pipe.execute()
+                return
+            _APPEND_SCRIPT(
+                keys=[history_key, version_key],
+                args=[record, self.max_turns, self.ttl],
+                client=redis_client,
+            )
+        except RedisError as e:
+            # 追加失败时删除缓存，下次从数据库回源
+            logging.warning(f"追加会话历史缓存失败: {e}")
+            try:
+                redis_client.delete(history_key)
+            except RedisError:
+                pass
+
+
+conversation_history = ConversationHistory()
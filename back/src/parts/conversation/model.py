@@ -30,7 +30,11 @@ class Conversation(db.Model):
     """
 
     __tablename__ = "conversation"
-    __table_args__ = (db.PrimaryKeyConstraint("id", name="conversation_pkey"),)
+    __table_args__ = (
+        db.PrimaryKeyConstraint("id", name="conversation_pkey"),
+        db.Index("conversation_app_created_idx", "app_id", "created_at"),
+        db.Index("conversation_session_turn_idx", "sessionid", "turn_number"),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     app_id = db.Column(db.String(40), nullable=True)
@@ -20,7 +20,6 @@
 import json
 import logging
 import uuid
-from collections import OrderedDict
 
 from flask import Response, request, stream_with_context
 from flask_restful import inputs, marshal, reqparse
@@ -37,6 +36,7 @@ from parts.urls import api
 from utils.util_database import db
 
 from . import fields
+from .history_cache import MACHINE_SENDER, conversation_history
 from .model import Conversation
 
 
@@ -230,39 +230,19 @@ class SpeakToAppApi(Resource):
                 raise ValueError("应用已经关闭服务")
 
         from_who = self.get_user()
-        from_machine = "lazyllm"
+        from_machine = MACHINE_SENDER
         sessionid = args["sessionid"]
         content = args["inputs"][0]
         files_list = args.get("files") or []
 
-        last_instance = (
-            Conversation.query.filter_by(sessionid=sessionid)
-            .order_by(Conversation.id.desc())
-            .first()
-        )
-        turn_number = (last_instance.turn_number + 1) if last_instance else 1
+        # 轮次号原子分配，历史从会话缓存读取，未命中时才查询数据库
+        turn_number = conversation_history.next_turn(sessionid)
 
         Conversation.create_new(
             app_id, sessionid, from_who, content, turn_number, files_list
         )
 
-        # 构建历史记录
-        history_dict = OrderedDict()
-        queryset = Conversation.query.filter_by(sessionid=sessionid).order_by(
-            Conversation.created_at.asc()
-        )
-        for item in queryset:
-            if item.turn_number not in history_dict:
-                history_dict[item.turn_number] = [None, None]
-            if item.from_who != from_machine:
-                history_dict[item.turn_number][0] = item.content
-            else:
-                history_dict[item.turn_number][1] = item.content
-
-        history_list = []
-        for key, value in history_dict.items():
-            if value[0] and value[1]:
-                history_list.append(value)
+        history_list = conversation_history.get(sessionid)
 
         app_run = AppRunService.create(app_model, mode=args["mode"])
 
@@ -288,24 +268,19 @@ class SpeakToAppApi(Resource):
                         output_data
                     )
                     output_urls = []
-
-                Conversation.create_new(
-                    app_id,
-                    sessionid,
-                    from_machine,
-                    output_str,
-                    turn_number,
-                    output_urls,
-                )
             else:
-                Conversation.create_new(
-                    app_id,
-                    sessionid,
-                    from_machine,
-                    event_handler.get_stream_result(),
-                    turn_number,
-                    [],
-                )
+                output_str = event_handler.get_stream_result()
+                output_urls = []
+
+            Conversation.create_new(
+                app_id,
+                sessionid,
+                from_machine,
+                output_str,
+                turn_number,
+                output_urls,
+            )
+            conversation_history.append(sessionid, turn_number, content, output_str)
             # refresh_data = marshal(instance, fields.speak_fields)
             # refresh_data["content"] = manager.stream_result  # 当前对话中将流式输出全部显示，但是历史记录中指记录最终输出
             # yield AppQueueManager.build_dict_as_message({"event": "tts_message_end", "data": refresh_data})
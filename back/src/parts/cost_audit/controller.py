@@ -346,6 +346,7 @@ class QueryAppStatisticsApi(Resource):
                 start_date (str, optional): 起始日期，格式为"YYYY-MM-DD"。
                 end_date (str, optional): 结束日期，格式为"YYYY-MM-DD"。
                 call_type (str, optional): 调用类型，用于过滤数据。
+                merged (bool, optional): 是否合并为整个区间的一条统计，默认为False。
 
         Returns:
             dict: 包含查询结果的字典。
@@ -366,8 +367,9 @@ class QueryAppStatisticsApi(Resource):
         start_date = data.get("start_date")
         end_date = data.get("end_date")
         call_type = data.get("call_type")
+        merged = bool(data.get("merged", False))
         result = CostService.query_app_statistics(
-            app_id, start_date, end_date, call_type
+            app_id, start_date, end_date, call_type, merged
         )
         return {"data": result}
 
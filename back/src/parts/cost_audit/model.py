@@ -41,6 +41,9 @@ class CostAudit(db.Model):
     """
 
     __tablename__ = "cost_audits"
+    __table_args__ = (
+        db.Index("cost_audit_app_call_created_idx", "app_id", "call_type", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     app_id = db.Column(db.String(36))  # app_id为字符串形式的UUID
@@ -74,10 +77,18 @@ class AppStatistics(db.Model):
         cost_time_p50 (Numeric): 响应时间P50值，默认为0。
         cost_time_p99 (Numeric): 响应时间P99值，默认为0。
         web_user_avg_interaction (float): Web用户平均互动数，默认为0。
+        system_user_sketch (bytes, optional): 系统用户去重草图（HyperLogLog）。
+        web_user_sketch (bytes, optional): Web用户去重草图（HyperLogLog）。
+        system_session_sketch (bytes, optional): 系统用户会话去重草图（HyperLogLog）。
+        web_session_sketch (bytes, optional): Web用户会话去重草图（HyperLogLog）。
+        cost_time_histogram (str, optional): 响应耗时对数直方图，非空表示该日汇总已生成。
         created_at (datetime): 记录创建时间，默认为当前UTC时间。
     """
 
     __tablename__ = "app_statistics"
+    __table_args__ = (
+        db.Index("app_statistics_app_call_date_idx", "app_id", "call_type", "stat_date"),
+    )
     id = db.Column(db.Integer, primary_key=True)
     app_id = db.Column(db.String(36), nullable=False, index=True)
     call_type = db.Column(db.String(30), nullable=False, default="release")
@@ -93,6 +104,12 @@ class AppStatistics(db.Model):
     cost_time_p50 = db.Column(db.Numeric(10, 5), default=0)
     cost_time_p99 = db.Column(db.Numeric(10, 5), default=0)
     web_user_avg_interaction = db.Column(db.Float, default=0)
+    # 以下字段仅在合并区间统计时读取，默认延迟加载
+    system_user_sketch = db.deferred(db.Column(db.LargeBinary, nullable=True))
+    web_user_sketch = db.deferred(db.Column(db.LargeBinary, nullable=True))
+    system_session_sketch = db.deferred(db.Column(db.LargeBinary, nullable=True))
+    web_session_sketch = db.deferred(db.Column(db.LargeBinary, nullable=True))
+    cost_time_histogram = db.deferred(db.Column(db.Text, nullable=True))
     created_at = db.Column(db.DateTime, default=func.now())
 
     def to_dict(self):
@@ -19,10 +19,14 @@
 
 import json
 import logging
+import threading
+import time
 from datetime import date, datetime, timedelta
 
-from sqlalchemy import func
+from sqlalchemy import String, case, cast, distinct, event, func, select
+from sqlalchemy.orm import aliased, undefer
 
+from configs import lazy_config
 from libs.http_exception import CommonError
 from libs.timetools import TimeTools
 from models.model_account import Account, Tenant, TenantStatus
@@ -32,6 +36,7 @@ from utils.util_database import db
 from utils.util_redis import redis_client
 
 from .model import AppStatistics, CostAudit
+from .sketch import CostTimeHistogram, HyperLogLog
 
 CATEGORY_TYPES = {
     "debug": "应用编排",
@@ -41,8 +46,130 @@ CATEGORY_TYPES = {
     "fine_tune_local": "模型微调(线下模型)",
 }
 
+# 按日汇总中可直接相加的指标
+ROLLUP_SUM_FIELDS = (
+    "system_user_token_sum",
+    "web_user_token_sum",
+    "system_user_interaction_count",
+    "web_user_interaction_count",
+)
+# 去重草图字段 -> 对应的去重计数字段
+ROLLUP_COUNT_FIELDS = {
+    "system_user_sketch": "system_user_count",
+    "web_user_sketch": "web_user_count",
+    "system_session_sketch": "system_user_session_count",
+    "web_session_sketch": "web_user_session_count",
+}
+ROLLUP_SKETCH_FIELDS = tuple(ROLLUP_COUNT_FIELDS)
+
 
 class CostService:
+    # app_id -> (tenant_id, 缓存时间)，应用更新或删除时失效
+    _app_tenant_cache: dict[str, tuple] = {}
+    _app_tenant_lock = threading.Lock()
+
+    @classmethod
+    def _get_cached_tenant_id(cls, app_id):
+        with cls._app_tenant_lock:
+            cached = cls._app_tenant_cache.get(app_id)
+        if cached and time.monotonic() - cached[1] < lazy_config.APP_TENANT_CACHE_TTL:
+            return True, cached[0]
+        return False, None
+
+    @classmethod
+    def _cache_tenant_id(cls, app_id, tenant_id):
+        with cls._app_tenant_lock:
+            cls._app_tenant_cache[app_id] = (tenant_id, time.monotonic())
+
+    @classmethod
+    def invalidate_app_tenant(cls, app_id):
+        """使应用的租户缓存失效。
+
+        Args:
+            app_id (str): 应用ID。
+        """
+        with cls._app_tenant_lock:
+            cls._app_tenant_cache.pop(str(app_id), None)
+
+    @classmethod
+    def get_app_tenant_id(cls, app_id):
+        """获取应用所属的租户ID，优先读取进程内缓存。
+
+        Args:
+            app_id (str): 应用ID。
+
+        Returns:
+            str: 租户ID，应用不存在时返回None。
+        """
+        app_id = str(app_id)
+        hit, tenant_id = cls._get_cached_tenant_id(app_id)
+        if hit:
+            return tenant_id
+        app = App.query.filter(App.id == app_id).first()
+        tenant_id = app.tenant_id if app else None
+        cls._cache_tenant_id(app_id, tenant_id)
+        return tenant_id
+
+    @classmethod
+    def get_app_tenant_ids(cls, app_ids):
+        """批量获取应用所属的租户ID，未命中缓存的应用一次查询。
+
+        Args:
+            app_ids (Iterable[str]): 应用ID列表。
+
+        Returns:
+            dict: app_id -> tenant_id。
+        """
+        result = {}
+        missing = []
+        for app_id in {str(app_id) for app_id in app_ids}:
+            hit, tenant_id = cls._get_cached_tenant_id(app_id)
+            if hit:
+                result[app_id] = tenant_id
+            else:
+                missing.append(app_id)
+        if missing:
+            rows = (
+                db.session.query(App.id, App.tenant_id)
+                .filter(App.id.in_(missing))
+                .all()
+            )
+            found = {str(app_id): tenant_id for app_id, tenant_id in rows}
+            for app_id in missing:
+                result[app_id] = found.get(app_id)
+                cls._cache_tenant_id(app_id, result[app_id])
+        return result
+
+    @staticmethod
+    def build_record(
+        user_id: str,
+        app_id: str,
+        token_num: int,
+        call_type: str,
+        session_id=None,
+        cost_time=None,
+        **kwargs,
+    ):
+        """构造成本审计记录的字段，租户ID未指定时由写入方按app_id补全。
+
+        Returns:
+            dict: CostAudit 字段字典。
+        """
+        now = TimeTools.now_datetime_china()
+        record = {
+            "user_id": str(user_id),
+            "call_type": call_type,
+            "token_num": token_num,
+            "created_at": now,
+            "updated_at": now,
+            "session_id": session_id,
+            "cost_time": cost_time,
+            "app_id": str(app_id) if app_id != "" else None,
+            "task_id": kwargs.get("task_id") or None,
+            "tenant_id": kwargs.get("tenant_id") or None,
+        }
+        return record
+
     def add(
         user_id: str,
         app_id: str,
@@ -69,32 +196,47 @@ class CostService:
             Exception: 当数据库操作失败时抛出异常。
         """
         try:
-            new_audit = CostAudit(
-                user_id=str(user_id),
-                call_type=call_type,
-                token_num=token_num,
-                created_at=TimeTools.now_datetime_china(),
-                updated_at=TimeTools.now_datetime_china(),
-                session_id=session_id,
-                cost_time=cost_time,
+            record = CostService.build_record(
+                user_id, app_id, token_num, call_type, session_id, cost_time, **kwargs
             )
-            if app_id != "":
-                new_audit.app_id = str(app_id)
+            if record["app_id"] and not record["tenant_id"]:
                 # 获取appid的租户id
-                new_audit.tenant_id = (
-                    App.query.filter(App.id == app_id).first().tenant_id
-                )
-            if kwargs.get("task_id"):
-                # 模型微调或模型评测的任务ID
-                new_audit.task_id = kwargs.get("task_id")
-            if kwargs.get("tenant_id"):
-                new_audit.tenant_id = kwargs.get("tenant_id")
-            db.session.add(new_audit)
+                record["tenant_id"] = CostService.get_app_tenant_id(record["app_id"])
+            db.session.add(CostAudit(**record))
             db.session.commit()
         except Exception as e:
             print(f"CostService.add发生异常: {e}")
             logging.exception(f"CostService.add发生异常: {e}")
 
+    def add_buffered(
+        user_id: str,
+        app_id: str,
+        token_num: int,
+        call_type: str,
+        session_id=None,
+        cost_time=None,
+        **kwargs,
+    ):
+        """将成本审计记录交给缓冲写入器批量落库，不阻塞请求。
+
+        参数与 add 相同；未启用缓冲写入器时退化为 add。
+        """
+        if not lazy_config.COST_AUDIT_WRITER_ENABLED:
+            return CostService.add(
+                user_id, app_id, token_num, call_type, session_id, cost_time, **kwargs
+            )
+
+        from .writer import cost_audit_writer
+
+        try:
+            cost_audit_writer.submit(
+                CostService.build_record(
+                    user_id, app_id, token_num, call_type, session_id, cost_time, **kwargs
+                )
+            )
+        except Exception as e:
+            logging.exception(f"CostService.add_buffered发生异常: {e}")
+
     # def statistics(self, start_date, end_date):
     def get_cost(account, tenant_id):
         """获取成本审计记录列表。
@@ -229,6 +371,156 @@ class CostService:
 
         return result
 
+    @staticmethod
+    def _account_ids():
+        """系统用户id子查询，用于区分系统用户与WEB用户"""
+        return select(cast(Account.id, String))
+
+    @staticmethod
+    def _statistics_filters(app_id, call_type, start_time, end_time):
+        """应用统计使用的会话、成本记录过滤条件"""
+        conversation_filters = (
+            Conversation.app_id == app_id,
+            Conversation.from_who != "lazyllm",
+            Conversation.created_at >= start_time,
+            Conversation.created_at <= end_time,
+            Conversation.sessionid.isnot(None),
+            Conversation.sessionid != "",
+        )
+        cost_audit_filters = (
+            CostAudit.app_id == app_id,
+            CostAudit.call_type == call_type,
+            CostAudit.created_at >= start_time,
+            CostAudit.created_at <= end_time,
+        )
+        return conversation_filters, cost_audit_filters
+
+    @staticmethod
+    def _aggregate_app_statistics(app_id, call_type, start_time, end_time):
+        """在数据库端聚合指定app_id和时间区间的统计指标。
+
+        会话归属于其第一条非空发送者消息的用户类型（from_who为系统用户id时为系统用户，
+        否则为WEB用户）；互动数取每个会话的最大轮次；Token按会话归属累加。
+
+        Args:
+            app_id (str): 应用ID。
+            call_type (str): 调用类型。
+            start_time (datetime): 统计开始时间。
+            end_time (datetime): 统计结束时间。
+
+        Returns:
+            dict: AppStatistics中除人均互动数外的各项指标。
+        """
+        conversation_filters, cost_audit_filters = CostService._statistics_filters(
+            app_id, call_type, start_time, end_time
+        )
+
+        # 1. 系统用户/WEB用户数及会话数
+        is_system_user = Conversation.from_who.in_(CostService._account_ids())
+        is_web_user = ~is_system_user
+        user_counts = (
+            db.session.query(
+                func.count(
+                    distinct(case((is_system_user, Conversation.from_who)))
+                ),
+                func.count(distinct(case((is_web_user, Conversation.from_who)))),
+                func.count(
+                    distinct(case((is_system_user, Conversation.sessionid)))
+                ),
+                func.count(distinct(case((is_web_user, Conversation.sessionid)))),
+            )
+            .filter(*conversation_filters, Conversation.from_who != "")
+            .one()
+        )
+
+        # 2. 会话归属于第一条非空发送者消息，互动数取该消息之后的最大轮次
+        session_messages = (
+            db.session.query(
+                Conversation.sessionid.label("sessionid"),
+                Conversation.id.label("id"),
+                Conversation.turn_number.label("turn_number"),
+                func.min(case((Conversation.from_who != "", Conversation.id)))
+                .over(partition_by=Conversation.sessionid)
+                .label("first_id"),
+            )
+            .filter(*conversation_filters)
+            .subquery()
+        )
+        session_turns = (
+            db.session.query(
+                session_messages.c.sessionid,
+                session_messages.c.first_id,
+                func.max(func.coalesce(session_messages.c.turn_number, 0)).label(
+                    "max_turn"
+                ),
+            )
+            .filter(session_messages.c.id >= session_messages.c.first_id)
+            .group_by(session_messages.c.sessionid, session_messages.c.first_id)
+            .subquery()
+        )
+        session_tokens = (
+            db.session.query(
+                CostAudit.session_id.label("session_id"),
+                func.sum(CostAudit.token_num).label("token_sum"),
+            )
+            .filter(*cost_audit_filters)
+            .group_by(CostAudit.session_id)
+            .subquery()
+        )
+
+        # 3. 按会话归属汇总互动数与token消费
+        first_message = aliased(Conversation)
+        is_system_session = first_message.from_who.in_(CostService._account_ids())
+        session_token_sum = func.coalesce(session_tokens.c.token_sum, 0)
+        session_sums = (
+            db.session.query(
+                func.sum(case((is_system_session, session_turns.c.max_turn), else_=0)),
+                func.sum(case((is_system_session, 0), else_=session_turns.c.max_turn)),
+                func.sum(case((is_system_session, session_token_sum), else_=0)),
+                func.sum(case((is_system_session, 0), else_=session_token_sum)),
+            )
+            .select_from(session_turns)
+            .join(first_message, first_message.id == session_turns.c.first_id)
+            .outerjoin(
+                session_tokens,
+                session_tokens.c.session_id == session_turns.c.sessionid,
+            )
+            .one()
+        )
+
+        # 5. 响应耗时P50/P99，按下标直接取排序后的第k个值
+        cost_time_filters = (*cost_audit_filters, CostAudit.cost_time.isnot(None))
+        n = (
+            db.session.query(func.count(CostAudit.cost_time))
+            .filter(*cost_time_filters)
+            .scalar()
+            or 0
+        )
+
+        def cost_time_at(index):
+            value = (
+                db.session.query(CostAudit.cost_time)
+                .filter(*cost_time_filters)
+                .order_by(CostAudit.cost_time)
+                .offset(index)
+                .limit(1)
+                .scalar()
+            )
+            return float(value) if value is not None else 0
+
+        return {
+            "system_user_count": user_counts[0] or 0,
+            "web_user_count": user_counts[1] or 0,
+            "system_user_session_count": user_counts[2] or 0,
+            "web_user_session_count": user_counts[3] or 0,
+            "system_user_token_sum": int(session_sums[2] or 0),
+            "web_user_token_sum": int(session_sums[3] or 0),
+            "system_user_interaction_count": int(session_sums[0] or 0),
+            "web_user_interaction_count": int(session_sums[1] or 0),
+            "cost_time_p50": cost_time_at(int(n * 0.5)) if n > 0 else 0,
+            "cost_time_p99": cost_time_at(int(n * 0.99)) if n > 0 else 0,
+        }
+
     @staticmethod
     def calc_and_save_app_statistics(
         app_id,
@@ -271,150 +563,371 @@ class CostService:
             start_time = datetime.combine(stat_date_start, datetime.min.time())
             end_time = datetime.combine(stat_date_end, datetime.max.time())
 
-        # 2. 获取所有系统用户id集合
-        all_user_ids = set(
-            str(acc.id) for acc in Account.query.with_entities(Account.id).all()
+        # 2. 会话、用户、互动数及Token统计均在数据库端聚合完成
+        metrics = CostService._aggregate_app_statistics(
+            app_id, call_type, start_time, end_time
         )
 
-        # 3. 查询app下所有会话
-        conversations = (
-            db.session.query(
-                Conversation.sessionid, Conversation.from_who, Conversation.turn_number
-            )
-            .filter(
-                Conversation.app_id == app_id,
-                Conversation.from_who != "lazyllm",
-                Conversation.created_at >= start_time,
-                Conversation.created_at <= end_time,
-            )
-            .all()
+        # 3. WEB用户人均互动数
+        web_user_count = metrics["web_user_count"]
+        web_user_interaction_count = metrics["web_user_interaction_count"]
+        web_user_avg_interaction = (
+            (web_user_interaction_count / web_user_count) if web_user_count > 0 else 0
         )
 
-        # 4. sessionid归类
-        sessionid_to_user_type = {}
-        sessionid_set = set()
-        system_user_set = set()
-        web_user_set = set()
-        system_user_session_set = set()
-        web_user_session_set = set()
-        system_user_interaction = {}
-        web_user_interaction = {}
+        # 4. 存入统计表
+        stat = AppStatistics(
+            app_id=app_id,
+            call_type=call_type,
+            stat_date=stat_date or stat_date_start,
+            web_user_avg_interaction=web_user_avg_interaction,
+            **metrics,
+        )
+        if need_save_db:
+            # 如果需要保存到数据库
+            # 检查是否已存在相同日期和应用的统计记录
+            existing_stat = AppStatistics.query.filter_by(
+                app_id=app_id,
+                call_type=call_type,
+                stat_date=stat_date or stat_date_start,
+            ).first()
+            if not existing_stat:
+                db.session.add(stat)
+                db.session.commit()
 
-        for sessionid, from_who, turn_number in conversations:
-            if not sessionid:
-                continue
-            sessionid_set.add(sessionid)
-            is_system_user = (
-                from_who and from_who != "lazyllm" and from_who in all_user_ids
+        return stat.to_dict()
+
+    @staticmethod
+    def _build_sketches(app_id, call_type, start_time, end_time):
+        """生成可跨日合并的去重草图与耗时直方图"""
+        conversation_filters, cost_audit_filters = CostService._statistics_filters(
+            app_id, call_type, start_time, end_time
+        )
+        is_system_user = case(
+            (Conversation.from_who.in_(CostService._account_ids()), 1), else_=0
+        )
+        sketches = {field: HyperLogLog() for field in ROLLUP_SKETCH_FIELDS}
+
+        for column, system_field, web_field in (
+            (Conversation.from_who, "system_user_sketch", "web_user_sketch"),
+            (Conversation.sessionid, "system_session_sketch", "web_session_sketch"),
+        ):
+            rows = (
+                db.session.query(column, is_system_user)
+                .filter(*conversation_filters, Conversation.from_who != "")
+                .distinct()
             )
-            if is_system_user:
-                system_user_set.add(from_who)
-                system_user_session_set.add(sessionid)
-            elif from_who and from_who != "lazyllm":
-                web_user_set.add(from_who)
-                web_user_session_set.add(sessionid)
-            # 记录sessionid属于哪类用户
-            if (
-                sessionid not in sessionid_to_user_type
-                and from_who
-                and from_who != "lazyllm"
-            ):
-                sessionid_to_user_type[sessionid] = (
-                    "system" if is_system_user else "web"
-                )
-            # 统计互动数
-            # if from_who == "lazyllm":
-            if sessionid in sessionid_to_user_type:
-                if sessionid_to_user_type[sessionid] == "system":
-                    if sessionid not in system_user_interaction or (
-                        turn_number and turn_number > system_user_interaction[sessionid]
-                    ):
-                        system_user_interaction[sessionid] = turn_number or 0
-                elif sessionid_to_user_type[sessionid] == "web":
-                    if sessionid not in web_user_interaction or (
-                        turn_number and turn_number > web_user_interaction[sessionid]
-                    ):
-                        web_user_interaction[sessionid] = turn_number or 0
-
-        # 5. token消费统计
-        # 先查出所有session_id属于哪类
-        system_sessionids = set(
-            [sid for sid, typ in sessionid_to_user_type.items() if typ == "system"]
+            for value, is_system in rows:
+                sketches[system_field if is_system else web_field].add(value)
+
+        cost_times = (
+            db.session.query(CostAudit.cost_time)
+            .filter(*cost_audit_filters, CostAudit.cost_time.isnot(None))
+            .yield_per(1000)
+        )
+        histogram = CostTimeHistogram().update(float(value) for (value,) in cost_times)
+
+        values = {field: sketch.to_bytes() for field, sketch in sketches.items()}
+        values["cost_time_histogram"] = histogram.to_json()
+        return values
+
+    @staticmethod
+    def _compute_daily_rollup(app_id, stat_date, call_type="release"):
+        """计算单日汇总：精确指标加上可合并草图"""
+        return CostService._compute_rollup(app_id, stat_date, stat_date, call_type)
+
+    @staticmethod
+    def _compute_rollup(app_id, start_date, end_date, call_type="release"):
+        """计算连续日期区间的汇总，格式与单日汇总一致，可参与合并"""
+        start_time = datetime.combine(start_date, datetime.min.time())
+        end_time = datetime.combine(end_date, datetime.max.time())
+        values = CostService._aggregate_app_statistics(
+            app_id, call_type, start_time, end_time
         )
-        web_sessionids = set(
-            [sid for sid, typ in sessionid_to_user_type.items() if typ == "web"]
+        values.update(
+            CostService._build_sketches(app_id, call_type, start_time, end_time)
         )
+        values["web_user_avg_interaction"] = (
+            values["web_user_interaction_count"] / values["web_user_count"]
+            if values["web_user_count"] > 0
+            else 0
+        )
+        return values
 
-        # CostAudit token统计
-        cost_audits = (
-            db.session.query(
-                CostAudit.session_id, CostAudit.token_num, CostAudit.cost_time
+    @staticmethod
+    def _empty_daily_rollup():
+        """无会话、无调用记录日期的汇总"""
+        values = dict.fromkeys(ROLLUP_SUM_FIELDS, 0)
+        values.update(dict.fromkeys(ROLLUP_SKETCH_FIELDS))
+        values.update(
+            system_user_count=0,
+            web_user_count=0,
+            system_user_session_count=0,
+            web_user_session_count=0,
+            cost_time_p50=0,
+            cost_time_p99=0,
+            web_user_avg_interaction=0,
+            cost_time_histogram=CostTimeHistogram().to_json(),
+        )
+        return values
+
+    @staticmethod
+    def _save_daily_rollup(app_id, call_type, stat_date, values, existing=None):
+        stat = existing
+        if stat is None:
+            stat = AppStatistics(app_id=app_id, call_type=call_type, stat_date=stat_date)
+            db.session.add(stat)
+        for field, value in values.items():
+            setattr(stat, field, value)
+        return stat
+
+    @staticmethod
+    def build_daily_rollup(app_id, stat_date, call_type="release"):
+        """生成并保存指定应用单日的汇总行，已存在时覆盖。
+
+        Args:
+            app_id (str): 应用ID。
+            stat_date (date): 统计日期。
+            call_type (str, optional): 调用类型，默认为"release"。
+
+        Returns:
+            AppStatistics: 保存后的汇总行。
+        """
+        existing = AppStatistics.query.filter_by(
+            app_id=app_id, call_type=call_type, stat_date=stat_date
+        ).first()
+        stat = CostService._save_daily_rollup(
+            app_id,
+            call_type,
+            stat_date,
+            CostService._compute_daily_rollup(app_id, stat_date, call_type),
+            existing,
+        )
+        db.session.commit()
+        return stat
+
+    @staticmethod
+    def _active_dates(app_id, call_type, start_date, end_date):
+        """区间内有会话或调用记录的日期集合"""
+        start_time = datetime.combine(start_date, datetime.min.time())
+        end_time = datetime.combine(end_date, datetime.max.time())
+        conversation_days = (
+            db.session.query(func.date(Conversation.created_at))
+            .filter(
+                Conversation.app_id == app_id,
+                Conversation.created_at >= start_time,
+                Conversation.created_at <= end_time,
             )
+            .distinct()
+            .all()
+        )
+        cost_audit_days = (
+            db.session.query(func.date(CostAudit.created_at))
             .filter(
                 CostAudit.app_id == app_id,
                 CostAudit.call_type == call_type,
                 CostAudit.created_at >= start_time,
                 CostAudit.created_at <= end_time,
             )
+            .distinct()
             .all()
         )
+        return {
+            date.fromisoformat(str(day))
+            for (day,) in conversation_days + cost_audit_days
+            if day
+        }
 
-        system_user_token_sum = 0
-        web_user_token_sum = 0
-        cost_times = []
-        for session_id, token_num, cost_time in cost_audits:
-            if session_id in system_sessionids:
-                system_user_token_sum += token_num or 0
-            elif session_id in web_sessionids:
-                web_user_token_sum += token_num or 0
-            if cost_time is not None:
-                cost_times.append(float(cost_time))
-
-        # 6. 响应耗时P50/P99
-        cost_times_sorted = sorted(cost_times)
-        n = len(cost_times_sorted)
-        cost_time_p50 = cost_times_sorted[int(n * 0.5)] if n > 0 else 0
-        cost_time_p99 = cost_times_sorted[int(n * 0.99)] if n > 0 else 0
-
-        # 7. 互动数
-        system_user_interaction_count = sum(system_user_interaction.values())
-        web_user_interaction_count = sum(web_user_interaction.values())
-
-        # 8. WEB用户人均互动数
-        web_user_count = len(web_user_set)
-        web_user_avg_interaction = (
-            (web_user_interaction_count / web_user_count) if web_user_count > 0 else 0
+    @staticmethod
+    def ensure_daily_rollups(
+        app_id, start_date=None, end_date=None, call_type="release", overwrite=False
+    ):
+        """补齐区间内缺失的按日汇总，今天及之后的日期不会落库。
+
+        无会话、无调用记录的日期直接写入空汇总，不再逐日统计。
+
+        Args:
+            app_id (str): 应用ID。
+            start_date (date, optional): 起始日期，默认为该应用最早的会话或调用日期。
+            end_date (date, optional): 结束日期，默认为昨天。
+            call_type (str, optional): 调用类型，默认为"release"。
+            overwrite (bool, optional): 是否重新生成已存在的汇总，默认为False。
+
+        Returns:
+            int: 本次生成的汇总天数。
+        """
+        yesterday = date.today() - timedelta(days=1)
+        end_date = min(end_date or yesterday, yesterday)
+        if start_date is None:
+            first_times = [
+                db.session.query(func.min(Conversation.created_at))
+                .filter(Conversation.app_id == app_id)
+                .scalar(),
+                db.session.query(func.min(CostAudit.created_at))
+                .filter(CostAudit.app_id == app_id, CostAudit.call_type == call_type)
+                .scalar(),
+            ]
+            first_times = [t for t in first_times if t]
+            if not first_times:
+                return 0
+            start_date = min(first_times).date()
+        if start_date > end_date:
+            return 0
+
+        rows = {
+            row.stat_date: row
+            for row in AppStatistics.query.options(
+                undefer(AppStatistics.cost_time_histogram)
+            )
+            .filter(
+                AppStatistics.app_id == app_id,
+                AppStatistics.call_type == call_type,
+                AppStatistics.stat_date >= start_date,
+                AppStatistics.stat_date <= end_date,
+            )
+            .order_by(AppStatistics.id)
+        }
+        missing = [
+            start_date + timedelta(days=offset)
+            for offset in range((end_date - start_date).days + 1)
+        ]
+        if not overwrite:
+            missing = [
+                day
+                for day in missing
+                if day not in rows or rows[day].cost_time_histogram is None
+            ]
+        if not missing:
+            return 0
+
+        active_dates = CostService._active_dates(
+            app_id, call_type, missing[0], missing[-1]
         )
+        for day in missing:
+            if day in active_dates:
+                values = CostService._compute_daily_rollup(app_id, day, call_type)
+            else:
+                values = CostService._empty_daily_rollup()
+            CostService._save_daily_rollup(
+                app_id, call_type, day, values, rows.get(day)
+            )
+        db.session.commit()
+        return len(missing)
 
-        # 9. 存入统计表
+    @staticmethod
+    def _uncovered_ranges(start_date, end_date, covered):
+        """区间内没有汇总的连续日期段，返回[(起始日期, 结束日期)]"""
+        ranges = []
+        day = start_date
+        while day <= end_date:
+            if day in covered:
+                day += timedelta(days=1)
+                continue
+            gap_start = day
+            while day <= end_date and day not in covered:
+                day += timedelta(days=1)
+            ranges.append((gap_start, day - timedelta(days=1)))
+        return ranges
+
+    @staticmethod
+    def merge_daily_rollups(app_id, start_date=None, end_date=None, call_type="release"):
+        """合并按日汇总得到任意区间的统计，结果格式与calc_and_save_app_statistics一致。
+
+        Token、互动数为各日之和；用户数、会话数由去重草图合并估计（误差约1.6%），
+        并限制在单日最大值与各日之和之间；P50/P99由耗时直方图估计（相对误差1%）。
+        跨天会话的互动数按天分别计入。缺少汇总的日期（包括今天）按连续区间实时统计，
+        本方法不写入汇总，补齐由 backfill-app-statistics 命令和每日任务负责。
+
+        Args:
+            app_id (str): 应用ID。
+            start_date (date, optional): 起始日期，默认为应用创建日期。
+            end_date (date, optional): 结束日期，默认为今天。
+            call_type (str, optional): 调用类型，默认为"release"。
+
+        Returns:
+            dict: 区间统计结果字典。
+
+        Raises:
+            CommonError: 当指定的app_id不存在时抛出异常。
+        """
+        app = App.query.filter_by(id=app_id).first()
+        if not app:
+            raise CommonError("指定的app_id不存在")
+
+        today = date.today()
+        end_date = end_date or today
+        created_date = app.created_at.date() if app.created_at else None
+        start_date = start_date or created_date or end_date
+        # 应用创建之前不会有数据，无需实时统计
+        history_start = max(start_date, created_date) if created_date else start_date
+
+        rollup_columns = [
+            getattr(AppStatistics, field)
+            for field in (*ROLLUP_SUM_FIELDS, *ROLLUP_COUNT_FIELDS.values())
+        ]
+        sketch_columns = [
+            getattr(AppStatistics, field)
+            for field in (*ROLLUP_SKETCH_FIELDS, "cost_time_histogram")
+        ]
+        rows = (
+            db.session.query(AppStatistics.stat_date, *rollup_columns, *sketch_columns)
+            .filter(
+                AppStatistics.app_id == app_id,
+                AppStatistics.call_type == call_type,
+                AppStatistics.stat_date >= start_date,
+                AppStatistics.stat_date <= end_date,
+                AppStatistics.cost_time_histogram.isnot(None),
+            )
+            .order_by(AppStatistics.id)
+        )
+        # 同一日期存在多行时以最新的为准
+        daily = {row.stat_date: row._asdict() for row in rows}
+        for gap_start, gap_end in CostService._uncovered_ranges(
+            history_start, min(end_date, today), daily
+        ):
+            daily[gap_start] = CostService._compute_rollup(
+                app_id, gap_start, gap_end, call_type
+            )
+
+        totals = dict.fromkeys(ROLLUP_SUM_FIELDS, 0)
+        sketches = {field: HyperLogLog() for field in ROLLUP_SKETCH_FIELDS}
+        count_bounds = {field: [0, 0] for field in ROLLUP_COUNT_FIELDS.values()}
+        histogram = CostTimeHistogram()
+        for values in daily.values():
+            for field in ROLLUP_SUM_FIELDS:
+                totals[field] += values[field] or 0
+            for sketch_field, count_field in ROLLUP_COUNT_FIELDS.items():
+                sketches[sketch_field].merge(
+                    HyperLogLog.from_bytes(values[sketch_field])
+                )
+                day_count = values[count_field] or 0
+                bounds = count_bounds[count_field]
+                bounds[0] = max(bounds[0], day_count)
+                bounds[1] += day_count
+            histogram.merge(CostTimeHistogram.from_json(values["cost_time_histogram"]))
+
+        counts = {
+            count_field: min(
+                max(sketches[sketch_field].count(), count_bounds[count_field][0]),
+                count_bounds[count_field][1],
+            )
+            for sketch_field, count_field in ROLLUP_COUNT_FIELDS.items()
+        }
+        web_user_count = counts["web_user_count"]
         stat = AppStatistics(
             app_id=app_id,
             call_type=call_type,
-            stat_date=stat_date or stat_date_start,
-            system_user_count=len(system_user_set),
-            web_user_count=web_user_count,
-            system_user_session_count=len(system_user_session_set),
-            web_user_session_count=len(web_user_session_set),
-            system_user_token_sum=system_user_token_sum,
-            web_user_token_sum=web_user_token_sum,
-            system_user_interaction_count=system_user_interaction_count,
-            web_user_interaction_count=web_user_interaction_count,
-            cost_time_p50=cost_time_p50,
-            cost_time_p99=cost_time_p99,
-            web_user_avg_interaction=web_user_avg_interaction,
+            stat_date=start_date,
+            cost_time_p50=round(histogram.quantile(0.5), 6),
+            cost_time_p99=round(histogram.quantile(0.99), 6),
+            web_user_avg_interaction=(
+                totals["web_user_interaction_count"] / web_user_count
+                if web_user_count > 0
+                else 0
+            ),
+            **totals,
+            **counts,
         )
-        if need_save_db:
-            # 如果需要保存到数据库
-            # 检查是否已存在相同日期和应用的统计记录
-            existing_stat = AppStatistics.query.filter_by(
-                app_id=app_id,
-                call_type=call_type,
-                stat_date=stat_date or stat_date_start,
-            ).first()
-            if not existing_stat:
-                db.session.add(stat)
-                db.session.commit()
-
         return stat.to_dict()
 
     @staticmethod
@@ -441,10 +954,8 @@ class CostService:
                 continue
             # 先缓存统计（可选，便于后续接口快速访问）
             CostService.get_app_statistics(app_id)
-            # 统计并存入数据库
-            CostService.calc_and_save_app_statistics(
-                app_id=app_id, stat_date=stat_date, need_save_db=True
-            )
+            # 统计并存入数据库，同时生成可合并的按日汇总
+            CostService.build_daily_rollup(app_id, stat_date)
 
     @staticmethod
     def cache_app_statistics_for_periods(stat_date: date):
@@ -491,11 +1002,8 @@ class CostService:
                 result_7 = None
 
             if not result_7:
-                result_7 = CostService.calc_and_save_app_statistics(
-                    app_id=app_id,
-                    stat_date_start=stat_date_start_7,
-                    stat_date_end=stat_date_end_7,
-                    need_save_db=False,
+                result_7 = CostService.merge_daily_rollups(
+                    app_id, stat_date_start_7, stat_date_end_7
                 )
                 redis_client.setex(
                     cache_key_7, 3600 * 23, json.dumps(result_7)
@@ -513,11 +1021,8 @@ class CostService:
                 result_30 = None
 
             if not result_30:
-                result_30 = CostService.calc_and_save_app_statistics(
-                    app_id=app_id,
-                    stat_date_start=stat_date_start_30,
-                    stat_date_end=stat_date_end_30,
-                    need_save_db=False,
+                result_30 = CostService.merge_daily_rollups(
+                    app_id, stat_date_start_30, stat_date_end_30
                 )
                 redis_client.setex(
                     cache_key_30, 3600 * 23, json.dumps(result_30)
@@ -553,17 +1058,13 @@ class CostService:
             except Exception:
                 pass
 
-        # 若缓存未命中，则实时统计（不写入redis）
-        result = CostService.calc_and_save_app_statistics(
-            app_id=app_id,
-            stat_date_start=start_date,
-            stat_date_end=end_date,
-            need_save_db=False,
-        )
-        return result
+        # 若缓存未命中，则合并按日汇总（不写入redis）
+        return CostService.merge_daily_rollups(app_id, start_date, end_date)
 
     @staticmethod
-    def query_app_statistics(app_id, start_date=None, end_date=None, call_type=None):
+    def query_app_statistics(
+        app_id, start_date=None, end_date=None, call_type=None, merged=False
+    ):
         """根据app_id、时间区间、call_type查询AppStatistics表的数据。
 
         Args:
@@ -571,23 +1072,30 @@ class CostService:
             start_date (date or str, optional): 起始日期，支持date类型或字符串格式。
             end_date (date or str, optional): 结束日期，支持date类型或字符串格式。
             call_type (str, optional): 调用类型，用于过滤数据。
+            merged (bool, optional): 是否将区间内的按日汇总合并为一条统计，默认为False。
 
         Returns:
-            list: 统计结果列表，每个元素为字典格式的统计数据。
+            list: 统计结果列表，每个元素为字典格式的统计数据；
+                  merged为True时返回合并后的统计字典。
 
         Raises:
             ValueError: 当日期格式不正确时抛出异常。
         """
+        if isinstance(start_date, str):
+            start_date = date.fromisoformat(start_date)
+        if isinstance(end_date, str):
+            end_date = date.fromisoformat(end_date)
+        if merged:
+            return CostService.merge_daily_rollups(
+                app_id, start_date, end_date, call_type or "release"
+            )
+
         query = AppStatistics.query.filter(AppStatistics.app_id == app_id)
         if call_type:
             query = query.filter(AppStatistics.call_type == call_type)
         if start_date:
-            if isinstance(start_date, str):
-                start_date = date.fromisoformat(start_date)
             query = query.filter(AppStatistics.stat_date >= start_date)
         if end_date:
-            if isinstance(end_date, str):
-                end_date = date.fromisoformat(end_date)
             query = query.filter(AppStatistics.stat_date <= end_date)
         return [
             stat.to_dict() for stat in query.order_by(AppStatistics.stat_date).all()
@@ -619,3 +1127,9 @@ class CostService:
         if from_who:
             query = query.filter(Conversation.from_who == from_who)
         return [dict(row) for row in query.all()]
+
+
+@event.listens_for(App, "after_update")
+@event.listens_for(App, "after_delete")
+def _invalidate_app_tenant(mapper, connection, target):
+    CostService.invalidate_app_tenant(target.id)
@@ -0,0 +1,187 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Additional Notice:
+# When modifying, redistributing, or creating derivative works of this software,
+# you must retain the original LazyCraft logo and the GitHub link icon that directs
+# to the official repository: https://github.com/LazyAGI/LazyLLM
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from typing import Optional
+
+from flask import current_app
+from sqlalchemy import insert
+
+from configs import lazy_config
+from utils.util_database import db
+
+from .model import CostAudit
+
+logger = logging.getLogger(__name__)
+
+
+class CostAuditWriter:
+    """成本审计记录的缓冲写入器。
+
+    请求线程只把记录放入有界队列，后台线程按批量大小或最长等待时间批量插入并提交，
+    缺失的租户ID在落库前按批次统一补全。队列满时按 COST_AUDIT_OVERFLOW_POLICY 处理：
+    sync 在请求线程中直接写入（不丢记录），drop 丢弃并计数。进程退出时会先写完队列中的记录。
+    """
+
+    def __init__(
+        self,
+        queue_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        overflow_policy: Optional[str] = None,
+    ):
+        self._queue = queue.Queue(
+            maxsize=queue_size or lazy_config.COST_AUDIT_QUEUE_SIZE
+        )
+        self._batch_size = batch_size or lazy_config.COST_AUDIT_BATCH_SIZE
+        self._flush_interval = flush_interval or lazy_config.COST_AUDIT_FLUSH_INTERVAL
+        self._overflow_policy = overflow_policy or lazy_config.COST_AUDIT_OVERFLOW_POLICY
+        self._app = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._stats = {
+            "written": 0,
+            "batches": 0,
+            "failed": 0,
+            "dropped": 0,
+            "sync_writes": 0,
+        }
+
+    def submit(self, record: dict) -> None:
+        """提交一条待写入的记录
+
+        Args:
+            record (dict): CostAudit 字段字典
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            if self._overflow_policy == "drop":
+                self._count("dropped")
+                logger.warning("CostAudit writer queue is full, record dropped")
+            else:
+                self._count("sync_writes")
+                self._write([record])
+
+    def flush(self) -> None:
+        """阻塞直到已提交的记录全部处理完成"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """写完队列中的记录后停止后台线程"""
+        self._stop.set()
+        try:
+            # 唤醒正在等待凑批的后台线程
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        """获取写入统计"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queued"] = self._queue.qsize()
+        return stats
+
+    def _count(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += value
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            # fork 出的子进程中线程不存在，需要重新启动
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if self._thread is None:
+                atexit.register(self.shutdown)
+            self._app = current_app._get_current_object()
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="cost-audit-writer", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            records = [record for record in batch if record is not None]
+            if records:
+                self._write(records)
+            for _ in batch:
+                self._queue.task_done()
+            if not records and self._stop.is_set():
+                break
+
+    def _take_batch(self) -> list[dict]:
+        try:
+            if self._stop.is_set():
+                batch = [self._queue.get_nowait()]
+            else:
+                batch = [self._queue.get(timeout=self._flush_interval)]
+        except queue.Empty:
+            return []
+
+        # 凑满一批或等到最长等待时间再提交，限制每秒的提交次数
+        deadline = time.monotonic() + self._flush_interval
+        while len(batch) < self._batch_size and batch[-1] is not None:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0 or self._stop.is_set():
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, records: list[dict]) -> None:
+        from .service import CostService
+
+        with self._app.app_context():
+            try:
+                app_ids = [
+                    r["app_id"] for r in records if r["app_id"] and not r["tenant_id"]
+                ]
+                if app_ids:
+                    tenant_ids = CostService.get_app_tenant_ids(app_ids)
+                    for record in records:
+                        if record["app_id"] and not record["tenant_id"]:
+                            record["tenant_id"] = tenant_ids.get(record["app_id"])
+                db.session.execute(insert(CostAudit), records)
+                db.session.commit()
+                self._count("written", len(records))
+                self._count("batches")
+            except Exception as e:
+                db.session.rollback()
+                self._count("failed", len(records))
+                logger.exception(f"Failed to write {len(records)} CostAudit records: {e}")
+
+
+cost_audit_writer = CostAuditWriter()
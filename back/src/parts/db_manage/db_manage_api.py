@@ -476,7 +476,8 @@ class DataImport(Resource):
             table_id (int): 表ID
 
         Form Data:
-            file: 要上传的Excel文件
+            file: 要上传的Excel或CSV文件
+            action (str, optional): 为"import"时跳过预览，直接按块导入文件
 
         Returns:
             dict: 包含预览数据的字典，包括总行数、列定义和数据
@@ -488,6 +489,12 @@ class DataImport(Resource):
         if "file" not in request.files:
             raise ValueError("请上传文件")
         file = request.files["file"]
+        if request.form.get("action") == "import":
+            service = DBManageService(current_user)
+            flag, error, exception = service.import_file(
+                database_id=database_id, table_id=table_id, file=file
+            )
+            return self._import_result(service, table_id, flag, error, exception)
         try:
             service = DBManageService(current_user)
             table_info = service.get_table_info_by_id(table_id)
@@ -576,13 +583,35 @@ class DataImport(Resource):
                 flag, error, exception = service.import_data(
                     database_id=database_id, table_id=table_id, data=args["data"]
                 )
-                if flag:
-                    return {"code": 200, "message": "success"}, 200
-                else:
-                    return {"code": 400, "message": error}, 400
+                return self._import_result(service, table_id, flag, error, exception)
         except Exception as e:
             abort(400, message=f"Error processing file: {str(e)}")
 
+    @staticmethod
+    def _import_result(service, table_id, flag, error, exception):
+        """构造导入结果响应，附带导入的行数统计"""
+        summary = service.get_import_progress(table_id)
+        if flag:
+            return {"code": 200, "message": "success", "summary": summary}, 200
+        return {"code": 400, "message": error, "summary": summary}, 400
+
+
+class DataImportProgress(Resource):
+    @login_required
+    def get(self, database_id, table_id):
+        """获取数据导入进度。
+
+        Args:
+            database_id (int): 数据库ID
+            table_id (int): 表ID
+
+        Returns:
+            dict: 最近一次导入的进度，没有记录时为空
+        """
+        database = db.session.get(DataBaseInfo, database_id)
+        self.check_can_read_object(database)
+        return DBManageService(current_user).get_import_progress(table_id) or {}
+
 
 class TableDataManager(Resource):
     @login_required
@@ -598,6 +627,8 @@ class TableDataManager(Resource):
         Query Parameters:
             page (int): 页码，默认为1
             limit (int): 每页数量，默认为10
+            mode (str): 分页方式，page为页码分页（默认），keyset为主键游标分页
+            cursor (str): 游标分页时上一页返回的next_cursor
 
         Returns:
             dict: 分页的表数据
@@ -617,11 +648,30 @@ class TableDataManager(Resource):
             location="args",
             help="Limit must be an integer",
         )
+        parser.add_argument(
+            "mode",
+            type=str,
+            default="page",
+            choices=("page", "keyset"),
+            location="args",
+            help="Mode must be page or keyset",
+        )
+        parser.add_argument("cursor", type=str, location="args")
         args = parser.parse_args()
         database = db.session.get(DataBaseInfo, database_id)
         self.check_can_read_object(database)
 
         service = DBManageService(current_user)
+        if args["mode"] == "keyset" or args["cursor"]:
+            try:
+                return service.browse_data(
+                    database_id=database_id,
+                    table_id=table_id,
+                    limit=args["limit"],
+                    cursor=args["cursor"],
+                )
+            except ValueError as e:
+                abort(400, message=str(e))
         page_data = service.select_data(
             database_id=database_id,
             table_id=table_id,
@@ -725,6 +775,9 @@ api.add_resource(DBManageDatabaseBase, "/database")
 api.add_resource(DBManageDatabaseBaseList, "/database/list/page")
 api.add_resource(DBManageDatabase, "/database/<database_id>")
 api.add_resource(DataImport, "/database/import/<database_id>/<table_id>")
+api.add_resource(
+    DataImportProgress, "/database/import/<database_id>/<table_id>/progress"
+)
 api.add_resource(DBManageTableList, "/database/<database_id>/table/list")
 api.add_resource(DBManageTableCreate, "/database/<database_id>/table")
 api.add_resource(DBManageTable, "/database/<database_id>/table/<table_id>")
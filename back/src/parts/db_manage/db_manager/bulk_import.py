@@ -0,0 +1,386 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Additional Notice:
+# When modifying, redistributing, or creating derivative works of this software,
+# you must retain the original LazyCraft logo and the GitHub link icon that directs
+# to the official repository: https://github.com/LazyAGI/LazyLLM
+
+
+import io
+import logging
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import Any, Optional
+
+import pandas as pd
+from sqlalchemy import Boolean, Table
+
+# 导入布尔字段时可识别的取值，与 mysql_bool_to_int 保持一致
+BOOL_VALUES = {"true": 1, "1": 1, "1.0": 1, "false": 0, "0": 0, "0.0": 0}
+BOOL_TYPES = ("TINYINT", "BOOLEAN", "BOOL")
+# COPY 文本格式中需要转义的字符
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+@dataclass
+class ImportProgress:
+    """数据导入进度"""
+
+    processed: int = 0
+    inserted: int = 0
+    failed: int = 0
+    errors: list = field(default_factory=list)
+    started_at: float = field(default_factory=time.monotonic)
+
+    def to_dict(self) -> dict:
+        elapsed = time.monotonic() - self.started_at
+        return {
+            "processed": self.processed,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "elapsed": round(elapsed, 3),
+            "rows_per_second": round(self.processed / elapsed, 1) if elapsed else 0,
+        }
+
+
+def iter_record_chunks(records: list, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """将预览后提交的数据行按块转换为DataFrame，保留原始的Python值"""
+    for start in range(0, len(records), chunk_size):
+        chunk = records[start : start + chunk_size]
+        # 含空值的整数列不能推断为float64，否则超过2^53的整数会被舍入
+        yield pd.DataFrame(
+            [row.to_dict() if hasattr(row, "to_dict") else row for row in chunk],
+            dtype=object,
+        )
+
+
+def iter_upload_chunks(file, chunk_size: int, filename: str = "") -> Iterator[pd.DataFrame]:
+    """按块读取上传的CSV或Excel文件，不把整个文件载入为一个DataFrame。
+
+    xlsx文件使用openpyxl的只读模式逐行读取，CSV使用pandas的分块读取，
+    旧版xls格式不支持流式读取，读入后再分块。含空值的整数列不会转为浮点数，
+    CSV使用可空类型，Excel保留单元格的原始值。
+
+    Args:
+        file: 上传的文件对象
+        chunk_size (int): 每块的行数
+        filename (str, optional): 文件名，默认取 file.filename
+
+    Yields:
+        DataFrame: 以首行为列名的数据块
+    """
+    name = (filename or getattr(file, "filename", "") or "").lower()
+    if name.endswith(".csv"):
+        yield from pd.read_csv(file, chunksize=chunk_size, dtype_backend="numpy_nullable")
+    elif name.endswith((".xlsx", ".xlsm")):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(file, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = ["" if h is None else str(h) for h in header]
+            while True:
+                batch = list(islice(rows, chunk_size))
+                if not batch:
+                    break
+                yield pd.DataFrame(batch, columns=columns, dtype=object)
+        finally:
+            workbook.close()
+    else:
+        df = pd.read_excel(file, dtype=object)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start : start + chunk_size]
+
+
+def _plain(value):
+    # 错误信息中的数据需要可JSON序列化
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return None if isinstance(value, float) and pd.isna(value) else value
+    if pd.api.types.is_scalar(value) and pd.isna(value):
+        return None
+    return str(value)
+
+
+def _column_kind(column) -> str:
+    if str(column.type).upper() in BOOL_TYPES or isinstance(column.type, Boolean):
+        return "bool"
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return "other"
+    if python_type is int:
+        return "int"
+    if python_type is float:
+        return "float"
+    if python_type is Decimal:
+        return "decimal"
+    if python_type is datetime:
+        return "datetime"
+    if python_type is date:
+        return "date"
+    if python_type is str:
+        return "str"
+    return "other"
+
+
+def _is_required(column) -> bool:
+    if column.nullable or column.default is not None or column.server_default is not None:
+        return False
+    # 整数主键默认自增
+    return not (column.primary_key and column.autoincrement in (True, "auto") and _column_kind(column) == "int")
+
+
+def _objects(values: list, valid: list) -> list:
+    return [v if ok else None for v, ok in zip(values, valid)]
+
+
+def _to_int(value) -> Optional[int]:
+    """将单个值精确转换为整数，不经过浮点数，无法转换时返回None"""
+    if pd.api.types.is_bool(value) or pd.api.types.is_integer(value):
+        return int(value)
+    if pd.api.types.is_float(value):
+        return int(value) if float(value).is_integer() else None
+    text = str(value).strip()
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        number = Decimal(text)
+    except InvalidOperation:
+        return None
+    if number.is_finite() and number == number.to_integral_value():
+        return int(number)
+    return None
+
+
+def convert_column(column, series: pd.Series) -> tuple[list, pd.Series, str]:
+    """按列类型整列校验并转换导入的数据。
+
+    Args:
+        column (Column): 表的列定义
+        series (Series): 上传文件中该列的数据
+
+    Returns:
+        tuple: (转换后的Python值列表，缺失值为None；无法转换的行掩码；错误说明)
+    """
+    kind = _column_kind(column)
+    present = series.notna()
+    if kind in ("int", "bool"):
+        # 整数逐个精确转换，不能经过float64，否则BIGINT会被舍入
+        values = []
+        for value, ok in zip(series.tolist(), present.tolist()):
+            if not ok:
+                values.append(None)
+            elif kind == "bool" and str(value).strip().lower() in BOOL_VALUES:
+                values.append(BOOL_VALUES[str(value).strip().lower()])
+            else:
+                # 非0/1的整数原样写入tinyint
+                values.append(_to_int(value))
+        bad = present & pd.Series([v is None for v in values], index=series.index)
+        return values, bad, "不是有效的布尔值" if kind == "bool" else "不是有效的整数"
+    if kind in ("float", "decimal"):
+        numeric = pd.to_numeric(series, errors="coerce")
+        bad = present & numeric.isna()
+        valid = (present & ~bad).tolist()
+        if kind == "float":
+            return _objects(numeric.tolist(), valid), bad, "不是有效的数字"
+        try:
+            values = [Decimal(str(v)) if ok else None for v, ok in zip(series.tolist(), valid)]
+        except InvalidOperation:
+            values = [Decimal(repr(v)) if ok else None for v, ok in zip(numeric.tolist(), valid)]
+        return values, bad, "不是有效的数字"
+    if kind in ("datetime", "date"):
+        parsed = pd.to_datetime(series, errors="coerce", format="mixed")
+        bad = present & parsed.isna()
+        valid = (present & ~bad).tolist()
+        values = list(parsed.dt.to_pydatetime())
+        if kind == "date":
+            values = [v.date() if ok else None for v, ok in zip(values, valid)]
+        return _objects(values, valid), bad, "不是有效的日期时间"
+    if kind == "str":
+        texts = series.where(present, "").astype(str)
+        bad = pd.Series(False, index=series.index)
+        length = getattr(column.type, "length", None)
+        if length:
+            bad = present & (texts.str.len() > length)
+        return _objects(texts.tolist(), (present & ~bad).tolist()), bad, f"长度超过{length}"
+    bad = pd.Series(False, index=series.index)
+    return _objects(series.tolist(), present.tolist()), bad, ""
+
+
+class BulkImporter:
+    """流式批量导入。
+
+    按块读取数据后整列校验类型，校验失败的行记录错误并跳过，其余行按批写入，
+    每批单独提交。PostgreSQL（psycopg2）使用 COPY，其他数据库使用 executemany，
+    pymysql 会将其改写为多行 VALUES。某一批写入失败时在该批内逐行重试，
+    只跳过数据库拒绝的行。
+    """
+
+    def __init__(
+        self,
+        engine,
+        table: Table,
+        batch_size: int = 2000,
+        max_errors: int = 1000,
+        on_progress: Optional[Callable[[ImportProgress], None]] = None,
+    ):
+        """初始化导入器。
+
+        Args:
+            engine (Engine): 目标数据库引擎
+            table (Table): 目标表定义
+            batch_size (int, optional): 每次提交的行数，默认为2000
+            max_errors (int, optional): 最多保留的错误行详情数，失败行数仍全部统计
+            on_progress (Callable, optional): 每批写入后调用，参数为 ImportProgress
+        """
+        self.engine = engine
+        self.table = table
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.on_progress = on_progress
+        self.columns = {column.name: column for column in table.columns}
+        self.required = [name for name, column in self.columns.items() if _is_required(column)]
+        self.progress = ImportProgress()
+
+    def run(self, chunks: Iterable[pd.DataFrame]) -> ImportProgress:
+        """导入全部数据块，返回导入进度"""
+        offset = 0
+        for chunk in chunks:
+            chunk = chunk.set_axis(range(offset, offset + len(chunk)))
+            offset += len(chunk)
+            rows, row_numbers = self._validate(chunk)
+            for start in range(0, len(rows), self.batch_size):
+                self._insert(
+                    rows[start : start + self.batch_size],
+                    row_numbers[start : start + self.batch_size],
+                )
+                self._report()
+        self._report()
+        return self.progress
+
+    def _report(self):
+        if self.on_progress:
+            try:
+                self.on_progress(self.progress)
+            except Exception as e:
+                logging.warning(f"上报导入进度失败: {e}")
+
+    def _record_error(self, row_number: int, error: str, data: dict):
+        self.progress.failed += 1
+        if len(self.progress.errors) < self.max_errors:
+            self.progress.errors.append(
+                {
+                    "row": row_number,
+                    "error": error,
+                    "data": {k: _plain(v) for k, v in data.items()},
+                }
+            )
+
+    def _validate(self, chunk: pd.DataFrame) -> tuple[list[dict], list[int]]:
+        chunk = chunk[[name for name in chunk.columns if name in self.columns]]
+        chunk = chunk.dropna(how="all")
+        self.progress.processed += len(chunk)
+        if chunk.empty:
+            return [], []
+
+        errors = defaultdict(list)
+        missing = [name for name in self.required if name not in chunk.columns]
+        if missing:
+            for index in chunk.index:
+                errors[index].append(f"缺少必填字段 {', '.join(missing)}")
+        names, values = [], []
+        for name in chunk.columns:
+            series = chunk[name]
+            converted, bad, message = convert_column(self.columns[name], series)
+            for index in bad.index[bad.to_numpy()]:
+                errors[index].append(f"字段 {name} 的值 {series[index]!r} {message}")
+            if name in self.required:
+                empty = series.isna()
+                for index in empty.index[empty.to_numpy()]:
+                    errors[index].append(f"字段 {name} 不能为空")
+            names.append(name)
+            values.append(converted)
+
+        rows, row_numbers = [], []
+        for index, row in zip(chunk.index, zip(*values)):
+            if index in errors:
+                self._record_error(index + 1, "；".join(errors[index]), chunk.loc[index].to_dict())
+            else:
+                rows.append(dict(zip(names, row)))
+                row_numbers.append(index + 1)
+        return rows, row_numbers
+
+    def _insert(self, rows: list[dict], row_numbers: list[int]):
+        if not rows:
+            return
+        try:
+            with self.engine.begin() as conn:
+                self._bulk_insert(conn, rows)
+            self.progress.inserted += len(rows)
+            return
+        except Exception as e:
+            logging.info(f"批量写入失败，逐行重试: {e}")
+        # 整批失败时逐行重试，定位并跳过出错的行
+        with self.engine.begin() as conn:
+            for row_number, row in zip(row_numbers, rows):
+                try:
+                    with conn.begin_nested():
+                        conn.execute(self.table.insert(), row)
+                    self.progress.inserted += 1
+                except Exception as e:
+                    self._record_error(row_number, str(getattr(e, "orig", e)), row)
+
+    def _bulk_insert(self, conn, rows: list[dict]):
+        if conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg2":
+            self._copy_rows(conn, rows)
+        else:
+            conn.execute(self.table.insert(), rows)
+
+    def _copy_rows(self, conn, rows: list[dict]):
+        names = list(rows[0])
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write("\t".join(_copy_value(row[name]) for name in names))
+            buffer.write("\n")
+        buffer.seek(0)
+        preparer = conn.dialect.identifier_preparer
+        columns = ", ".join(preparer.quote(name) for name in names)
+        sql = f"COPY {preparer.format_table(self.table)} ({columns}) FROM STDIN"
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.copy_expert(sql, buffer)
+        finally:
+            cursor.close()
+
+
+def _copy_value(value: Any) -> str:
+    """将值转换为 COPY 文本格式的字段，NULL 写作 \\N"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value).translate(COPY_ESCAPES)
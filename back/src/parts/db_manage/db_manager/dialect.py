@@ -19,6 +19,7 @@
 
 from typing import Optional
 
+from sqlalchemy import text
 from sqlalchemy.engine import Engine
 
 
@@ -376,3 +377,27 @@ class DialectAdapter:
         else:
             # 其他数据库类型
             raise Exception(f"Unsupported database dialect: {self.dialect}")
+
+    def estimated_row_count_sql(self):
+        """生成从系统统计信息读取估算行数的SQL语句。
+
+        估算值来自数据库的统计信息（PostgreSQL的pg_class.reltuples、
+        MySQL/TiDB的information_schema.tables.table_rows、达梦的USER_TABLES.NUM_ROWS），
+        无需扫描全表。语句使用 :table_name 绑定参数。
+
+        Returns:
+            TextClause | None: 查询估算行数的SQL语句，不支持的方言返回None
+        """
+        if self.dialect == "postgresql":
+            return text(
+                "SELECT reltuples::bigint FROM pg_class "
+                "WHERE oid = to_regclass(:schema || '.' || :table_name)"
+            ).bindparams(schema=self.schema)
+        if self.dialect in ["mysql", "tidb"]:
+            return text(
+                "SELECT table_rows FROM information_schema.tables "
+                "WHERE table_schema = DATABASE() AND table_name = :table_name"
+            )
+        if self.dialect == "dm":
+            return text("SELECT NUM_ROWS FROM USER_TABLES WHERE TABLE_NAME = :table_name")
+        return None
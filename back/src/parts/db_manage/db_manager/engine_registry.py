@@ -0,0 +1,202 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Additional Notice:
+# When modifying, redistributing, or creating derivative works of this software,
+# you must retain the original LazyCraft logo and the GitHub link icon that directs
+# to the official repository: https://github.com/LazyAGI/LazyLLM
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import MetaData, Table, create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from configs import lazy_config
+from utils.util_redis import redis_client
+
+# 两次空闲引擎清理之间的最短间隔（秒）
+SWEEP_INTERVAL = 30
+
+
+def build_url(endpoint: str, db_name: Optional[str]) -> str:
+    return f"{endpoint}{db_name}" if db_name else endpoint
+
+
+def _metadata_version_key(url: str) -> str:
+    # 连接地址中含有账号密码，只使用其哈希作为键
+    return f"db_metadata_version:{hashlib.sha256(url.encode('utf-8')).hexdigest()}"
+
+
+class EngineRegistry:
+    """用户数据库的进程级引擎注册表。
+
+    按连接地址复用 SQLAlchemy 引擎，每个引擎的连接池大小有上限
+    （``DB_ENGINE_POOL_SIZE`` + ``DB_ENGINE_MAX_OVERFLOW``），借出连接前先探测可用性，
+    超过 ``DB_ENGINE_POOL_RECYCLE`` 秒的连接会重建。超过 ``DB_ENGINE_IDLE_TIMEOUT`` 秒
+    未使用、且没有借出连接的引擎在后续获取时被释放；引擎数超过 ``DB_ENGINE_MAX_ENGINES``
+    时优先释放最久未使用的空闲引擎。
+
+    同时缓存反射得到的表定义，表结构变更后由调用方按数据库失效：失效时递增 Redis 中
+    该数据库的版本号，各进程读取表定义时比对版本号，因此其他进程中的缓存同样失效；
+    另有 ``DB_METADATA_CACHE_TTL`` 兜底，覆盖平台之外的结构修改和 Redis 不可用的情况。
+
+    fork 出的子进程不会复用父进程的连接：注册表按进程号区分，检测到进程变化时丢弃旧引擎。
+    """
+
+    def __init__(self):
+        self._engines: "OrderedDict[str, tuple[Engine, float]]" = OrderedDict()
+        self._tables: dict[tuple[str, str], tuple[Table, float, Optional[int]]] = {}
+        self._lock = threading.RLock()
+        self._pid = os.getpid()
+        self._last_sweep = time.monotonic()
+
+    def _check_fork(self) -> None:
+        if self._pid == os.getpid():
+            return
+        # 子进程中不能关闭父进程的连接，只丢弃引用
+        for engine, _ in self._engines.values():
+            engine.dispose(close=False)
+        self._engines.clear()
+        self._tables.clear()
+        self._pid = os.getpid()
+
+    @staticmethod
+    def _create(url: str) -> Engine:
+        kwargs = dict(
+            poolclass=QueuePool,
+            pool_size=lazy_config.DB_ENGINE_POOL_SIZE,
+            max_overflow=lazy_config.DB_ENGINE_MAX_OVERFLOW,
+            pool_timeout=lazy_config.DB_ENGINE_POOL_TIMEOUT,
+            pool_recycle=lazy_config.DB_ENGINE_POOL_RECYCLE,
+            pool_pre_ping=True,
+        )
+        if url.lower().startswith("dm"):
+            # 达梦需要特定的驱动，例如 'dm' 或 'pydm'
+            kwargs["connect_args"] = {"charset": "utf8"}
+        return create_engine(url, **kwargs)
+
+    def get(self, endpoint: str, db_name: Optional[str] = None) -> Engine:
+        """获取连接到指定数据库的共享引擎，调用方不应 dispose 返回的引擎"""
+        url = build_url(endpoint, db_name)
+        now = time.monotonic()
+        with self._lock:
+            self._check_fork()
+            entry = self._engines.get(url)
+            if entry is None:
+                engine = self._create(url)
+            else:
+                engine = entry[0]
+            self._engines[url] = (engine, now)
+            self._engines.move_to_end(url)
+            if (
+                now - self._last_sweep >= SWEEP_INTERVAL
+                or len(self._engines) > lazy_config.DB_ENGINE_MAX_ENGINES
+            ):
+                self._sweep(now, keep=url)
+        return engine
+
+    def _sweep(self, now: float, keep: str) -> None:
+        self._last_sweep = now
+        over = len(self._engines) - lazy_config.DB_ENGINE_MAX_ENGINES
+        for url, (engine, last_used) in list(self._engines.items()):
+            if url == keep or engine.pool.checkedout():
+                continue
+            if over > 0 or now - last_used > lazy_config.DB_ENGINE_IDLE_TIMEOUT:
+                self._drop(url)
+                over -= 1
+
+    def _drop(self, url: str) -> None:
+        engine, _ = self._engines.pop(url)
+        for key in [key for key in self._tables if key[0] == url]:
+            del self._tables[key]
+        try:
+            engine.dispose()
+        except Exception as e:
+            logging.warning(f"释放数据库引擎失败: {e}")
+
+    def dispose(self, endpoint: str, db_name: Optional[str] = None) -> None:
+        """关闭指定数据库的连接池，删除或重命名数据库前调用"""
+        url = build_url(endpoint, db_name)
+        with self._lock:
+            self._check_fork()
+            if url in self._engines:
+                self._drop(url)
+
+    @staticmethod
+    def _metadata_version(url: str) -> Optional[int]:
+        try:
+            value = redis_client.get(_metadata_version_key(url))
+            return int(value) if value is not None else 0
+        except Exception as e:
+            logging.warning(f"读取表结构版本失败: {e}")
+            return None
+
+    def reflect_table(self, endpoint: str, db_name: str, table_name: str) -> Table:
+        """获取反射得到的表定义，命中缓存且版本号未变化时不再查询数据库结构"""
+        url = build_url(endpoint, db_name)
+        key = (url, table_name)
+        version = self._metadata_version(url)
+        now = time.monotonic()
+        with self._lock:
+            self._check_fork()
+            entry = self._tables.get(key)
+        if (
+            entry is not None
+            and entry[2] == version
+            and now - entry[1] < lazy_config.DB_METADATA_CACHE_TTL
+        ):
+            return entry[0]
+
+        table = Table(table_name, MetaData(), autoload_with=self.get(endpoint, db_name))
+        with self._lock:
+            self._tables[key] = (table, now, version)
+        return table
+
+    def invalidate_metadata(self, endpoint: str, db_name: Optional[str] = None) -> None:
+        """丢弃数据库中所有表的缓存定义，表结构变更后调用，所有进程中的缓存随之失效"""
+        url = build_url(endpoint, db_name)
+        with self._lock:
+            for key in [key for key in self._tables if key[0] == url]:
+                del self._tables[key]
+        try:
+            redis_client.incr(_metadata_version_key(url))
+        except Exception as e:
+            logging.warning(f"更新表结构版本失败: {e}")
+
+    def stats(self) -> dict:
+        """引擎数量与连接池中的连接数"""
+        with self._lock:
+            engines = [engine for engine, _ in self._engines.values()]
+        return {
+            "engines": len(engines),
+            "checked_out": sum(engine.pool.checkedout() for engine in engines),
+            "checked_in": sum(engine.pool.checkedin() for engine in engines),
+            "tables": len(self._tables),
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            for url in list(self._engines):
+                self._drop(url)
+            self._tables.clear()
+
+
+engine_registry = EngineRegistry()
@@ -0,0 +1,175 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Additional Notice:
+# When modifying, redistributing, or creating derivative works of this software,
+# you must retain the original LazyCraft logo and the GitHub link icon that directs
+# to the official repository: https://github.com/LazyAGI/LazyLLM
+
+
+import base64
+import binascii
+import json
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from sqlalchemy import and_, or_
+
+# 数据库驱动按列类型返回的、可直接输出给前端的值类型
+PASSTHROUGH_TYPES = (str, int, float, bool, list, dict)
+
+
+def convert_value(v):
+    """将任意单元格值转换为可JSON序列化的值，未知类型的列逐值使用"""
+    if isinstance(v, datetime):
+        return v.strftime("%Y-%m-%d %H:%M:%S")  # 日期时间格式化
+    elif isinstance(v, Decimal):
+        return float(v)  # Decimal 转为 float
+    elif isinstance(v, bytes):
+        return v.decode("utf-8", errors="replace")  # bytes 转为字符串
+    elif isinstance(v, uuid.UUID):
+        return str(v)  # UUID 转为字符串
+    elif v is None or isinstance(v, PASSTHROUGH_TYPES):
+        return v
+    return str(v)  # 默认转为字符串
+
+
+def convert_tinyint(v):
+    # 判断是否为boolean类型（前端定义）。tinyint默认为为boolean.
+    return True if v in (1, "1", True) else False if v in (0, "0", False) else v
+
+
+def _typed(expected, convert):
+    # 值为列声明的类型时直接转换，否则退回通用转换
+    return lambda v: convert(v) if isinstance(v, expected) else convert_value(v)
+
+
+def column_converter(column):
+    """根据列类型选择转换函数，可直接输出的类型返回None"""
+    if str(column.type).upper() == "TINYINT":
+        return convert_tinyint
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return convert_value
+    if python_type in (str, int, float, bool):
+        return None
+    if python_type is datetime:
+        return _typed(datetime, lambda v: v.strftime("%Y-%m-%d %H:%M:%S"))
+    if python_type is Decimal:
+        return _typed(Decimal, float)
+    return convert_value
+
+
+def build_row_converter(columns):
+    """为表的列预先编译行转换函数。
+
+    每列的转换函数只在编译时按类型选择一次，转换时不再逐个单元格判断类型，
+    可直接输出的列不做任何处理。
+
+    Args:
+        columns: 查询结果的列（与结果行的顺序一致）
+
+    Returns:
+        Callable: 将结果行列表转换为字典列表的函数
+    """
+    names = [column.name for column in columns]
+    converters = [
+        (index, converter)
+        for index, converter in enumerate(map(column_converter, columns))
+        if converter is not None
+    ]
+
+    def convert_rows(rows):
+        result = []
+        for row in rows:
+            values = list(row)
+            for index, converter in converters:
+                values[index] = converter(values[index])
+            result.append(dict(zip(names, values)))
+        return result
+
+    return convert_rows
+
+
+def _dump_key_value(v):
+    if isinstance(v, (datetime, date, time)):
+        return v.isoformat()
+    if isinstance(v, (Decimal, uuid.UUID)):
+        return str(v)
+    return v
+
+
+def _load_key_value(column, v):
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return v
+    if v is None or isinstance(v, python_type):
+        return v
+    if python_type in (datetime, date, time):
+        return python_type.fromisoformat(v)
+    if python_type in (Decimal, uuid.UUID, int, float):
+        return python_type(v)
+    return v
+
+
+def encode_cursor(state: dict) -> str:
+    """将翻页状态编码为不透明的游标字符串"""
+    payload = json.dumps(state, separators=(",", ":"), default=_dump_key_value)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """解析游标字符串
+
+    Raises:
+        ValueError: 游标格式无效
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        state = json.loads(payload)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("无效的游标")
+    if not isinstance(state, dict):
+        raise ValueError("无效的游标")
+    return state
+
+
+def load_key(columns, values):
+    """将游标中的主键值还原为列类型对应的Python值
+
+    Raises:
+        ValueError: 游标中的主键与表的主键不匹配
+    """
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError("无效的游标")
+    try:
+        return [_load_key_value(column, v) for column, v in zip(columns, values)]
+    except (TypeError, ValueError, ArithmeticError):
+        raise ValueError("无效的游标")
+
+
+def keyset_condition(columns, values):
+    """生成"主键大于上一页最后一行"的过滤条件。
+
+    联合主键展开为 (a > x) OR (a = x AND b > y) 的形式，
+    各数据库都能使用主键索引，不依赖行值比较语法。
+    """
+    clauses = []
+    for i, column in enumerate(columns):
+        equals = [columns[j] == values[j] for j in range(i)]
+        clauses.append(and_(*equals, column > values[i]))
+    return or_(*clauses)
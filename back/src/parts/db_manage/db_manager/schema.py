@@ -17,18 +17,21 @@
 # you must retain the original LazyCraft logo and the GitHub link icon that directs
 # to the official repository: https://github.com/LazyAGI/LazyLLM
 
+import functools
 import re
 import traceback
-import uuid
-from datetime import datetime
-from decimal import Decimal
 from typing import Any
 
-from sqlalchemy import MetaData, Table, create_engine, func, select, text
+from sqlalchemy import func, select, text
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.inspection import inspect
 
+from configs import lazy_config
+
 from .dialect import DialectAdapter
+from .engine_registry import engine_registry
+from .row_browser import (build_row_converter, decode_cursor, encode_cursor,
+                          keyset_condition, load_key)
 from .utils import (build_foreign_key_sql, determine_operation,
                     group_unique_list, parse_column_default_val,
                     union_of_dict_lists, unique_check)
@@ -57,6 +60,19 @@ def mysql_bool_to_int(val):
     return val
 
 
+def invalidates_metadata(func_):
+    """表结构变更后（无论成功与否）丢弃该数据库缓存的表定义"""
+
+    @functools.wraps(func_)
+    def wrapper(self, db_name, *args, **kwargs):
+        try:
+            return func_(self, db_name, *args, **kwargs)
+        finally:
+            engine_registry.invalidate_metadata(self.config["endpoint"], db_name)
+
+    return wrapper
+
+
 class DbManager:
 
     def __init__(self, config):
@@ -70,21 +86,16 @@ class DbManager:
     def get_engine(self, db_name: str = None) -> "Engine":
         """获取数据库引擎。
 
-        根据配置创建数据库引擎连接，支持MySQL、PostgreSQL、TiDB、达梦等数据库。
+        从进程级注册表获取共享的数据库引擎，同一数据库的操作复用同一个连接池，
+        支持MySQL、PostgreSQL、TiDB、达梦等数据库。
 
         Args:
             db_name (str, optional): 数据库名称，如果为None则连接到默认数据库
 
         Returns:
-            Engine: SQLAlchemy数据库引擎对象
+            Engine: SQLAlchemy数据库引擎对象，由注册表管理，调用方无需释放
         """
-        endpoint = self.config["endpoint"]
-        if endpoint.lower().startswith("dm"):  # 假设达梦的连接字符串包含 "dm"
-            url = f"{endpoint}{db_name}" if db_name else endpoint
-            # 达梦需要特定的驱动，例如 'dm' 或 'pydm'
-            return create_engine(url, connect_args={"charset": "utf8"})
-        url = f"{endpoint}{db_name}" if db_name else endpoint
-        return create_engine(url)
+        return engine_registry.get(self.config["endpoint"], db_name)
 
     def create_database(self, db_name: str, comment: str) -> (bool, str):
         """创建数据库并添加注释。
@@ -154,6 +165,8 @@ class DbManager:
             )
 
         engine = self.get_engine("")
+        # 关闭本进程连接到该数据库的连接池
+        engine_registry.dispose(self.config["endpoint"], db_name)
         try:
             with engine.connect() as conn:
                 conn.execution_options(isolation_level="AUTOCOMMIT")
@@ -161,6 +174,8 @@ class DbManager:
                     # 根据数据库类型使用不同的重命名语法
                     dialect = engine.dialect.name.lower()
                     if dialect == "postgresql":
+                        # 其他 worker 进程的连接池仍持有该数据库的连接，重命名前需终止这些会话
+                        self._terminate_sessions(conn, db_name)
                         # PostgreSQL 支持使用 ALTER DATABASE ... RENAME TO 语法重命名数据库
                         conn.execute(
                             text(f"ALTER DATABASE {db_name} RENAME TO {new_db_name}")
@@ -206,6 +221,7 @@ class DbManager:
         if not db_name:
             return False, "Database id cannot be empty."
         engine = self.get_engine("")
+        engine_registry.dispose(self.config["endpoint"], db_name)
         try:
             with engine.connect() as conn:
                 conn.execution_options(isolation_level="AUTOCOMMIT")
@@ -214,12 +230,7 @@ class DbManager:
                 dialect = engine.dialect.name.lower()
                 if dialect == "postgresql":
                     # PostgreSQL 需要先终止连接到该数据库的会话
-                    conn.execute(
-                        text(
-                            """SELECT pg_terminate_backend(pid) FROM pg_stat_activity WHERE datname = :database_name AND pid <> pg_backend_pid()"""
-                        ),
-                        {"database_name": db_name},
-                    )
+                    self._terminate_sessions(conn, db_name)
 
                 conn.execute(text(f"DROP DATABASE IF EXISTS {db_name}"))
             return True, f"Database '{db_name}' deleted successfully."
@@ -227,6 +238,24 @@ class DbManager:
             traceback.print_exc()
             return False, f"Error deleting database: {str(e)}"
 
+    @staticmethod
+    def _terminate_sessions(conn, db_name: str) -> None:
+        """终止 PostgreSQL 中其他连接到指定数据库的会话。
+
+        各 worker 进程的连接池在空闲超时前一直持有连接，只关闭本进程的连接池不足以
+        让重命名或删除数据库成功。被终止的连接在其所在进程下次借出时由预探测发现并重建。
+
+        Args:
+            conn: 使用 AUTOCOMMIT 的连接
+            db_name (str): 数据库名称
+        """
+        conn.execute(
+            text(
+                """SELECT pg_terminate_backend(pid) FROM pg_stat_activity WHERE datname = :database_name AND pid <> pg_backend_pid()"""
+            ),
+            {"database_name": db_name},
+        )
+
     def get_all_databases(self) -> (bool, Any):
         """获取数据库服务器中的所有数据库列表。
 
@@ -346,6 +375,7 @@ class DbManager:
             if col.get("is_primary_key") and col.get("type", "").lower() in ["text"]:
                 raise Exception(f"主键字段 '{col['name']}' 不能是 {col['type']} 类型")
 
+    @invalidates_metadata
     def create_table_structure(
         self, db_name: str, table_name: str, comment: str, columns: list[dict]
     ) -> (bool, Any):
@@ -501,6 +531,7 @@ class DbManager:
             traceback.print_exc()
             return False, str(e)
 
+    @invalidates_metadata
     def edit_table_structure(
         self, db_name: str, old_table_name: str, table_name: str, columns: list[dict]
     ) -> (bool, Any):
@@ -780,6 +811,7 @@ class DbManager:
             traceback.print_exc()
             return False, f"更新表 {old_table_name} 失败 {str(e)}"
 
+    @invalidates_metadata
     def delete_table(self, db_name: str, table_name: str) -> (bool, Any):
         """删除指定的数据表。
 
@@ -1328,6 +1360,8 @@ class DbManager:
     def build_table_def(self, db_name, table_name):
         """构建SQLAlchemy表定义对象。
 
+        表定义由引擎注册表缓存，表结构变更后失效。
+
         Args:
             db_name (str): 数据库名称
             table_name (str): 表名称
@@ -1335,10 +1369,9 @@ class DbManager:
         Returns:
             Table: SQLAlchemy表对象
         """
-        engine = self.get_engine(db_name)
-        metadata = MetaData()
-        users_table = Table(table_name, metadata, autoload_with=engine)
-        return users_table
+        return engine_registry.reflect_table(
+            self.config["endpoint"], db_name, table_name
+        )
 
     def select_table_data(self, db_name, table_name, page, limit):
         """分页查询表数据。
@@ -1356,10 +1389,7 @@ class DbManager:
         """
         engine = self.get_engine(db_name)
         table = self.build_table_def(db_name, table_name=table_name)
-        # 获取字段类型映射
-        inspector = inspect(engine)
-        columns_info = inspector.get_columns(table_name)
-        type_map = {col["name"]: str(col["type"]).upper() for col in columns_info}
+        convert_rows = build_row_converter(table.columns)
         with engine.connect() as conn:
             total_query = select(func.count()).select_from(table)
             total = conn.execute(total_query).scalar()
@@ -1371,32 +1401,8 @@ class DbManager:
 
             # 构建分页查询
             paginated_query = select(table).offset(offset).limit(limit)
-            result = conn.execute(paginated_query).mappings().fetchall()
-
-            # 将结果转换为字典列表
-            rows = [dict(row) for row in result]
-            for row in rows:
-                for k, v in row.items():
-                    if type_map.get(k) == "TINYINT":
-                        # 判断是否为boolean类型（前端定义）。tinyint默认为为boolean.
-                        row[k] = (
-                            True
-                            if v in (1, "1", True)
-                            else False if v in (0, "0", False) else v
-                        )
-                    elif isinstance(v, datetime):
-                        row[k] = v.strftime("%Y-%m-%d %H:%M:%S")  # 日期时间格式化
-                    elif isinstance(v, Decimal):
-                        row[k] = float(v)  # Decimal 转为 float
-                    elif isinstance(v, bytes):
-                        row[k] = v.decode("utf-8", errors="replace")  # bytes 转为字符串
-                    elif isinstance(v, uuid.UUID):
-                        row[k] = str(v)  # UUID 转为字符串
-                    elif v is None:
-                        row[k] = None  # 显式处理 None
-                        # 可扩展其他类型，例如自定义对象
-                    elif not isinstance(v, (str, int, float, bool, list, dict)):
-                        row[k] = str(v)  # 默认转为字符串
+            # 将结果转换为字典列表，各列的转换函数已按类型预先选好
+            rows = convert_rows(conn.execute(paginated_query).fetchall())
             # 计算总页数
             total_pages = (total + limit - 1) // limit if total > 0 else 1
 
@@ -1410,6 +1416,111 @@ class DbManager:
             }
             return pagination
 
+    def browse_table_data(
+        self, db_name, table_name, limit, cursor=None, count_mode="auto"
+    ):
+        """按主键游标分页浏览表数据。
+
+        有主键的表按主键排序，用"主键大于上一页最后一行"定位下一页，
+        翻到深页也只读取当前页的数据；没有主键的表退化为偏移分页。
+        大表的总行数可使用数据库统计信息中的估算值，避免每页执行 COUNT(*)。
+
+        Args:
+            db_name (str): 数据库名称
+            table_name (str): 表名称
+            limit (int): 每页数量
+            cursor (str, optional): 上一页返回的next_cursor，为空时从第一行开始
+            count_mode (str): 总行数统计方式，exact为精确计数，estimate优先使用估算值，
+                auto在估算值超过DB_TABLE_EXACT_COUNT_THRESHOLD时使用估算值
+
+        Returns:
+            dict: 包含data、total、total_is_estimate、per_page、next_cursor、has_more字段
+
+        Raises:
+            ValueError: 游标无效
+        """
+        engine = self.get_engine(db_name)
+        table = self.build_table_def(db_name, table_name=table_name)
+        convert_rows = build_row_converter(table.columns)
+        state = decode_cursor(cursor) if cursor else {}
+        primary_key = list(table.primary_key.columns)
+
+        query = select(table)
+        if primary_key:
+            if "after" in state:
+                after = load_key(primary_key, state["after"])
+                query = query.where(keyset_condition(primary_key, after))
+            query = query.order_by(*primary_key)
+        else:
+            offset = state.get("offset", 0)
+            if not isinstance(offset, int) or offset < 0:
+                raise ValueError("无效的游标")
+            query = query.offset(offset)
+        # 多取一行用于判断是否还有下一页
+        query = query.limit(limit + 1)
+
+        with engine.connect() as conn:
+            result = conn.execute(query).fetchall()
+            total, estimated = self.count_table_rows(conn, table, count_mode)
+
+        has_more = len(result) > limit
+        result = result[:limit]
+        next_cursor = None
+        if has_more and primary_key:
+            last = result[-1]._mapping
+            next_cursor = encode_cursor({"after": [last[column] for column in primary_key]})
+        elif has_more:
+            next_cursor = encode_cursor({"offset": offset + limit})
+
+        return {
+            "data": convert_rows(result),
+            "total": total,
+            "total_is_estimate": estimated,
+            "per_page": limit,
+            "next_cursor": next_cursor,
+            "has_more": has_more,
+        }
+
+    def count_table_rows(self, conn, table, count_mode="auto"):
+        """统计表的行数，可使用数据库统计信息中的估算值。
+
+        Args:
+            conn (Connection): 数据库连接
+            table (Table): 表定义
+            count_mode (str): exact、estimate或auto，含义见browse_table_data
+
+        Returns:
+            tuple: (行数, 是否为估算值)
+        """
+        if count_mode != "exact":
+            estimate = self.estimate_table_rows(conn, table.name)
+            if estimate is not None and (
+                count_mode == "estimate"
+                or estimate >= lazy_config.DB_TABLE_EXACT_COUNT_THRESHOLD
+            ):
+                return estimate, True
+        return conn.execute(select(func.count()).select_from(table)).scalar(), False
+
+    def estimate_table_rows(self, conn, table_name):
+        """从数据库统计信息中读取表的估算行数。
+
+        Returns:
+            int | None: 估算行数，方言不支持或统计信息缺失时返回None
+        """
+        query = DialectAdapter(conn.engine).estimated_row_count_sql()
+        if query is None:
+            return None
+        try:
+            estimate = conn.execute(query, {"table_name": table_name}).scalar()
+        except SQLAlchemyError as e:
+            print(f"Error querying estimated row count: {e}")
+            conn.rollback()
+            return None
+        # PostgreSQL 未收集过统计信息的表 reltuples 为 -1
+        if estimate is None or estimate < 0:
+            return None
+        return int(estimate)
+
     def get_table_row_count(self, db_name: str, table_name: str) -> int:
         """获取表的行数统计。
 
@@ -20,6 +20,8 @@
 import ast
 import decimal
 import hashlib
+import json
+import logging
 import re
 import traceback
 from datetime import datetime
@@ -30,10 +32,15 @@ from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from configs import lazy_config
 from models.model_account import Account, Tenant
 from utils.util_database import db
+from utils.util_redis import redis_client
 
 from .db_manager import DbManager
+from .db_manager.bulk_import import (BulkImporter, iter_record_chunks,
+                                     iter_upload_chunks)
 from .model import DataBaseInfo, TableInfo
 
+IMPORT_PROGRESS_TTL = 24 * 3600
+
 
 def _generate_unique_name(tenant_id: str, database_name: str) -> str:
     """
@@ -557,6 +564,35 @@ class DBManageService:
         )
         return res
 
+    def browse_data(self, database_id, table_id, limit, cursor=None):
+        """按主键游标浏览表数据。
+
+        适用于大表：翻页耗时不随页码增长，总行数可能为估算值。
+
+        Args:
+            database_id (int): 数据库ID
+            table_id (int): 表ID
+            limit (int): 每页数量
+            cursor (str, optional): 上一页返回的next_cursor
+
+        Returns:
+            dict: 包含游标分页数据和表结构信息的字典
+        """
+        database_info = db.session.get(DataBaseInfo, database_id)
+        table_info = db.session.get(TableInfo, table_id)
+        manager = DbManager(self.build_config(database_info))
+
+        res = manager.browse_table_data(
+            db_name=database_info.database_name,
+            table_name=table_info.name,
+            limit=limit,
+            cursor=cursor,
+        )
+        res["columns"] = manager.get_table_structure(
+            db_name=database_info.database_name, table_name=table_info.name
+        )
+        return res
+
     def update_data(self, database_id, table_id, add_items, update_items, delete_items):
         """批量更新表数据。
 
@@ -833,7 +869,7 @@ class DBManageService:
     def import_data(self, database_id, table_id, data):
         """执行数据导入操作。
 
-        将外部数据批量导入到指定的表中。
+        将预览后提交的数据按块校验并批量导入到指定的表中。
 
         Args:
             database_id (int): 数据库ID
@@ -843,40 +879,80 @@ class DBManageService:
         Returns:
             tuple: (是否成功, 错误行列表, 异常信息)
         """
+        chunks = iter_record_chunks(data, lazy_config.DB_IMPORT_CHUNK_SIZE)
+        return self._import_chunks(database_id, table_id, chunks)
+
+    def import_file(self, database_id, table_id, file):
+        """直接从上传的文件流式导入数据。
+
+        按块读取CSV或Excel文件，适用于预览无法承载的大文件。
+
+        Args:
+            database_id (int): 数据库ID
+            table_id (int): 表ID
+            file (FileStorage): 上传的CSV或Excel文件
+
+        Returns:
+            tuple: (是否成功, 错误行列表, 异常信息)
+        """
+        chunks = iter_upload_chunks(file, lazy_config.DB_IMPORT_CHUNK_SIZE)
+        return self._import_chunks(database_id, table_id, chunks)
+
+    def _import_chunks(self, database_id, table_id, chunks):
+        """校验并批量写入数据块。
+
+        类型不符或被数据库拒绝的行记录到错误列表中，不影响其他行的导入；
+        每批写入后更新导入进度。
+        """
         database_info = db.session.get(DataBaseInfo, database_id)
         table_info = db.session.get(TableInfo, table_id)
-        config = self.build_config(database_info)
-        manager = DbManager(config)
+        manager = DbManager(self.build_config(database_info))
+        importer = BulkImporter(
+            manager.get_engine(database_info.database_name),
+            manager.build_table_def(database_info.database_name, table_info.name),
+            batch_size=lazy_config.DB_IMPORT_BATCH_SIZE,
+            max_errors=lazy_config.DB_IMPORT_MAX_ERROR_ROWS,
+            on_progress=lambda progress: self._save_import_progress(table_id, progress),
+        )
+        try:
+            progress = importer.run(chunks)
+        except Exception as e:
+            traceback.print_exc()
+            self._save_import_progress(table_id, importer.progress, status="failed")
+            return False, importer.progress.errors, str(e)
+        self._save_import_progress(table_id, progress, status="completed")
+        if progress.failed:
+            return False, progress.errors, f"{progress.failed}行数据导入失败"
+        # 全部成功
+        return True, None, None
+
+    def _save_import_progress(self, table_id, progress, status="running"):
+        """记录导入进度，供前端轮询"""
+        try:
+            redis_client.setex(
+                f"db_import_progress:{table_id}",
+                IMPORT_PROGRESS_TTL,
+                json.dumps({"status": status, **progress.to_dict()}),
+            )
+        except Exception as e:
+            logging.warning(f"保存导入进度失败, table_id: {table_id}, 错误: {e}")
 
-        error_rows = []
-        engine = manager.get_engine(database_info.database_name)
+    def get_import_progress(self, table_id):
+        """获取表最近一次数据导入的进度。
 
-        table_structure_res = self.get_table_structure(database_info.id, table_info.id)
-        table_columns = []
-        if table_structure_res:
-            table_columns = [c["name"] for c in table_structure_res["columns"]]
+        Args:
+            table_id (int): 表ID
+
+        Returns:
+            dict: 包括status、processed、inserted、failed、rows_per_second等；
+                  没有记录时返回None。
+        """
         try:
-            with engine.begin() as connection:
-                for index, row in enumerate(data):
-                    try:
-                        excel_columns = [k for k, v in row.items()]
-                        sql, data = manager.build_insert_data(
-                            table_info.name, table_columns, excel_columns, row.to_dict()
-                        )
-                        connection.execute(text(sql), data)
-                    except Exception as e:
-                        # 记录错误行信息
-                        error_info = {
-                            "row": index + 1,  # 加2因为有标题行和从1开始计数
-                            "error": str(e),
-                            "data": row.to_dict(),
-                        }
-                        error_rows.append(error_info)
-                        raise Exception("导入数据出错")
-            # 全部成功
-            return True, None, None
+            progress = redis_client.get(f"db_import_progress:{table_id}")
+            return json.loads(progress) if progress else None
         except Exception as e:
-            return False, error_rows, str(e)
+            logging.warning(f"获取导入进度失败, table_id: {table_id}, 错误: {e}")
+            return None
 
     @staticmethod
     def get_model_columns_info(model_class):
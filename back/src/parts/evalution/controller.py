@@ -460,6 +460,11 @@ class CreateTask(Resource):
                         return build_response(
                             message=f"prompt中缺少 {substring}", status=400
                         )
+            concurrency = data.get("concurrency")
+            if concurrency is not None and (
+                not isinstance(concurrency, int) or concurrency < 1
+            ):
+                return build_response(message="并发数必须为正整数", status=400)
             if (
                 data.get("ai_evaluator_name", "")
                 and data["model_name"] == data["ai_evaluator_name"]
@@ -676,6 +681,7 @@ class TaskInfo(Resource):
             "ai_eva_fail": task.ai_eva_fail,
             "ai_evaluator_name": task.ai_evaluator_name,
             "process": task.process,
+            "throughput": Service().get_task_progress(task.id),
         }
 
         # 返回结果
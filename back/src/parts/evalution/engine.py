@@ -0,0 +1,234 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Additional Notice:
+# When modifying, redistributing, or creating derivative works of this software,
+# you must retain the original LazyCraft logo and the GitHub link icon that directs
+# to the official repository: https://github.com/LazyAGI/LazyLLM
+
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import Callable, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import lazyllm
+
+from configs import lazy_config
+
+
+@dataclass
+class EvaluationResult:
+    """单条数据的推理结果"""
+
+    key: Any
+    success: bool
+    output: Optional[str] = None
+    error: Optional[str] = None
+    tokens: int = 0
+
+
+@dataclass
+class _InFlight:
+    key: Any
+    prompt: str
+    attempt: int
+    # 工作线程开始调用模型的时间，在共享线程池中排队时为None，排队时间不计入超时
+    started: Optional[float] = None
+
+
+class EvaluationEngine:
+    """评测推理执行引擎。
+
+    所有评测任务共享进程级线程池，每个任务通过 ``concurrency`` 限制同时在途的模型调用数，
+    超时后被放弃但仍在执行的调用同样计入。超时从工作线程开始调用模型时计时。
+    工作线程只负责调用模型，结果回到调用线程后按批交给 ``on_batch`` 落库，
+    因此数据库会话只在调用线程中使用。
+    """
+
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_lock = threading.Lock()
+
+    def __init__(
+        self,
+        llm,
+        concurrency: Optional[int] = None,
+        timeout: float = 60,
+        max_retries: int = 1,
+        max_failures: int = 3,
+        batch_size: Optional[int] = None,
+    ):
+        """初始化执行引擎。
+
+        Args:
+            llm: 已启动的模型对象。
+            concurrency (int, optional): 同时在途的模型调用数，不超过共享线程池大小。
+            timeout (float, optional): 单次调用超时时间（秒），默认为60。
+            max_retries (int, optional): 失败或超时后的最大重试次数，默认为1。
+            max_failures (int, optional): 失败条数超过该值后不再提交新数据，默认为3。
+            batch_size (int, optional): 每批交给 on_batch 的结果条数。
+        """
+        self._llm = llm
+        concurrency = concurrency or lazy_config.EVALUATION_CONCURRENCY
+        self.concurrency = max(1, min(concurrency, lazy_config.EVALUATION_WORKER_POOL_SIZE))
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_failures = max_failures
+        self.batch_size = batch_size or lazy_config.EVALUATION_COMMIT_BATCH_SIZE
+        self._stats = {"done": 0, "succeeded": 0, "failed": 0, "tokens": 0}
+        self._started_at = None
+
+    @classmethod
+    def _pool(cls) -> ThreadPoolExecutor:
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=lazy_config.EVALUATION_WORKER_POOL_SIZE,
+                    thread_name_prefix="evaluation",
+                )
+            return cls._executor
+
+    def _call(self, call: _InFlight) -> tuple[str, int]:
+        call.started = time.monotonic()
+        return self._forward(call.prompt)
+
+    def _wait_timeout(self, calls: Iterable[_InFlight]) -> Optional[float]:
+        """距最近一个在途调用超时的时间，尚未开始的调用至少还有完整的超时时间"""
+        now = time.monotonic()
+        remaining = [
+            self.timeout if call.started is None else call.started + self.timeout - now
+            for call in calls
+        ]
+        return max(0.0, min(remaining)) if remaining else None
+
+    def _forward(self, prompt: str) -> tuple[str, int]:
+        # 每次调用使用独立的 lazyllm 会话，token 用量互不干扰
+        lazyllm.globals._init_sid(f"evaluation-{uuid.uuid4().hex}")
+        try:
+            output = self._llm.forward(prompt)
+            tokens = sum(
+                usage.get("prompt_tokens", 0) + usage.get("completion_tokens", 0)
+                for usage in lazyllm.globals.usage.values()
+            )
+            return output, tokens
+        finally:
+            lazyllm.globals.clear()
+
+    def progress(self) -> dict:
+        """当前进度与吞吐量"""
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0
+        progress = dict(self._stats)
+        progress["elapsed"] = round(elapsed, 3)
+        progress["rows_per_second"] = round(progress["done"] / elapsed, 3) if elapsed else 0
+        progress["tokens_per_second"] = (
+            round(progress["tokens"] / elapsed, 3) if elapsed else 0
+        )
+        return progress
+
+    def _record(self, result: EvaluationResult) -> None:
+        self._stats["done"] += 1
+        self._stats["succeeded" if result.success else "failed"] += 1
+        self._stats["tokens"] += result.tokens
+
+    def run(
+        self,
+        items: Iterable[tuple[Any, str]],
+        on_batch: Callable[[list[EvaluationResult], dict], None],
+    ) -> dict:
+        """并发执行推理，按批回调结果。
+
+        Args:
+            items (Iterable): (key, prompt) 序列，在调用线程中按需读取。
+            on_batch (Callable): 批量结果回调，参数为结果列表和当前进度。
+
+        Returns:
+            dict: 最终进度与吞吐量。
+        """
+        pool = self._pool()
+        pending = iter(items)
+        next_item = next(pending, None)
+        in_flight: dict[Future, _InFlight] = {}
+        # 超时后不再等待、但仍占用工作线程的调用
+        abandoned: set[Future] = set()
+        retries: deque[_InFlight] = deque()
+        batch: list[EvaluationResult] = []
+        stopped = False
+        self._started_at = time.monotonic()
+
+        def submit(call: _InFlight):
+            in_flight[pool.submit(self._call, call)] = call
+
+        def finish(call: _InFlight, result: Optional[EvaluationResult], error: str):
+            nonlocal stopped
+            if result is None:
+                if call.attempt < self.max_retries:
+                    logging.warning(
+                        f"评测推理失败，第{call.attempt + 1}次尝试，准备重试: {error}"
+                    )
+                    retries.append(_InFlight(call.key, call.prompt, call.attempt + 1))
+                    return
+                result = EvaluationResult(call.key, False, error=error)
+            self._record(result)
+            batch.append(result)
+            if not result.success and self._stats["failed"] > self.max_failures:
+                stopped = True
+
+        while True:
+            abandoned = {future for future in abandoned if not future.done()}
+            while len(in_flight) + len(abandoned) < self.concurrency:
+                if retries:
+                    submit(retries.popleft())
+                elif not stopped and next_item is not None:
+                    submit(_InFlight(*next_item, 0))
+                    next_item = next(pending, None)
+                else:
+                    break
+            if not in_flight and not retries and (stopped or next_item is None):
+                break
+
+            done, _ = wait(
+                [*in_flight, *abandoned],
+                timeout=self._wait_timeout(in_flight.values()),
+                return_when=FIRST_COMPLETED,
+            )
+            for future in done:
+                call = in_flight.pop(future, None)
+                if call is None:
+                    continue
+                try:
+                    output, tokens = future.result()
+                except Exception as e:
+                    finish(call, None, str(e))
+                else:
+                    finish(call, EvaluationResult(call.key, True, output, tokens=tokens), "")
+
+            now = time.monotonic()
+            for future, call in list(in_flight.items()):
+                if call.started is not None and call.started + self.timeout <= now:
+                    # 超时的调用不再等待，在模型返回前仍计入并发数
+                    del in_flight[future]
+                    abandoned.add(future)
+                    finish(call, None, f"推理超时，超过{self.timeout}秒未返回结果")
+
+            while len(batch) >= self.batch_size:
+                on_batch(batch[: self.batch_size], self.progress())
+                batch = batch[self.batch_size :]
+
+        if batch:
+            on_batch(batch, self.progress())
+        return self.progress()
@@ -49,6 +49,7 @@ class Task(db.Model):
         scene_descrp (str): AI测评场景说明。
         user_id (str): 用户ID。
         tenant_id (str): 租户ID。
+        concurrency (int): 同时在途的模型调用数，为空时使用全局配置。
         created_at (datetime): 创建时间。
     """
 
@@ -72,6 +73,7 @@ class Task(db.Model):
     scene_descrp = db.Column(db.Text)  # AI测评场景说明，仅AI测评有值
     user_id = db.Column(db.String(255), nullable=False)
     tenant_id = db.Column(db.String(40))
+    concurrency = db.Column(db.Integer, nullable=True)
     created_at = db.Column(db.DateTime, default=db.func.now())
 
     # @property
@@ -21,26 +21,31 @@ import json
 import logging
 import os
 import re
-from concurrent.futures import ThreadPoolExecutor, TimeoutError
 
 import pandas as pd
 from flask_login import current_user
-from sqlalchemy import func, or_
+from sqlalchemy import func, insert, or_
 
 import lazyllm
 from lazyllm.engine.engine import setup_deploy_method
 
 from libs.http_exception import CommonError
 from models.model_account import Account
+from parts.cost_audit.model import CostAudit
 from parts.cost_audit.service import CostService
 from parts.data.model import DataSet, DataSetFile, DataSetVersion
 from parts.inferservice.service import InferService
 from parts.logs import Action, LogService, Module
 from utils.util_database import db
+from utils.util_redis import redis_client
 
+from .engine import EvaluationEngine
 from .model import (Dimension, DimensionOption, EvaluationDatasetData,
                     EvaluationDatasetFile, EvaluationScore, Task)
 
+# 评测进度在Redis中的保留时间
+EVALUATION_PROGRESS_TTL = 24 * 3600
+
 
 class Service:
     """评估服务类，提供评估任务的创建、管理和执行功能。
@@ -116,6 +121,7 @@ class Service:
                 - ai_evaluator_type (str, optional): AI评估器类型。
                 - scene (str, optional): 场景。
                 - scene_descrp (str, optional): 场景描述。
+                - concurrency (int, optional): 同时在途的模型调用数，默认使用全局配置。
 
         Returns:
             int: 创建的任务ID。
@@ -130,6 +136,7 @@ class Service:
         ai_evaluator_type = data.get("ai_evaluator_type")
         scene = data.get("scene", "")
         scene_descrp = data.get("scene_descrp", "")
+        concurrency = data.get("concurrency")
         task = Task(
             name=task_name,
             model_name=model_name,
@@ -145,6 +152,7 @@ class Service:
             ai_evaluator_name=ai_evaluator_name,
             ai_evaluator_type=ai_evaluator_type,
             model_type=model_type,
+            concurrency=int(concurrency) if concurrency else None,
         )
 
         # 添加任务基本信息到数据库会话
@@ -668,75 +676,33 @@ class Service:
                 ret.append({"id": dataset.id, "name": dataset.name})
         return ret
 
-    def _llm_forward_with_timeout(self, llm, prompt, timeout_seconds=60, max_retries=1):
-        """带超时的LLM前向传播。
+    def _save_task_progress(self, task_id, stage, progress, total):
+        """记录评测进度与吞吐量，供任务详情展示"""
+        try:
+            redis_client.setex(
+                f"evaluation_progress:{task_id}",
+                EVALUATION_PROGRESS_TTL,
+                json.dumps({"stage": stage, "total": total, **progress}),
+            )
+        except Exception as e:
+            logging.warning(f"保存评测进度失败, task_id: {task_id}, 错误: {e}")
+
+    def get_task_progress(self, task_id):
+        """获取评测任务最近一次推理的进度与吞吐量。
 
         Args:
-            llm: LLM模型对象。
-            prompt (str): 提示词。
-            timeout_seconds (int, optional): 超时时间（秒），默认为60。
-            max_retries (int, optional): 最大重试次数，默认为1。
+            task_id (int): 任务ID。
 
         Returns:
-            str: LLM响应结果。
-
-        Raises:
-            TimeoutError: 当请求超时时抛出异常。
-            Exception: 当其他错误发生时抛出异常。
+            dict: 进度信息，包括阶段、已处理条数、失败条数、rows_per_second、
+                  tokens_per_second等；没有记录时返回None。
         """
-
-        def _forward_worker():
-            """LLM前向传播工作函数。
-
-            Returns:
-                str: LLM响应结果。
-            """
-            try:
-                result = llm.forward(prompt)
-                return (True, result, None)
-            except Exception as e:
-                return (False, None, str(e))
-
-        for attempt in range(max_retries + 1):
-            try:
-                logging.info(
-                    f"LLM推理开始，第{attempt + 1}次尝试，超时时间: {timeout_seconds}秒"
-                )
-                with ThreadPoolExecutor(max_workers=1) as executor:
-                    future = executor.submit(_forward_worker)
-                    result = future.result(timeout=timeout_seconds)
-
-                    if result[0]:  # 成功
-                        logging.info(f"LLM推理成功，第{attempt + 1}次尝试")
-                        return result
-                    else:  # 推理失败但未超时
-                        logging.warning(
-                            f"LLM推理失败，第{attempt + 1}次尝试，错误: {result[2]}"
-                        )
-                        if attempt < max_retries:
-                            logging.info(f"准备进行第{attempt + 2}次重试...")
-                            continue
-                        else:
-                            return result
-
-            except TimeoutError:
-                logging.error(
-                    f"LLM推理超时，第{attempt + 1}次尝试，超时时间: {timeout_seconds}秒"
-                )
-                if attempt < max_retries:
-                    logging.info(f"超时，准备进行第{attempt + 2}次重试...")
-                    continue
-                else:
-                    return (False, None, f"推理超时，超过{timeout_seconds}秒未返回结果")
-            except Exception as e:
-                logging.error(f"LLM推理异常，第{attempt + 1}次尝试: {e}")
-                if attempt < max_retries:
-                    logging.info(f"异常，准备进行第{attempt + 2}次重试...")
-                    continue
-                else:
-                    return (False, None, str(e))
-
-        return (False, None, "所有重试都失败了")
+        try:
+            progress = redis_client.get(f"evaluation_progress:{task_id}")
+            return json.loads(progress) if progress else None
+        except Exception as e:
+            logging.warning(f"获取评测进度失败, task_id: {task_id}, 错误: {e}")
+            return None
 
     def llm_model_start(self, model, task_model_name=None):
         """启动LLM模型。
@@ -884,45 +850,42 @@ class Service:
                 )
             if llm:
                 logging.info(f"start dataset_inference by llm: {task_id}")
-                # 开始对没有response的数据进行推理
-                cnt = 0
-                for d in dataset_data:
-                    if not d.response:
-                        try:
-                            # 使用带超时的推理调用
-                            success, response, error_msg = (
-                                self._llm_forward_with_timeout(
-                                    llm,
-                                    d.instruction,
-                                    timeout_seconds=self.dataset_inference_timeout,
-                                )
-                            )
-
-                            if success:
-                                d.response = response
-                            else:
-                                logging.error(
-                                    f"数据集推理失败，data_id: {d.id}, 错误: {error_msg}"
-                                )
-                                d.response = "模型生成文案失败"
-                                cnt += 1
-                                if cnt > 3:
-                                    break
+                # 已有response的数据不在查询结果中，任务中断后重新执行即从断点继续
+                rows = {d.id: d for d in dataset_data}
+                total = len(dataset_data)
 
-                        except Exception as e:
-                            LogService().add(
-                                Module.MODEL_EVALUATE,
-                                Action.EVALUATE_INFERENCE_FAILED,
-                                user_id=task.user_id,
-                                task_method=task.evaluation_method_name,
-                                task_name=task.name,
-                                result="失败：" + str(e),
+                def save_batch(results, progress):
+                    for result in results:
+                        d = rows[result.key]
+                        if result.success:
+                            d.response = result.output
+                        else:
+                            logging.error(
+                                f"数据集推理失败，data_id: {d.id}, 错误: {result.error}"
                             )
                             d.response = "模型生成文案失败"
-                            cnt += 1
-                            if cnt > 3:
-                                break
-                        db.session.commit()
+                    db.session.commit()
+                    self._save_task_progress(
+                        task_id, "dataset_inference", progress, total
+                    )
+
+                engine = EvaluationEngine(
+                    llm,
+                    concurrency=task.concurrency,
+                    timeout=self.dataset_inference_timeout,
+                )
+                try:
+                    engine.run(((d.id, d.instruction) for d in dataset_data), save_batch)
+                except Exception as e:
+                    db.session.rollback()
+                    LogService().add(
+                        Module.MODEL_EVALUATE,
+                        Action.EVALUATE_INFERENCE_FAILED,
+                        user_id=task.user_id,
+                        task_method=task.evaluation_method_name,
+                        task_name=task.name,
+                        result="失败：" + str(e),
+                    )
 
                 if task.evaluation_method == "ai":
                     task.status = "ai_evaluating"
@@ -1026,86 +989,114 @@ class Service:
                 dimensions = Service().get_evaluation_dimensions(task_id)
                 dimension_ids = [dimension.id for dimension in dimensions]
                 total = len(dataset_data)
-                complete = 0
-                cnt = 0
-                for d in dataset_data:
-                    if not d.response or d.response == "模型生成文案失败":
-                        continue
-                    prompt = self.create_ai_evaluation_prompt(task, d, dimensions)
-                    tokens = 0
-                    logging.info("AI测评prompt:" + prompt)
-                    try:
-                        # 使用带超时的推理调用
-                        success, result_list, error_msg = (
-                            self._llm_forward_with_timeout(
-                                llm, prompt, timeout_seconds=self.ai_evaluation_timeout
-                            )
-                        )
+                # 已打分的数据直接跳过，任务中断后重新执行即从断点继续
+                complete = sum(1 for d in dataset_data if d.is_evaluated)
+                rows = {
+                    d.id: d
+                    for d in dataset_data
+                    if d.response
+                    and d.response != "模型生成文案失败"
+                    and not d.is_evaluated
+                }
 
-                        if success:
-                            logging.info("AI测评结果:" + result_list)
-                            for key, value in lazyllm.globals.usage.items():
-                                tokens += (
-                                    value["prompt_tokens"] + value["completion_tokens"]
-                                )
-                            logging.info(
-                                "获取到评测消耗token:"
-                                + str(tokens)
-                                + ",dataid:"
-                                + str(d.id)
+                def build_prompts():
+                    for d in rows.values():
+                        prompt = self.create_ai_evaluation_prompt(task, d, dimensions)
+                        logging.info("AI测评prompt:" + prompt)
+                        yield d.id, prompt
+
+                def save_batch(results, progress):
+                    nonlocal complete
+                    cost_records = []
+                    scored = {}
+                    for result in results:
+                        if not result.success:
+                            logging.error(
+                                f"AI评测推理失败，data_id: {result.key}, 错误: {result.error}"
+                            )
+                            LogService().add(
+                                Module.MODEL_EVALUATE,
+                                Action.EVALUATE_FAILED,
+                                user_id=task.user_id,
+                                task_method=task.evaluation_method_name,
+                                task_name=task.name,
+                                result="失败:" + result.error,
                             )
-                            CostService.add(
-                                user_id=current_user.id,
+                            continue
+                        logging.info("AI测评结果:" + result.output)
+                        logging.info(
+                            f"获取到评测消耗token:{result.tokens},dataid:{result.key}"
+                        )
+                        cost_records.append(
+                            CostService.build_record(
+                                user_id=task.user_id,
                                 app_id="",
-                                token_num=tokens,
+                                token_num=result.tokens,
                                 call_type="evaluation",
                                 tenant_id=task.tenant_id,
                                 task_id=task.id,
                             )
-                            results = self.check_result(
-                                task, result_list, dimension_ids
-                            )
-                            if not results:
-                                continue
-                            for result in results:
-                                score = result["metric_final_score"]
-                                self.save_evaluation_scores(
-                                    data_id=d.id,
-                                    dimension_id=result["metric_id"],
-                                    score=score,
-                                    task_id=task_id,
-                                )
-                            complete += 1
-                        else:
-                            logging.error(
-                                f"AI评测推理失败，data_id: {d.id}, 错误: {error_msg}"
+                        )
+                        try:
+                            scores = self.check_result(
+                                task, result.output, dimension_ids
                             )
+                        except Exception as e:
                             LogService().add(
                                 Module.MODEL_EVALUATE,
                                 Action.EVALUATE_FAILED,
                                 user_id=task.user_id,
                                 task_method=task.evaluation_method_name,
                                 task_name=task.name,
-                                result="失败:" + error_msg,
+                                result="失败:" + str(e),
+                            )
+                            continue
+                        if scores:
+                            scored[result.key] = scores
+
+                    if scored:
+                        # 覆盖这些数据此前未完成的打分
+                        EvaluationScore.query.filter(
+                            EvaluationScore.task_id == task_id,
+                            EvaluationScore.data_id.in_(list(scored)),
+                        ).delete(synchronize_session=False)
+                        db.session.add_all(
+                            EvaluationScore(
+                                task_id=task_id,
+                                data_id=data_id,
+                                dimension_id=score["metric_id"],
+                                option_select_id=0,
+                                score=score["metric_final_score"],
+                                remark="",
                             )
-                            cnt += 1
-                            if cnt > 3:
-                                break
-                    except Exception as e:
-                        LogService().add(
-                            Module.MODEL_EVALUATE,
-                            Action.EVALUATE_FAILED,
-                            user_id=task.user_id,
-                            task_method=task.evaluation_method_name,
-                            task_name=task.name,
-                            result="失败:" + str(e),
+                            for data_id, scores in scored.items()
+                            for score in scores
                         )
+                        for data_id in scored:
+                            rows[data_id].is_evaluated = True
+                        complete += len(scored)
+                    if cost_records:
+                        db.session.execute(insert(CostAudit), cost_records)
+                    db.session.commit()
+                    self._save_task_progress(task_id, "ai_evaluation", progress, total)
 
-                        print("ai评测推理失败:" + str(e))
-                        db.session.commit()
-                        cnt += 1
-                        if cnt > 3:
-                            break
+                engine = EvaluationEngine(
+                    llm,
+                    concurrency=task.concurrency,
+                    timeout=self.ai_evaluation_timeout,
+                )
+                try:
+                    engine.run(build_prompts(), save_batch)
+                except Exception as e:
+                    db.session.rollback()
+                    LogService().add(
+                        Module.MODEL_EVALUATE,
+                        Action.EVALUATE_FAILED,
+                        user_id=task.user_id,
+                        task_method=task.evaluation_method_name,
+                        task_name=task.name,
+                        result="失败:" + str(e),
+                    )
                 task.status = "ai_evaluated"
                 db.session.commit()
                 if task.completed == task.total:
@@ -401,6 +401,36 @@ class FinetuneLogApi(Resource):
         return Response(service.task_logs(task_id), headers=headers)
 
 
+class FinetuneLogRangeApi(Resource):
+    @login_required
+    def get(self, task_id):
+        """按字节范围获取微调任务日志。
+
+        用于日志的分段查看与持续跟读，不需要下载整个日志文件。
+
+        Args:
+            task_id (int): 微调任务ID
+            offset (int, optional): 起始字节偏移，传入上一次返回的 next_offset 可继续读取
+            limit (int, optional): 最多返回的字节数
+            tail (int, optional): 读取日志末尾的字节数，提供时忽略 offset
+
+        Returns:
+            dict: 包括 content、offset、next_offset 和日志总大小 size
+
+        Raises:
+            PermissionError: 当用户没有读取权限时
+        """
+        self.check_can_read()
+        parser = reqparse.RequestParser()
+        parser.add_argument("offset", type=inputs.natural, location="args", default=0)
+        parser.add_argument("limit", type=inputs.positive, location="args")
+        parser.add_argument("tail", type=inputs.positive, location="args")
+        args = parser.parse_args()
+        return FinetuneService(current_user).task_log_range(
+            task_id, offset=args["offset"], limit=args["limit"], tail=args["tail"]
+        )
+
+
 class FinetuneStartApi(Resource):
     @login_required
     def get(self, task_id):
@@ -574,6 +604,7 @@ api.add_resource(FinetuneModelApi, "/finetune/models")
 api.add_resource(FinetuneDatasetApi, "/finetune/datasets")
 api.add_resource(FinetuneCustomParamApi, "/finetune_param")
 api.add_resource(FinetuneLogApi, "/finetune/log/<int:task_id>")
+api.add_resource(FinetuneLogRangeApi, "/finetune/log/<int:task_id>/range")
 
 api.add_resource(FinetunePauseApi, "/finetune/pause/<int:task_id>")
 api.add_resource(FinetuneResumeApi, "/finetune/resume/<int:task_id>")
@@ -17,6 +17,7 @@
 # you must retain the original LazyCraft logo and the GitHub link icon that directs
 # to the official repository: https://github.com/LazyAGI/LazyLLM
 
+import codecs
 import json
 import logging
 import os
@@ -26,6 +27,7 @@ import requests
 from flask import copy_current_request_context, current_app
 from flask_restful import marshal
 
+from configs import lazy_config
 from core.account_manager import CommonError
 from libs.helper import generate_random_string
 from libs.timetools import TimeTools
@@ -557,6 +559,50 @@ class FinetuneService:
             else:
                 return reader("没有收集到日志")
 
+    def task_log_range(self, task_id, offset=None, limit=None, tail=None):
+        """按字节范围读取微调任务日志，避免一次加载整个日志文件。
+
+        Args:
+            task_id (int): 任务ID。
+            offset (int, optional): 起始字节偏移，配合返回的 next_offset 可持续跟读。
+            limit (int, optional): 最多返回的字节数，不超过 FINETUNE_LOG_RANGE_LIMIT。
+            tail (int, optional): 读取末尾的字节数，从其中第一个完整行开始返回；
+                提供时忽略 offset。
+
+        Returns:
+            dict: 包括 content、offset、next_offset 和日志总大小 size。
+        """
+        task = db.session.query(FinetuneTask).get(task_id)
+        if task is None or not task.log_path:
+            return {"content": "", "offset": 0, "next_offset": 0, "size": 0}
+
+        size = storage.size(task.log_path)
+        max_bytes = lazy_config.FINETUNE_LOG_RANGE_LIMIT
+        limit = min(limit or max_bytes, max_bytes)
+        if tail is not None:
+            tail = min(tail, max_bytes)
+            offset = max(0, size - tail)
+            limit = size - offset
+        offset = min(max(offset or 0, 0), size)
+        data = storage.load_range(task.log_path, offset, limit) if size > offset else b""
+        if tail is not None and offset > 0:
+            # 从第一个完整行开始
+            newline = data.find(b"\n")
+            if newline >= 0:
+                offset += newline + 1
+                data = data[newline + 1 :]
+
+        # 末尾不完整的多字节字符留到下一次读取
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        content = decoder.decode(data)
+        pending = len(decoder.getstate()[0])
+        return {
+            "content": content,
+            "offset": offset,
+            "next_offset": offset + len(data) - pending,
+            "size": size,
+        }
+
     def ft_pause_task(self, job_id, task_name):
         """调用微调后端接口暂停任务。
 
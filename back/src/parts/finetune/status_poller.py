@@ -0,0 +1,180 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Additional Notice:
+# When modifying, redistributing, or creating derivative works of this software,
+# you must retain the original LazyCraft logo and the GitHub link icon that directs
+# to the official repository: https://github.com/LazyAGI/LazyLLM
+
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Optional
+
+from configs import lazy_config
+from utils.util_redis import redis_client
+
+
+class FinetuneStatusPoller:
+    """微调任务状态的并发轮询调度器。
+
+    每轮只检查到期的任务，检查在有界线程池中并发执行。每个任务的检查间隔随运行时长增长：
+    刚启动的任务每 ``FINETUNE_STATUS_MIN_INTERVAL`` 秒检查一次，长时间运行的任务按
+    ``FINETUNE_STATUS_INTERVAL_RATIO`` 放缓，检查失败或超时的任务再按次数指数退避，
+    上限为 ``FINETUNE_STATUS_MAX_INTERVAL``。
+
+    每轮最多等待 ``FINETUNE_STATUS_ROUND_TIMEOUT`` 秒：到时仍在排队的检查被取消并释放锁，
+    由下一轮重新调度；已开始但未完成的检查由后台线程继续执行。任务锁保存在 Redis 中，
+    锁未释放前后续轮次和其他 worker 进程都会跳过该任务。
+    """
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        round_timeout: Optional[float] = None,
+        min_interval: Optional[float] = None,
+        max_interval: Optional[float] = None,
+        interval_ratio: Optional[float] = None,
+        lock_ttl: Optional[int] = None,
+    ):
+        self.concurrency = concurrency or lazy_config.FINETUNE_STATUS_CONCURRENCY
+        self.round_timeout = round_timeout or lazy_config.FINETUNE_STATUS_ROUND_TIMEOUT
+        self.min_interval = min_interval or lazy_config.FINETUNE_STATUS_MIN_INTERVAL
+        self.max_interval = max_interval or lazy_config.FINETUNE_STATUS_MAX_INTERVAL
+        self.interval_ratio = (
+            interval_ratio or lazy_config.FINETUNE_STATUS_INTERVAL_RATIO
+        )
+        self.lock_ttl = lock_ttl or lazy_config.FINETUNE_STATUS_LOCK_TTL
+
+    @staticmethod
+    def _state_key(task_id) -> str:
+        return f"finetune_status:state:{task_id}"
+
+    @staticmethod
+    def _lock_key(task_id) -> str:
+        return f"finetune_status:lock:{task_id}"
+
+    def next_interval(self, running_seconds: float, failures: int = 0) -> float:
+        """根据任务已运行时长和连续失败次数计算下次检查的间隔（秒）"""
+        interval = max(self.min_interval, running_seconds * self.interval_ratio)
+        interval *= 2 ** min(failures, 16)
+        return min(interval, self.max_interval)
+
+    def _load_state(self, task_id) -> dict:
+        try:
+            raw = redis_client.get(self._state_key(task_id))
+            return json.loads(raw) if raw else {}
+        except Exception as e:
+            logging.warning(f"读取微调任务 {task_id} 轮询状态失败: {e}")
+            return {}
+
+    def _save_state(self, task_id, running_seconds: float, failures: int) -> None:
+        interval = self.next_interval(running_seconds, failures)
+        state = {"next_at": time.time() + interval, "failures": failures}
+        try:
+            # 状态在任务长期不再被轮询后自动过期
+            redis_client.set(
+                self._state_key(task_id),
+                json.dumps(state),
+                ex=int(self.max_interval * 4),
+            )
+        except Exception as e:
+            logging.warning(f"保存微调任务 {task_id} 轮询状态失败: {e}")
+
+    def _acquire(self, task_id) -> bool:
+        try:
+            return bool(
+                redis_client.set(self._lock_key(task_id), 1, nx=True, ex=self.lock_ttl)
+            )
+        except Exception as e:
+            # Redis 不可用时退化为不加锁，保证状态仍能更新
+            logging.warning(f"获取微调任务 {task_id} 轮询锁失败: {e}")
+            return True
+
+    def _release(self, task_id) -> None:
+        try:
+            redis_client.delete(self._lock_key(task_id))
+        except Exception as e:
+            logging.warning(f"释放微调任务 {task_id} 轮询锁失败: {e}")
+
+    def _run_job(self, task_id, running_seconds, check) -> bool:
+        failures = self._load_state(task_id).get("failures", 0)
+        try:
+            check(task_id)
+            failures = 0
+        except Exception as e:
+            failures += 1
+            logging.error(f"微调任务 {task_id} 状态检查失败({failures}): {e}")
+        finally:
+            self._save_state(task_id, running_seconds, failures)
+            self._release(task_id)
+        return failures == 0
+
+    def poll(
+        self, jobs: Iterable[tuple[int, float]], check: Callable[[int], None]
+    ) -> dict:
+        """并发检查一批任务中已到期的任务。
+
+        Args:
+            jobs (Iterable): (任务ID, 已运行秒数) 序列。
+            check (Callable): 在工作线程中检查单个任务的函数，参数为任务ID。
+
+        Returns:
+            dict: 本轮统计，包含检查成功(checked)、未到期或仍在检查(skipped)、
+                检查失败(failed)、超时转入后台(timed_out)、本轮未轮到而推迟(deferred)的任务ID列表。
+        """
+        summary = {"checked": [], "skipped": [], "failed": [], "timed_out": [], "deferred": []}
+        now = time.time()
+        due = []
+        for task_id, running_seconds in jobs:
+            if self._load_state(task_id).get("next_at", 0) > now:
+                summary["skipped"].append(task_id)
+            elif not self._acquire(task_id):
+                # 上一轮的检查仍在执行
+                summary["skipped"].append(task_id)
+            else:
+                due.append((task_id, running_seconds))
+        if not due:
+            return summary
+
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.concurrency, len(due)),
+            thread_name_prefix="finetune-status",
+        )
+        futures = {
+            executor.submit(self._run_job, task_id, running_seconds, check): task_id
+            for task_id, running_seconds in due
+        }
+        try:
+            finished, pending = wait(futures, timeout=self.round_timeout)
+            for future in finished:
+                key = "checked" if future.result() else "failed"
+                summary[key].append(futures[future])
+            for future in pending:
+                task_id = futures[future]
+                if future.cancel():
+                    # 仍在排队的检查不再执行，释放锁后由下一轮重新调度
+                    self._release(task_id)
+                    summary["deferred"].append(task_id)
+                else:
+                    logging.warning(f"微调任务 {task_id} 状态检查超时，转入后台继续执行")
+                    summary["timed_out"].append(task_id)
+        finally:
+            # 超时的检查在后台线程中继续执行，不阻塞本轮返回
+            executor.shutdown(wait=False)
+        return summary
+
+
+status_poller = FinetuneStatusPoller()
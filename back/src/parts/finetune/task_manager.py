@@ -29,18 +29,26 @@ from urllib.parse import quote
 
 import pytz
 import requests
+from flask import current_app
 
 from libs.timetools import TimeTools
 from libs.filetools import FileTools
 from models.model_account import Account, Tenant
 from parts.data.data_service import DataService
 from parts.finetune.model import FinetuneTask, TaskStatus
+from parts.finetune.status_poller import status_poller
 from parts.logs import Action, LogService, Module
 from parts.models_hub.service import ModelService
 from utils.util_database import db
 from utils.util_storage import storage
 
 LOG_PATH = "finetune/log/"
+# 增量获取日志时与已保存内容重叠的字节数，用于确认远端日志没有被截断或重写
+LOG_OVERLAP_BYTES = 256
+# 状态查询请求的超时时间（秒），避免单个任务的请求无限挂起
+FT_REQUEST_TIMEOUT = 30
+# 等待模型导出到 AMP 的总时长（秒）；每轮轮询只查询一次导出状态，未完成时留给后续轮次
+AMP_UPLOAD_WAIT_TIMEOUT = 20 * 60
 
 
 def calculate_time_difference(datetime_val):
@@ -206,7 +214,7 @@ class TaskManager:
         """
         ft_status_url = os.getenv("FT_ENDPOINT", "NOT_SET_FT_ENDPOINT!!") + "/v1/finetuneTasks/" + job_id
         logging.info(f"get_ft_status_url: {ft_status_url}")
-        response = requests.get(ft_status_url)
+        response = requests.get(ft_status_url, timeout=FT_REQUEST_TIMEOUT)
         response_data = response.json()
         logging.info(f"get_ft_status response: {response.status_code}")
         if response.status_code != 200:
@@ -237,7 +245,7 @@ class TaskManager:
             os.getenv("FT_ENDPOINT", "NOT_SET_FT_ENDPOINT!!") + "/v1/finetuneTasks/" + job_id
         )
         logging.info(f"get_ft_amp_upload_status_url: {ft_amp_upload_status_url}")
-        response = requests.get(ft_amp_upload_status_url)
+        response = requests.get(ft_amp_upload_status_url, timeout=FT_REQUEST_TIMEOUT)
         response_data = response.json()
         logging.info(f"get_ft_amp_upload_status response: {response.status_code}")
         if response.status_code != 200:
@@ -275,6 +283,80 @@ class TaskManager:
             return False, ""
         return True, response.text
 
+    def get_ft_log_since(self, job_id, offset):
+        """从指定字节偏移增量获取FT任务日志。
+
+        通过 Range 请求只获取偏移之后的内容，并向前多取 LOG_OVERLAP_BYTES 字节
+        用于校验；FT服务不支持 Range 时返回完整日志。
+
+        Args:
+            job_id (str): 任务ID
+            offset (int): 已保存的日志字节数
+
+        Returns:
+            tuple: (是否成功, 返回内容的起始偏移, 日志内容bytes)
+        """
+        ft_log_url = os.getenv("FT_ENDPOINT", "NOT_SET_FT_ENDPOINT!!") + "/v1/finetuneTasks/" + job_id + "/log"
+        start = max(0, offset - LOG_OVERLAP_BYTES)
+        headers = {"Range": f"bytes={start}-"} if start else {}
+        response = requests.get(ft_log_url, headers=headers, timeout=30)
+        if response.status_code == 206:
+            return True, start, response.content
+        if response.status_code == 416:
+            # 没有新内容
+            return True, offset, b""
+        if response.status_code != 200:
+            logging.info(f"get_ft_log failed: {response.text}")
+            return False, 0, b""
+        return True, 0, response.content
+
+    def sync_task_log(self, task_db, job_id):
+        """把FT任务日志的新增部分追加到已保存的日志文件。
+
+        已保存的字节数即为下一次获取的偏移；重叠部分与已保存内容不一致时
+        （日志被截断或重写）重新获取完整日志并覆盖。
+
+        Args:
+            task_db (FinetuneTask): 任务数据库对象
+            job_id (str): 任务ID
+
+        Returns:
+            bool: 是否成功获取日志
+        """
+        save_path = os.path.join(LOG_PATH, str(task_db.id), "finetune.log")
+        offset = storage.size(save_path) if task_db.log_path == save_path else 0
+        success, start, content = self.get_ft_log_since(job_id, offset)
+        if not success:
+            return False
+
+        # 只比较偏移前的一小段，FT服务返回完整日志时也不必读出整个已保存文件
+        check_start = max(start, offset - LOG_OVERLAP_BYTES)
+        overlap = (
+            storage.load_range(save_path, check_start, offset - check_start)
+            if offset > check_start
+            else b""
+        )
+        if (
+            start + len(content) < offset
+            or content[check_start - start : offset - start] != overlap
+        ):
+            logging.info(f"finetune log of task {task_db.id} changed, refetching")
+            if start:
+                success, start, content = self.get_ft_log_since(job_id, 0)
+                if not success:
+                    return False
+            storage.save(save_path, content)
+        elif len(content) > offset - start:
+            if offset:
+                storage.append(save_path, content[offset - start :])
+            else:
+                storage.save(save_path, content)
+
+        if task_db.log_path != save_path and storage.size(save_path):
+            task_db.log_path = save_path
+            db.session.commit()
+        return True
+
     def get_ft_log_sse(self, job_id):
         """获取FT任务日志（SSE格式）。
 
@@ -734,16 +816,17 @@ class TaskManager:
     def check_task_status(self):
         """检查所有任务状态。
 
-        定期检查所有微调任务的状态，更新任务进度和状态。
+        定期检查所有微调任务的状态，更新任务进度和状态。各任务由状态轮询调度器
+        并发检查，并按运行时长自适应调整检查间隔，单个任务阻塞不影响其他任务。
 
         Returns:
-            None: 无返回值。
+            dict: 本轮轮询统计。
         """
         eight_hours_ago = TimeTools.get_china_now(output="datetime") - timedelta(
             hours=48
         )
         tasks_db = (
-            db.session.query(FinetuneTask)
+            db.session.query(FinetuneTask.id, FinetuneTask.created_at)
             .filter(
                 FinetuneTask.status == TaskStatus.IN_PROGRESS.value,
                 FinetuneTask.deleted_flag == 0,
@@ -751,10 +834,34 @@ class TaskManager:
             )
             .all()
         )
+        if not tasks_db:
+            return None
+
+        jobs = [
+            (task_id, calculate_time_difference(created_at) if created_at else 0)
+            for task_id, created_at in tasks_db
+        ]
+        # 本轮的会话不再使用，避免在等待工作线程期间占用数据库连接
+        db.session.remove()
+        summary = status_poller.poll(jobs, self._check_task_in_context())
+        logging.info(
+            f"finetune status poll: checked={summary['checked']} failed={summary['failed']} "
+            f"timed_out={summary['timed_out']} skipped={len(summary['skipped'])}"
+        )
+        return summary
 
-        if tasks_db is not None and len(tasks_db) > 0:
-            for t_db in tasks_db:
-                self._process_single_task(t_db)
+    def _check_task_in_context(self):
+        """返回在工作线程中检查单个任务的函数，每次检查使用独立的应用上下文和数据库会话"""
+        app = current_app._get_current_object()
+
+        def check(task_id):
+            with app.app_context():
+                task_db = db.session.get(FinetuneTask, task_id)
+                if task_db is None or task_db.status != TaskStatus.IN_PROGRESS.value:
+                    return
+                self._process_single_task(task_db)
+
+        return check
 
     def _process_single_task(self, task_db):
         """处理单个任务的状态检查。
@@ -778,18 +885,19 @@ class TaskManager:
         status = self._get_task_status(task_db, job_id)
 
         try:
-            get_ft_log_result, get_ft_log_return = self.get_ft_log(job_id)
-            if get_ft_log_result and get_ft_log_return != "":
-                self.task_log_content(task_db.id, get_ft_log_return)
+            # 只追加上次检查之后新增的日志
+            self.sync_task_log(task_db, job_id)
         except Exception as e:
             logging.error(f"get_ft_log error: {e}")
 
         if status == "Completed":
-            self._handle_completed_task(
+            finished = self._handle_completed_task(
                 task_db, job_id, token, check_count, model_id_or_path
             )
-            # 调用handle_done_task来处理完成的任务
-            self.handle_done_task(task_db.id)
+            # 模型仍在导出到 AMP 时保持进行中，由后续轮询继续检查
+            if finished:
+                # 调用handle_done_task来处理完成的任务
+                self.handle_done_task(task_db.id)
         elif status in ["Failed"]:
             self.handle_failed_task(task_db.id, "")
 
@@ -837,7 +945,7 @@ class TaskManager:
             model_id_or_path (str): 模型ID或路径
 
         Returns:
-            None
+            bool: 是否处理完毕，lazy 任务无需等待导出，始终为 True
         """
         if model_id_or_path is None or model_id_or_path == "":
             # 上传微调模型
@@ -853,13 +961,14 @@ class TaskManager:
                         f"ft_upload_finetuned_model failed, check_count: {check_count}"
                     )
                     self._update_check_count(task_db, check_count + 1)
-                    return
+                    return True
                 raise Exception("任务发起异常")
 
             # 更新任务信息
             self._update_task_job_info(
                 task_db, job_id, task_db.target_model_name, token, check_count
             )
+        return True
 
     def _handle_completed_task_maas(
         self, task_db, job_id, token, check_count, model_id_or_path
@@ -876,12 +985,11 @@ class TaskManager:
             model_id_or_path (str): 模型ID或路径
 
         Returns:
-            None
+            bool: 是否处理完毕，模型仍在导出到 AMP 时为 False
         """
         if model_id_or_path is None or model_id_or_path == "":
-            self._handle_model_upload_and_download(task_db, job_id, token, check_count)
-        else:
-            self._handle_existing_model_download(task_db, job_id)
+            return self._handle_model_upload_and_download(task_db, job_id, token, check_count)
+        return self._handle_existing_model_download(task_db, job_id)
 
     def _handle_model_upload_and_download(self, task_db, job_id, token, check_count):
         """处理模型上传和下载。
@@ -895,7 +1003,7 @@ class TaskManager:
             check_count (int): 检查次数
 
         Returns:
-            None
+            bool: 是否处理完毕，模型仍在导出到 AMP 时为 False
 
         Raises:
             Exception: 当上传或下载失败时
@@ -913,7 +1021,7 @@ class TaskManager:
                     f"ft_upload_finetuned_model failed, check_count: {check_count}"
                 )
                 self._update_check_count(task_db, check_count + 1)
-                return
+                return True
             raise Exception("任务发起异常")
 
         # 更新任务信息
@@ -922,7 +1030,7 @@ class TaskManager:
         )
 
         # 下载模型
-        self._download_model_from_amp(task_db, job_id)
+        return self._download_model_from_amp(task_db, job_id)
 
     def _handle_existing_model_download(self, task_db, job_id):
         """处理现有模型下载。
@@ -934,29 +1042,39 @@ class TaskManager:
             job_id (str): 任务ID
 
         Returns:
-            None
+            bool: 是否处理完毕，模型仍在导出到 AMP 时为 False
         """
         try:
             self.update_task_status_to_db_ft(task_db.id, TaskStatus.DOWNLOAD.value)
-            self._download_model_from_amp(task_db, job_id)
+            return self._download_model_from_amp(task_db, job_id)
         except Exception as e:
             self._handle_download_error(task_db, e)
+            return True
 
     def _download_model_from_amp(self, task_db, job_id):
         """从AMP下载模型。
 
-        从AMP服务下载微调后的模型。
+        从AMP服务下载微调后的模型。模型尚未导出完成时不在轮询线程中等待，
+        任务保持进行中，由后续轮询再次检查，超过 ``AMP_UPLOAD_WAIT_TIMEOUT`` 后按超时处理。
 
         Args:
             task_db (FinetuneTask): 任务数据库对象
             job_id (str): 任务ID
 
         Returns:
-            None
+            bool: 是否处理完毕，模型仍在导出到 AMP 时为 False
 
         Raises:
             Exception: 当下载失败时
         """
+        upload_status = self._check_amp_upload_status(job_id)
+        if upload_status == "pending" and not self._amp_upload_wait_expired(task_db):
+            logging.info(
+                f"ft model is still exporting to amp, model_name: {task_db.target_model_name}"
+            )
+            self.update_task_status_to_db_ft(task_db.id, TaskStatus.IN_PROGRESS.value)
+            return False
+
         logging.info(
             f"start download from amp, model_name: {task_db.target_model_name}"
         )
@@ -966,14 +1084,33 @@ class TaskManager:
         )
         self._prepare_download_path(amp_download_path)
 
-        upload_status = self._check_amp_upload_status(job_id)
-
         if upload_status == "success":
             self._perform_model_download(task_db, amp_download_path)
         elif upload_status == "failed":
             self._handle_upload_failure(task_db, amp_download_path)
         else:
             self._handle_upload_timeout(task_db, amp_download_path)
+        return True
+
+    def _amp_upload_wait_expired(self, task_db):
+        """检查等待模型导出到AMP是否已超时。
+
+        首次等待时在任务信息中记录开始时间，之后的轮询据此判断是否超过 ``AMP_UPLOAD_WAIT_TIMEOUT``。
+
+        Args:
+            task_db (FinetuneTask): 任务数据库对象
+
+        Returns:
+            bool: 是否已超时
+        """
+        job_info = task_db.task_job_info_dict
+        wait_since = job_info.get("amp_upload_wait_since")
+        if wait_since is None:
+            job_info["amp_upload_wait_since"] = time.time()
+            task_db.task_job_info = json.dumps(job_info)
+            db.session.commit()
+            return False
+        return time.time() - wait_since >= AMP_UPLOAD_WAIT_TIMEOUT
 
     def _prepare_download_path(self, amp_download_path):
         """准备下载路径。
@@ -994,38 +1131,36 @@ class TaskManager:
     def _check_amp_upload_status(self, job_id):
         """检查AMP上传状态。
 
-        检查模型在AMP上的上传状态。
+        检查模型在AMP上的上传状态，只查询一次，不等待。
 
         Args:
             job_id (str): 任务ID
 
         Returns:
-            str: 上传状态（success/failed/timeout）
+            str: 上传状态（success/failed/pending）
 
         Raises:
             Exception: 当检查状态失败时
         """
-        for amp_download_try in range(1, 21):
-            time.sleep(60)
-            (
-                get_ft_amp_upload_status_result,
-                get_ft_amp_upload_status_return,
-            ) = self.get_ft_amp_upload_status(job_id)
+        (
+            get_ft_amp_upload_status_result,
+            get_ft_amp_upload_status_return,
+        ) = self.get_ft_amp_upload_status(job_id)
 
-            logging.info(
-                f"get_ft_amp_upload_status_result, get_ft_amp_upload_status_return: "
-                f"{get_ft_amp_upload_status_result}, {get_ft_amp_upload_status_return}"
-            )
+        logging.info(
+            f"get_ft_amp_upload_status_result, get_ft_amp_upload_status_return: "
+            f"{get_ft_amp_upload_status_result}, {get_ft_amp_upload_status_return}"
+        )
 
-            if get_ft_amp_upload_status_result:
-                if get_ft_amp_upload_status_return == "MODEL_EXPORTED":
-                    logging.info("ft upload model to amp success")
-                    return "success"
-                elif get_ft_amp_upload_status_return == "MODEL_EXPORT_FAILED":
-                    logging.info("ft upload model to amp failed")
-                    return "failed"
+        if get_ft_amp_upload_status_result:
+            if get_ft_amp_upload_status_return == "MODEL_EXPORTED":
+                logging.info("ft upload model to amp success")
+                return "success"
+            elif get_ft_amp_upload_status_return == "MODEL_EXPORT_FAILED":
+                logging.info("ft upload model to amp failed")
+                return "failed"
 
-        return "timeout"
+        return "pending"
 
     def _perform_model_download(self, task_db, amp_download_path):
         """执行模型下载。
@@ -0,0 +1,220 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Additional Notice:
+# When modifying, redistributing, or creating derivative works of this software,
+# you must retain the original LazyCraft logo and the GitHub link icon that directs
+# to the official repository: https://github.com/LazyAGI/LazyLLM
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from configs import lazy_config
+from parts.models_hub.model_list import ams_model_list
+
+# 单次状态查询的超时时间（秒）
+AMS_REQUEST_TIMEOUT = 5
+# 超过该倍数的TTL未被列表查询的服务不再后台刷新
+WATCH_TTL_FACTOR = 30
+
+FAILED_STATUS = (False, "", "")
+
+
+class AmsStatusCache:
+    """AMS推理服务状态的并发查询与短时缓存。
+
+    状态查询通过带连接池的 HTTP 会话并发发出，结果在进程内缓存 ``AMS_STATUS_CACHE_TTL`` 秒。
+    最近被列表查询过的服务由后台线程每隔 ``AMS_STATUS_REFRESH_INTERVAL`` 秒刷新一次，
+    列表页通常直接命中缓存；缓存缺失或过期的服务一次性并发查询，耗时约为一次请求往返。
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = None,
+        refresh_interval: Optional[float] = None,
+        concurrency: Optional[int] = None,
+    ):
+        self._ttl = ttl or lazy_config.AMS_STATUS_CACHE_TTL
+        self._refresh_interval = (
+            refresh_interval or lazy_config.AMS_STATUS_REFRESH_INTERVAL
+        )
+        self._concurrency = concurrency or lazy_config.AMS_STATUS_CONCURRENCY
+        self._entries: dict[str, tuple[float, tuple]] = {}
+        self._watched: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._session: Optional[requests.Session] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _http(self) -> requests.Session:
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=1, pool_maxsize=self._concurrency
+                    )
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._session = session
+        return self._session
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self._concurrency, thread_name_prefix="ams-status"
+                    )
+        return self._executor
+
+    def fetch(self, lws_release_name: str) -> tuple[bool, str, str]:
+        """直接查询AMS服务状态，不使用缓存。
+
+        Args:
+            lws_release_name (str): LWS发布名称。
+
+        Returns:
+            tuple: (是否成功获取, 服务状态, 服务端点)。
+        """
+        ams_get_url = (
+            os.getenv("AMS_ENDPOINT") + "/v1/inference_services/" + lws_release_name
+        )
+        logging.info(f"ams_get_url: {ams_get_url}")
+        try:
+            response = self._http().get(ams_get_url, timeout=AMS_REQUEST_TIMEOUT)
+            response_data = response.json()
+            logging.info(f"ams get model status response: {response.status_code}")
+            logging.info(f"ams_get_service_status response: {response.text}")
+            if response.status_code != 200:
+                logging.info(
+                    f"ams_get_service_status failed: {response_data.get('code')}, {response_data.get('message')}"
+                )
+                return FAILED_STATUS
+            if response_data.get("deploy_method"):
+                for local_ams_model in ams_model_list:
+                    if local_ams_model["name"] == response_data.get("model_name"):
+                        local_ams_model["framework"] = response_data.get(
+                            "deploy_method"
+                        )
+                        break
+
+            # 获取endpoint，127.0.0.1或localhost替换为AMS的地址
+            endpoint = response_data.get("endpoint")
+            if endpoint:
+                ams_host = urlparse(ams_get_url).hostname
+                if "127.0.0.1" in endpoint or "localhost" in endpoint:
+                    if "127.0.0.1" in endpoint:
+                        endpoint = endpoint.replace("127.0.0.1", ams_host)
+                    if "localhost" in endpoint:
+                        endpoint = endpoint.replace("localhost", ams_host)
+                    logging.info(f"替换endpoint中的IP地址: {endpoint}")
+
+            return True, response_data.get("status"), endpoint
+        except Exception as e:
+            logging.info(f"ams_get_service_status failed: {str(e)}")
+            return FAILED_STATUS
+
+    def fetch_many(self, gids) -> dict[str, tuple[bool, str, str]]:
+        """并发查询一批服务状态并写入缓存"""
+        gids = list(dict.fromkeys(gids))
+        if not gids:
+            return {}
+        if len(gids) == 1:
+            results = {gids[0]: self.fetch(gids[0])}
+        else:
+            results = dict(zip(gids, self._pool().map(self.fetch, gids)))
+        now = time.monotonic()
+        with self._lock:
+            for gid, result in results.items():
+                self._entries[gid] = (now, result)
+        return results
+
+    def get_many(self, gids) -> dict[str, tuple[bool, str, str]]:
+        """获取一批服务状态，优先使用缓存，缺失或过期的并发查询。
+
+        Args:
+            gids (Iterable[str]): LWS发布名称列表。
+
+        Returns:
+            dict: LWS发布名称到 (是否成功获取, 服务状态, 服务端点) 的映射。
+        """
+        self._ensure_started()
+        now = time.monotonic()
+        results, missing = {}, []
+        with self._lock:
+            for gid in gids:
+                self._watched[gid] = now
+                entry = self._entries.get(gid)
+                if entry and now - entry[0] < self._ttl:
+                    results[gid] = entry[1]
+                else:
+                    missing.append(gid)
+        results.update(self.fetch_many(missing))
+        return results
+
+    def invalidate(self, gid: str) -> None:
+        """服务启停后丢弃缓存的状态"""
+        with self._lock:
+            self._entries.pop(gid, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._watched.clear()
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """停止后台刷新线程"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            # fork 出的子进程中线程不存在，需要重新启动
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="ams-status-refresher", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._refresh_interval):
+            now = time.monotonic()
+            with self._lock:
+                for gid, last_seen in list(self._watched.items()):
+                    if now - last_seen > self._ttl * WATCH_TTL_FACTOR:
+                        del self._watched[gid]
+                        self._entries.pop(gid, None)
+                gids = list(self._watched)
+            try:
+                self.fetch_many(gids)
+            except Exception as e:
+                logging.warning(f"刷新AMS服务状态失败: {e}")
+
+
+ams_status_cache = AmsStatusCache()
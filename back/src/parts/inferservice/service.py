@@ -30,6 +30,7 @@ from lazyllm.engine import LightEngine
 
 from libs.timetools import TimeTools
 from models.model_account import Account, Tenant
+from parts.inferservice.ams_status import ams_status_cache
 from parts.inferservice.model import InferModelService, InferModelServiceGroup
 from parts.logs import Action, LogService, Module
 from parts.models_hub.model import Lazymodel
@@ -126,6 +127,8 @@ class InferService:
     def ams_get_service_status(self, lws_release_name):
         """获取AMS服务状态。
 
+        通过带连接池的会话直接查询，不使用缓存。
+
         Args:
             lws_release_name (str): LWS发布名称。
 
@@ -138,49 +141,7 @@ class InferService:
         Raises:
             Exception: 当请求AMS服务失败时抛出异常。
         """
-        ams_get_url = (
-            os.getenv("AMS_ENDPOINT") + "/v1/inference_services/" + lws_release_name
-        )
-        logging.info(f"ams_get_url: {ams_get_url}")
-        try:
-            response = requests.get(ams_get_url, timeout=5)
-            response_data = response.json()
-            logging.info(f"ams get model status response: {response.status_code}")
-            logging.info(f"ams_get_service_status response: {response.text}")
-            if response.status_code != 200:
-                logging.info(
-                    f"ams_get_service_status failed: {response_data.get('code')}, {response_data.get('message')}"
-                )
-                return False, "", ""
-            if response_data.get("deploy_method"):
-                for local_ams_model in ams_local_model_list_ams:
-                    if local_ams_model["name"] == response_data.get("model_name"):
-                        local_ams_model["framework"] = response_data.get(
-                            "deploy_method"
-                        )
-                        break
-            
-            # 获取endpoint并检查是否需要替换IP
-            endpoint = response_data.get("endpoint")
-            if endpoint:
-                # 从ams_get_url中提取IP地址
-                from urllib.parse import urlparse
-                parsed_url = urlparse(ams_get_url)
-                ams_host = parsed_url.hostname
-                
-                # 检查endpoint是否包含127.0.0.1或localhost
-                if "127.0.0.1" in endpoint or "localhost" in endpoint:
-                    # 替换为ams_get_url的IP地址
-                    if "127.0.0.1" in endpoint:
-                        endpoint = endpoint.replace("127.0.0.1", ams_host)
-                    if "localhost" in endpoint:
-                        endpoint = endpoint.replace("localhost", ams_host)
-                    logging.info(f"替换endpoint中的IP地址: {endpoint}")
-            
-            return True, response_data.get("status"), endpoint
-        except Exception as e:
-            logging.info(f"ams_get_service_status failed: {str(e)}")
-            return False, "", ""
+        return ams_status_cache.fetch(lws_release_name)
 
     def _build_filters(self, qtype, search_name, model_kind, is_draw, tenant=""):
         """构建查询过滤器。
@@ -258,56 +219,75 @@ class InferService:
         """
         ams_service_status = {}
         ams_service_endpoint = {}
-        for infer_model_service_group in infer_model_service_groups:
+        group_services = [
+            (infer_model_service_group, service)
+            for infer_model_service_group in infer_model_service_groups
+            for service in infer_model_service_group.services
+            if service.gid
+        ]
+        if not group_services:
+            return ams_service_status, ams_service_endpoint
+
+        # 状态并发查询（优先命中缓存），模型信息批量预取
+        statuses = ams_status_cache.get_many(
+            [service.gid for _, service in group_services]
+        )
+        model_ids = {service.model_id for _, service in group_services}
+        models = {
+            model.id: model
+            for model in Lazymodel.query.filter(Lazymodel.id.in_(model_ids))
+        }
+        # 与逐个遍历时一致：同名模型以列表中最后一项为准
+        local_models = {
+            local_ams_model["model_name"]: local_ams_model
+            for local_ams_model in ams_local_model_list_ams
+        }
+
+        for infer_model_service_group, service in group_services:
+            (
+                ams_get_service_status_result,
+                ams_get_service_status_return,
+                ams_get_service_status_endpoint,
+            ) = statuses[service.gid]
+            if not ams_get_service_status_result:
+                logging.info(
+                    f"获取AMS推理任务状态失败： " f"{str(service.gid)}"
+                )
+                ams_service_status[str(service.gid)] = "Cancelled"
+                ams_service_endpoint[str(service.gid)] = ""
+                continue
+            # TBD: convert status
+            if ams_get_service_status_return == "Available":
+                ams_service_status[str(service.gid)] = "Ready"
+            elif ams_get_service_status_return == "Unavailable":
+                # 判断service.updated_time与当前系统时间是否超过2分钟，如果没有超过2分钟，则设置为Running
+                if (
+                    service.updated_time + timedelta(minutes=2)
+                    > TimeTools.now_datetime_china()
+                ):
+                    ams_service_status[str(service.gid)] = "Running"
+                else:
+                    ams_service_status[str(service.gid)] = "Failed"
+            elif ams_get_service_status_return == "Unknown":
+                ams_service_status[str(service.gid)] = "Cancelled"
+            else:
+                ams_service_status[str(service.gid)] = ams_get_service_status_return
+
             ams_model_name = infer_model_service_group.model_name
-            services = infer_model_service_group.services
-            for service in services:
-                if service.gid:
-                    (
-                        ams_get_service_status_result,
-                        ams_get_service_status_return,
-                        ams_get_service_status_endpoint,
-                    ) = self.ams_get_service_status(service.gid)
-                    if not ams_get_service_status_result:
-                        logging.info(
-                            f"获取AMS推理任务状态失败： " f"{str(service.gid)}"
-                        )
-                        ams_service_status[str(service.gid)] = "Cancelled"
-                        ams_service_endpoint[str(service.gid)] = ""
-                        continue
-                    # TBD: convert status
-                    if ams_get_service_status_return == "Available":
-                        ams_service_status[str(service.gid)] = "Ready"
-                    elif ams_get_service_status_return == "Unavailable":
-                        # 判断service.updated_time与当前系统时间是否超过2分钟，如果没有超过2分钟，则设置为Running
-                        if (
-                            service.updated_time + timedelta(minutes=2)
-                            > TimeTools.now_datetime_china()
-                        ):
-                            ams_service_status[str(service.gid)] = "Running"
-                        else:
-                            ams_service_status[str(service.gid)] = "Failed"
-                    elif ams_get_service_status_return == "Unknown":
-                        ams_service_status[str(service.gid)] = "Cancelled"
-                    else:
-                        ams_service_status[str(service.gid)] = (
-                            ams_get_service_status_return
-                        )
-
-                    model_info = Lazymodel.query.get(service.model_id)
-                    if model_info.model_from == "finetune":
-                        ams_model_name = model_info.model_key_ams
-                    for local_ams_model in ams_local_model_list_ams:
-                        if local_ams_model["model_name"] == ams_model_name:
-                            if "http" in ams_get_service_status_endpoint:
-                                endpoint_url = ams_get_service_status_endpoint
-                            else:
-                                endpoint_url = (
-                                    "http://"
-                                    + ams_get_service_status_endpoint
-                                    + local_ams_model["endpoint"]
-                                )
-                            ams_service_endpoint[str(service.gid)] = endpoint_url
+            model_info = models.get(service.model_id)
+            if model_info and model_info.model_from == "finetune":
+                ams_model_name = model_info.model_key_ams
+            local_ams_model = local_models.get(ams_model_name)
+            if local_ams_model:
+                if "http" in ams_get_service_status_endpoint:
+                    endpoint_url = ams_get_service_status_endpoint
+                else:
+                    endpoint_url = (
+                        "http://"
+                        + ams_get_service_status_endpoint
+                        + local_ams_model["endpoint"]
+                    )
+                ams_service_endpoint[str(service.gid)] = endpoint_url
         return ams_service_status, ams_service_endpoint
 
     def _process_status_filter(self, status):
@@ -878,6 +858,7 @@ class InferService:
         try:
             if service.gid:
                 ams_stop_service_result = self.ams_stop_service(service.gid)
+                ams_status_cache.invalidate(service.gid)
                 if not ams_stop_service_result:
                     logging.info(f"ams delete failed: {service.gid}")
                     return False
@@ -17,28 +17,18 @@
 # you must retain the original LazyCraft logo and the GitHub link icon that directs
 # to the official repository: https://github.com/LazyAGI/LazyLLM
 
-import asyncio
 import logging
-import queue
-import threading
-from datetime import timedelta
+
 import httpx
-import mcp
 from anyio import BrokenResourceError
 from exceptiongroup import ExceptionGroup
 from httpx import ConnectError
-from mcp import ClientSession, McpError, StdioServerParameters
-from mcp.client.sse import sse_client
-from mcp.client.stdio import stdio_client
-from mcp.shared.context import RequestContext
+from mcp import McpError
 from mcp.shared.exceptions import McpError as SharedMcpError
-from mcp.types import CreateMessageRequestParams
 
 from sqlalchemy import and_, or_
 from sqlalchemy.orm.exc import NoResultFound
 
-from lazyllm.tools import MCPClient
-
 from libs.timetools import TimeTools
 from models.model_account import Account
 from parts.logs import Action, LogService, Module
@@ -47,6 +37,7 @@ from utils.util_database import db
 
 
 from .model import McpServer, McpTool, TestState
+from .session_pool import McpServerSpec, mcp_session_manager
 from parts.app.model import App, WorkflowRefer
 
 
@@ -274,6 +265,10 @@ class McpServerService:
         if "headers" in data and data["headers"] != server.headers:
             changed = True
 
+        if changed or data.get("timeout") != server.timeout:
+            # 连接参数变化后旧会话不再使用，立即关闭
+            mcp_session_manager.invalidate(server)
+
         if data.get("name") and data.get("name") != server.name:
             if McpServer.query.filter_by(
                 name=data.get("name"), tenant_id=self.account.current_tenant_id
@@ -317,6 +312,7 @@ class McpServerService:
         """MCP 服务"""
         server = self.get_by_id(mcp_server_id)
         name = server.name
+        mcp_session_manager.invalidate(server)
         Tag.delete_bindings(Tag.Types.MCP, mcp_server_id)
         db.session.delete(server)
         db.session.commit()
@@ -354,6 +350,8 @@ class McpServerService:
         if enable and not server.publish:
             raise ValueError("服务未发布，无法启用")
 
+        if not enable:
+            mcp_session_manager.invalidate(server)
         server.enable = enable
         server.updated_at = TimeTools.get_china_now()
         db.session.commit()
@@ -419,36 +417,18 @@ class McpToolService:
                 "message": "MCP 工具不存在",
                 "status": 400,
             }
+        if server.transport_type not in ("STDIO", "SSE"):
+            return {
+                "message": "该MCP服务类型不支持，仅支持SSE、STDIO",
+                "status": 400,
+            }
         try:
-            if server.transport_type == "STDIO":
-                args = []
-                if server.stdio_arguments:
-                    args = [word for word in server.stdio_arguments.split(" ") if word]
-                client = MCPClient(
-                    command_or_url=server.stdio_command,
-                    args=args,
-                    env=server.stdio_env,
-                    timeout=server.timeout,
-                )
-                return {
-                    "status": 200,
-                    "result": asyncio.run(client.call_tool(tool.name, arguments))
-                }
-            elif server.transport_type == "SSE":
-                client = MCPClient(
-                    command_or_url=server.http_url,
-                    headers=server.headers or {},
-                    timeout=server.timeout,
-                )
-                return {
-                    "status": 200,
-                    "result": asyncio.run(client.call_tool(tool.name, arguments))
-                }
-            else:
-                return {
-                    "message": "该MCP服务类型不支持，仅支持SSE、STDIO",
-                    "status": 400,
-                }
+            # 复用该服务的长连接会话，STDIO 服务不会每次调用都重新启动子进程
+            spec = McpServerSpec.from_server(server)
+            return {
+                "status": 200,
+                "result": mcp_session_manager.call_tool_sync(spec, tool.name, arguments),
+            }
         except Exception as e:
             error_msg = []
             for error_message in handle_exception(e):
@@ -472,18 +452,14 @@ class McpToolService:
             yield {"flow_type": "mcp", "event": "error", "data": "MCP 服务不存在"}
             return
         try:
-            if server.transport_type == "STDIO":
-                tools_func = self.sync_tools_from_stdio
-            elif server.transport_type == "SSE":
-                tools_func = self.sync_tools_from_sse
-            else:
+            if server.transport_type not in ("STDIO", "SSE"):
                 yield {
                     "flow_type": "mcp",
                     "event": "error",
                     "data": f"暂不支持的该 MCP 服务类型: {server.transport_type}",
                 }
                 return
-            for x in self.sync_event_stream(tools_func(server)):
+            for x in self.sync_event_stream(self.sync_tools_from_session(server)):
                 logging.info(f"同步工具信息: {x}")
                 if x and x.get("event") == "finish" and x.get("data"):
                     # 获取当前数据库中的工具
@@ -580,144 +556,47 @@ class McpToolService:
         return mcpTool
 
     def sync_event_stream(self, async_gen):
-        q = queue.Queue()
-
-        def runner():
-            try:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-
-                async def consume():
-                    async for msg in async_gen:
-                        q.put(msg)
-
-                loop.run_until_complete(consume())
-            except Exception as e:
-                logging.error(f"同步工具时发生错误: {str(e)}", exc_info=True)
-                q.put({"flow_type": "mcp", "event": "error", "data": str(e)})
-            finally:
-                q.put(None)  # 结束信号
-
-        threading.Thread(target=runner, daemon=True).start()
-        while True:
-            item = q.get()
-            if item is None:
-                break
-            yield item
-
-    async def sync_tools_from_stdio(self, server: McpServer):
-        args = []
-        if server.stdio_arguments:
-            args = [word for word in server.stdio_arguments.split(" ") if word]
+        """在MCP会话线程中消费异步生成器，不再为每次同步新建线程和事件循环"""
         try:
-            server_params = StdioServerParameters(
-                command=server.stdio_command, args=args, env=server.stdio_env
-            )
+            yield from mcp_session_manager.iterate(async_gen)
         except Exception as e:
-            logging.error(f"创建 MCP STDIO 客户端失败: {str(e)}")
-            yield {
-                "flow_type": "mcp",
-                "event": "error",
-                "data": f"创建 MCP STDIO 客户端失败: {str(e)}",
-            }
-            return
-
-        try:
-            tools = []
-            async with stdio_client(server_params) as (read_stream, write_stream):
-                logging.info(
-                    f"开始连接 MCP 服务: {server.stdio_command} {args} ,timeout={server.timeout}"
-                )
-                async with ClientSession(
-                    read_stream=read_stream,
-                    write_stream=write_stream,
-                    sampling_callback=handle_stido_callback,
-                    read_timeout_seconds=timedelta(seconds=server.timeout),
-                ) as session:
-                    yield {
-                        "flow_type": "mcp",
-                        "event": "chunk",
-                        "data": "初始化MCP客户端",
-                    }
-                    await session.initialize()
+            logging.error(f"同步工具时发生错误: {str(e)}", exc_info=True)
+            yield {"flow_type": "mcp", "event": "error", "data": str(e)}
 
-                    yield {
-                        "flow_type": "mcp",
-                        "event": "chunk",
-                        "data": "开始获取工具列表",
-                    }
-                    response = await session.list_tools()
-
-                    for tool in response.tools:
-                        tool_dict = tool.model_dump()
-                        tools.append(tool_dict)
-                        tool_name = tool_dict["name"]
-                        yield {
-                            "flow_type": "mcp",
-                            "event": "chunk",
-                            "data": f"同步工具: [{tool_name}] 成功",
-                        }
-                    if not tools:
-                        yield {
-                            "flow_type": "mcp",
-                            "event": "error",
-                            "data": "获取工具列表成功，单查询到0个工具，故失败！请检查该MCP是否提供Tool调用能力。",
-                        }
-                    else:
-                        yield {"flow_type": "mcp", "event": "finish", "data": tools}
-        except Exception as e:
-            for error_msg in handle_exception(e):
-                yield error_msg
+    async def sync_tools_from_session(self, server: McpServer):
+        """通过会话管理器获取工具列表。
 
-    async def sync_tools_from_sse(self, server: McpServer):
+        同步时总是重新获取工具列表并刷新缓存，但会复用已经建立的会话。
+        """
         try:
+            spec = McpServerSpec.from_server(server)
             yield {"flow_type": "mcp", "event": "chunk", "data": "初始化MCP客户端"}
-            async with sse_client(
-                url=server.http_url,
-                headers=server.headers,
-                timeout=server.timeout or 30,
-            ) as streams:
-                async with mcp.ClientSession(*streams) as session:
-                    await session.initialize()
-                    yield {
-                        "flow_type": "mcp",
-                        "event": "chunk",
-                        "data": "开始获取工具列表",
-                    }
-                    response = await session.list_tools()
-                    if response and response.tools:
-                        tools = []
-                        for tool in response.tools:
-                            tool_dict = tool.model_dump()
-                            tools.append(tool_dict)
-                            tool_name = tool_dict["name"]
-                            yield {
-                                "flow_type": "mcp",
-                                "event": "chunk",
-                                "data": f"同步工具: [{tool_name}] 成功",
-                            }
-                        yield {"flow_type": "mcp", "event": "finish", "data": tools}
-                    else:
-                        yield {
-                            "flow_type": "mcp",
-                            "event": "error",
-                            "data": "获取工具列表成功，单查询到0个工具，故失败！请检查该MCP是否提供Tool调用能力。",
-                        }
+            logging.info(
+                f"开始连接 MCP 服务: {spec.command_or_url} {list(spec.args)} ,timeout={spec.timeout}"
+            )
+            yield {"flow_type": "mcp", "event": "chunk", "data": "开始获取工具列表"}
+            tools = []
+            for tool in await mcp_session_manager.list_tools(spec, refresh=True):
+                tool_dict = tool.model_dump()
+                tools.append(tool_dict)
+                yield {
+                    "flow_type": "mcp",
+                    "event": "chunk",
+                    "data": f"同步工具: [{tool_dict['name']}] 成功",
+                }
+            if not tools:
+                yield {
+                    "flow_type": "mcp",
+                    "event": "error",
+                    "data": "获取工具列表成功，单查询到0个工具，故失败！请检查该MCP是否提供Tool调用能力。",
+                }
+            else:
+                yield {"flow_type": "mcp", "event": "finish", "data": tools}
         except Exception as e:
             for error_msg in handle_exception(e):
                 yield error_msg
 
 
-async def handle_stido_callback(
-    context: RequestContext[ClientSession, None],
-    params: CreateMessageRequestParams,
-):
-    # 获取工具发送的消息
-    logging.info(
-        f"---------------获取工具发送的消息: {params.messages[0].content.text}"
-    )
-
-
 def handle_exception(e: Exception):
     """处理异常组"""
     if isinstance(e, ExceptionGroup):
@@ -0,0 +1,502 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Additional Notice:
+# When modifying, redistributing, or creating derivative works of this software,
+# you must retain the original LazyCraft logo and the GitHub link icon that directs
+# to the official repository: https://github.com/LazyAGI/LazyLLM
+
+
+import asyncio
+import hashlib
+import logging
+import os
+import queue
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+import anyio
+from mcp import ClientSession, McpError, StdioServerParameters
+from mcp.client.sse import sse_client
+from mcp.client.stdio import stdio_client
+from mcp.types import CONNECTION_CLOSED
+
+from configs import lazy_config
+from utils.util_redis import redis_client
+
+# 关闭会话时等待传输层退出的最长时间（秒）
+CLOSE_TIMEOUT = 5
+# 健康检查 ping 的超时时间上限（秒）
+PING_TIMEOUT = 5
+
+
+@dataclass(frozen=True)
+class McpServerSpec:
+    """MCP 服务的连接参数，参数相同的调用共享同一个会话"""
+
+    transport: str
+    command_or_url: str
+    args: tuple = ()
+    env: tuple = ()
+    headers: tuple = ()
+    timeout: float = 30
+
+    @classmethod
+    def from_server(cls, server) -> "McpServerSpec":
+        """根据 McpServer 记录构造连接参数"""
+        if server.transport_type == "STDIO":
+            args = [word for word in (server.stdio_arguments or "").split(" ") if word]
+            return cls(
+                transport="STDIO",
+                command_or_url=server.stdio_command,
+                args=tuple(args),
+                env=tuple(sorted((server.stdio_env or {}).items())),
+                timeout=server.timeout or 30,
+            )
+        if server.transport_type == "SSE":
+            return cls(
+                transport="SSE",
+                command_or_url=server.http_url,
+                headers=tuple(sorted((server.headers or {}).items())),
+                timeout=server.timeout or 30,
+            )
+        raise ValueError(f"不支持的MCP服务传输类型: {server.transport_type}")
+
+    @classmethod
+    def from_node_args(cls, command_or_url, args=None, env=None, headers=None, timeout=30):
+        """根据 McpToolNode 的节点参数构造连接参数，与 MCPClient 一样按 URL 判断传输类型"""
+        is_url = urlparse(command_or_url).scheme in ("http", "https")
+        return cls(
+            transport="SSE" if is_url else "STDIO",
+            command_or_url=command_or_url,
+            args=() if is_url else tuple(args or ()),
+            env=() if is_url else tuple(sorted((env or {}).items())),
+            headers=tuple(sorted((headers or {}).items())) if is_url else (),
+            timeout=timeout or 30,
+        )
+
+    @property
+    def version_key(self) -> str:
+        """服务版本号在 Redis 中的键，按传输类型和地址区分，超时等调用参数不同的连接共享同一版本"""
+        # 地址中可能含有凭证，只使用其哈希作为键
+        digest = hashlib.sha256(f"{self.transport}:{self.command_or_url}".encode("utf-8")).hexdigest()
+        return f"mcp_server_version:{digest}"
+
+    def transport_context(self):
+        if self.transport == "STDIO":
+            params = StdioServerParameters(
+                command=self.command_or_url, args=list(self.args), env=dict(self.env) or None
+            )
+            return stdio_client(params)
+        return sse_client(url=self.command_or_url, headers=dict(self.headers), timeout=self.timeout)
+
+
+class _PooledSession:
+    """一个长连接的 MCP 会话。
+
+    anyio 的传输层上下文必须在同一个任务中进入和退出，因此每个会话由专属任务持有，
+    该任务完成握手后一直等待关闭信号；其他任务只通过 session 发送请求。
+    """
+
+    def __init__(self, spec: McpServerSpec, max_concurrency: int, version: Optional[int] = None):
+        self.spec = spec
+        self.version = version
+        self.session: Optional[ClientSession] = None
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.ready = asyncio.get_running_loop().create_future()
+        self.closing = asyncio.Event()
+        self.closed = False
+        self.retired = False
+        self.in_flight = 0
+        self.last_used = time.monotonic()
+        self.task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        try:
+            async with AsyncExitStack() as stack:
+                streams = await stack.enter_async_context(self.spec.transport_context())
+                session = await stack.enter_async_context(
+                    ClientSession(
+                        streams[0],
+                        streams[1],
+                        read_timeout_seconds=timedelta(seconds=self.spec.timeout),
+                    )
+                )
+                await session.initialize()
+                self.session = session
+                self.ready.set_result(session)
+                await self.closing.wait()
+        except BaseException as e:
+            if not self.ready.done():
+                self.ready.set_exception(e)
+            elif not isinstance(e, asyncio.CancelledError):
+                logging.warning(f"MCP 会话异常退出 {self.spec.command_or_url}: {e}")
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        finally:
+            self.closed = True
+
+    async def close(self):
+        self.closing.set()
+        try:
+            await asyncio.wait_for(asyncio.shield(self.task), CLOSE_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.task.cancel()
+        except BaseException:
+            pass
+
+
+class McpSessionManager:
+    """进程级 MCP 会话管理器。
+
+    所有会话运行在同一个后台事件循环线程中，按连接参数复用：
+    STDIO 服务只在首次调用时启动子进程并握手，SSE 服务保持长连接。
+    单个会话的并发请求数受 ``max_concurrency`` 限制；空闲超过 ``idle_timeout``
+    的会话被关闭，空闲较久的会话在复用前通过 ping 做健康检查；
+    ``list_tools`` 的结果按连接参数缓存 ``tools_ttl`` 秒。
+
+    服务配置变更、停用或删除时递增 Redis 中该服务的版本号，各进程在借出会话和读取工具缓存时
+    比对版本号，因此其他进程中的会话和工具列表同样失效；Redis 不可用时由空闲超时和缓存过期兜底。
+    失效或断开的会话先从池中移除，等正在进行的请求结束后再关闭。
+    """
+
+    def __init__(
+        self,
+        idle_timeout: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        max_sessions: Optional[int] = None,
+        health_interval: Optional[float] = None,
+        tools_ttl: Optional[float] = None,
+    ):
+        self._idle_timeout = idle_timeout
+        self._max_concurrency = max_concurrency
+        self._max_sessions = max_sessions
+        self._health_interval = health_interval
+        self._tools_ttl = tools_ttl
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pid = None
+        # 以下状态只在事件循环线程中访问
+        self._sessions: dict[McpServerSpec, _PooledSession] = {}
+        self._tools: dict[McpServerSpec, tuple[list, float, Optional[int]]] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def _option(self, value, name):
+        return value if value is not None else getattr(lazy_config, name)
+
+    @property
+    def idle_timeout(self) -> float:
+        return self._option(self._idle_timeout, "MCP_SESSION_IDLE_TIMEOUT")
+
+    @property
+    def max_concurrency(self) -> int:
+        return self._option(self._max_concurrency, "MCP_SESSION_MAX_CONCURRENCY")
+
+    @property
+    def max_sessions(self) -> int:
+        return self._option(self._max_sessions, "MCP_SESSION_MAX_SESSIONS")
+
+    @property
+    def health_interval(self) -> float:
+        return self._option(self._health_interval, "MCP_SESSION_HEALTH_INTERVAL")
+
+    @property
+    def tools_ttl(self) -> float:
+        return self._option(self._tools_ttl, "MCP_TOOLS_CACHE_TTL")
+
+    # ==================== 事件循环线程 ====================
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is not None and self._pid == os.getpid():
+                return self._loop
+            # fork 出的子进程中没有父进程的循环线程，父进程的子进程和连接也不能复用
+            self._sessions, self._tools, self._sweeper = {}, {}, None
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="mcp-session-loop", daemon=True
+            ).start()
+            self._loop, self._pid = loop, os.getpid()
+            return loop
+
+    def submit(self, coro):
+        """在会话线程中执行协程，返回 concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """在会话线程中执行协程并同步等待结果"""
+        return self.submit(coro).result(timeout)
+
+    def iterate(self, async_gen: AsyncIterator) -> Iterator:
+        """在会话线程中消费异步生成器，同步地逐个产出结果"""
+        items = queue.Queue()
+        done = object()
+
+        async def consume():
+            try:
+                async for item in async_gen:
+                    items.put(item)
+            finally:
+                items.put(done)
+
+        future = self.submit(consume())
+        while True:
+            item = items.get()
+            if item is done:
+                break
+            yield item
+        future.result()
+
+    # ==================== 会话管理（事件循环线程内） ====================
+
+    @staticmethod
+    async def _version(spec: McpServerSpec) -> Optional[int]:
+        try:
+            value = await asyncio.to_thread(redis_client.get, spec.version_key)
+            return int(value) if value is not None else 0
+        except Exception as e:
+            logging.warning(f"读取MCP服务版本失败: {e}")
+            return None
+
+    @staticmethod
+    def _stale(cached_version: Optional[int], version: Optional[int]) -> bool:
+        # 读取不到版本号时沿用已有会话和缓存
+        return version is not None and cached_version != version
+
+    async def _acquire(self, spec: McpServerSpec) -> _PooledSession:
+        version = await self._version(spec)
+        entry = self._sessions.get(spec)
+        if entry is not None and self._stale(entry.version, version):
+            await self._retire(entry)
+            entry = None
+        if entry is not None and not entry.closed and entry.ready.done() and not entry.in_flight:
+            if time.monotonic() - entry.last_used > self.health_interval and not await self._ping(entry):
+                await self._discard(entry)
+                entry = None
+        if entry is None or entry.closed:
+            self._ensure_sweeper()
+            entry = _PooledSession(spec, self.max_concurrency, version)
+            self._sessions[spec] = entry
+            await self._evict_excess()
+        try:
+            await asyncio.shield(entry.ready)
+        except BaseException:
+            if self._sessions.get(spec) is entry:
+                del self._sessions[spec]
+            raise
+        return entry
+
+    async def _ping(self, entry: _PooledSession) -> bool:
+        try:
+            await asyncio.wait_for(entry.session.send_ping(), min(PING_TIMEOUT, entry.spec.timeout))
+            entry.last_used = time.monotonic()
+            return True
+        except Exception as e:
+            logging.info(f"MCP 会话健康检查失败 {entry.spec.command_or_url}: {e}")
+            return False
+
+    async def _discard(self, entry: _PooledSession):
+        if self._sessions.get(entry.spec) is entry:
+            del self._sessions[entry.spec]
+        await entry.close()
+
+    async def _retire(self, entry: _PooledSession):
+        """从池中移除会话，新请求改用新会话，正在进行的请求结束后再关闭"""
+        if self._sessions.get(entry.spec) is entry:
+            del self._sessions[entry.spec]
+        entry.retired = True
+        if not entry.in_flight:
+            await entry.close()
+
+    async def _evict_excess(self):
+        idle = sorted(
+            (e for e in self._sessions.values() if not e.in_flight and e.ready.done()),
+            key=lambda e: e.last_used,
+        )
+        while len(self._sessions) > self.max_sessions and idle:
+            await self._discard(idle.pop(0))
+
+    def _ensure_sweeper(self):
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    async def _sweep_loop(self):
+        while self._sessions:
+            await asyncio.sleep(min(self.idle_timeout, self.health_interval) / 2)
+            await self.sweep()
+
+    async def sweep(self):
+        """关闭空闲超时或已断开的会话"""
+        now = time.monotonic()
+        for entry in list(self._sessions.values()):
+            if entry.closed or (not entry.in_flight and now - entry.last_used > self.idle_timeout):
+                await self._discard(entry)
+
+    async def _request(self, spec: McpServerSpec, send):
+        for attempt in range(2):
+            entry = await self._acquire(spec)
+            async with entry.semaphore:
+                entry.in_flight += 1
+                try:
+                    return await send(entry.session)
+                except (anyio.ClosedResourceError, anyio.BrokenResourceError):
+                    # 会话已断开，请求没有发出，换一个新会话重试一次
+                    await self._retire(entry)
+                    if attempt:
+                        raise
+                except McpError as e:
+                    # 只有连接断开的会话不再复用，工具返回的错误不影响同一会话上的其他请求
+                    if e.error.code == CONNECTION_CLOSED:
+                        await self._retire(entry)
+                    raise
+                finally:
+                    entry.in_flight -= 1
+                    entry.last_used = time.monotonic()
+                    if entry.retired and not entry.in_flight:
+                        await entry.close()
+
+    async def call_tool(self, spec: McpServerSpec, tool_name: str, arguments: dict):
+        """调用 MCP 工具，复用已建立的会话"""
+        return await self._request(spec, lambda session: session.call_tool(tool_name, arguments))
+
+    async def list_tools(self, spec: McpServerSpec, refresh: bool = False) -> list:
+        """获取 MCP 服务提供的工具列表，结果按连接参数缓存"""
+        cached = self._tools.get(spec)
+        if not refresh and cached and time.monotonic() - cached[1] < self.tools_ttl:
+            version = await self._version(spec)
+            if not self._stale(cached[2], version):
+                return cached[0]
+
+        async def list_all(session):
+            tools, cursor = [], None
+            while True:
+                result = await session.list_tools(cursor)
+                tools.extend(result.tools)
+                cursor = result.nextCursor
+                if not cursor:
+                    return tools
+
+        version = await self._version(spec)
+        tools = await self._request(spec, list_all)
+        self._tools[spec] = (tools, time.monotonic(), version)
+        return tools
+
+    async def close(self, spec: McpServerSpec):
+        """关闭指定服务的会话并清除工具缓存，正在进行的请求结束后会话才关闭"""
+        self._tools.pop(spec, None)
+        entry = self._sessions.get(spec)
+        if entry is not None:
+            await self._retire(entry)
+
+    async def close_all(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+        self._tools.clear()
+        for entry in list(self._sessions.values()):
+            await self._discard(entry)
+
+    # ==================== 同步接口 ====================
+
+    def call_tool_sync(self, spec: McpServerSpec, tool_name: str, arguments: dict):
+        return self.run(self.call_tool(spec, tool_name, arguments))
+
+    def list_tools_sync(self, spec: McpServerSpec, refresh: bool = False) -> list:
+        return self.run(self.list_tools(spec, refresh))
+
+    def invalidate(self, server):
+        """MCP 服务配置变更、停用或删除时关闭其会话，其他进程借出会话时通过版本号感知"""
+        try:
+            spec = McpServerSpec.from_server(server)
+        except ValueError:
+            return
+        try:
+            redis_client.incr(spec.version_key)
+        except Exception as e:
+            logging.warning(f"更新MCP服务版本失败: {e}")
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                return
+        self.run(self.close(spec), CLOSE_TIMEOUT * 2)
+
+    def stats(self) -> dict:
+        async def collect():
+            return {
+                "sessions": len(self._sessions),
+                "in_flight": sum(e.in_flight for e in self._sessions.values()),
+                "cached_tools": len(self._tools),
+            }
+
+        return self.run(collect())
+
+    def shutdown(self):
+        """关闭全部会话并停止事件循环线程"""
+        with self._lock:
+            loop, pid = self._loop, self._pid
+            self._loop = None
+        if loop is None or pid != os.getpid():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self.close_all(), loop).result(CLOSE_TIMEOUT * 2)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+
+
+class PooledMcpClient:
+    """与 lazyllm MCPClient 接口一致的客户端，调用通过会话管理器复用连接"""
+
+    def __init__(self, spec: McpServerSpec, manager: Optional[McpSessionManager] = None):
+        self._spec = spec
+        self._manager = manager or mcp_session_manager
+
+    async def call_tool(self, tool_name: str, arguments: dict) -> Any:
+        return await asyncio.wrap_future(
+            self._manager.submit(self._manager.call_tool(self._spec, tool_name, arguments))
+        )
+
+    async def list_tools(self) -> list:
+        return await asyncio.wrap_future(self._manager.submit(self._manager.list_tools(self._spec)))
+
+
+def make_pooled_mcp_tool(
+    command_or_url: str,
+    tool_name: str,
+    args: Optional[list[str]] = None,
+    env: dict[str, str] = None,
+    headers: dict[str, str] = None,
+    timeout: float = 5,
+):
+    """构建 MCPTool 节点，替代 lazyllm 默认每次调用都重新握手的实现"""
+    from lazyllm.tools.mcp.tool_adaptor import generate_lazyllm_tool
+
+    spec = McpServerSpec.from_node_args(command_or_url, args, env, headers, timeout)
+    tools = [t for t in mcp_session_manager.list_tools_sync(spec) if t.name == tool_name]
+    assert len(tools) == 1, f'Current MCP client does not support tool "{tool_name}". \
+        Please check if the tool name is correct.'
+    return generate_lazyllm_tool(PooledMcpClient(spec), tools[0])
+
+
+def install_mcp_tool_constructor():
+    """将 lazyllm 引擎中 MCPTool 节点的构建函数替换为复用会话的实现"""
+    from lazyllm.engine.engine import NodeConstructor
+
+    NodeConstructor.register("MCPTool", subitems=["tools"])(make_pooled_mcp_tool)
+
+
+mcp_session_manager = McpSessionManager()
@@ -0,0 +1,264 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Additional Notice:
+# When modifying, redistributing, or creating derivative works of this software,
+# you must retain the original LazyCraft logo and the GitHub link icon that directs
+# to the official repository: https://github.com/LazyAGI/LazyLLM
+
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from typing import Optional
+
+from configs import lazy_config
+
+MANIFEST_NAME = "manifest.json"
+DATA_NAME = "data.part"
+
+
+class ChunkedUpload:
+    """模型文件的分片上传。
+
+    分片目录中保存清单文件 ``manifest.json`` 和每个分片的记录 ``chunk_<n>.json``
+    （大小与 sha256 校验值）。客户端提供分片大小和文件总大小时，服务端预先创建
+    目标文件，每个分片按偏移量直接写入，多个分片可以由不同请求同时写入，合并时无需
+    再复制数据；否则每个分片单独保存，合并时按顺序流式拼接。
+
+    所有写入都按 ``MODEL_UPLOAD_BUFFER_SIZE`` 分块读取，内存占用与分片大小无关。
+    已记录的分片即为上传成功的分片，连接中断后客户端查询缺失分片后续传即可。
+    """
+
+    def __init__(self, chunk_dir: str, filename: str):
+        self.chunk_dir = chunk_dir
+        self.filename = filename
+        self.manifest_path = os.path.join(chunk_dir, MANIFEST_NAME)
+        self.data_path = os.path.join(chunk_dir, DATA_NAME)
+
+    def _record_path(self, chunk_number: int) -> str:
+        return os.path.join(self.chunk_dir, f"chunk_{chunk_number}.json")
+
+    def _chunk_path(self, chunk_number: int) -> str:
+        return os.path.join(self.chunk_dir, f"chunk_{chunk_number}")
+
+    def _write_atomic(self, path: str, content: dict, exclusive: bool = False) -> bool:
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(content, f)
+        try:
+            if exclusive:
+                # link 在目标已存在时失败，多个请求同时初始化时只有一个生效
+                os.link(tmp_path, path)
+            else:
+                os.replace(tmp_path, path)
+                return True
+        except FileExistsError:
+            return False
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return True
+
+    def manifest(self) -> Optional[dict]:
+        """读取上传清单，尚未开始上传时返回None"""
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def prepare(
+        self,
+        total_chunks: int,
+        chunk_size: Optional[int] = None,
+        total_size: Optional[int] = None,
+    ) -> dict:
+        """创建或校验上传清单，按偏移写入时预分配目标文件。
+
+        Args:
+            total_chunks (int): 总分片数。
+            chunk_size (int, optional): 除最后一片外每个分片的大小。
+            total_size (int, optional): 文件总大小。
+
+        Returns:
+            dict: 上传清单。
+
+        Raises:
+            ValueError: 分片参数不合法，或同名文件已在以不同参数上传时抛出。
+        """
+        positional = bool(chunk_size and total_size)
+        if positional and not (
+            chunk_size * (total_chunks - 1) < total_size <= chunk_size * total_chunks
+        ):
+            raise ValueError("分片大小与文件总大小不匹配")
+        expected = {
+            "filename": self.filename,
+            "total_chunks": total_chunks,
+            "chunk_size": chunk_size if positional else None,
+            "total_size": total_size if positional else None,
+        }
+        manifest = self.manifest()
+        if manifest is None:
+            os.makedirs(self.chunk_dir, exist_ok=True)
+            if not self._write_atomic(self.manifest_path, expected, exclusive=True):
+                manifest = self.manifest()
+        if manifest is not None and manifest != expected:
+            # 不能丢弃可能仍在进行中的上传，需先删除已上传的分片再重新上传
+            raise ValueError("同名文件正在以不同参数上传，请删除已上传的分片后重新上传")
+        if positional:
+            fd = os.open(self.data_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if os.fstat(fd).st_size < total_size:
+                    os.ftruncate(fd, total_size)
+            finally:
+                os.close(fd)
+        return expected
+
+    def _expected_size(self, manifest: dict, chunk_number: int) -> Optional[int]:
+        if not manifest["chunk_size"]:
+            return None
+        if chunk_number == manifest["total_chunks"] - 1:
+            return manifest["total_size"] - manifest["chunk_size"] * chunk_number
+        return manifest["chunk_size"]
+
+    def write_chunk(self, chunk_number: int, stream, checksum: Optional[str] = None) -> dict:
+        """流式写入一个分片并记录校验值。
+
+        Args:
+            chunk_number (int): 分片编号，从0开始。
+            stream: 可读的二进制流。
+            checksum (str, optional): 客户端计算的分片 sha256，不一致时拒绝该分片。
+
+        Returns:
+            dict: 分片记录，包括 size 和 sha256。
+
+        Raises:
+            ValueError: 未初始化清单、分片编号越界、大小或校验值不一致时抛出。
+        """
+        manifest = self.manifest()
+        if manifest is None:
+            raise ValueError("上传未初始化")
+        if not 0 <= chunk_number < manifest["total_chunks"]:
+            raise ValueError(f"分片编号超出范围: {chunk_number}")
+
+        buffer_size = lazy_config.MODEL_UPLOAD_BUFFER_SIZE
+        expected_size = self._expected_size(manifest, chunk_number)
+        digest = hashlib.sha256()
+        size = 0
+        if expected_size is not None:
+            offset = manifest["chunk_size"] * chunk_number
+            fd = os.open(self.data_path, os.O_WRONLY)
+            try:
+                while block := stream.read(buffer_size):
+                    if size + len(block) > expected_size:
+                        raise ValueError(f"分片 {chunk_number} 大小超出预期")
+                    os.pwrite(fd, block, offset + size)
+                    digest.update(block)
+                    size += len(block)
+            finally:
+                os.close(fd)
+            if size != expected_size:
+                raise ValueError(
+                    f"分片 {chunk_number} 大小不完整: {size}/{expected_size}"
+                )
+            if checksum and digest.hexdigest() != checksum.lower():
+                raise ValueError(f"分片 {chunk_number} 校验失败")
+        else:
+            tmp_path = f"{self._chunk_path(chunk_number)}.{uuid.uuid4().hex}.tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    while block := stream.read(buffer_size):
+                        f.write(block)
+                        digest.update(block)
+                        size += len(block)
+                if checksum and digest.hexdigest() != checksum.lower():
+                    raise ValueError(f"分片 {chunk_number} 校验失败")
+                os.replace(tmp_path, self._chunk_path(chunk_number))
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+        record = {"size": size, "sha256": digest.hexdigest()}
+        self._write_atomic(self._record_path(chunk_number), record)
+        return record
+
+    def uploaded_chunks(self) -> dict:
+        """已成功写入的分片记录，键为分片编号"""
+        chunks = {}
+        if not os.path.isdir(self.chunk_dir):
+            return chunks
+        for name in os.listdir(self.chunk_dir):
+            if not (name.startswith("chunk_") and name.endswith(".json")):
+                continue
+            chunk_number = int(name[len("chunk_"):-len(".json")])
+            with open(os.path.join(self.chunk_dir, name)) as f:
+                chunks[chunk_number] = json.load(f)
+        return chunks
+
+    def status(self) -> dict:
+        """续传查询：返回总分片数、已上传和缺失的分片编号"""
+        manifest = self.manifest()
+        if manifest is None:
+            return {"total_chunks": 0, "uploaded": [], "missing": []}
+        uploaded = self.uploaded_chunks()
+        return {
+            "total_chunks": manifest["total_chunks"],
+            "chunk_size": manifest["chunk_size"],
+            "total_size": manifest["total_size"],
+            "uploaded": sorted(uploaded),
+            "missing": [
+                n for n in range(manifest["total_chunks"]) if n not in uploaded
+            ],
+        }
+
+    def assemble(self) -> str:
+        """确认分片完整并得到完整文件。
+
+        按偏移写入的文件已经完整，以上传文件名建立硬链接；单独保存的分片按顺序流式拼接到
+        临时文件，完成后再重命名。已上传的数据保持不变，后续处理失败时可以重新合并。
+
+        Returns:
+            str: 分片目录中完整文件的路径，文件名与上传文件名一致。
+
+        Raises:
+            ValueError: 存在缺失分片时抛出。
+        """
+        status = self.status()
+        if not status["total_chunks"]:
+            raise ValueError("上传未初始化")
+        if status["missing"]:
+            raise ValueError(f"分片未上传完整，缺失分片: {status['missing']}")
+
+        target_path = os.path.join(self.chunk_dir, os.path.basename(self.filename))
+        tmp_path = f"{target_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            if status["chunk_size"]:
+                os.link(self.data_path, tmp_path)
+            else:
+                buffer_size = lazy_config.MODEL_UPLOAD_BUFFER_SIZE
+                with open(tmp_path, "wb") as outfile:
+                    for chunk_number in range(status["total_chunks"]):
+                        with open(self._chunk_path(chunk_number), "rb") as infile:
+                            shutil.copyfileobj(infile, outfile, buffer_size)
+            os.replace(tmp_path, target_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return target_path
+
+    def cleanup(self) -> None:
+        """删除分片目录"""
+        shutil.rmtree(self.chunk_dir, ignore_errors=True)
@@ -521,9 +521,13 @@ class modelHubUploadFileChunkApi(Resource):
             total_chunks (int): 总分片数。
             filename (str): 文件名。
             file_dir (str): 文件目录。
+            chunk_size (int, optional): 除最后一片外每个分片的大小，与 total_size
+                同时提供时分片直接写入预分配的目标文件。
+            total_size (int, optional): 文件总大小。
+            chunk_sha256 (str, optional): 分片的 sha256 校验值。
             
         Returns:
-            dict: 包含上传结果的字典。
+            dict: 包含上传结果和分片校验值的字典。
             
         Raises:
             ValueError: 当未上传文件或上传多个文件时抛出。
@@ -540,10 +544,41 @@ class modelHubUploadFileChunkApi(Resource):
         if len(request.files) > 1:
             raise ValueError("请上传单个文件")
 
-        ModelService(current_user).upload_file_chunk(
-            file, filename, file_dir, chunk_number, total_chunks
+        record = ModelService(current_user).upload_file_chunk(
+            file,
+            filename,
+            file_dir,
+            chunk_number,
+            total_chunks,
+            chunk_size=request.form.get("chunk_size", type=int),
+            total_size=request.form.get("total_size", type=int),
+            checksum=request.form.get("chunk_sha256"),
+        )
+        return {
+            "message": f"当前分片 {chunk_number + 1}/{total_chunks} 上传成功",
+            "sha256": record["sha256"],
+        }
+
+
+class modelHubUploadFileChunkStatusApi(Resource):
+    @login_required
+    def get(self):
+        """查询模型文件分片上传进度，用于断点续传。
+        
+        Args:
+            file_name (str): 文件名（必需）。
+            file_dir (str): 文件目录（必需）。
+            
+        Returns:
+            dict: 总分片数、已上传分片编号和缺失分片编号。
+        """
+        parser = reqparse.RequestParser()
+        parser.add_argument("file_name", type=str, required=True, location="args")
+        parser.add_argument("file_dir", type=str, required=True, location="args")
+        args = parser.parse_args()
+        return ModelService(current_user).get_uploaded_chunks(
+            args["file_name"], args["file_dir"]
         )
-        return {"message": f"当前分片 {chunk_number + 1}/{total_chunks} 上传成功"}
 
 
 class modelHubUploadFileMergeApi(Resource):
@@ -931,6 +966,7 @@ api.add_resource(modelHubUpdateApi, "/mh/update")
 api.add_resource(modelHubDeleteApi, "/mh/delete")
 api.add_resource(modelIconUploadApi, "/mh/upload/icon")
 api.add_resource(modelHubUploadFileChunkApi, "/mh/upload/chunk")
+api.add_resource(modelHubUploadFileChunkStatusApi, "/mh/upload/chunk/status")
 api.add_resource(modelHubUploadFileMergeApi, "/mh/upload/merge")
 api.add_resource(ModelHubDeleteUploadedFileApi, "/mh/delete_uploaded_file")
 api.add_resource(modelHubCheckModelNameApi, "/mh/check/model_name")
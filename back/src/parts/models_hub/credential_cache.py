@@ -0,0 +1,222 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Additional Notice:
+# When modifying, redistributing, or creating derivative works of this software,
+# you must retain the original LazyCraft logo and the GitHub link icon that directs
+# to the official repository: https://github.com/LazyAGI/LazyLLM
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from flask_login import current_user
+
+from configs import lazy_config
+from core.account_manager import AccountService, CommonError
+from models.model_account import Account
+from utils.util_database import db
+from parts.app.node_run.graph_cache import (dependency_key,
+                                           record_graph_dependency)
+from utils.util_redis import redis_client
+
+from .model import Lazymodel, LazyModelConfigInfo, LazymodelOnlineModels
+
+
+# 租户凭证版本号同时作为画布缓存的依赖：批量删除等绕过 ORM 会话的修改也会调用
+# invalidate，已转换的画布随之失效，不会继续使用被清除或撤销的 api_key
+CREDENTIAL_DEPENDENCY_KIND = "model_credentials"
+
+
+def _version_key(tenant_id) -> str:
+    return dependency_key(CREDENTIAL_DEPENDENCY_KIND, tenant_id)
+
+
+def current_credential_tenant_id():
+    """与 ModelService.get_model_apikey_by_id 一致：优先当前用户的租户，否则使用管理员的租户"""
+    if current_user:
+        return current_user.current_tenant_id
+    admin_account = AccountService.load_user(user_id=Account.get_administrator_id())
+    return admin_account.current_tenant_id
+
+
+@dataclass(frozen=True)
+class CredentialSnapshot:
+    """某个租户在线模型凭证的只读快照，在 _load 中一次填充完整，之后被多个线程共享读取"""
+
+    api_keys: dict[int, dict] = field(default_factory=dict)
+    model_ids: dict[str, int] = field(default_factory=dict)
+    version: Optional[int] = None
+    loaded_at: float = 0.0
+
+
+class ModelCredentialCache:
+    """按租户缓存在线模型的 API key 与模型名称到ID的映射。
+
+    每个租户的凭证用两次查询整体加载，进程内缓存 ``MODEL_CREDENTIAL_CACHE_TTL`` 秒。
+    ``ModelService`` 修改或清除 api_key 后递增 Redis 中的租户版本号，
+    各进程读取快照时比对版本号，因此修改立即生效；Redis 不可用时仅依赖过期时间。
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self._ttl = ttl or lazy_config.MODEL_CREDENTIAL_CACHE_TTL
+        self._entries: dict[str, CredentialSnapshot] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _remote_version(tenant_id) -> Optional[int]:
+        try:
+            value = redis_client.get(_version_key(tenant_id))
+            return int(value) if value is not None else 0
+        except Exception as e:
+            logging.warning(f"读取模型凭证版本失败: {e}")
+            return None
+
+    @staticmethod
+    def _load(tenant_id, version) -> CredentialSnapshot:
+        api_keys: dict[int, dict] = {}
+        rows = (
+            db.session.query(
+                LazyModelConfigInfo.model_id,
+                LazyModelConfigInfo.api_key,
+                Lazymodel.model_brand,
+            )
+            .outerjoin(Lazymodel, Lazymodel.id == LazyModelConfigInfo.model_id)
+            .filter(
+                LazyModelConfigInfo.tenant_id == tenant_id,
+                LazyModelConfigInfo.api_key != "",
+            )
+            .order_by(LazyModelConfigInfo.id)
+            .all()
+        )
+        for model_id, api_key, model_brand in rows:
+            if model_id in api_keys:
+                continue
+            # 只有sensenova平台需要api_key + secret_key，此时api_key格式为 api_key:secret_key
+            split_keys = api_key.split(":")
+            if len(split_keys) >= 2:
+                result = {"api_key": split_keys[0], "secret_key": split_keys[1]}
+            else:
+                result = {"api_key": api_key}
+            if model_brand:
+                result["source"] = model_brand
+            api_keys[model_id] = result
+
+        # 只预加载本租户已配置 api_key 的模型下的在线模型名称；同名记录仍按ID取第一条，
+        # 与 ModelService.get_model_id_by_name 的结果一致
+        model_ids: dict[str, int] = {}
+        if api_keys:
+            tenant_keys = db.session.query(LazymodelOnlineModels.model_key).filter(
+                LazymodelOnlineModels.model_id.in_(list(api_keys))
+            )
+            for model_key, model_id in (
+                db.session.query(LazymodelOnlineModels.model_key, LazymodelOnlineModels.model_id)
+                .filter(LazymodelOnlineModels.model_key.in_(tenant_keys.scalar_subquery()))
+                .order_by(LazymodelOnlineModels.id)
+                .all()
+            ):
+                model_ids.setdefault(model_key, model_id)
+        return CredentialSnapshot(
+            api_keys=api_keys, model_ids=model_ids, version=version, loaded_at=time.monotonic()
+        )
+
+    def get(self, tenant_id) -> CredentialSnapshot:
+        """获取租户的凭证快照，过期或版本变化时重新加载"""
+        version = self._remote_version(tenant_id)
+        with self._lock:
+            snapshot = self._entries.get(tenant_id)
+        if (
+            snapshot is not None
+            and snapshot.version == version
+            and time.monotonic() - snapshot.loaded_at < self._ttl
+        ):
+            return snapshot
+
+        snapshot = self._load(tenant_id, version)
+        with self._lock:
+            self._entries[tenant_id] = snapshot
+        return snapshot
+
+    def invalidate(self, tenant_id) -> None:
+        """租户的 api_key 变更后调用，使所有进程中的缓存失效"""
+        with self._lock:
+            self._entries.pop(tenant_id, None)
+        try:
+            redis_client.incr(_version_key(tenant_id))
+        except Exception as e:
+            logging.warning(f"更新模型凭证版本失败: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+model_credential_cache = ModelCredentialCache()
+
+
+class ModelCredentialResolver:
+    """单次画布转换内的模型凭证解析器。
+
+    首次解析时从租户缓存取得快照，之后同一次转换中的所有模型节点都从该快照读取，
+    不再逐个节点查询数据库。快照被多个线程共享，只读不写，回退查询的结果记录在解析器自身。
+    """
+
+    def __init__(self, cache: Optional[ModelCredentialCache] = None):
+        self._cache = cache or model_credential_cache
+        self._snapshot: Optional[CredentialSnapshot] = None
+        self._fallback_model_ids: dict[str, object] = {}
+
+    def _current(self) -> CredentialSnapshot:
+        if self._snapshot is None:
+            tenant_id = current_credential_tenant_id()
+            record_graph_dependency(CREDENTIAL_DEPENDENCY_KIND, tenant_id)
+            self._snapshot = self._cache.get(tenant_id)
+        return self._snapshot
+
+    def get_model_id_by_name(self, model_name):
+        """与 ModelService.get_model_id_by_name 一致，未找到时返回空字符串
+
+        快照只包含本租户已配置 api_key 的模型，且名称映射不区分租户，其他租户新增的
+        在线模型不会使本租户的快照失效，因此快照中未命中时回退到数据库查询。
+        """
+        model_ids = self._current().model_ids
+        if model_name in model_ids:
+            return model_ids[model_name]
+        if model_name not in self._fallback_model_ids:
+            online_model = (
+                LazymodelOnlineModels.query.filter(
+                    LazymodelOnlineModels.model_key == model_name
+                )
+                .order_by(LazymodelOnlineModels.id)
+                .first()
+            )
+            self._fallback_model_ids[model_name] = online_model.model_id if online_model else ""
+        return self._fallback_model_ids[model_name]
+
+    def get_model_apikey_by_id(self, online_id):
+        """与 ModelService.get_model_apikey_by_id 一致
+
+        Raises:
+            CommonError: 没有可用的api_key时抛出。
+        """
+        if isinstance(online_id, str) and online_id.isdigit():
+            online_id = int(online_id)
+        if not isinstance(online_id, int):
+            return {}
+        result = self._current().api_keys.get(online_id)
+        if result is None:
+            raise CommonError("没有可用的 api_key")
+        return dict(result)
@@ -0,0 +1,225 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Additional Notice:
+# When modifying, redistributing, or creating derivative works of this software,
+# you must retain the original LazyCraft logo and the GitHub link icon that directs
+# to the official repository: https://github.com/LazyAGI/LazyLLM
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from configs import lazy_config
+from utils.storage.blob_store import link_or_copy
+
+
+@dataclass
+class CopyProgress:
+    """模型复制进度，字节数以源文件大小计"""
+
+    total_files: int = 0
+    total_bytes: int = 0
+    done_files: int = 0
+    done_bytes: int = 0
+    linked_files: int = 0
+    copied_files: int = 0
+    skipped_files: int = 0
+
+    @property
+    def percent(self) -> int:
+        if not self.total_bytes:
+            return 100 if self.done_files >= self.total_files else 0
+        return int(self.done_bytes * 100 / self.total_bytes)
+
+
+def _same_file(src_stat: os.stat_result, dst_path: str) -> bool:
+    """大小和修改时间（秒）都一致时认为目标文件无需更新"""
+    try:
+        dst_stat = os.stat(dst_path)
+    except OSError:
+        return False
+    return dst_stat.st_size == src_stat.st_size and int(dst_stat.st_mtime) == int(
+        src_stat.st_mtime
+    )
+
+
+class ModelCopier:
+    """本地模型目录的复制引擎。
+
+    每个文件优先尝试 reflink，不支持时（如跨文件系统）用 ``MODEL_COPY_BUFFER_SIZE``
+    大小的缓冲区复制，多个文件由 ``MODEL_COPY_WORKERS`` 个线程并行处理。目标文件保留源文件的
+    修改时间，再次复制时大小和修改时间都一致的文件直接跳过，未变化的模型只需逐个 stat。
+
+    进度回调最多每 ``MODEL_COPY_PROGRESS_INTERVAL`` 秒触发一次，结束时再触发一次；
+    模型总大小在遍历源目录时得到，无需复制后再次遍历。
+
+    reflink 写时复制，副本与源文件互不影响。硬链接与源文件共享 inode，原地修改任一方都会改变另一方，
+    因此默认不使用，仅在 ``MODEL_COPY_ALLOW_HARDLINK`` 开启时作为 reflink 之后的选择。
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        buffer_size: Optional[int] = None,
+        progress_interval: Optional[float] = None,
+        allow_hardlink: Optional[bool] = None,
+    ):
+        self.workers = workers or lazy_config.MODEL_COPY_WORKERS
+        self.buffer_size = buffer_size or lazy_config.MODEL_COPY_BUFFER_SIZE
+        self.progress_interval = (
+            progress_interval
+            if progress_interval is not None
+            else lazy_config.MODEL_COPY_PROGRESS_INTERVAL
+        )
+        self.allow_hardlink = (
+            allow_hardlink
+            if allow_hardlink is not None
+            else lazy_config.MODEL_COPY_ALLOW_HARDLINK
+        )
+
+    @staticmethod
+    def scan(src: str) -> tuple[list[str], list[tuple[str, os.stat_result]]]:
+        """遍历源目录，返回相对路径的目录列表和 (文件相对路径, stat) 列表"""
+        dirs, files = [], []
+        for root, dir_names, file_names in os.walk(src, followlinks=True):
+            rel_root = os.path.relpath(root, src)
+            for name in dir_names:
+                dirs.append(os.path.normpath(os.path.join(rel_root, name)))
+            for name in file_names:
+                rel_path = os.path.normpath(os.path.join(rel_root, name))
+                files.append((rel_path, os.stat(os.path.join(root, name))))
+        return dirs, files
+
+    def _buffered_copy(self, on_bytes: Callable[[int], None]):
+        def copy(src: str, dst: str) -> None:
+            with open(src, "rb") as infile, open(dst, "wb") as outfile:
+                in_fd, out_fd = infile.fileno(), outfile.fileno()
+                offset = 0
+                try:
+                    # 内核内复制，不经过用户态缓冲区
+                    while sent := os.sendfile(out_fd, in_fd, offset, self.buffer_size):
+                        offset += sent
+                        on_bytes(sent)
+                except OSError:
+                    if offset:
+                        raise
+                    buffer = bytearray(self.buffer_size)
+                    view = memoryview(buffer)
+                    while n := infile.readinto(buffer):
+                        outfile.write(view[:n])
+                        on_bytes(n)
+
+        return copy
+
+    def copy_tree(
+        self,
+        src: str,
+        dst: str,
+        on_progress: Optional[Callable[[CopyProgress], None]] = None,
+    ) -> CopyProgress:
+        """把 src 目录的内容同步到 dst。
+
+        Args:
+            src (str): 源模型目录。
+            dst (str): 目标目录，不存在时创建；已存在的同名文件未变化时跳过，变化时原子替换。
+            on_progress (Callable, optional): 进度回调，参数为 :class:`CopyProgress`。
+
+        Returns:
+            CopyProgress: 最终进度，total_bytes 即模型大小。
+        """
+        dirs, files = self.scan(src)
+        progress = CopyProgress(
+            total_files=len(files),
+            total_bytes=sum(stat.st_size for _, stat in files),
+        )
+        lock = threading.Lock()
+        last_report = [0.0]
+
+        def report(force: bool = False) -> None:
+            if on_progress is None:
+                return
+            now = time.monotonic()
+            with lock:
+                if not force and now - last_report[0] < self.progress_interval:
+                    return
+                last_report[0] = now
+                snapshot = CopyProgress(**progress.__dict__)
+            on_progress(snapshot)
+
+        def add_bytes(n: int) -> None:
+            with lock:
+                progress.done_bytes += n
+            report()
+
+        def materialize(item: tuple[str, os.stat_result]) -> None:
+            rel_path, stat = item
+            src_path = os.path.join(src, rel_path)
+            dst_path = os.path.join(dst, rel_path)
+            copied = [0]
+
+            def on_bytes(n: int) -> None:
+                copied[0] += n
+                add_bytes(n)
+
+            method = link_or_copy(
+                src_path,
+                dst_path,
+                copy_function=self._buffered_copy(on_bytes),
+                allow_hardlink=self.allow_hardlink,
+            )
+            if method != "hardlink":
+                # 硬链接与源文件共享 inode，修改时间本就一致
+                os.utime(dst_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            with lock:
+                progress.done_files += 1
+                progress.done_bytes += stat.st_size - copied[0]
+                if method == "copy":
+                    progress.copied_files += 1
+                else:
+                    progress.linked_files += 1
+            report()
+
+        os.makedirs(dst, exist_ok=True)
+        for rel_dir in dirs:
+            os.makedirs(os.path.join(dst, rel_dir), exist_ok=True)
+
+        pending = []
+        for rel_path, stat in files:
+            if _same_file(stat, os.path.join(dst, rel_path)):
+                progress.skipped_files += 1
+                progress.done_files += 1
+                progress.done_bytes += stat.st_size
+            else:
+                pending.append((rel_path, stat))
+
+        # 大文件优先，避免最后只剩一个大文件在复制
+        pending.sort(key=lambda item: item[1].st_size, reverse=True)
+        if self.workers > 1 and len(pending) > 1:
+            with ThreadPoolExecutor(
+                max_workers=min(self.workers, len(pending)), thread_name_prefix="model-copy"
+            ) as executor:
+                # list() 使任一文件的异常在此抛出
+                list(executor.map(materialize, pending))
+        else:
+            for item in pending:
+                materialize(item)
+        report(force=True)
+        return progress
+
+
+model_copier = ModelCopier()
@@ -47,6 +47,9 @@ from utils.util_database import db
 from . import fields
 from .model import (Lazymodel, LazyModelConfigInfo, LazymodelOnlineModels,
                     ModelStatus)
+from .chunk_upload import ChunkedUpload
+from .credential_cache import model_credential_cache
+from .model_copy import CopyProgress, model_copier
 from .model_list import model_card_kinds, model_kinds
 from .websocket_handle import send_ms
 
@@ -54,7 +57,8 @@ from .websocket_handle import send_ms
 def extract_archive(file_path, target_dir):
     """自动识别压缩包格式并解压。
 
-    支持zip、tar、tar.gz格式的压缩包解压。
+    支持zip、tar、tar.gz格式的压缩包解压。tar格式以流模式顺序读取，
+    只需一次顺序读取，不会为建立成员索引而先完整扫描一遍压缩包。
 
     Args:
         file_path (str): 压缩包文件路径。
@@ -71,10 +75,10 @@ def extract_archive(file_path, target_dir):
         with zipfile.ZipFile(file_path, "r") as zip_ref:
             zip_ref.extractall(target_dir)
     elif file_path.lower().endswith((".tar.gz", ".tgz")):
-        with tarfile.open(file_path, "r:gz") as tar_ref:
+        with tarfile.open(file_path, "r|gz") as tar_ref:
             tar_ref.extractall(target_dir)
     elif file_path.lower().endswith(".tar"):
-        with tarfile.open(file_path, "r:") as tar_ref:
+        with tarfile.open(file_path, "r|") as tar_ref:
             tar_ref.extractall(target_dir)
     # elif file_path.lower().endswith('.rar'):
     #     if not _has_rarfile:
@@ -500,6 +504,7 @@ class ModelService:
 
         # 提交数据库更改
         db.session.commit()
+        model_credential_cache.invalidate(self.account.current_tenant_id)
         return "API key 已更新或新增"
 
     def clear_api_key(self, model_brand):
@@ -523,6 +528,7 @@ class ModelService:
                 LazyModelConfigInfo.tenant_id == self.account.current_tenant_id,
             ).delete()
         db.session.commit()
+        model_credential_cache.invalidate(self.account.current_tenant_id)
         return "API key 已清除"
 
     def create_model(self, data):
@@ -615,7 +621,8 @@ class ModelService:
                     raise CommonError("模型不可用,不存在有效的权重文件!")
                 new_model_path = os.getenv("LAZYLLM_MODEL_PATH") + "/" + model.model_name
                 if not os.path.exists(new_model_path):
-                    shutil.copytree(model.model_dir, new_model_path)
+                    # 同一文件系统上只创建链接，随后删除源目录即相当于移动
+                    model_copier.copy_tree(model.model_dir, new_model_path)
                 # 删除model.model_dir目录
                 shutil.rmtree(model.model_dir)
 
@@ -654,6 +661,9 @@ class ModelService:
                         )
                         db.session.add(lm)
         db.session.commit()
+        if model.model_type == "online":
+            # 新增的在线模型名称需要立即能被画布解析到
+            model_credential_cache.invalidate(self.account.current_tenant_id)
         # 保存模型使用空间
         if data.get("model_path") is not None and data.get("model_path") != "":
             Tenant.save_used_storage(
@@ -735,6 +745,7 @@ class ModelService:
         if new_models:
             db.session.add_all(new_models)
             db.session.commit()
+            model_credential_cache.invalidate(self.account.current_tenant_id)
             return {"message": "保存成功", "success": True}
         else:
             return {"message": "没有可保存的数据", "success": False}
@@ -770,6 +781,7 @@ class ModelService:
                 deleted_count += 1
         if deleted_count > 0:
             db.session.commit()
+            model_credential_cache.invalidate(self.account.current_tenant_id)
             return {"message": f"成功删除{deleted_count}条记录", "success": True}
         else:
             return {"message": "未找到可删除的数据", "success": False}
@@ -821,6 +833,7 @@ class ModelService:
             )
             db.session.add(lm)
             db.session.commit()
+            model_credential_cache.invalidate(data.get("current_tenant_id"))
             return lm
         if "target_model_name" in data and create_from != "finetune":
             name_exists = (
@@ -1046,6 +1059,9 @@ class ModelService:
             Tenant.restore_used_storage(
                 model.tenant_id, FileTools.get_dir_path_size(child.model_path)
             )
+        if model.model_type == "online":
+            db.session.commit()
+            model_credential_cache.invalidate(self.account.current_tenant_id)
         return True
 
     def delete_finetune_model(self, model_id, finetune_model_id):
@@ -1081,6 +1097,7 @@ class ModelService:
             online_model = LazymodelOnlineModels.query.get(finetune_model_id)
             online_model.deleted_flag = 1
             db.session.commit()
+            model_credential_cache.invalidate(self.account.current_tenant_id)
             LogService().add(
                 Module.MODEL_MANAGEMENT,
                 Action.DELETE_FINETUNE_MODEL,
@@ -1183,6 +1200,7 @@ class ModelService:
                 if model_config.id is None:
                     db.session.add(model_config)
                 db.session.commit()
+                model_credential_cache.invalidate(self.account.current_tenant_id)
         else:
             raise CommonError("这是一个无效的 api_key")
         if api_key:
@@ -1285,9 +1303,30 @@ class ModelService:
 
             call_back(1, 1, status=ModelStatus.FAILED.value)
 
-    def upload_file_chunk(self, file, filename, file_dir, chunk_number, total_chunks):
+    def _chunked_upload(self, filename, file_dir):
+        """获取文件对应的分片上传对象"""
+        base_path = os.getenv("APP_MODEL_PATH", "/app/upload")
+        chunk_dir = FileTools.create_temp_storage(
+            self.user_id, file_dir, filename + "_chunks", base_path=base_path
+        )
+        return ChunkedUpload(chunk_dir, filename)
+
+    def upload_file_chunk(
+        self,
+        file,
+        filename,
+        file_dir,
+        chunk_number,
+        total_chunks,
+        chunk_size=None,
+        total_size=None,
+        checksum=None,
+    ):
         """
-        保存上传的文件分片。
+        流式保存上传的文件分片。
+
+        提供 chunk_size 和 total_size 时分片按偏移量直接写入预分配的目标文件，
+        合并时无需再复制数据。
 
         Args:
             file (FileStorage): 上传的文件分片。
@@ -1295,19 +1334,29 @@ class ModelService:
             file_dir (str): 文件目录。
             chunk_number (int): 当前分片编号。
             total_chunks (int): 总分片数。
+            chunk_size (int, optional): 除最后一片外每个分片的大小。
+            total_size (int, optional): 文件总大小。
+            checksum (str, optional): 分片的 sha256 校验值。
 
         Returns:
-            str: 分片文件保存路径。
+            dict: 分片记录，包括 size 和 sha256。
         """
-        user_id = self.user_id
-        base_path = os.getenv("APP_MODEL_PATH", "/app/upload")
-        chunk_dir = FileTools.create_temp_storage(
-            user_id, file_dir, filename + "_chunks", base_path=base_path
-        )
-        # 保存分片
-        chunk_path = os.path.join(chunk_dir, f"chunk_{int(chunk_number)}")
-        file.save(chunk_path)
-        return chunk_path
+        upload = self._chunked_upload(filename, file_dir)
+        upload.prepare(int(total_chunks), chunk_size, total_size)
+        return upload.write_chunk(int(chunk_number), file.stream, checksum)
+
+    def get_uploaded_chunks(self, filename, file_dir):
+        """
+        查询分片上传进度，用于断点续传。
+
+        Args:
+            filename (str): 文件名。
+            file_dir (str): 文件目录。
+
+        Returns:
+            dict: 总分片数、已上传分片编号和缺失分片编号。
+        """
+        return self._chunked_upload(filename, file_dir).status()
 
     def merge_file_chunks(self, filename, file_dir):
         """
@@ -1325,32 +1374,23 @@ class ModelService:
         """
         user_id = self.user_id
         base_path = os.getenv("APP_MODEL_PATH", "/app/upload")
-        chunk_dir = FileTools.create_temp_storage(
-            user_id, file_dir, filename + "_chunks", base_path=base_path
-        )
-        chunks = sorted(
-            os.listdir(chunk_dir), key=lambda x: int(x.split("_")[1])
-        )  # 获取所有分片并排序
+        upload = self._chunked_upload(filename, file_dir)
+        new_file_path = upload.assemble()
 
         target_dir = FileTools.create_model_storage(
             user_id, file_dir, base_path=base_path
         )
-        new_file_path = os.path.join(target_dir, filename)
-        # 合并分片
-        with open(new_file_path, "wb") as outfile:
-            for chunk in chunks:
-                with open(os.path.join(chunk_dir, chunk), "rb") as infile:
-                    outfile.write(infile.read())
-        # 删除分片文件夹
-        for chunk in chunks:
-            os.remove(os.path.join(chunk_dir, chunk))
-        os.rmdir(chunk_dir)
 
         # 将new_file_path这个压缩包解压到target_dir
-        extract_archive(new_file_path, target_dir)
+        try:
+            extract_archive(new_file_path, target_dir)
+        except Exception:
+            # 已上传的分片保持不变，只删除合并出的压缩包，修复后可以重新合并
+            os.remove(new_file_path)
+            raise
 
-        # 删除new_file_path
-        os.remove(new_file_path)
+        # 删除分片目录及合并后的压缩包
+        upload.cleanup()
 
         # 处理解压后的文件夹结构
         # 如果target_dir下只有一个文件夹，则将其内容移动到target_dir
@@ -2039,6 +2079,7 @@ class ModelService:
             db.session.add_all(add_list)
 
         db.session.commit()
+        model_credential_cache.invalidate(self.account.current_tenant_id)
         return True
 
     def exist_model_list(self):
@@ -2082,68 +2123,50 @@ class ModelService:
         model = Lazymodel.query.get(id)
         model.model_status = ModelStatus.DOWNLOAD.value
         db.session.commit()
-        is_end_flag = False
 
-        def call_back(n, total, status=ModelStatus.DOWNLOAD.value):
-            nonlocal is_end_flag
-            if is_end_flag:
-                return
-            is_end_flag = n == total
-            print(f"model_key download process {n}/{total}")
+        def call_back(progress, status=ModelStatus.DOWNLOAD.value):
+            is_end = status != ModelStatus.DOWNLOAD.value
             send_ms(
                 task_id=str(id),
                 msg={
-                    "current": n,
-                    "total": total,
-                    "is_end": n == total,
-                    "percent": int(n / total * 100),
+                    "current": progress.done_files,
+                    "total": progress.total_files,
+                    "current_bytes": progress.done_bytes,
+                    "total_bytes": progress.total_bytes,
+                    "is_end": is_end,
+                    "percent": 100 if is_end else progress.percent,
                     "status": status,
                 },
             )
 
-        def custom_copy(src, dst):
-            nonlocal copied_files
-            shutil.copy2(src, dst)
-            copied_files += 1
-            call_back(copied_files, total_files)
-
         try:
             exist_model_path = os.getenv("EXIST_MODEL_PATH")
             if exist_model_path is None:
                 raise ValueError("Environment variable 'EXIST_MODEL_PATH' is not set.")
 
             new_model_path = os.path.join(exist_model_path, model_name)
-            if not os.path.exists(new_model_path):
-                # 删除对应文件
-                # shutil.rmtree(new_model_path)
-
-                # 计算总文件数
-                total_files = sum(len(files) for _, _, files in os.walk(model_path))
-                copied_files = 0
-                is_end_flag = False
-
-                # 使用自定义的文件复制函数
-                shutil.copytree(model_path, new_model_path, copy_function=custom_copy)
+            # 优先使用 reflink/硬链接，未变化的文件直接跳过，进度按时间间隔限流发送
+            progress = model_copier.copy_tree(
+                model_path, new_model_path, on_progress=call_back
+            )
+            logging.info(
+                f"copy model {id}: {progress.total_files} files, {progress.total_bytes} bytes, "
+                f"linked={progress.linked_files} copied={progress.copied_files} "
+                f"skipped={progress.skipped_files}"
+            )
             model.model_path = new_model_path
             model.model_status = ModelStatus.SUCCESS.value
             model.download_message = "Copy successful"
             db.session.commit()
-            call_back(total_files, total_files, status=ModelStatus.SUCCESS.value)
-            # 模型文件大小同步至用户组空间下
-            Tenant.save_used_storage(
-                model.tenant_id, FileTools.get_dir_path_size(model.model_path)
-            )
-
-            # delete local model
-            if os.path.exists(new_model_path):
-                # shutil.rmtree(new_model_path)
-                print("不删除本地模型")
+            call_back(progress, status=ModelStatus.SUCCESS.value)
+            # 模型文件大小同步至用户组空间下，大小在复制时已统计
+            Tenant.save_used_storage(model.tenant_id, progress.total_bytes)
         except Exception as e:
             logging.exception(e)
             model.model_status = ModelStatus.FAILED.value
             model.download_message = str(e)
             db.session.commit()
-            call_back(1, 1, status=ModelStatus.FAILED.value)
+            call_back(CopyProgress(), status=ModelStatus.FAILED.value)
 
     def default_icon_list(self):
         """
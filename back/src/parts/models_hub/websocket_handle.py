@@ -19,20 +19,22 @@
 
 import json
 import logging
-import uuid
 from typing import Any
 
 from flask_sock import Sock
 from simple_websocket import ConnectionClosed
 
-task_connections: dict[str, Any] = {}
+from utils.progress_bus import progress_bus
+
+PROGRESS_TOPIC = "model_hub"
 websocket_handler = None
 
 
 def send_ms(task_id: str, msg: dict[str, Any]):
     """发送消息到指定任务的WebSocket连接。
 
-    向指定任务ID的所有WebSocket连接发送消息。
+    消息经进度总线转发到持有该任务连接的所有进程，Celery 任务中调用同样有效。
+    同一任务在合并间隔内只发送最新进度，结束消息立即发送。
 
     Args:
         task_id (str): 任务ID。
@@ -40,17 +42,8 @@ def send_ms(task_id: str, msg: dict[str, Any]):
 
     Returns:
         None: 无返回值。
-
-    Raises:
-        Exception: 当发送消息失败时抛出异常。
     """
-    if task_id in task_connections:
-        websockets = task_connections[task_id]
-        for websocket in websockets:
-            try:
-                websockets[websocket].send(json.dumps(msg))
-            except Exception as e:
-                print(f"Error sending message to task: {task_id}: {str(e)}")
+    progress_bus.publish(PROGRESS_TOPIC, task_id, msg, final=bool(msg.get("is_end")))
 
 
 def setup_websocket(app):
@@ -69,8 +62,12 @@ def setup_websocket(app):
 
     @sock.route("/model_hub/ws/<task_id>")
     def handle_model_hub_websocket(ws, task_id):
-        uuid_str = str(uuid.uuid4())
-        task_connections.setdefault(task_id, {})[uuid_str] = ws
+        def forward(events):
+            for event in events:
+                ws.send(json.dumps(event))
+
+        # 订阅时先回放最新进度，连接晚于任务开始时也能看到当前状态
+        token = progress_bus.subscribe(PROGRESS_TOPIC, task_id, forward)
         try:
             while True:
                 try:
@@ -87,10 +84,7 @@ def setup_websocket(app):
         except Exception as e:
             logging.error(f"Error in WebSocket connection for task {task_id}: {str(e)}")
         finally:
-            if uuid_str in task_connections[task_id]:
-                del task_connections[task_id][uuid_str]
-            if not task_connections[task_id]:
-                del task_connections[task_id]
+            progress_bus.unsubscribe(PROGRESS_TOPIC, task_id, token)
             logging.info(
                 f"WebSocket connection for task {task_id} ended and cleaned up."
             )
@@ -0,0 +1,300 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Additional Notice:
+# When modifying, redistributing, or creating derivative works of this software,
+# you must retain the original LazyCraft logo and the GitHub link icon that directs
+# to the official repository: https://github.com/LazyAGI/LazyLLM
+
+"""IDE 工具沙箱进程池
+
+每次 IDE 工具调用都启动新解释器并重新导入 lazyllm 需要数秒。这里预先启动若干
+已导入 lazyllm 的 zygote 工作进程（见 ``sandbox_worker``），通过 stdin/stdout 上的
+长度前缀 JSON 帧交换请求和结果：
+
+- 每次调用由 zygote fork 出的新子进程执行，用户代码留下的全局状态随子进程退出丢弃，
+  不同工具、不同租户的调用不会共享解释器状态；
+- 工作进程串行处理调用，池中同时最多 ``size`` 个进程，等待空闲进程超过
+  ``acquire_timeout`` 时抛出 ``SandboxTimeoutError``；
+- 单次调用超时由 zygote 杀掉子进程；zygote 本身无响应时直接杀掉，由新进程补位；
+- 进程处理 ``max_calls`` 次或常驻内存超过 ``max_rss_mb`` 后回收；
+- fork 出的子进程不会复用父进程的工作进程，检测到进程号变化时重新建池。
+"""
+
+import json
+import logging
+import os
+import selectors
+import subprocess
+import sys
+import threading
+import time
+from typing import Optional
+
+from configs import lazy_config
+
+from .sandbox_worker import HEADER, write_frame
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sandbox_worker.py")
+# 结束工作进程时等待其退出的时间（秒），也是 zygote 处理子进程超时的余量
+KILL_TIMEOUT = 5
+
+
+class SandboxTimeoutError(TimeoutError):
+    """工作进程启动或调用超时"""
+
+
+class SandboxWorker:
+    """一个沙箱工作进程，同一时间只被一个调用占用"""
+
+    def __init__(self, preload: str = ""):
+        env = dict(os.environ, PYTHONUNBUFFERED="1", IDE_SANDBOX_PRELOAD=preload)
+        self.process = subprocess.Popen(
+            [sys.executable, WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            close_fds=True,
+            env=env,
+        )
+        self.pid = self.process.pid
+        self.calls = 0
+        self.rss_mb = 0.0
+        self.ready = False
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def _read_exact(self, size: int, deadline: float) -> bytes:
+        fd = self.process.stdout.fileno()
+        chunks = []
+        with selectors.DefaultSelector() as selector:
+            selector.register(fd, selectors.EVENT_READ)
+            while size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not selector.select(remaining):
+                    raise SandboxTimeoutError(f"沙箱进程 {self.pid} 响应超时")
+                chunk = os.read(fd, size)
+                if not chunk:
+                    raise EOFError(f"沙箱进程 {self.pid} 已退出，返回码: {self.process.poll()}")
+                chunks.append(chunk)
+                size -= len(chunk)
+        return b"".join(chunks)
+
+    def _read_frame(self, deadline: float) -> dict:
+        size = HEADER.unpack(self._read_exact(HEADER.size, deadline))[0]
+        return json.loads(self._read_exact(size, deadline).decode("utf-8"))
+
+    def wait_ready(self, timeout: float) -> None:
+        if self.ready:
+            return
+        frame = self._read_frame(time.monotonic() + timeout)
+        if not frame.get("ready"):
+            raise RuntimeError(f"沙箱进程 {self.pid} 启动失败: {frame}")
+        self.ready = True
+
+    def call(self, request: dict, timeout: float) -> dict:
+        write_frame(self.process.stdin, request)
+        response = self._read_frame(time.monotonic() + timeout)
+        self.calls += 1
+        self.rss_mb = response.get("rss_mb", 0.0)
+        return response
+
+    def kill(self) -> None:
+        if self.alive:
+            self.process.kill()
+        try:
+            self.process.wait(KILL_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            logging.warning(f"沙箱进程 {self.pid} 未能及时退出")
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+
+class SandboxPool:
+    """预热的沙箱工作进程池
+
+    未显式传入的参数在使用时读取 ``lazy_config`` 中的 IDE_SANDBOX_* 配置。
+    """
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        max_calls: Optional[int] = None,
+        max_rss_mb: Optional[float] = None,
+        call_timeout: Optional[float] = None,
+        start_timeout: Optional[float] = None,
+        preload: Optional[str] = None,
+        acquire_timeout: Optional[float] = None,
+    ):
+        self._size = size
+        self._max_calls = max_calls
+        self._max_rss_mb = max_rss_mb
+        self._call_timeout = call_timeout
+        self._start_timeout = start_timeout
+        self._preload = preload
+        self._acquire_timeout = acquire_timeout
+        self._cond = threading.Condition()
+        self._idle: list[SandboxWorker] = []
+        self._busy = 0
+        self._pid = os.getpid()
+        self._started = 0
+        self._recycled = 0
+        self._timeouts = 0
+
+    def _option(self, value, name):
+        return value if value is not None else getattr(lazy_config, name)
+
+    @property
+    def size(self) -> int:
+        return self._option(self._size, "IDE_SANDBOX_POOL_SIZE")
+
+    @property
+    def max_calls(self) -> int:
+        return self._option(self._max_calls, "IDE_SANDBOX_MAX_CALLS")
+
+    @property
+    def max_rss_mb(self) -> float:
+        return self._option(self._max_rss_mb, "IDE_SANDBOX_MAX_RSS_MB")
+
+    @property
+    def call_timeout(self) -> float:
+        return self._option(self._call_timeout, "IDE_SANDBOX_CALL_TIMEOUT")
+
+    @property
+    def start_timeout(self) -> float:
+        return self._option(self._start_timeout, "IDE_SANDBOX_START_TIMEOUT")
+
+    @property
+    def preload(self) -> str:
+        return self._option(self._preload, "IDE_SANDBOX_PRELOAD_MODULES")
+
+    @property
+    def acquire_timeout(self) -> float:
+        return self._option(self._acquire_timeout, "IDE_SANDBOX_ACQUIRE_TIMEOUT")
+
+    def _check_fork(self) -> None:
+        # 父进程的工作进程管道在子进程中不可用，直接丢弃而不结束它们
+        if self._pid == os.getpid():
+            return
+        self._idle, self._busy, self._pid = [], 0, os.getpid()
+
+    def _spawn(self) -> SandboxWorker:
+        worker = SandboxWorker(self.preload)
+        self._started += 1
+        return worker
+
+    def _fill(self) -> None:
+        """补足空闲进程，使池中进程总数达到 size，新进程在后台完成预热"""
+        while len(self._idle) + self._busy < self.size:
+            self._idle.append(self._spawn())
+
+    def warm_up(self) -> None:
+        with self._cond:
+            self._check_fork()
+            self._fill()
+
+    def _acquire(self) -> SandboxWorker:
+        with self._cond:
+            self._check_fork()
+            self._fill()
+            deadline = time.monotonic() + self.acquire_timeout
+            while not self._idle:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise SandboxTimeoutError(f"沙箱进程池繁忙，{self.acquire_timeout}秒内没有空闲进程")
+                self._cond.wait(remaining)
+                self._check_fork()
+            # 优先使用最早启动、最可能已完成预热的进程
+            worker = self._idle.pop(0)
+            self._busy += 1
+        if not worker.alive:
+            worker.kill()
+            worker = self._spawn()
+        return worker
+
+    def _release(self, worker: SandboxWorker, retire: bool) -> None:
+        retire = (
+            retire
+            or not worker.alive
+            or worker.calls >= self.max_calls
+            or worker.rss_mb > self.max_rss_mb
+        )
+        if retire:
+            worker.kill()
+        with self._cond:
+            if self._pid != os.getpid():
+                return
+            self._busy -= 1
+            if retire:
+                self._recycled += 1
+                self._fill()
+            else:
+                self._idle.append(worker)
+            self._cond.notify()
+
+    def execute(self, code: str, vars_for_code: dict, input_data: dict, timeout: float = 30) -> dict:
+        """在沙箱中执行 IDE 工具代码
+
+        返回工作进程的响应：``ok``、``result`` 或 ``error``/``traceback``，以及执行期间的输出行 ``output``；
+        执行代码的子进程崩溃时 ``ok`` 为 False。等待空闲进程、启动或调用超时抛出 ``SandboxTimeoutError``，
+        zygote 异常退出抛出 ``RuntimeError``。
+        """
+        request = {
+            "code": code,
+            "vars_for_code": vars_for_code,
+            "input": input_data,
+            "timeout": timeout,
+            "call_timeout": self.call_timeout,
+        }
+        worker = self._acquire()
+        retire = True
+        try:
+            worker.wait_ready(self.start_timeout)
+            response = worker.call(request, self.call_timeout + KILL_TIMEOUT)
+            retire = False
+            if response.get("timed_out"):
+                raise SandboxTimeoutError(f"沙箱进程 {worker.pid} 执行超时: {response.get('error')}")
+            return response
+        except SandboxTimeoutError:
+            self._timeouts += 1
+            raise
+        except (EOFError, BrokenPipeError) as e:
+            raise RuntimeError(f"ide工具执行失败: {e}") from e
+        finally:
+            self._release(worker, retire)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "idle": len(self._idle),
+                "busy": self._busy,
+                "started": self._started,
+                "recycled": self._recycled,
+                "timeouts": self._timeouts,
+            }
+
+    def shutdown(self) -> None:
+        """结束所有空闲进程，下次调用时重新启动"""
+        with self._cond:
+            self._check_fork()
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.kill()
+
+
+ide_sandbox_pool = SandboxPool()
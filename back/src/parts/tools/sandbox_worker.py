@@ -0,0 +1,212 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Additional Notice:
+# When modifying, redistributing, or creating derivative works of this software,
+# you must retain the original LazyCraft logo and the GitHub link icon that directs
+# to the official repository: https://github.com/LazyAGI/LazyLLM
+
+"""IDE 工具沙箱工作进程
+
+由 ``sandbox_pool`` 以独立解释器启动，启动时预先导入 lazyllm，之后作为 zygote 循环读取
+stdin 上的请求帧：每个请求 fork 一个子进程执行工具代码，子进程把响应帧写入单独的管道后退出，
+zygote 转发响应。用户代码对全局状态、已导入模块的修改都随子进程丢弃，不同工具、
+不同租户的调用之间互不可见。每帧为 4 字节大端长度加 UTF-8 JSON。
+
+为避免用户代码的输出破坏协议或读走请求，启动时把原 stdin/stdout 复制为私有的协议通道，
+fd 0 指向 /dev/null、fd 1 重定向到 stderr，子进程执行前关闭协议通道；
+执行期间 ``print`` 的内容被收集后随响应返回。
+本模块只依赖标准库，父进程也从这里导入帧读写函数。
+"""
+
+import io
+import json
+import os
+import selectors
+import signal
+import struct
+import sys
+import time
+import traceback
+from contextlib import redirect_stdout
+
+HEADER = struct.Struct(">I")
+
+
+def write_frame(stream, payload: dict) -> None:
+    data = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+    stream.write(HEADER.pack(len(data)) + data)
+    stream.flush()
+
+
+def read_frame(stream):
+    """读取一帧，对端关闭时返回 None"""
+    header = _read_exact(stream, HEADER.size)
+    if header is None:
+        return None
+    data = _read_exact(stream, HEADER.unpack(header)[0])
+    if data is None:
+        return None
+    return json.loads(data.decode("utf-8"))
+
+
+def _read_exact(stream, size: int):
+    chunks = []
+    while size:
+        chunk = stream.read(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def current_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        # 非 Linux 平台退化为峰值内存（ru_maxrss 单位为 KB）
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def import_vars(vars_for_code: dict) -> dict:
+    """按变量名导入工具代码依赖的模块，导入失败的模块只输出提示"""
+    import importlib
+
+    modules = {}
+    for var_name, module_name in vars_for_code.items():
+        try:
+            modules[var_name] = importlib.import_module(module_name)
+        except ImportError as e:
+            print(f"Error importing {module_name}: {e}")
+    return modules
+
+
+def execute(request: dict, http_tool_cls) -> dict:
+    output = io.StringIO()
+    try:
+        with redirect_stdout(output):
+            http_tool = http_tool_cls(
+                code_str=request["code"],
+                vars_for_code=import_vars(request.get("vars_for_code") or {}),
+                timeout=request.get("timeout", 30),
+            )
+            result = http_tool.forward(**(request.get("input") or {}))
+        # 结果需要能以 JSON 返回，与原先子进程打印 json.dumps(result) 的约束一致
+        json.dumps(result)
+        response = {"ok": True, "result": result}
+    except KeyboardInterrupt:
+        raise
+    except BaseException as e:  # noqa: B036 用户代码调用 sys.exit 也只算本次调用失败
+        response = {"ok": False, "error": str(e) or type(e).__name__, "traceback": traceback.format_exc()}
+    response["output"] = output.getvalue().splitlines()
+    response["rss_mb"] = current_rss_mb()
+    return response
+
+
+def _drain(fd: int, deadline: float):
+    """读取子进程管道直到对端关闭，超过 deadline 时返回 None"""
+    chunks = []
+    with selectors.DefaultSelector() as selector:
+        selector.register(fd, selectors.EVENT_READ)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not selector.select(remaining):
+                return None
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                return b"".join(chunks)
+            chunks.append(chunk)
+
+
+def _parse_frame(data: bytes):
+    if len(data) < HEADER.size:
+        return None
+    size = HEADER.unpack(data[: HEADER.size])[0]
+    if len(data) < HEADER.size + size:
+        return None
+    return json.loads(data[HEADER.size : HEADER.size + size].decode("utf-8"))
+
+
+def run_isolated(request: dict, http_tool_cls, close_fds=()) -> dict:
+    """fork 子进程执行一次调用，超过请求中的 ``call_timeout`` 时杀掉子进程
+
+    zygote 只负责转发，本身不执行用户代码，因此超时或子进程崩溃后仍可继续服务。
+    """
+    timeout = request.get("call_timeout") or request.get("timeout", 30)
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            os.close(read_fd)
+            for fd in close_fds:
+                os.close(fd)
+            with os.fdopen(write_fd, "wb") as stream:
+                write_frame(stream, execute(request, http_tool_cls))
+            code = 0
+        finally:
+            os._exit(code)
+
+    os.close(write_fd)
+    try:
+        data = _drain(read_fd, time.monotonic() + timeout)
+    finally:
+        os.close(read_fd)
+    if data is None:
+        os.kill(pid, signal.SIGKILL)
+    _, status = os.waitpid(pid, 0)
+    if data is None:
+        return {"ok": False, "timed_out": True, "error": f"执行超时（{timeout}秒）", "output": []}
+    response = _parse_frame(data)
+    if response is None:
+        return {
+            "ok": False,
+            "error": f"沙箱子进程异常退出，返回码: {os.waitstatus_to_exitcode(status)}",
+            "output": [],
+        }
+    return response
+
+
+def main() -> None:
+    proto_in = os.fdopen(os.dup(sys.stdin.fileno()), "rb", buffering=0)
+    proto_out = os.fdopen(os.dup(sys.stdout.fileno()), "wb", buffering=0)
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, sys.stdin.fileno())
+    os.close(devnull)
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    from lazyllm.tools.tools import HttpTool
+
+    for module_name in filter(None, os.environ.get("IDE_SANDBOX_PRELOAD", "").split(",")):
+        import_vars({module_name: module_name})
+
+    write_frame(proto_out, {"ready": True, "pid": os.getpid()})
+    while True:
+        request = read_frame(proto_in)
+        if request is None:
+            break
+        response = run_isolated(request, HttpTool, close_fds=(proto_in.fileno(), proto_out.fileno()))
+        # 回收判断依据 zygote 自身的内存，子进程的内存随其退出释放
+        response["rss_mb"] = current_rss_mb()
+        response["worker_pid"] = os.getpid()
+        write_frame(proto_out, response)
+
+
+if __name__ == "__main__":
+    main()
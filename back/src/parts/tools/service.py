@@ -21,8 +21,6 @@ import ast
 import json
 import logging
 import re
-import subprocess
-import sys
 import uuid
 from datetime import datetime, timedelta, timezone
 
@@ -43,6 +41,7 @@ from utils.util_database import db
 
 from . import fields
 from .model import Tool, ToolAuth, ToolField, ToolHttp
+from .sandbox_pool import ide_sandbox_pool
 from .utils import object_to_json
 from .websocket_handle import get_tool_logger
 
@@ -689,137 +688,20 @@ class ToolService:
 
         print(vars_for_code)
 
-        # 3. 准备要在子进程中执行的代码
-        code = f"""
-import json
-import importlib
-import sys
-import pytz
-import traceback
-from datetime import datetime
-from lazyllm.tools.tools import HttpTool
-
-
-def execute_http_tool(code_str, vars_for_code, processed_input, timeout):
-    try:
-        vars_for_code_new = {{}}
-        print("Starting execution of code")
-        print("code_str:", code_str)
-        print("processed_input:", processed_input)
-        
-        for var_name, module_name in vars_for_code.items():
-            flag = False
-            print("Importing {{}} as {{}}".format(module_name, var_name))
-            try:
-                # if "." in module_name:
-                #    flag = True
-                #    module_name = module_name.split(".")[0]
-                module = importlib.import_module(module_name)
-                vars_for_code_new[var_name] = module
-                #if flag:
-                #    submodule = getattr(module, var_name)
-                #    vars_for_code_new[var_name] = submodule
-                print("Imported {{}}: {{}}".format(module_name, vars_for_code_new[var_name]))
-            except ImportError as e:
-                print(f"Error importing {{module_name}}: {{e}}")
-
-        print("vars_for_code_new:", vars_for_code_new)
-        print("Creating code instance")
-        http_tool = HttpTool(
-            code_str=code_str,
-            vars_for_code=vars_for_code_new,
-            timeout=timeout
-        )
-        
-        print("Executing code")
-        result = http_tool.forward(**processed_input)
-        print("Code execution completed")
-        print("RESULT_START")
-        print(json.dumps(result))
-        print("RESULT_END")
-        return result
-    except Exception as e:
-        print("Error occurred:", str(e))
-        print(traceback.format_exc())
-        raise
-
-# 执行 HTTP 调用
-execute_http_tool(
-    code_str='''{tool_instance.tool_ide_code}
-    ''',
-    vars_for_code={vars_for_code},
-    processed_input={json.dumps(processed_input)},
-    timeout=30
-)
-"""
-
-        # 使用 Popen 在子进程中运行代码
-        process = subprocess.Popen(
-            [sys.executable, "-c", code],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,  # 分离标准错误输出
-            text=True,
-            bufsize=1,
-            universal_newlines=True,
+        # 3. 在预热的沙箱进程中执行，执行期间的输出写入工具日志
+        tool_logger = get_tool_logger(str(tool_instance.id))
+        response = ide_sandbox_pool.execute(
+            tool_instance.tool_ide_code, vars_for_code, processed_input, timeout=30
         )
+        for line in response["output"]:
+            tool_logger.info(line)
 
-        tool_logger = get_tool_logger(str(tool_instance.id))
-        output_buffer = []
-        result_buffer = []
-
-        capturing_result = False
-
-        # 同时读取标准输出和标准错误
-        while True:
-            # 读取标准输出
-            output = process.stdout.readline()
-            if output == "" and process.poll() is not None:
-                break
-            if output:
-                output = output.strip()
-                print(f"Debug: {output}")  # 调试输出
-                if output == "RESULT_START":
-                    capturing_result = True
-                    continue
-                elif output == "RESULT_END":
-                    capturing_result = False
-                    continue
-
-                if capturing_result:
-                    output = output.strip().replace("'''", "")
-                    result_buffer.append(output)
-                else:
-                    try:
-                        tool_logger.info(str(output))
-                    except Exception as e:
-                        print(f"Error logging output: {e}")
-                    output_buffer.append(output)
-
-            # 读取标准错误 这里会造成阻塞，且上面没有错误输出，先注释掉
-            # error = process.stderr.readline()
-            # if error:
-            #     error = error.strip()
-            #     error_buffer.append(error)
-            #     try:
-            #         tool_logger.error(str(error))  # 记录错误日志
-            #     except Exception as e:
-            #         print(f"Error logging error: {e}")
-
-        # 等待进程结束并获取返回码
-        return_code = process.wait()
-
-        # 检查是否有错误发生
-        if return_code != 0:
-            # error_message = '\n'.join(error_buffer)
-            raise RuntimeError(f"ide工具执行失败，返回码: {return_code}")
-
-        # 解析结果
-        result_json = "\n".join(result_buffer)
+        if not response["ok"]:
+            for line in response.get("traceback", "").splitlines():
+                tool_logger.info(line)
+            raise RuntimeError(f"ide工具执行失败: {response['error']}")
 
-        try:
-            result = json.loads(result_json)
-        except json.JSONDecodeError:
-            result = result_json
+        result = response["result"]
 
         # 处理输出
         output = self.process_output(tool_instance, result)
@@ -19,15 +19,16 @@
 
 import json
 import logging
-import threading
-import time
 from datetime import datetime
 from typing import Any
 
 from flask_sock import Sock
 from simple_websocket import ConnectionClosed
 
-user_connections: dict[str, Any] = {}
+from utils.progress_bus import progress_bus
+
+LOG_TOPIC = "tool_log"
+TOOL_LOGGER_PREFIX = "logger_"
 websocket_handler = None
 
 
@@ -61,52 +62,38 @@ class RealtimeMyLogger(logging.Logger):
 
         self.log_history.append(log_entry)
 
-        id = self.name.split("_")[-1]
-        send_log(id, log_entry)
+        # setup_logging 把所有 logger 都设为本类，只有 get_tool_logger 创建的工具日志需要推送
+        if self.name.startswith(TOOL_LOGGER_PREFIX):
+            send_log(self.name[len(TOOL_LOGGER_PREFIX):], log_entry)
 
     def get_log_history(self):
         return self.log_history
 
 
 def send_log(user_id: str, log_entry: dict[str, Any]):
-    if user_id in user_connections:
-        websocket = user_connections[user_id]
-        try:
-            websocket.send(json.dumps(log_entry))
-        except Exception as e:
-            print(f"Error sending log to user {user_id}: {str(e)}")
+    # 经进度总线转发，日志可能产生于其他进程；间隔内的日志合并为一批但不会丢弃
+    progress_bus.append(LOG_TOPIC, user_id, log_entry)
 
 
 def get_tool_logger(id: str) -> RealtimeMyLogger:
-    logger_name = f"logger_{id}"
+    logger_name = f"{TOOL_LOGGER_PREFIX}{id}"
     tool_logger = logging.getLogger(logger_name)
     if not isinstance(tool_logger, RealtimeMyLogger):
         raise TypeError("Expected RealtimeMyLogger instance")
     return tool_logger
 
 
-def clean_connections():
-    for id, ws in list(user_connections.items()):
-        if ws.closed:
-            del user_connections[id]
-            logger = get_tool_logger(id)
-            logger.info(f"Cleaned up closed connection for user {id}")
-
-
-def connection_cleaner():
-    while True:
-        clean_connections()
-        time.sleep(300)  # 每5分钟清理一次
-
-
 def setup_websocket(app):
     global websocket_handler
     sock = Sock(app)
 
     @sock.route("/ws/<id>")
     def handle_websocket(ws, id):
-        user_connections[id] = ws
+        def forward(events):
+            for event in events:
+                ws.send(json.dumps(event))
 
+        token = progress_bus.subscribe(LOG_TOPIC, id, forward)
         try:
             while True:
                 try:
@@ -125,17 +112,11 @@ def setup_websocket(app):
         except Exception as e:
             logging.error(f"Error in WebSocket connection for user {id}: {str(e)}")
         finally:
-            if id in user_connections:
-                del user_connections[id]
+            progress_bus.unsubscribe(LOG_TOPIC, id, token)
             logging.info(f"WebSocket connection for user {id} ended and cleaned up.")
 
     websocket_handler = sock
 
-    # 启动连接清理线程
-    cleaner_thread = threading.Thread(target=connection_cleaner)
-    cleaner_thread.daemon = True
-    cleaner_thread.start()
-
 
 def setup_logging():
     logging.setLoggerClass(RealtimeMyLogger)
@@ -0,0 +1,33 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Additional Notice:
+# When modifying, redistributing, or creating derivative works of this software,
+# you must retain the original LazyCraft logo and the GitHub link icon that directs
+# to the official repository: https://github.com/LazyAGI/LazyLLM
+
+from celery import shared_task
+
+from core.file_service import FileService
+
+
+@shared_task
+def collect_file_blob_garbage():
+    """回收没有文件记录引用的 blob。
+
+    这是一个 Celery 定时任务，删除 blob 存储中不再被任何文件记录引用、
+    且超过 BLOB_GC_MIN_AGE 未被使用的文件内容。
+    """
+    removed = FileService.collect_blob_garbage()
+    print(f"Completed file blob garbage collection, removed {removed} blobs")
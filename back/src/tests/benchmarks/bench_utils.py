@@ -0,0 +1,9 @@
+import time
+
+
+def measure(func, repeat=1):
+    """返回 func 执行 repeat 次的平均耗时（秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
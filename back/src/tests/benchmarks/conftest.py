@@ -0,0 +1,43 @@
+import os
+from pathlib import Path
+
+import pytest
+
+BENCHMARK_DIR = Path(__file__).parent
+
+
+def pytest_collection_modifyitems(config, items):
+    """基准测试按耗时断言，负载较高的环境中结果不稳定，默认跳过。
+
+    设置 RUN_BENCHMARKS=1 时运行。
+    """
+    if os.environ.get("RUN_BENCHMARKS"):
+        return
+    skip = pytest.mark.skip(reason="基准测试默认不运行，设置 RUN_BENCHMARKS=1 后运行")
+    for item in items:
+        if BENCHMARK_DIR in Path(item.fspath).parents:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def bench_redis():
+    """基准测试使用的 Redis 客户端。
+
+    设置 BENCH_REDIS_URL 时连接真实 Redis，否则退化为 fakeredis。
+    """
+    url = os.environ.get("BENCH_REDIS_URL")
+    if url:
+        import redis
+
+        client = redis.Redis.from_url(url)
+        try:
+            client.ping()
+        except redis.exceptions.ConnectionError:
+            pytest.skip(f"Redis {url} 不可用")
+        client.flushdb()
+        yield client
+        client.flushdb()
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        yield fakeredis.FakeRedis()
+
@@ -0,0 +1,99 @@
+import random
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+from flask import Flask
+from sqlalchemy import insert
+
+from models.model_account import Account
+from parts.app.model import App
+from parts.conversation.model import Conversation
+from parts.cost_audit.model import AppStatistics, CostAudit
+from parts.cost_audit.service import CostService
+from utils.util_database import db
+
+HISTORY_DAYS = 90
+ROWS_PER_DAY = 400
+
+
+# 基准测试：区间统计直接扫描原始记录与合并按日汇总的耗时
+def test_period_statistics_rollup_vs_raw(tmp_path):
+    bench_app = Flask(__name__)
+    bench_app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'stats.db'}"
+    db.init_app(bench_app)
+
+    with bench_app.app_context():
+        for model in (Account, App, Conversation, CostAudit, AppStatistics):
+            model.__table__.create(db.engine)
+        end_date = date.today() - timedelta(days=1)
+        start_date = end_date - timedelta(days=HISTORY_DAYS - 1)
+        app_id = str(uuid.uuid4())
+        db.session.add(
+            App(
+                id=app_id,
+                tenant_id=str(uuid.uuid4()),
+                name="app",
+                description="",
+                created_at=datetime.combine(start_date, datetime.min.time()),
+            )
+        )
+
+        rng = random.Random(0)
+        conversations, audits = [], []
+        for offset in range(HISTORY_DAYS):
+            day_start = datetime.combine(start_date + timedelta(days=offset), datetime.min.time())
+            for _ in range(ROWS_PER_DAY):
+                created_at = day_start + timedelta(seconds=rng.randint(0, 86399))
+                sessionid = f"{offset}-{rng.randint(0, 80)}"
+                conversations.append(
+                    dict(
+                        app_id=app_id,
+                        sessionid=sessionid,
+                        from_who=f"guest{rng.randint(0, 500)}",
+                        turn_number=rng.randint(1, 10),
+                        created_at=created_at,
+                    )
+                )
+                audits.append(
+                    dict(
+                        app_id=app_id,
+                        user_id="user",
+                        session_id=sessionid,
+                        call_type="release",
+                        token_num=rng.randint(1, 100),
+                        cost_time=rng.uniform(0.1, 5),
+                        created_at=created_at,
+                    )
+                )
+        db.session.execute(insert(Conversation), conversations)
+        db.session.execute(insert(CostAudit), audits)
+        db.session.commit()
+
+        backfill_start = time.perf_counter()
+        CostService.ensure_daily_rollups(app_id)
+        backfill = time.perf_counter() - backfill_start
+
+        results = {}
+        for name, run in (
+            (
+                "raw",
+                lambda: CostService.calc_and_save_app_statistics(
+                    app_id=app_id, stat_date_start=start_date, stat_date_end=end_date
+                ),
+            ),
+            ("rollup", lambda: CostService.merge_daily_rollups(app_id, start_date, end_date)),
+        ):
+            run_start = time.perf_counter()
+            results[name] = (run(), time.perf_counter() - run_start)
+
+        raw, raw_time = results["raw"]
+        merged, merged_time = results["rollup"]
+        print(
+            f"\n{HISTORY_DAYS} days x {ROWS_PER_DAY} rows: backfill={backfill:.2f}s "
+            f"raw={raw_time * 1e3:.1f}ms rollup={merged_time * 1e3:.1f}ms "
+            f"web_users raw={raw['web_user_count']} rollup={merged['web_user_count']}"
+        )
+        assert merged["web_user_token_sum"] == raw["web_user_token_sum"]
+        assert abs(merged["web_user_count"] - raw["web_user_count"]) <= raw["web_user_count"] * 0.05
+        assert merged_time < raw_time
@@ -0,0 +1,101 @@
+import statistics
+import time
+from collections import OrderedDict
+from unittest.mock import MagicMock, patch
+
+from flask import Flask
+from sqlalchemy import insert
+
+from parts.conversation.history_cache import ConversationHistory
+from parts.conversation.model import Conversation
+from parts.conversation.speak_api import SpeakToAppApi
+from utils.util_database import db
+
+SESSION_TURNS = 1000
+OTHER_ROWS = 20000
+SENDS = 30
+SESSION = "long-session"
+
+
+class _LegacyHistory:
+    """原实现：每次都查询最新一条记录得到轮次号，并读取会话全部记录重建历史"""
+
+    def next_turn(self, sessionid):
+        last = Conversation.query.filter_by(sessionid=sessionid).order_by(Conversation.id.desc()).first()
+        return (last.turn_number + 1) if last else 1
+
+    def get(self, sessionid):
+        history_dict = OrderedDict()
+        for item in Conversation.query.filter_by(sessionid=sessionid).order_by(Conversation.created_at.asc()):
+            pair = history_dict.setdefault(item.turn_number, [None, None])
+            pair[0 if item.from_who != "lazyllm" else 1] = item.content
+        return [pair for pair in history_dict.values() if pair[0] and pair[1]]
+
+    def append(self, *args):
+        pass
+
+
+def _ttft(bench_app, history):
+    latencies = []
+    handler = MagicMock()
+    handler.is_success.return_value = True
+
+    def run_stream(inputs, files, history_list, track_id, turn_number):
+        yield "data: first\n\n"
+        return handler
+
+    with patch("parts.conversation.speak_api.conversation_history", history), patch(
+        "parts.conversation.speak_api.PassportService"
+    ) as passport, patch("parts.conversation.speak_api.AppService") as app_service, patch(
+        "parts.conversation.speak_api.LightEngine"
+    ), patch(
+        "parts.conversation.speak_api.AppRunService"
+    ) as run_service:
+        passport.return_value.verify.return_value = {"user_id": "user"}
+        app_service.return_value.get_app.return_value = MagicMock(id="app", enable_api=True)
+        app_run = run_service.create.return_value
+        app_run.run_stream.side_effect = run_stream
+        app_run.parse_media.return_value = {"raw": "answer", "file_urls": []}
+        for i in range(SENDS):
+            with bench_app.test_request_context(json={"sessionid": SESSION, "inputs": [f"question {i}"]}):
+                start = time.perf_counter()
+                chunks = iter(SpeakToAppApi().post("app").response)
+                next(chunks)
+                latencies.append(time.perf_counter() - start)
+                list(chunks)
+    return latencies
+
+
+# 基准测试：长会话（1000轮）每次重建全部历史与使用会话历史缓存的首字延迟
+def test_speak_ttft_legacy_vs_history_cache(tmp_path, bench_redis):
+    bench_app = Flask(__name__)
+    bench_app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'conversation.db'}"
+    db.init_app(bench_app)
+
+    with bench_app.app_context():
+        Conversation.__table__.create(db.engine)
+        rows = [
+            dict(app_id="app", sessionid=SESSION, from_who=who, content=f"{who} {turn} " * 20, turn_number=turn)
+            for turn in range(1, SESSION_TURNS + 1)
+            for who in ("user", "lazyllm")
+        ]
+        rows += [
+            dict(app_id="app", sessionid=f"other-{i % 500}", from_who="user", content="x", turn_number=i)
+            for i in range(OTHER_ROWS)
+        ]
+        db.session.execute(insert(Conversation), rows)
+        db.session.commit()
+
+        legacy = _ttft(bench_app, _LegacyHistory())
+        with patch("parts.conversation.history_cache.redis_client", bench_redis):
+            cached = _ttft(bench_app, ConversationHistory(max_turns=100, ttl=600))
+        turns = [row.turn_number for row in Conversation.query.filter_by(sessionid=SESSION, from_who="user")]
+
+    legacy_p50, cached_p50 = statistics.median(legacy), statistics.median(cached)
+    print(
+        f"\n{SESSION_TURNS}+ turn session, {SENDS} sends each: "
+        f"legacy p50={legacy_p50 * 1e3:.1f}ms max={max(legacy) * 1e3:.1f}ms, "
+        f"cached p50={cached_p50 * 1e3:.1f}ms max={max(cached) * 1e3:.1f}ms (first send loads from DB)"
+    )
+    assert len(turns) == len(set(turns)) == SESSION_TURNS + 2 * SENDS
+    assert cached_p50 * 3 < legacy_p50
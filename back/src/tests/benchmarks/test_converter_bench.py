@@ -0,0 +1,90 @@
+import contextlib
+import io
+import itertools
+
+from bench_utils import measure
+
+from parts.app.node_run.lazy_converter import LazyConverter
+
+# 每个分支内串联的并行菱形数量，原全路径枚举的耗时随其指数增长
+PARALLEL_DIAMONDS = 8
+
+
+class _CanvasBuilder:
+    def __init__(self):
+        self._ids = itertools.count()
+        self.nodes = [self._node("__start__", "__start__"), self._node("__end__", "__end__")]
+        self.edges = []
+
+    def _node(self, node_id, kind, input_ports=("target",), **data):
+        data.update(
+            payload__kind=kind,
+            title=node_id,
+            config__input_ports=[{"id": port} for port in input_ports],
+        )
+        return {"id": node_id, "data": data}
+
+    def add(self, kind, source, source_handle="source", target_handle="target", **data):
+        node = self._node(f"n{next(self._ids)}", kind, **data)
+        self.nodes.append(node)
+        self.link(source, node["id"], source_handle, target_handle)
+        return node["id"]
+
+    def link(self, source, target, source_handle="source", target_handle="target"):
+        self.edges.append(
+            {
+                "source": source,
+                "target": target,
+                "sourceHandle": source_handle,
+                "targetHandle": target_handle,
+            }
+        )
+
+    def code(self, source, source_handle="source"):
+        return self.add("Code", source, source_handle, payload__code="")
+
+    def diamonds(self, source):
+        for _ in range(PARALLEL_DIAMONDS):
+            left, right = self.code(source), self.code(source)
+            source = self.add("JoinFormatter", left, target_handle="i0", input_ports=("i0", "i1"))
+            self.link(right, source, target_handle="i1")
+        return source
+
+    def ifs(self, source, depth):
+        """添加一个条件分支，true 分支内再嵌套 depth - 1 层，返回聚合器ID"""
+        fork = self.add("Ifs", source, config__output_ports=[{"id": "true", "cond": "x"}, {"id": "false"}])
+        aggregator = f"{fork}_link"
+        self.nodes.append(self._node(aggregator, "aggregator", input_ports=("t", "f")))
+        branch = self.code(fork, "true")
+        if depth > 1:
+            branch = self.ifs(branch, depth - 1)
+        self.link(self.diamonds(branch), aggregator, target_handle="t")
+        self.link(self.code(fork, "false"), aggregator, target_handle="f")
+        return aggregator
+
+    def build(self, branches, nested):
+        source = "__start__"
+        for _ in range(1 if nested else branches):
+            source = self.ifs(source, branches if nested else 1)
+        self.link(source, "__end__")
+        return {"nodes": self.nodes, "edges": self.edges, "resources": []}
+
+
+def _convert(canvas):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return LazyConverter.convert_workflow_to_lazy(canvas)
+
+
+# 基准测试：嵌套/串联分支数从 1 增长到 50 时转换耗时近似线性
+def test_converter_scales_with_branches():
+    for nested in (True, False):
+        costs = {}
+        for branches in (1, 10, 25, 50):
+            canvas = _CanvasBuilder().build(branches, nested)
+            costs[branches] = measure(lambda canvas=canvas: _convert(canvas), repeat=3)
+            print(
+                f"\n{'nested' if nested else 'sequential'} branches={branches}: "
+                f"{costs[branches] * 1e3:.1f}ms"
+            )
+        # 分支数增长 5 倍，耗时增长应远低于指数级
+        assert costs[50] < costs[10] * 25
@@ -0,0 +1,63 @@
+import time
+import uuid
+
+from flask import Flask
+from sqlalchemy import event
+
+from parts.app.model import App
+from parts.cost_audit.model import CostAudit
+from parts.cost_audit.service import CostService
+from parts.cost_audit.writer import CostAuditWriter
+from utils.util_database import db
+
+CALLS = 500
+
+
+def _percentile(samples, ratio):
+    return sorted(samples)[int(len(samples) * ratio) - 1]
+
+
+# 基准测试：逐条同步提交与缓冲写入的请求耗时和每秒提交次数
+def test_cost_audit_writer_vs_sync(tmp_path, monkeypatch):
+    bench_app = Flask(__name__)
+    bench_app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'audit.db'}"
+    db.init_app(bench_app)
+
+    with bench_app.app_context():
+        App.__table__.create(db.engine)
+        CostAudit.__table__.create(db.engine)
+        app_ids = []
+        for _ in range(10):
+            app = App(id=str(uuid.uuid4()), tenant_id=str(uuid.uuid4()), name="app", description="")
+            db.session.add(app)
+            app_ids.append(app.id)
+        db.session.commit()
+
+        commits = []
+        event.listen(db.engine, "commit", lambda conn: commits.append(1))
+        writer = CostAuditWriter(batch_size=200, flush_interval=0.1)
+        monkeypatch.setattr("parts.cost_audit.writer.cost_audit_writer", writer)
+
+        results = {}
+        for name, add in (("sync", CostService.add), ("buffered", CostService.add_buffered)):
+            commits.clear()
+            latencies = []
+            start = time.perf_counter()
+            for i in range(CALLS):
+                call_start = time.perf_counter()
+                add("user", app_ids[i % len(app_ids)], 10, "release", "session", 0.5)
+                latencies.append(time.perf_counter() - call_start)
+            writer.flush()
+            elapsed = time.perf_counter() - start
+            results[name] = (latencies, len(commits), elapsed)
+            print(
+                f"\n{name}: p50={_percentile(latencies, 0.5) * 1e3:.3f}ms "
+                f"p99={_percentile(latencies, 0.99) * 1e3:.3f}ms "
+                f"commits={len(commits)} ({len(commits) / elapsed:.1f}/s)"
+            )
+        writer.shutdown()
+
+        assert CostAudit.query.count() == CALLS * 2
+        assert CostAudit.query.filter(CostAudit.tenant_id.is_(None)).count() == 0
+        assert results["buffered"][1] < results["sync"][1] / 10
+        assert _percentile(results["buffered"][0], 0.5) < _percentile(results["sync"][0], 0.5)
@@ -0,0 +1,62 @@
+from sqlalchemy import MetaData, Table, create_engine, func, select, text
+
+from bench_utils import measure
+
+from parts.db_manage.db_manager import DbManager
+from parts.db_manage.db_manager.bulk_import import BulkImporter, iter_record_chunks
+
+ROW_COUNT = 100_000
+DDL = (
+    "CREATE TABLE {name} (id INTEGER PRIMARY KEY, code VARCHAR(20) NOT NULL, "
+    "flag BOOLEAN, amount NUMERIC(10, 2), created DATETIME)"
+)
+
+
+def _records():
+    return [
+        {
+            "code": f"code{i}",
+            "flag": "true" if i % 2 else "false",
+            "amount": f"{i % 1000}.{i % 100:02d}",
+            "created": f"2025-01-{i % 28 + 1:02d} 12:00:00",
+        }
+        for i in range(ROW_COUNT)
+    ]
+
+
+# 基准测试：10万行数据逐行INSERT与分块校验、批量提交的导入耗时对比
+def test_import_row_by_row_vs_bulk(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'bench.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(DDL.format(name="legacy")))
+        conn.execute(text(DDL.format(name="bulk")))
+    records = _records()
+    manager = DbManager({"endpoint": ""})
+    columns = ["id", "code", "flag", "amount", "created"]
+
+    def legacy_import():
+        with engine.begin() as connection:
+            for row in records:
+                sql, data = manager.build_insert_data("legacy", columns, list(row), row)
+                connection.execute(text(sql), data)
+
+    def bulk_import():
+        table = Table("bulk", MetaData(), autoload_with=engine)
+        importer = BulkImporter(engine, table, batch_size=2000)
+        assert importer.run(iter_record_chunks(records, 5000)).inserted == ROW_COUNT
+
+    legacy = measure(legacy_import)
+    bulk = measure(bulk_import)
+    with engine.connect() as conn:
+        counts = [
+            conn.execute(select(func.count()).select_from(text(name))).scalar()
+            for name in ("legacy", "bulk")
+        ]
+    engine.dispose()
+
+    print(
+        f"\n{ROW_COUNT} rows: row-by-row={legacy:.2f}s ({ROW_COUNT / legacy:.0f} rows/s) "
+        f"bulk={bulk:.2f}s ({ROW_COUNT / bulk:.0f} rows/s)"
+    )
+    assert counts == [ROW_COUNT, ROW_COUNT]
+    assert bulk < legacy
@@ -0,0 +1,75 @@
+import sqlite3
+from unittest.mock import patch
+
+from bench_utils import measure
+from sqlalchemy import MetaData, Table, create_engine, event
+from sqlalchemy.pool import Pool
+
+from parts.db_manage.db_manager import DbManager
+from parts.db_manage.db_manager.engine_registry import EngineRegistry
+
+TABLE_COUNT = 20
+ROWS_PER_TABLE = 200
+PAGE_VIEWS = 5
+
+
+class _LegacyDbManager(DbManager):
+    """每次调用都新建引擎并反射表结构的旧实现"""
+
+    def get_engine(self, db_name=None):
+        return create_engine(f"{self.config['endpoint']}{db_name}")
+
+    def build_table_def(self, db_name, table_name):
+        return Table(table_name, MetaData(), autoload_with=self.get_engine(db_name))
+
+
+def _make_database(path):
+    with sqlite3.connect(path) as conn:
+        for i in range(TABLE_COUNT):
+            conn.execute(f"CREATE TABLE t{i} (id INTEGER PRIMARY KEY, flag TINYINT, note TEXT)")
+            conn.executemany(
+                f"INSERT INTO t{i} (flag, note) VALUES (?, ?)",
+                [(j % 2, f"row{j}") for j in range(ROWS_PER_TABLE)],
+            )
+
+
+# 基准测试：浏览多张表的数据页，每次新建引擎与共享连接池的耗时和新建连接数对比
+def test_table_page_loads_legacy_vs_registry(tmp_path, bench_redis):
+    _make_database(tmp_path / "bench.db")
+    config = {"endpoint": f"sqlite:///{tmp_path}/"}
+    registry = EngineRegistry()
+    connects = []
+    listener = lambda *args: connects.append(1)  # noqa: E731
+    event.listen(Pool, "connect", listener)
+
+    def browse(manager):
+        def run():
+            for i in range(TABLE_COUNT):
+                for page in range(1, PAGE_VIEWS + 1):
+                    manager.select_table_data("bench.db", f"t{i}", page, 20)
+
+        return run
+
+    try:
+        legacy = measure(browse(_LegacyDbManager(config)))
+        legacy_connects = len(connects)
+        connects.clear()
+        with patch("parts.db_manage.db_manager.schema.engine_registry", registry), patch(
+            "parts.db_manage.db_manager.engine_registry.redis_client", bench_redis
+        ):
+            pooled = measure(browse(DbManager(config)))
+        pooled_connects = len(connects)
+        stats = registry.stats()
+    finally:
+        event.remove(Pool, "connect", listener)
+        registry.clear()
+
+    loads = TABLE_COUNT * PAGE_VIEWS
+    print(
+        f"\n{loads} page loads: legacy={legacy / loads * 1e3:.2f}ms/page "
+        f"connects={legacy_connects}, registry={pooled / loads * 1e3:.2f}ms/page "
+        f"connects={pooled_connects}, registry={stats}"
+    )
+    assert pooled_connects < legacy_connects
+    assert stats["engines"] == 1 and stats["tables"] == TABLE_COUNT
+    assert pooled < legacy
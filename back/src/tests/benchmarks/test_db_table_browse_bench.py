@@ -0,0 +1,53 @@
+import sqlite3
+from unittest.mock import patch
+
+from bench_utils import measure
+
+from parts.db_manage.db_manager import DbManager
+from parts.db_manage.db_manager.engine_registry import EngineRegistry
+from parts.db_manage.db_manager.row_browser import encode_cursor
+
+ROW_COUNT = 500_000
+LIMIT = 50
+
+
+# 基准测试：大表深页浏览，页码分页（COUNT(*) + OFFSET）与主键游标分页（估算行数）的耗时对比
+def test_deep_page_offset_vs_keyset(tmp_path, bench_redis):
+    with sqlite3.connect(tmp_path / "bench.db") as conn:
+        conn.execute(
+            "CREATE TABLE events (id INTEGER PRIMARY KEY, flag TINYINT, amount DECIMAL(10, 2), "
+            "created DATETIME, note TEXT)"
+        )
+        conn.executemany(
+            "INSERT INTO events VALUES (?, ?, ?, ?, ?)",
+            (
+                (i, i % 2, i / 100, f"2025-01-01 00:00:{i % 60:02d}", f"note{i}")
+                for i in range(ROW_COUNT)
+            ),
+        )
+    registry = EngineRegistry()
+    manager = DbManager({"endpoint": f"sqlite:///{tmp_path}/"})
+    deep_page = ROW_COUNT // LIMIT - 1
+    cursor = encode_cursor({"after": [(deep_page - 1) * LIMIT - 1]})
+
+    with patch("parts.db_manage.db_manager.schema.engine_registry", registry), patch(
+        "parts.db_manage.db_manager.engine_registry.redis_client", bench_redis
+    ), patch.object(
+        DbManager, "estimate_table_rows", return_value=ROW_COUNT
+    ):
+        offset_page = manager.select_table_data("bench.db", "events", deep_page, LIMIT)
+        keyset_page = manager.browse_table_data("bench.db", "events", LIMIT, cursor=cursor)
+        offset = measure(
+            lambda: manager.select_table_data("bench.db", "events", deep_page, LIMIT), repeat=5
+        )
+        keyset = measure(
+            lambda: manager.browse_table_data("bench.db", "events", LIMIT, cursor=cursor), repeat=5
+        )
+    registry.clear()
+
+    print(
+        f"\n{ROW_COUNT} rows, page {deep_page}: offset={offset * 1e3:.2f}ms "
+        f"keyset={keyset * 1e3:.2f}ms"
+    )
+    assert keyset_page["data"] == offset_page["data"]
+    assert keyset < offset
@@ -0,0 +1,35 @@
+from unittest.mock import patch
+
+from bench_utils import measure
+
+from parts.app.node_run.engine_manager import RedisStateManager
+
+NODE_COUNT = 200
+EVENTS = 2000
+WINDOW = 200
+
+
+# 基准测试：单个调试事件的写入耗时不随本次运行已有事件数增长
+def test_set_detail_cost_is_flat(bench_redis):
+    with patch("parts.app.node_run.engine_manager.redis_client", bench_redis):
+        manager = RedisStateManager("bench_app", "draft")
+        nodes = [f"n{i}" for i in range(NODE_COUNT)]
+        chain = ["__start__", *nodes, "__end__"]
+        edges = [{"source": s, "target": t} for s, t in zip(chain, chain[1:])]
+        manager.save_graph_data({"nodes": []}, {"nodes": [], "edges": edges})
+        manager.set_detail(None)
+
+        costs = []
+        for i in range(EVENTS):
+            # 循环节点反复写入，模拟长时间运行
+            data = {"node_id": nodes[(i * 7) % NODE_COUNT], "outputs": i}
+            costs.append(measure(lambda data=data: manager.set_detail(data)))
+
+        head = sum(costs[:WINDOW]) / WINDOW
+        tail = sum(costs[-WINDOW:]) / WINDOW
+        print(
+            f"\nset_detail per event: first {WINDOW}={head * 1e6:.1f}us, "
+            f"last {WINDOW}={tail * 1e6:.1f}us"
+        )
+        assert manager.get_detail_length() == EVENTS
+        assert tail < head * 3
@@ -0,0 +1,36 @@
+from unittest.mock import patch
+
+from bench_utils import measure
+
+from parts.app.node_run.engine_manager import RedisStateManager
+
+TURNS = 20
+
+
+def _populate(app_id):
+    manager = RedisStateManager(app_id, "draft")
+    for turn in range(1, TURNS + 1):
+        manager.set_detail({"node_id": "n", "prompt_tokens": 1}, turn_number=turn)
+    return manager
+
+
+# 基准测试：清理单个应用的耗时不随实例中其他应用数量增长
+def test_cleanup_latency_is_flat(bench_redis):
+    with patch("parts.app.node_run.engine_manager.redis_client", bench_redis):
+        results = []
+        populated = 0
+        for app_count in (10, 100, 500):
+            for i in range(populated, app_count):
+                _populate(f"other-{i}")
+            populated = app_count
+
+            costs = []
+            for _ in range(5):
+                manager = _populate("target")
+                costs.append(measure(manager.cleanup))
+                assert manager.get_latest_turn_number() == -1
+            results.append((app_count, sorted(costs)[len(costs) // 2]))
+
+        for app_count, cost in results:
+            print(f"\ncleanup with {app_count} apps: {cost * 1e3:.2f}ms")
+        assert results[-1][1] < results[0][1] * 3
@@ -0,0 +1,76 @@
+import contextlib
+import glob
+import io
+import json
+import os
+from unittest.mock import patch
+
+from bench_utils import measure
+
+from parts.app.node_run.graph_cache import GraphCache
+from parts.app.node_run.lazy_converter import LazyConverter
+
+APPS_DIR = os.path.join(
+    os.path.dirname(__file__), "..", "..", "built_in_apps", "apps", "*.json"
+)
+
+
+def _load_convertible_apps():
+    apps = []
+    for path in sorted(glob.glob(APPS_DIR)):
+        with open(path, encoding="utf-8") as f:
+            graph = json.load(f)["graph"]
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                LazyConverter.convert_workflow_to_lazy(graph)
+        except Exception:
+            # 依赖数据库资源（知识库、数据库等）的应用在此跳过
+            continue
+        apps.append((os.path.basename(path), graph))
+    return apps
+
+
+def _convert(graph):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return LazyConverter.convert_workflow_to_lazy(graph)
+
+
+# 基准测试：内置应用的冷转换与缓存命中耗时
+def test_graph_cache_on_builtin_apps(bench_redis):
+    with (
+        patch("parts.app.node_run.graph_cache.redis_client", bench_redis),
+        patch(
+            "parts.models_hub.credential_cache.ModelCredentialResolver.get_model_apikey_by_id",
+            return_value={"api_key": "bench"},
+        ),
+        patch(
+            "parts.models_hub.credential_cache.ModelCredentialResolver.get_model_id_by_name",
+            return_value=1,
+        ),
+    ):
+        apps = _load_convertible_apps()
+        assert apps
+
+        GraphCache.clear_local()
+        cold = sum(
+            measure(lambda graph=graph: GraphCache.get_or_convert(graph, lambda graph=graph: _convert(graph)))
+            for _, graph in apps
+        )
+        warm = sum(
+            measure(
+                lambda graph=graph: GraphCache.get_or_convert(graph, lambda graph=graph: _convert(graph)),
+                repeat=20,
+            )
+            for _, graph in apps
+        )
+        GraphCache.clear_local()
+        shared = sum(
+            measure(lambda graph=graph: GraphCache.get_or_convert(graph, lambda graph=graph: _convert(graph)))
+            for _, graph in apps
+        )
+
+        print(
+            f"\n{len(apps)} apps: cold={cold * 1e3:.1f}ms, local hit={warm * 1e3:.1f}ms, "
+            f"redis hit={shared * 1e3:.1f}ms, stats={GraphCache.stats()}"
+        )
+        assert warm < cold
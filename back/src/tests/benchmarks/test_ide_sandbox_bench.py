@@ -0,0 +1,73 @@
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from parts.tools.sandbox_pool import SandboxPool
+
+COLD_CALLS = 20
+POOL_CALLS = 200
+CODE = """
+def add(a, b):
+    return {"sum": a + b, "at": datetime.datetime.now().isoformat()}
+"""
+VARS = {"datetime": "datetime", "json": "json"}
+
+# 原实现：每次调用启动新解释器，导入 lazyllm 后在标记之间打印结果
+COLD_SCRIPT = """
+import importlib, json, sys
+from lazyllm.tools.tools import HttpTool
+request = json.loads(sys.argv[1])
+modules = {k: importlib.import_module(v) for k, v in request["vars"].items()}
+result = HttpTool(code_str=request["code"], vars_for_code=modules, timeout=30).forward(**request["input"])
+print("RESULT_START")
+print(json.dumps(result))
+print("RESULT_END")
+"""
+
+
+def _cold_call(input_data):
+    request = json.dumps({"code": CODE, "vars": VARS, "input": input_data})
+    output = subprocess.run(
+        [sys.executable, "-c", COLD_SCRIPT, request], capture_output=True, text=True, check=True
+    ).stdout.splitlines()
+    return json.loads(output[output.index("RESULT_START") + 1])
+
+
+def _latencies(call, count):
+    latencies = []
+    for i in range(count):
+        start = time.perf_counter()
+        assert call({"a": i, "b": 1})["sum"] == i + 1
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _p50_p99(latencies):
+    quantiles = statistics.quantiles(latencies, n=100)
+    return quantiles[49] * 1e3, quantiles[98] * 1e3
+
+
+# 基准测试：每次启动子进程与预热沙箱进程池（每次调用 fork 子进程）执行IDE工具的延迟分布
+def test_ide_tool_latency_cold_vs_pool():
+    cold = _latencies(_cold_call, COLD_CALLS)
+
+    pool = SandboxPool(size=2, max_calls=50, max_rss_mb=1024, call_timeout=30, start_timeout=60, preload="")
+    pool.warm_up()
+    time.sleep(2)
+    try:
+        warm = _latencies(lambda data: pool.execute(CODE, VARS, data)["result"], POOL_CALLS)
+        stats = pool.stats()
+    finally:
+        pool.shutdown()
+
+    cold_p50, cold_p99 = _p50_p99(cold)
+    warm_p50, warm_p99 = _p50_p99(warm)
+    print(
+        f"\ncold subprocess ({COLD_CALLS} calls): p50={cold_p50:.1f}ms p99={cold_p99:.1f}ms"
+        f"\nsandbox pool ({POOL_CALLS} calls, recycled={stats['recycled']}): "
+        f"p50={warm_p50:.1f}ms p99={warm_p99:.1f}ms"
+    )
+    assert warm_p50 * 10 < cold_p50
+    assert warm_p99 < cold_p99
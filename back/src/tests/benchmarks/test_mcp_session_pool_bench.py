@@ -0,0 +1,55 @@
+import asyncio
+import sys
+from unittest.mock import patch
+
+from bench_utils import measure
+from lazyllm.tools import MCPClient
+
+from parts.mcp.session_pool import McpServerSpec, McpSessionManager
+
+CALLS = 10
+SERVER = """
+from mcp.server.fastmcp import FastMCP
+
+server = FastMCP("bench")
+
+
+@server.tool()
+def echo(text: str) -> str:
+    return text
+
+
+server.run()
+"""
+
+
+# 基准测试：STDIO MCP 工具连续调用，每次新建客户端与复用会话的耗时对比
+def test_mcp_tool_calls_per_call_client_vs_pooled(tmp_path, bench_redis):
+    script = tmp_path / "server.py"
+    script.write_text(SERVER)
+    spec = McpServerSpec(
+        transport="STDIO", command_or_url=sys.executable, args=(str(script),), timeout=30
+    )
+    manager = McpSessionManager(idle_timeout=60, max_concurrency=4)
+
+    def per_call():
+        client = MCPClient(command_or_url=sys.executable, args=[str(script)], timeout=30)
+        assert asyncio.run(client.call_tool("echo", {"text": "hi"})).content[0].text == "hi"
+
+    def pooled():
+        assert manager.call_tool_sync(spec, "echo", {"text": "hi"}).content[0].text == "hi"
+
+    # 复用会话时每次借出都会比对 Redis 中的服务版本号
+    with patch("parts.mcp.session_pool.redis_client", bench_redis):
+        try:
+            cold = measure(per_call, repeat=CALLS)
+            pooled()
+            warm = measure(pooled, repeat=CALLS)
+        finally:
+            manager.shutdown()
+
+    print(
+        f"\n{CALLS} calls: new client={cold * 1e3:.1f}ms/call, "
+        f"pooled session={warm * 1e3:.2f}ms/call"
+    )
+    assert warm * 10 < cold
@@ -0,0 +1,70 @@
+import os
+import shutil
+from unittest.mock import patch
+
+from bench_utils import measure
+
+from libs.filetools import FileTools
+from parts.models_hub.model_copy import ModelCopier
+
+SHARD_COUNT = 8
+SHARD_SIZE = 32 * 1024 * 1024
+SMALL_FILES = 200
+
+
+def _make_model(root):
+    os.makedirs(os.path.join(root, "tokenizer"))
+    block = os.urandom(1024 * 1024)
+    for i in range(SHARD_COUNT):
+        with open(os.path.join(root, f"model-{i:05d}.safetensors"), "wb") as f:
+            for _ in range(SHARD_SIZE // len(block)):
+                f.write(block)
+    for i in range(SMALL_FILES):
+        with open(os.path.join(root, "tokenizer", f"vocab-{i}.txt"), "wb") as f:
+            f.write(os.urandom(1024))
+
+
+def _legacy_copy(src, dst):
+    """原实现：copytree 逐个文件复制并发送消息，复制后再次遍历统计大小"""
+    messages = []
+    total_files = sum(len(files) for _, _, files in os.walk(src))
+    copied = [0]
+
+    def custom_copy(s, d):
+        shutil.copy2(s, d)
+        copied[0] += 1
+        messages.append((copied[0], total_files))
+
+    shutil.copytree(src, dst, copy_function=custom_copy)
+    return messages, FileTools.get_dir_path_size(dst)
+
+
+# 基准测试：原 copytree 实现与复制引擎（普通复制、链接、未变化时跳过）的耗时与消息数
+def test_model_copy_engine_vs_copytree(tmp_path):
+    src = str(tmp_path / "src")
+    _make_model(src)
+
+    legacy_messages = []
+    legacy = measure(lambda: legacy_messages.extend(_legacy_copy(src, str(tmp_path / "legacy"))[0]))
+
+    engine_messages = []
+    copier = ModelCopier(workers=4, progress_interval=0.5)
+    with patch("utils.storage.blob_store.fcntl.ioctl", side_effect=OSError), patch(
+        "utils.storage.blob_store.os.link", side_effect=OSError
+    ):
+        copied = measure(
+            lambda: copier.copy_tree(src, str(tmp_path / "copy"), on_progress=engine_messages.append)
+        )
+    link_copier = ModelCopier(workers=4, progress_interval=0.5, allow_hardlink=True)
+    linked = measure(lambda: link_copier.copy_tree(src, str(tmp_path / "linked")))
+    noop = measure(lambda: copier.copy_tree(src, str(tmp_path / "copy")), repeat=5)
+
+    print(
+        f"\n{SHARD_COUNT}x{SHARD_SIZE >> 20}MiB + {SMALL_FILES} small files: "
+        f"copytree={legacy * 1e3:.0f}ms ({len(legacy_messages)} msgs) "
+        f"engine copy={copied * 1e3:.0f}ms ({len(engine_messages)} msgs) "
+        f"link={linked * 1e3:.0f}ms unchanged={noop * 1e3:.1f}ms"
+    )
+    assert len(engine_messages) < len(legacy_messages)
+    assert linked < legacy
+    assert noop < legacy / 10
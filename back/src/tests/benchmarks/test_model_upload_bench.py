@@ -0,0 +1,86 @@
+import io
+import multiprocessing
+import os
+import resource
+import time
+
+import pytest
+
+from parts.models_hub.chunk_upload import ChunkedUpload
+
+TOTAL_SIZE = 256 * 1024 * 1024
+CHUNK_COUNTS = (8, 32, 128)
+
+
+def _rss_kb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def _legacy_upload(chunk_dir, chunks, target_path):
+    """原实现：分片单独保存，合并时整片读入内存再写出"""
+    os.makedirs(chunk_dir)
+    for n, chunk in enumerate(chunks):
+        with open(os.path.join(chunk_dir, f"chunk_{n}"), "wb") as f:
+            f.write(chunk.getbuffer())
+    merge_start = time.perf_counter()
+    with open(target_path, "wb") as outfile:
+        for n in range(len(chunks)):
+            with open(os.path.join(chunk_dir, f"chunk_{n}"), "rb") as infile:
+                outfile.write(infile.read())
+    return time.perf_counter() - merge_start
+
+
+def _positional_upload(chunk_dir, chunks, target_path):
+    upload = ChunkedUpload(chunk_dir, os.path.basename(target_path))
+    upload.prepare(len(chunks), len(chunks[0].getbuffer()), TOTAL_SIZE)
+    for n, chunk in enumerate(chunks):
+        upload.write_chunk(n, chunk)
+    merge_start = time.perf_counter()
+    upload.assemble()
+    return time.perf_counter() - merge_start
+
+
+def _measure(conn, run, workdir, chunk_count):
+    chunk_size = TOTAL_SIZE // chunk_count
+    # 所有分片共享同一块源数据，避免测试数据本身计入峰值
+    source = memoryview(os.urandom(chunk_size))
+    chunks = [io.BytesIO(source) for _ in range(chunk_count)]
+    baseline = _rss_kb()
+    merge_time = run(os.path.join(workdir, "chunks"), chunks, os.path.join(workdir, "model.bin"))
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    conn.send((merge_time, max(0, peak - baseline) / 1024))
+
+
+def _run_isolated(run, workdir, chunk_count):
+    ctx = multiprocessing.get_context("fork")
+    parent, child = ctx.Pipe()
+    process = ctx.Process(target=_measure, args=(child, run, workdir, chunk_count))
+    process.start()
+    result = parent.recv()
+    process.join()
+    return result
+
+
+# 基准测试：不同分片数下合并耗时与峰值内存（RSS增量）
+@pytest.mark.parametrize("chunk_count", CHUNK_COUNTS)
+def test_chunk_merge_time_and_peak_rss(tmp_path, chunk_count):
+    legacy_dir = tmp_path / "legacy"
+    positional_dir = tmp_path / "positional"
+    legacy_dir.mkdir()
+    positional_dir.mkdir()
+
+    legacy_merge, legacy_rss = _run_isolated(_legacy_upload, str(legacy_dir), chunk_count)
+    merge, rss = _run_isolated(_positional_upload, str(positional_dir), chunk_count)
+
+    print(
+        f"\n{chunk_count} chunks x {TOTAL_SIZE // chunk_count >> 20}MiB: "
+        f"legacy merge={legacy_merge * 1e3:.1f}ms peak_rss=+{legacy_rss:.1f}MiB | "
+        f"positional merge={merge * 1e3:.1f}ms peak_rss=+{rss:.1f}MiB"
+    )
+    assert merge < legacy_merge
+    # 按缓冲区大小分块写入，峰值内存不随分片大小增长
+    assert rss < 8
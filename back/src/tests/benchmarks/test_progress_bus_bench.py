@@ -0,0 +1,43 @@
+import time
+from unittest.mock import patch
+
+from bench_utils import measure
+
+from utils.progress_bus import ProgressBus
+
+UPDATES = 5000
+
+
+def _deliver(bench_redis, interval):
+    publisher, subscriber = ProgressBus(interval=interval), ProgressBus(interval=interval)
+    frames = []
+    with patch("utils.progress_bus.redis_client", bench_redis):
+        subscriber.subscribe("model_hub", "bench", frames.extend, replay=False)
+        time.sleep(0.3)
+
+        def produce():
+            for i in range(UPDATES):
+                publisher.publish("model_hub", "bench", {"current": i, "total": UPDATES})
+            publisher.publish("model_hub", "bench", {"current": UPDATES, "is_end": True}, final=True)
+
+        elapsed = measure(produce)
+        deadline = time.monotonic() + 30
+        while not (frames and frames[-1].get("is_end")) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        subscriber.close()
+        publisher.close()
+    return elapsed, frames
+
+
+# 基准测试：逐条发布与按间隔合并时进度推送的耗时和到达客户端的帧数
+def test_progress_fanout_per_message_vs_coalesced(bench_redis):
+    raw_time, raw_frames = _deliver(bench_redis, interval=0)
+    coalesced_time, coalesced_frames = _deliver(bench_redis, interval=0.1)
+
+    print(
+        f"\n{UPDATES} updates: per-message={raw_time * 1e3:.0f}ms/{len(raw_frames)} frames "
+        f"coalesced={coalesced_time * 1e3:.0f}ms/{len(coalesced_frames)} frames"
+    )
+    assert raw_frames[-1]["is_end"] and coalesced_frames[-1]["is_end"]
+    assert len(coalesced_frames) * 10 < len(raw_frames)
+    assert coalesced_time < raw_time
@@ -0,0 +1,61 @@
+import time
+import uuid
+
+import lazyllm
+
+from parts.app.node_run.stream_relay import StreamRelay
+
+CHUNKS = 20
+FIRST_TOKEN_DELAY = 0.2
+CHUNK_INTERVAL = 0.02
+
+
+def _produce():
+    queue = lazyllm.FileSystemQueue()
+    time.sleep(FIRST_TOKEN_DELAY)
+    for i in range(CHUNKS):
+        queue.enqueue(f"chunk{i} ")
+        time.sleep(CHUNK_INTERVAL)
+    return "done"
+
+
+def _busy_poll(future):
+    # 原 execute_stream_task 的轮询方式，作为对照
+    while True:
+        tid = lazyllm.FileSystemQueue().sid
+        if value := lazyllm.FileSystemQueue()._dequeue(tid):
+            yield "".join(value)
+        elif future.done():
+            break
+
+
+def _run_stream(consume):
+    lazyllm.globals._init_sid(str(uuid.uuid4()))
+    with lazyllm.ThreadPoolExecutor(1) as executor:
+        start_wall = time.perf_counter()
+        start_cpu = time.thread_time()
+        future = executor.submit(_produce)
+        first_token = None
+        text = ""
+        for part in consume(future):
+            if first_token is None:
+                first_token = time.perf_counter() - start_wall
+            text += part
+        cpu = time.thread_time() - start_cpu
+    return text, first_token, cpu
+
+
+# 基准测试：单个流的 CPU 占用与首包延迟
+def test_stream_relay_cpu_and_ttft():
+    expected = "".join(f"chunk{i} " for i in range(CHUNKS))
+
+    poll_text, poll_ttft, poll_cpu = _run_stream(_busy_poll)
+    relay_text, relay_ttft, relay_cpu = _run_stream(StreamRelay().relay)
+
+    print(
+        f"\nbusy poll: cpu={poll_cpu * 1000:.1f}ms ttft={poll_ttft * 1000:.1f}ms"
+        f"\nrelay:     cpu={relay_cpu * 1000:.1f}ms ttft={relay_ttft * 1000:.1f}ms"
+    )
+    assert poll_text == relay_text == expected
+    assert relay_cpu < poll_cpu
+    assert relay_ttft < FIRST_TOKEN_DELAY + 0.1
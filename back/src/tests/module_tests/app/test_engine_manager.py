@@ -0,0 +1,114 @@
+from unittest.mock import patch
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from parts.app.node_run.engine_manager import RedisStateManager  # noqa: E402
+
+
+@pytest.fixture
+def fake_redis():
+    client = fakeredis.FakeRedis()
+    with patch("parts.app.node_run.engine_manager.redis_client", client):
+        yield client
+
+
+@pytest.fixture
+def state_manager(fake_redis):
+    manager = RedisStateManager("app_id", "draft")
+    edges = [
+        {"source": "__start__", "target": "a"},
+        {"source": "a", "target": "b"},
+        {"source": "b", "target": "c"},
+        {"source": "c", "target": "__end__"},
+    ]
+    manager.save_graph_data({"nodes": []}, {"nodes": [], "edges": edges})
+    return manager
+
+
+def _detail(node_id, tokens=0):
+    return {"node_id": node_id, "prompt_tokens": tokens, "completion_tokens": 1}
+
+
+# 测试详情按拓扑顺序返回，同一节点保持写入顺序
+def test_set_detail_keeps_topological_order(state_manager):
+    for node_id in ["c", "a", "b", "a"]:
+        state_manager.set_detail(_detail(node_id))
+    state_manager.set_detail({"type": "session_end"})
+
+    details = state_manager.get_detail()
+    assert [item.get("node_id") for item in details] == ["a", "a", "b", "c", None]
+    assert state_manager.get_detail_length() == 5
+    assert [item.get("node_id") for item in state_manager.get_detail_since(2)] == [
+        "c",
+        None,
+    ]
+
+
+# 测试重复记录不会被合并，token 数累加
+def test_set_detail_duplicate_records_and_tokens(state_manager):
+    state_manager.set_detail(_detail("a", tokens=3), turn_number=2)
+    state_manager.set_detail(_detail("a", tokens=3), turn_number=2)
+
+    assert len(state_manager.get_detail(turn_number=2)) == 2
+    assert state_manager.get_detail(conversation_type="multi") == [
+        _detail("a", tokens=3),
+        _detail("a", tokens=3),
+    ]
+
+    state_manager.set_detail(None, turn_number=2)
+    assert state_manager.get_detail_length(turn_number=2) == 0
+
+
+# 测试未保存原始图时按写入顺序返回
+def test_set_detail_without_graph(fake_redis):
+    manager = RedisStateManager("other_app", "draft")
+    for node_id in ["c", "a", "b"]:
+        manager.set_detail(_detail(node_id))
+    assert [item["node_id"] for item in manager.get_detail()] == ["c", "a", "b"]
+
+
+# 测试最新轮次以计数器维护
+def test_latest_turn_number_counter(state_manager):
+    assert state_manager.get_latest_turn_number() == -1
+    state_manager.set_detail(_detail("a"), turn_number=3)
+    state_manager.set_detail(_detail("a"), turn_number=2)
+    state_manager.set_detail(_detail("a"))
+    assert state_manager.get_latest_turn_number() == 3
+
+
+# 测试清理只删除本应用的 key，且不使用 KEYS
+def test_cleanup_uses_registry(fake_redis, state_manager):
+    other = RedisStateManager("other_app", "draft")
+    other.set_detail(_detail("a"), turn_number=1)
+    for turn in (1, 2):
+        state_manager.set_detail(_detail("a"), turn_number=turn)
+
+    with patch.object(fake_redis, "keys", side_effect=AssertionError("KEYS used")):
+        state_manager.cleanup()
+
+    assert not fake_redis.keys("*app_id*")
+    assert state_manager.get_latest_turn_number() == -1
+    assert other.get_detail_length(turn_number=1) == 1
+
+
+# 测试调试历史按轮次保存并只读取最后limit轮
+def test_detail_history_per_turn(state_manager):
+    for turn in (1, 2, 3):
+        state_manager.set_detail(None, turn_number=turn)
+        state_manager.set_detail(
+            {"node_id": "a", "turn_number": turn}, turn_number=turn
+        )
+        state_manager.set_detail(
+            {"type": "session_end", "turn_number": turn}, turn_number=turn
+        )
+        state_manager.save_current_detail_to_history(turn)
+
+    history = state_manager.get_detail_history()
+    assert list(history.keys()) == ["1", "2", "3"]
+    assert history["2"] == [{"node_id": "a", "turn_number": 2}]
+    assert list(state_manager.get_detail_history(limit=2).keys()) == ["2", "3"]
+
+    state_manager.cleanup()
+    assert state_manager.get_detail_history() == {}
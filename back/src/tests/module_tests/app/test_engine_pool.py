@@ -0,0 +1,168 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from parts.app.app_restart_service import AppRestartService  # noqa: E402
+from parts.app.node_run.engine_manager import EngineManager  # noqa: E402
+from parts.app.node_run.engine_pool import EnginePool  # noqa: E402
+from parts.app.node_run.run_context import RunContext  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def engine_pool():
+    EnginePool.clear()
+    with (
+        patch("parts.app.node_run.engine_pool.LightEngine") as light_engine,
+        patch("parts.app.node_run.engine_pool.lazy_config") as config,
+    ):
+        config.ENGINE_POOL_MODEL_BUDGET = 4
+        yield light_engine.return_value
+    EnginePool.clear()
+
+
+# 测试相同画布命中、画布变化未命中
+def test_acquire_matches_graph_hash():
+    EnginePool.register("publish-1", "hash-a", 1)
+    EnginePool.park("publish-1")
+    before = EnginePool.stats()
+
+    assert EnginePool.acquire("publish-1", "hash-a")
+    assert not EnginePool.is_idle("publish-1")
+    assert not EnginePool.acquire("publish-1", "hash-b")
+    assert not EnginePool.acquire("publish-1", "hash-a")
+
+    stats = EnginePool.stats()
+    assert stats["hits"] == before["hits"] + 1
+    assert stats["misses"] == before["misses"] + 2
+    assert stats["engines"] == 0
+
+
+# 测试超出模型预算时只按 LRU 顺序淘汰空闲引擎
+def test_evicts_idle_engines_over_budget(engine_pool):
+    EnginePool.register("publish-1", "h1", 2)
+    EnginePool.register("publish-2", "h2", 1)
+    EnginePool.park("publish-1")
+    EnginePool.park("publish-2")
+    evictions = EnginePool.stats()["evictions"]
+
+    EnginePool.register("publish-3", "h3", 2)
+
+    assert not EnginePool.acquire("publish-1", "h1")
+    engine_pool.release_node.assert_called_once_with("publish-1")
+    stats = EnginePool.stats()
+    assert stats["evictions"] == evictions + 1
+    assert stats["idle"] == 1
+
+    # 使用中的引擎即使超出预算也不会被淘汰
+    EnginePool.register("publish-4", "h4", 8)
+    assert EnginePool.stats()["engines"] == 2
+    engine_pool.release_node.assert_called_with("publish-2")
+
+
+# 测试发布态停止后再次启动复用引擎
+def test_engine_manager_reuses_parked_engine():
+    executor = MagicMock(engine_id="publish-app")
+    executor.start_engine.return_value = "publish-app"
+    executor.is_engine_running.return_value = True
+    executor.get_engine_urls.return_value = ("", "")
+
+    with (
+        patch("parts.app.node_run.engine_manager.EngineExecutor", return_value=executor),
+        patch("parts.app.node_run.engine_manager.redis_client", fakeredis.FakeRedis()),
+    ):
+        manager = EngineManager(RunContext(app_id="app", mode="publish"))
+        manager._graph_data = {"nodes": [{"id": "a"}], "edges": []}
+
+        manager.start_engine()
+        manager.stop_engine(keep_warm=True)
+        assert not manager.is_engine_running()
+        executor.stop_engine.assert_not_called()
+
+        manager.start_engine()
+        assert executor.start_engine.call_count == 1
+        assert manager.is_engine_running()
+
+        manager.stop_engine()
+        executor.stop_engine.assert_called_once()
+        assert EnginePool.stats()["engines"] == 0
+
+
+# 测试重启应用时复用本进程中仍在运行的引擎，不清理运行状态
+def test_restart_app_reuses_running_engine():
+    executor = MagicMock(engine_id="publish-app")
+    executor.start_engine.return_value = "publish-app"
+    executor.is_engine_running.return_value = True
+    executor.get_engine_urls.return_value = ("", "")
+    app = MagicMock(id="app", enable_api=True)
+    app.name = "app"
+
+    with (
+        patch("parts.app.node_run.engine_manager.EngineExecutor", return_value=executor),
+        patch("parts.app.node_run.engine_manager.redis_client", fakeredis.FakeRedis()),
+        patch("parts.app.app_restart_service.db"),
+        patch("parts.app.app_restart_service.AppRunService") as app_run_service,
+    ):
+        manager = EngineManager(RunContext(app_id="app", mode="publish"))
+        manager._graph_data = {"nodes": [{"id": "a"}], "edges": []}
+        manager.start_engine()
+        hits = EnginePool.stats()["hits"]
+
+        def start_stream(graph):
+            manager.start_engine()
+            yield 'data: {"data": {"status": "succeeded"}}\n\n'
+
+        app_run_service.create.return_value.start_stream.side_effect = start_stream
+        service = AppRestartService()
+        service.workflow_service = MagicMock()
+
+        assert service.restart_app(app)
+
+    app_run_service.create.return_value.stop.assert_not_called()
+    executor.stop_engine.assert_not_called()
+    assert executor.start_engine.call_count == 1
+    assert EnginePool.stats()["hits"] == hits + 1
+    assert app.enable_api
+
+
+# 测试显式停止、下线和清理时释放引擎而不是保留
+def test_cleanup_releases_engine():
+    executor = MagicMock(engine_id="publish-app")
+    executor.start_engine.return_value = "publish-app"
+    executor.is_engine_running.return_value = True
+    executor.get_engine_urls.return_value = ("", "")
+
+    with (
+        patch("parts.app.node_run.engine_manager.EngineExecutor", return_value=executor),
+        patch("parts.app.node_run.engine_manager.redis_client", fakeredis.FakeRedis()),
+    ):
+        manager = EngineManager(RunContext(app_id="app", mode="publish"))
+        manager._graph_data = {"nodes": [{"id": "a"}], "edges": []}
+
+        manager.start_engine()
+        manager.cleanup_all()
+
+        executor.stop_engine.assert_called_once()
+        assert EnginePool.stats()["engines"] == 0
+
+
+# 测试按画布中本地模型节点估算引擎占用
+def test_model_footprint_counts_local_models():
+    workflow = {
+        "nodes": [
+            {"id": "1", "data": {"payload__kind": "TTS"}},
+            {"id": "2", "data": {"payload__kind": "OnlineLLM"}},
+            {
+                "id": "3",
+                "data": {
+                    "payload__kind": "SubGraph",
+                    "payload__patch": {"nodes": [{"data": {"type": "localembedding"}}]},
+                },
+            },
+        ],
+        "resources": [{"id": "4", "data": {"payload__kind": "SD"}}],
+    }
+
+    assert EnginePool.model_footprint(workflow) == 3
+    assert EnginePool.model_footprint({"nodes": [{"data": {"payload__kind": "Code"}}]}) == 1
@@ -0,0 +1,133 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from sqlalchemy import Column, Integer, create_engine  # noqa: E402
+from sqlalchemy.orm import Session, declarative_base  # noqa: E402
+
+from parts.app.node_run.graph_cache import (  # noqa: E402
+    GraphCache,
+    bump_graph_dependencies,
+    record_graph_dependency,
+    register_session_listeners,
+)
+
+WORKFLOW = {"nodes": [{"id": "a", "kind": "llm"}], "edges": []}
+
+
+@pytest.fixture(autouse=True)
+def fake_redis():
+    client = fakeredis.FakeRedis()
+    GraphCache.clear_local()
+    with patch("parts.app.node_run.graph_cache.redis_client", client):
+        yield client
+    GraphCache.clear_local()
+
+
+def _converter(result):
+    def convert():
+        record_graph_dependency("lazymodel", 1)
+        return {"nodes": [dict(result)], "edges": []}
+
+    return MagicMock(side_effect=convert)
+
+
+# 测试相同画布第二次转换命中缓存，且返回值互不影响
+def test_get_or_convert_hits_cache():
+    convert = _converter({"id": "a"})
+    first = GraphCache.get_or_convert(WORKFLOW, convert, tenant_id="t1")
+    first["nodes"].append("mutated")
+    second = GraphCache.get_or_convert(WORKFLOW, convert, tenant_id="t1")
+
+    assert convert.call_count == 1
+    assert second == {"nodes": [{"id": "a"}], "edges": []}
+    assert GraphCache.stats()["local_hits"] >= 1
+
+
+# 测试上下文不同或依赖资源变更时重新转换
+def test_get_or_convert_invalidation():
+    convert = _converter({"id": "a"})
+    GraphCache.get_or_convert(WORKFLOW, convert, tenant_id="t1")
+    GraphCache.get_or_convert(WORKFLOW, convert, tenant_id="t2")
+    assert convert.call_count == 2
+
+    bump_graph_dependencies(["graph_dep:lazymodel:1"])
+    GraphCache.get_or_convert(WORKFLOW, convert, tenant_id="t1")
+    assert convert.call_count == 3
+
+
+# 测试进程内缓存清空后从 Redis 共享缓存命中
+def test_get_or_convert_redis_tier():
+    convert = _converter({"id": "a"})
+    GraphCache.get_or_convert(WORKFLOW, convert)
+    GraphCache.clear_local()
+    redis_hits = GraphCache.stats()["redis_hits"]
+
+    assert GraphCache.get_or_convert(WORKFLOW, convert)["nodes"] == [{"id": "a"}]
+    assert convert.call_count == 1
+    assert GraphCache.stats()["redis_hits"] == redis_hits + 1
+
+
+# 测试缓存以 JSON 保存，含有 JSON 无法原样表示的对象的画布不缓存
+def test_cache_payload_is_json(fake_redis):
+    GraphCache.get_or_convert(WORKFLOW, _converter({"id": "a"}))
+    key = GraphCache.make_key(WORKFLOW)
+    assert json.loads(fake_redis.get(key))["graph"]["nodes"] == [{"id": "a"}]
+
+    convert = _converter({"id": "b", "shape": (1, 2)})
+    GraphCache.get_or_convert(WORKFLOW, convert, tenant_id="tuple")
+    GraphCache.get_or_convert(WORKFLOW, convert, tenant_id="tuple")
+    assert convert.call_count == 2
+
+
+# 测试清除租户 api_key（批量删除，不经过 ORM 会话事件）后已转换的画布失效
+def test_credential_invalidation_invalidates_graph(fake_redis):
+    from parts.models_hub.credential_cache import (ModelCredentialCache,
+                                                   ModelCredentialResolver)
+
+    cache = ModelCredentialCache(ttl=60)
+    cache.get = MagicMock(return_value=MagicMock(model_ids={"m": 1}, api_keys={}))
+
+    def convert():
+        with patch(
+            "parts.models_hub.credential_cache.current_credential_tenant_id", return_value="tenant"
+        ):
+            ModelCredentialResolver(cache).get_model_id_by_name("m")
+        return {"nodes": [], "edges": []}
+
+    converter = MagicMock(side_effect=convert)
+    GraphCache.get_or_convert(WORKFLOW, converter, tenant_id="tenant")
+    GraphCache.get_or_convert(WORKFLOW, converter, tenant_id="tenant")
+    assert converter.call_count == 1
+
+    with patch("parts.models_hub.credential_cache.redis_client", fake_redis):
+        cache.invalidate("tenant")
+    GraphCache.get_or_convert(WORKFLOW, converter, tenant_id="tenant")
+    assert converter.call_count == 2
+
+
+# 测试启动时注册的会话监听在提交后递增依赖版本，重复注册不会重复递增
+def test_session_listeners_bump_dependencies_on_commit(fake_redis):
+    base = declarative_base()
+
+    class Tool(base):
+        __tablename__ = "tool"
+        id = Column(Integer, primary_key=True)
+
+    engine = create_engine("sqlite://")
+    base.metadata.create_all(engine)
+    register_session_listeners()
+    register_session_listeners()
+
+    with Session(engine) as session:
+        session.add(Tool(id=7))
+        session.commit()
+        session.add(Tool(id=8))
+        session.flush()
+        session.rollback()
+
+    assert fake_redis.get("graph_dep:tool:7") == b"1"
+    assert fake_redis.get("graph_dep:tool:8") is None
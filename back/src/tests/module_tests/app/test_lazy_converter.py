@@ -0,0 +1,134 @@
+import contextlib
+import io
+import random
+from unittest.mock import patch
+
+import networkx as nx
+
+from parts.app.node_run import lazy_converter
+from parts.app.node_run.lazy_converter import (
+    LazyConverter,
+    compress_a_to_b,
+    get_simple_paths_with_key,
+)
+
+
+# 基于全路径枚举的原始实现，作为对照
+def _reference_paths_with_key(graph, a, b):
+    all_edges = list(nx.all_simple_edge_paths(graph, a, b))
+    all_keys = [
+        [graph[begin][end]["key"] for begin, end in edges if len(graph[begin][end]) > 0]
+        for edges in all_edges
+    ]
+    return {
+        keys[0]: [end for (begin, end) in edges]
+        for keys, edges in zip(all_keys, all_edges)
+    }
+
+
+def _reference_compress(graph, a, b):
+    paths = list(nx.all_simple_edge_paths(graph, a, b))
+    all_edges = [edge for path in paths for edge in path]
+    middle_nodes = {v for path in paths for (_, v, *_) in path[:-1]}
+    graph.remove_edges_from((u, v) for (u, v, *_) in all_edges)
+    graph.remove_nodes_from(middle_nodes)
+    for succ in list(graph.successors(b)):
+        graph.add_edge(a, succ)
+    graph.remove_node(b)
+
+
+def _random_region(rng, size):
+    graph = nx.DiGraph()
+    nodes = list(range(size))
+    graph.add_nodes_from(nodes)
+    for v in nodes[1:]:
+        for u in rng.sample(nodes[:v], k=min(v, rng.randint(1, 3))):
+            attrs = {"key": rng.choice(["true", "false", "c1"])}
+            graph.add_edge(u, v, **(attrs if u == 0 or rng.random() < 0.5 else {}))
+    return graph
+
+
+def _node(node_id, kind, **data):
+    data.update(payload__kind=kind, title=node_id)
+    data.setdefault("config__input_ports", [{"id": "target"}])
+    return {"id": node_id, "data": data}
+
+
+def _edge(source, target, source_handle="source", target_handle="target"):
+    return {
+        "source": source,
+        "target": target,
+        "sourceHandle": source_handle,
+        "targetHandle": target_handle,
+    }
+
+
+def _nested_ifs_canvas():
+    # start -> if1 -(true)-> if2 -(true)-> c1 -> (d1, d2) -> join -> agg2 -> agg1 -> end
+    ifs_ports = [{"id": "true", "cond": "x"}, {"id": "false"}]
+    agg_ports = [{"id": "t"}, {"id": "f"}]
+    nodes = [
+        _node("__start__", "__start__"),
+        _node("__end__", "__end__"),
+        _node("if1", "Ifs", config__output_ports=ifs_ports),
+        _node("if1_link", "aggregator", config__input_ports=agg_ports),
+        _node("if2", "Ifs", config__output_ports=ifs_ports),
+        _node("if2_link", "aggregator", config__input_ports=agg_ports),
+        _node("join", "JoinFormatter", config__input_ports=[{"id": "i0"}, {"id": "i1"}]),
+    ] + [_node(i, "Code", payload__code=i) for i in ("c1", "d1", "d2", "f1", "f2")]
+    edges = [
+        _edge("__start__", "if1"),
+        _edge("if1", "if1_link", "false", ""),
+        _edge("if1", "if2", "true"),
+        _edge("if1", "f1", "false"),
+        _edge("if2", "c1", "true"),
+        _edge("if2", "f2", "false"),
+        _edge("c1", "d1"),
+        _edge("c1", "d2"),
+        _edge("d1", "join", target_handle="i0"),
+        _edge("d2", "join", target_handle="i1"),
+        _edge("join", "if2_link", target_handle="t"),
+        _edge("f2", "if2_link", target_handle="f"),
+        _edge("if2_link", "if1_link", target_handle="t"),
+        _edge("f1", "if1_link", target_handle="f"),
+        _edge("if1_link", "__end__"),
+    ]
+    return {"nodes": nodes, "edges": edges, "resources": []}
+
+
+# 测试分支路径与区域压缩的结果与全路径枚举一致
+def test_region_helpers_match_path_enumeration():
+    rng = random.Random(7)
+    for _ in range(300):
+        graph = _random_region(rng, rng.randint(2, 12))
+        end = max(graph.nodes)
+        assert get_simple_paths_with_key(graph, 0, end) == _reference_paths_with_key(
+            graph, 0, end
+        )
+
+        expected = graph.copy()
+        graph.add_edge(end, "next")
+        expected.add_edge(end, "next")
+        compress_a_to_b(graph, 0, end)
+        _reference_compress(expected, 0, end)
+        assert list(graph.nodes) == list(expected.nodes)
+        assert list(graph.edges(data=True)) == list(expected.edges(data=True))
+
+
+# 测试嵌套分支画布的转换结果与原实现一致
+def test_nested_fork_conversion_unchanged():
+    def convert():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return LazyConverter.convert_workflow_to_lazy(_nested_ifs_canvas())
+
+    result = convert()
+    with (
+        patch.object(lazy_converter, "get_simple_paths_with_key", _reference_paths_with_key),
+        patch.object(lazy_converter, "compress_a_to_b", _reference_compress),
+    ):
+        expected = convert()
+
+    assert result == expected
+    if1 = next(node for node in result["nodes"] if node["id"] == "if1")
+    assert [node["id"] for node in if1["args"]["true"]] == ["if2"]
+    assert [node["id"] for node in if1["args"]["false"]] == ["f1"]
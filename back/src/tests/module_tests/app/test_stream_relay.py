@@ -0,0 +1,53 @@
+import uuid
+from concurrent.futures import Future
+
+import lazyllm
+import pytest
+
+from parts.app.node_run.stream_relay import StreamRelay
+
+
+@pytest.fixture
+def queue():
+    lazyllm.globals._init_sid(str(uuid.uuid4()))
+    queue = lazyllm.FileSystemQueue()
+    yield queue
+    queue.clear()
+
+
+# 测试消费方仍在读取时生产方结束，剩余分片全部转发且不重复
+def test_drains_chunks_written_while_consumer_reads(queue):
+    future = Future()
+    for i in range(5):
+        queue.enqueue(f"c{i} ")
+
+    stream = StreamRelay(max_wait=0.01, batch_size=2).relay(future)
+    assert next(stream) == "c0 c1 "
+
+    # 消费方处理第一批时生产方写完剩余分片并结束
+    for i in range(5, 10):
+        queue.enqueue(f"c{i} ")
+    future.set_result("done")
+
+    assert "".join(stream) == "".join(f"c{i} " for i in range(2, 10))
+    assert not queue.dequeue()
+
+
+# 测试队列取空与任务结束之间写入的最后分片不会丢失
+def test_drains_chunks_written_just_before_done(queue, monkeypatch):
+    future = Future()
+    queue.enqueue("first ")
+    original_dequeue = queue._dequeue
+    finished = []
+
+    def dequeue(sid, limit=None):
+        chunks = original_dequeue(sid, limit=limit)
+        if not chunks and not finished:
+            # 取到空队列后、检查任务状态前，生产方写入最后的分片并结束
+            finished.append(True)
+            queue.enqueue("last ")
+            future.set_result("done")
+        return chunks
+
+    monkeypatch.setattr(queue, "_dequeue", dequeue)
+    assert list(StreamRelay(max_wait=0.01, batch_size=2).relay(future)) == ["first ", "last "]
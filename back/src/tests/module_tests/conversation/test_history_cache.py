@@ -0,0 +1,156 @@
+import threading
+import uuid
+from unittest.mock import MagicMock, patch
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlalchemy import event
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from parts.conversation.history_cache import (  # noqa: E402
+    ConversationHistory,
+    conversation_history,
+)
+from parts.conversation.model import Conversation  # noqa: E402
+from parts.conversation.speak_api import SpeakToAppApi  # noqa: E402
+from utils.util_database import db  # noqa: E402
+
+SESSION = "session-1"
+
+
+@pytest.fixture
+def conversation_table(app):
+    Conversation.__table__.create(db.engine, checkfirst=True)
+    yield
+    db.session.rollback()
+    Conversation.query.delete()
+    db.session.commit()
+
+
+@pytest.fixture
+def fake_redis():
+    client = fakeredis.FakeRedis()
+    with patch("parts.conversation.history_cache.redis_client", client):
+        yield client
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(db.engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(db.engine, "before_cursor_execute", self)
+
+
+def _add_turns(turns, sessionid=SESSION):
+    for turn in turns:
+        Conversation.create_new("app", sessionid, "user", f"q{turn}", turn, [])
+        Conversation.create_new("app", sessionid, "lazyllm", f"a{turn}", turn, [])
+
+
+# 测试轮次号以数据库最大轮次为起点原子分配，并发请求得到不同的轮次号
+def test_next_turn_seeds_from_db_and_is_atomic(conversation_table, fake_redis):
+    _add_turns(range(1, 6))
+    history = ConversationHistory(max_turns=10, ttl=60)
+    assert history.next_turn(SESSION) == 6
+    assert history.next_turn(str(uuid.uuid4())) == 1
+
+    turns = []
+    threads = [threading.Thread(target=lambda: turns.append(history.next_turn(SESSION))) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(turns) == list(range(7, 27))
+
+
+# 测试历史未命中时从数据库回源，之后读取不再查询数据库，追加的轮次按上限截断
+def test_history_loads_once_then_appends(conversation_table, fake_redis):
+    _add_turns(range(1, 5))
+    # 没有回复的轮次不计入历史
+    Conversation.create_new("app", SESSION, "user", "pending", 5, [])
+    history = ConversationHistory(max_turns=3, ttl=60)
+
+    with _QueryCounter() as counter:
+        assert history.get(SESSION) == [["q2", "a2"], ["q3", "a3"], ["q4", "a4"]]
+        loaded = counter.count
+        history.append(SESSION, 5, "pending", "a5")
+        history.append(SESSION, 6, "q6", "")
+        assert history.get(SESSION) == [["q3", "a3"], ["q4", "a4"], ["pending", "a5"]]
+        assert counter.count == loaded
+
+    # 并发轮次乱序完成时按轮次号排序
+    history.append(SESSION, 8, "q8", "a8")
+    history.append(SESSION, 7, "q7", "a7")
+    assert history.get(SESSION) == [["pending", "a5"], ["q7", "a7"], ["q8", "a8"]]
+
+
+# 测试回源期间有新回复追加时不写入缓存，避免缓存缺少该轮
+def test_stale_fill_is_not_cached(conversation_table, fake_redis):
+    _add_turns(range(1, 3))
+    history = ConversationHistory(max_turns=10, ttl=60)
+    load = history._load_from_db
+
+    def load_then_race(sessionid):
+        records = load(sessionid)
+        _add_turns([3])
+        history.append(sessionid, 3, "q3", "a3")
+        return records
+
+    with patch.object(history, "_load_from_db", side_effect=load_then_race):
+        assert history.get(SESSION) == [["q1", "a1"], ["q2", "a2"]]
+    assert history.get(SESSION) == [["q1", "a1"], ["q2", "a2"], ["q3", "a3"]]
+
+
+# 测试Redis不可用时直接查询数据库
+def test_falls_back_to_db_without_redis(conversation_table):
+    _add_turns(range(1, 3))
+    broken = MagicMock()
+    broken.pipeline.side_effect = RedisConnectionError("down")
+    broken.evalsha.side_effect = RedisConnectionError("down")
+    broken.delete.side_effect = RedisConnectionError("down")
+    history = ConversationHistory(max_turns=10, ttl=60)
+    with patch("parts.conversation.history_cache.redis_client", broken):
+        assert history.next_turn(SESSION) == 3
+        assert history.get(SESSION) == [["q1", "a1"], ["q2", "a2"]]
+        history.append(SESSION, 3, "q3", "a3")
+
+
+# 测试对话接口使用缓存的历史和轮次号，回复写入后追加到历史
+@patch("parts.conversation.speak_api.AppRunService")
+@patch("parts.conversation.speak_api.LightEngine")
+@patch("parts.conversation.speak_api.AppService")
+@patch("parts.conversation.speak_api.PassportService")
+def test_speak_to_app_uses_history_cache(
+    mock_passport, mock_app_service, mock_engine, mock_run_service, app, conversation_table, fake_redis
+):
+    _add_turns(range(1, 3))
+    mock_passport.return_value.verify.return_value = {"user_id": "user"}
+    mock_app_service.return_value.get_app.return_value = MagicMock(id="app", enable_api=True)
+    app_run = mock_run_service.create.return_value
+    handler = MagicMock()
+    handler.is_success.return_value = True
+    app_run.parse_media.return_value = {"raw": "a3", "file_urls": []}
+
+    def run_stream(inputs, files, history_list, track_id, turn_number):
+        yield f"data: {turn_number} {len(history_list)}\n\n"
+        return handler
+
+    app_run.run_stream.side_effect = run_stream
+
+    with app.test_request_context(json={"sessionid": SESSION, "inputs": ["q3"]}):
+        response = SpeakToAppApi().post("app")
+        assert list(response.response) == ["data: 3 2\n\n"]
+
+    assert Conversation.query.filter_by(sessionid=SESSION, turn_number=3).count() == 2
+    with _QueryCounter() as counter:
+        assert conversation_history.get(SESSION)[-1] == ["q3", "a3"]
+        assert counter.count == 0
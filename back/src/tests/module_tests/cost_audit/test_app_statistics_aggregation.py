@@ -0,0 +1,148 @@
+import random
+import uuid
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from models.model_account import Account
+from parts.app.model import App
+from parts.conversation.model import Conversation
+from parts.cost_audit.model import AppStatistics, CostAudit
+from parts.cost_audit.service import CostService
+from utils.util_database import db
+
+STAT_DATE = date(2025, 3, 1)
+
+
+@pytest.fixture
+def tables(app):
+    for model in (Account, App, Conversation, CostAudit, AppStatistics):
+        model.__table__.create(db.engine, checkfirst=True)
+    yield
+    db.session.rollback()
+    for model in (AppStatistics, CostAudit, Conversation, App, Account):
+        model.query.delete()
+    db.session.commit()
+
+
+def _reference_metrics(app_id, call_type, start_time, end_time):
+    """原有的内存统计逻辑，用于校验数据库端聚合结果"""
+    all_user_ids = set(str(acc.id) for acc in Account.query.all())
+    conversations = (
+        db.session.query(
+            Conversation.sessionid, Conversation.from_who, Conversation.turn_number
+        )
+        .filter(
+            Conversation.app_id == app_id,
+            Conversation.from_who != "lazyllm",
+            Conversation.created_at >= start_time,
+            Conversation.created_at <= end_time,
+        )
+        .order_by(Conversation.id)
+        .all()
+    )
+    session_type = {}
+    system_users, web_users = set(), set()
+    system_sessions, web_sessions = set(), set()
+    interactions = {"system": {}, "web": {}}
+    for sessionid, from_who, turn_number in conversations:
+        if not sessionid:
+            continue
+        is_system = bool(from_who) and from_who in all_user_ids
+        if is_system:
+            system_users.add(from_who)
+            system_sessions.add(sessionid)
+        elif from_who:
+            web_users.add(from_who)
+            web_sessions.add(sessionid)
+        if sessionid not in session_type and from_who:
+            session_type[sessionid] = "system" if is_system else "web"
+        if sessionid in session_type:
+            bucket = interactions[session_type[sessionid]]
+            if sessionid not in bucket or (turn_number and turn_number > bucket[sessionid]):
+                bucket[sessionid] = turn_number or 0
+
+    token_sums = {"system": 0, "web": 0}
+    cost_times = []
+    for session_id, token_num, cost_time in db.session.query(
+        CostAudit.session_id, CostAudit.token_num, CostAudit.cost_time
+    ).filter(
+        CostAudit.app_id == app_id,
+        CostAudit.call_type == call_type,
+        CostAudit.created_at >= start_time,
+        CostAudit.created_at <= end_time,
+    ):
+        if session_id in session_type:
+            token_sums[session_type[session_id]] += token_num or 0
+        if cost_time is not None:
+            cost_times.append(float(cost_time))
+    cost_times.sort()
+    n = len(cost_times)
+    return {
+        "system_user_count": len(system_users),
+        "web_user_count": len(web_users),
+        "system_user_session_count": len(system_sessions),
+        "web_user_session_count": len(web_sessions),
+        "system_user_token_sum": token_sums["system"],
+        "web_user_token_sum": token_sums["web"],
+        "system_user_interaction_count": sum(interactions["system"].values()),
+        "web_user_interaction_count": sum(interactions["web"].values()),
+        "cost_time_p50": cost_times[int(n * 0.5)] if n else 0,
+        "cost_time_p99": cost_times[int(n * 0.99)] if n else 0,
+    }
+
+
+def _populate(rng, app_id):
+    accounts = [str(uuid.uuid4()) for _ in range(5)]
+    for account_id in accounts:
+        db.session.add(Account(id=account_id, name=account_id[:8], email=f"{account_id}@x.com"))
+    senders = accounts + ["guest1", "guest2", "guest3", ""]
+    sessions = [f"s{i}" for i in range(30)] + ["", None]
+    day_start = datetime.combine(STAT_DATE, datetime.min.time())
+    for _ in range(400):
+        created_at = day_start + timedelta(hours=rng.uniform(-6, 30))
+        sessionid = rng.choice(sessions)
+        db.session.add(
+            Conversation(
+                app_id=app_id,
+                sessionid=sessionid,
+                from_who=rng.choice(senders + ["lazyllm"] * 3),
+                turn_number=rng.choice([None, 0, 1, 2, 3, 5, 8]),
+                created_at=created_at,
+            )
+        )
+        if rng.random() < 0.5:
+            db.session.add(
+                CostAudit(
+                    app_id=app_id,
+                    user_id="user",
+                    session_id=sessionid,
+                    call_type=rng.choice(["release", "release", "debug"]),
+                    token_num=rng.randint(0, 100),
+                    cost_time=rng.choice([None, round(rng.uniform(0, 5), 6)]),
+                    created_at=created_at,
+                )
+            )
+    db.session.commit()
+
+
+# 测试数据库端聚合结果与原有内存统计逻辑一致
+@pytest.mark.parametrize("seed", range(5))
+def test_aggregation_matches_reference(tables, seed):
+    rng = random.Random(seed)
+    app_id = str(uuid.uuid4())
+    db.session.add(App(id=app_id, tenant_id=str(uuid.uuid4()), name="app", description=""))
+    db.session.commit()
+    _populate(rng, app_id)
+
+    start_time = datetime.combine(STAT_DATE, datetime.min.time())
+    end_time = datetime.combine(STAT_DATE, datetime.max.time())
+    expected = _reference_metrics(app_id, "release", start_time, end_time)
+    actual = CostService._aggregate_app_statistics(app_id, "release", start_time, end_time)
+    assert actual == pytest.approx(expected)
+
+    result = CostService.calc_and_save_app_statistics(
+        app_id=app_id, stat_date=STAT_DATE, need_save_db=True
+    )
+    assert result["web_user_count"] == expected["web_user_count"]
+    assert AppStatistics.query.filter_by(app_id=app_id).count() == 1
@@ -0,0 +1,177 @@
+import random
+import uuid
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from models.model_account import Account
+from parts.app.model import App
+from parts.conversation.model import Conversation
+from parts.cost_audit.model import AppStatistics, CostAudit
+from parts.cost_audit.service import CostService
+from parts.cost_audit.sketch import CostTimeHistogram, HyperLogLog
+from utils.util_database import db
+
+FIRST_DATE = date(2025, 3, 1)
+DAYS = 4
+
+
+@pytest.fixture
+def tables(app):
+    for model in (Account, App, Conversation, CostAudit, AppStatistics):
+        model.__table__.create(db.engine, checkfirst=True)
+    yield
+    db.session.rollback()
+    for model in (AppStatistics, CostAudit, Conversation, App, Account):
+        model.query.delete()
+    db.session.commit()
+
+
+def _create_app():
+    app = App(
+        id=str(uuid.uuid4()),
+        tenant_id=str(uuid.uuid4()),
+        name="app",
+        description="",
+        created_at=datetime.combine(FIRST_DATE - timedelta(days=10), datetime.min.time()),
+    )
+    db.session.add(app)
+    db.session.commit()
+    return app.id
+
+
+def _populate(app_id, active_days):
+    rng = random.Random(7)
+    accounts = [str(uuid.uuid4()) for _ in range(4)]
+    for account_id in accounts:
+        db.session.add(Account(id=account_id, name=account_id[:8], email=f"{account_id}@x.com"))
+    senders = accounts + [f"guest{i}" for i in range(6)]
+    for offset in active_days:
+        day_start = datetime.combine(FIRST_DATE + timedelta(days=offset), datetime.min.time())
+        for i in range(60):
+            created_at = day_start + timedelta(minutes=rng.randint(0, 1439))
+            # 会话不跨天，区间互动数与逐日合并结果一致
+            sessionid = f"d{offset}-s{rng.randint(0, 9)}"
+            db.session.add(
+                Conversation(
+                    app_id=app_id,
+                    sessionid=sessionid,
+                    from_who=rng.choice(senders),
+                    turn_number=rng.randint(1, 6),
+                    created_at=created_at,
+                )
+            )
+            db.session.add(
+                CostAudit(
+                    app_id=app_id,
+                    user_id="user",
+                    session_id=sessionid,
+                    call_type="release",
+                    token_num=rng.randint(1, 50),
+                    cost_time=round(rng.uniform(0.1, 3), 6),
+                    created_at=created_at,
+                )
+            )
+    db.session.commit()
+
+
+# 测试HyperLogLog的估计精度、合并与序列化
+def test_hyperloglog_merge_and_roundtrip():
+    left = HyperLogLog().update(f"user-{i}" for i in range(6000))
+    right = HyperLogLog().update(f"user-{i}" for i in range(4000, 10000))
+    assert abs(left.count() - 6000) / 6000 < 0.05
+
+    merged = HyperLogLog.from_bytes(left.to_bytes()).merge(HyperLogLog.from_bytes(right.to_bytes()))
+    assert abs(merged.count() - 10000) / 10000 < 0.05
+    assert HyperLogLog().update(["a", "b", "c"]).count() == 3
+    assert HyperLogLog().to_bytes() is None
+    assert HyperLogLog.from_bytes(None).count() == 0
+
+
+# 测试耗时直方图合并后的分位数误差
+def test_cost_time_histogram_quantile():
+    rng = random.Random(1)
+    values = [rng.uniform(0.01, 20) for _ in range(5000)]
+    histogram = CostTimeHistogram().update(values[:2000])
+    histogram.merge(CostTimeHistogram.from_json(CostTimeHistogram().update(values[2000:]).to_json()))
+
+    ordered = sorted(values)
+    for q in (0.5, 0.99):
+        expected = ordered[int(len(ordered) * q)]
+        assert histogram.quantile(q) == pytest.approx(expected, rel=0.011)
+    assert CostTimeHistogram().quantile(0.5) == 0
+
+
+# 测试区间统计由按日汇总合并得到，并与直接统计结果一致
+def test_merge_daily_rollups_matches_range_statistics(tables):
+    app_id = _create_app()
+    _populate(app_id, active_days=[0, 1, 3])
+    last_date = FIRST_DATE + timedelta(days=DAYS - 1)
+
+    merged = CostService.merge_daily_rollups(app_id, FIRST_DATE, last_date)
+    expected = CostService.calc_and_save_app_statistics(
+        app_id=app_id, stat_date_start=FIRST_DATE, stat_date_end=last_date
+    )
+    for field, value in expected.items():
+        if field.startswith("cost_time"):
+            assert merged[field] == pytest.approx(value, rel=0.011)
+        else:
+            assert merged[field] == pytest.approx(value), field
+
+    # 单日区间与直接统计完全一致
+    single = CostService.merge_daily_rollups(app_id, FIRST_DATE, FIRST_DATE)
+    exact = CostService.calc_and_save_app_statistics(app_id=app_id, stat_date=FIRST_DATE)
+    for field in ("system_user_count", "web_user_count", "web_user_session_count", "web_user_token_sum"):
+        assert single[field] == exact[field]
+
+
+# 测试补齐按日汇总：无数据日期写入空汇总，重复调用不再生成
+def test_ensure_daily_rollups_fills_missing_days_once(tables):
+    app_id = _create_app()
+    _populate(app_id, active_days=[0, 2])
+    last_date = FIRST_DATE + timedelta(days=DAYS - 1)
+
+    with pytest.MonkeyPatch.context() as mp:
+        computed = []
+        original = CostService._compute_daily_rollup
+        mp.setattr(
+            CostService,
+            "_compute_daily_rollup",
+            staticmethod(lambda *args: computed.append(args[1]) or original(*args)),
+        )
+        assert CostService.ensure_daily_rollups(app_id, FIRST_DATE, last_date) == DAYS
+        assert sorted(computed) == [FIRST_DATE, FIRST_DATE + timedelta(days=2)]
+
+    assert CostService.ensure_daily_rollups(app_id, FIRST_DATE, last_date) == 0
+    rows = CostService.query_app_statistics(app_id, FIRST_DATE, last_date)
+    assert [row["stat_date"] for row in rows] == [
+        (FIRST_DATE + timedelta(days=offset)).isoformat() for offset in range(DAYS)
+    ]
+    assert rows[1]["web_user_count"] == 0
+
+
+# 测试查询时不补齐汇总：已有汇总直接合并，缺少汇总的连续日期实时统计一次
+def test_merge_daily_rollups_queries_gap_without_backfill(tables):
+    app_id = _create_app()
+    _populate(app_id, active_days=[0, 1, 3])
+    last_date = FIRST_DATE + timedelta(days=DAYS - 1)
+    CostService.ensure_daily_rollups(app_id, FIRST_DATE, FIRST_DATE + timedelta(days=1))
+    rollup_count = AppStatistics.query.filter_by(app_id=app_id).count()
+
+    with pytest.MonkeyPatch.context() as mp:
+        ranges = []
+        original = CostService._compute_rollup
+        mp.setattr(
+            CostService,
+            "_compute_rollup",
+            staticmethod(lambda *args: ranges.append(args[1:3]) or original(*args)),
+        )
+        merged = CostService.merge_daily_rollups(app_id, FIRST_DATE, last_date)
+
+    assert ranges == [(FIRST_DATE + timedelta(days=2), last_date)]
+    assert AppStatistics.query.filter_by(app_id=app_id).count() == rollup_count
+    expected = CostService.calc_and_save_app_statistics(
+        app_id=app_id, stat_date_start=FIRST_DATE, stat_date_end=last_date
+    )
+    for field in ("system_user_token_sum", "web_user_token_sum", "web_user_interaction_count"):
+        assert merged[field] == expected[field]
@@ -0,0 +1,92 @@
+import uuid
+from unittest.mock import patch
+
+import pytest
+
+from parts.app.model import App
+from parts.cost_audit.model import CostAudit
+from parts.cost_audit.service import CostService
+from parts.cost_audit.writer import CostAuditWriter
+from utils.util_database import db
+
+
+@pytest.fixture
+def tables(app):
+    App.__table__.create(db.engine, checkfirst=True)
+    CostAudit.__table__.create(db.engine, checkfirst=True)
+    yield
+    db.session.rollback()
+    CostAudit.query.delete()
+    App.query.delete()
+    db.session.commit()
+
+
+def _create_app():
+    app = App(
+        id=str(uuid.uuid4()),
+        tenant_id=str(uuid.uuid4()),
+        name="app",
+        description="",
+    )
+    db.session.add(app)
+    db.session.commit()
+    return app
+
+
+def _record(app_id, token_num=1):
+    return CostService.build_record("user", app_id, token_num, "release", "session")
+
+
+# 测试缓冲写入器批量落库并补全租户ID
+def test_writer_bulk_inserts_with_tenant(tables):
+    app = _create_app()
+    writer = CostAuditWriter(batch_size=50, flush_interval=0.05)
+    try:
+        for i in range(120):
+            writer.submit(_record(app.id, i))
+        writer.flush()
+
+        assert CostAudit.query.count() == 120
+        assert {row.tenant_id for row in CostAudit.query.all()} == {app.tenant_id}
+        stats = writer.stats()
+        assert stats["written"] == 120
+        assert stats["batches"] < 120
+    finally:
+        writer.shutdown()
+
+
+# 测试队列满时的背压策略
+@pytest.mark.parametrize("policy, expected_rows", [("sync", 1), ("drop", 0)])
+def test_writer_overflow_policy(tables, app, policy, expected_rows):
+    app_model = _create_app()
+    writer = CostAuditWriter(queue_size=1, overflow_policy=policy)
+    writer._app = app
+    with patch.object(writer, "_ensure_started"):
+        writer.submit(_record(app_model.id))
+        writer.submit(_record(app_model.id))
+
+    assert CostAudit.query.count() == expected_rows
+    assert writer.stats()["queued"] == 1
+
+
+# 测试停止时写完队列中的记录
+def test_writer_shutdown_drains_queue(tables):
+    app = _create_app()
+    writer = CostAuditWriter(batch_size=10, flush_interval=5)
+    for _ in range(25):
+        writer.submit(_record(app.id))
+    writer.shutdown()
+
+    assert CostAudit.query.count() == 25
+
+
+# 测试应用租户变更后缓存失效
+def test_app_tenant_cache_invalidated_on_update(tables):
+    app = _create_app()
+    assert CostService.get_app_tenant_id(app.id) == app.tenant_id
+
+    new_tenant = str(uuid.uuid4())
+    app.tenant_id = new_tenant
+    db.session.commit()
+
+    assert CostService.get_app_tenant_ids([app.id]) == {app.id: new_tenant}
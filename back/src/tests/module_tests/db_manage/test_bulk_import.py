@@ -0,0 +1,198 @@
+import csv
+import json
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import pytest
+from openpyxl import Workbook
+from sqlalchemy import (Column, DateTime, Integer, MetaData, Numeric, String,
+                        Table, create_engine, event, select, text)
+from sqlalchemy.dialects.mysql import TINYINT
+
+from parts.db_manage.db_manager.bulk_import import (BulkImporter,
+                                                    iter_record_chunks,
+                                                    iter_upload_chunks)
+from parts.db_manage.db_manager.engine_registry import EngineRegistry
+from parts.db_manage.service import DBManageService
+
+
+@pytest.fixture
+def orders(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'shop.db'}")
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE orders (id INTEGER PRIMARY KEY, code VARCHAR(5) NOT NULL UNIQUE, "
+                "flag BOOLEAN, amount NUMERIC(10, 2), created DATETIME)"
+            )
+        )
+    yield engine, Table("orders", MetaData(), autoload_with=engine)
+    engine.dispose()
+
+
+RECORDS = [
+    {"code": "a", "flag": "true", "amount": "1.50", "created": "2025-01-02 03:04:05"},
+    {"code": "b", "flag": 0, "amount": 2, "created": datetime(2025, 1, 3)},
+    {"code": "toolong", "flag": 1, "amount": 3, "created": None},
+    {"code": "c", "flag": "maybe", "amount": "x", "created": "not a date"},
+    {"code": None, "flag": 1, "amount": 4, "created": None},
+    {"code": "d", "flag": None, "amount": None, "created": None, "unknown": 1},
+    {"code": "a", "flag": 1, "amount": 5, "created": None},
+    {"code": "e", "flag": "False", "amount": 6.25, "created": "2025-02-01"},
+]
+
+
+# 测试整列校验类型，出错的行记录行号和原因后跳过，其余行按批提交
+def test_bulk_import_collects_row_errors_and_commits_batches(orders):
+    engine, table = orders
+    commits, reports = [], []
+    event.listen(engine, "commit", lambda conn: commits.append(1))
+    importer = BulkImporter(
+        engine, table, batch_size=2, on_progress=lambda p: reports.append(p.to_dict())
+    )
+
+    progress = importer.run(iter_record_chunks(RECORDS, chunk_size=3))
+
+    assert progress.processed == 8 and progress.inserted == 4 and progress.failed == 4
+    errors = {error["row"]: error["error"] for error in progress.errors}
+    assert set(errors) == {3, 4, 5, 7}
+    assert "code" in errors[3] and "长度超过5" in errors[3]
+    assert "flag" in errors[4] and "amount" in errors[4] and "created" in errors[4]
+    assert "不能为空" in errors[5]
+    # 第7行违反唯一约束，整批失败后逐行重试
+    assert "UNIQUE" in errors[7]
+    assert progress.errors[0]["data"]["code"] == "toolong"
+    json.dumps(progress.errors)
+
+    with engine.connect() as conn:
+        rows = conn.execute(select(table).order_by(table.c.id)).fetchall()
+    assert [(r.code, r.flag, r.amount, r.created) for r in rows] == [
+        ("a", 1, Decimal("1.50"), datetime(2025, 1, 2, 3, 4, 5)),
+        ("b", 0, Decimal("2.00"), datetime(2025, 1, 3)),
+        ("d", None, None, None),
+        ("e", 0, Decimal("6.25"), datetime(2025, 2, 1)),
+    ]
+    # 每块的有效行各提交一批，最后一批失败回滚后逐行重试再提交
+    assert len(commits) == 3
+    assert reports[-1]["processed"] == 8 and reports[-1]["inserted"] == 4
+
+
+# 测试xlsx与csv文件按块读取
+@pytest.mark.parametrize("suffix", ["xlsx", "csv"])
+def test_iter_upload_chunks_streams_file(tmp_path, suffix):
+    path = tmp_path / f"upload.{suffix}"
+    rows = [["code", "amount"]] + [[f"c{i}", i] for i in range(7)]
+    if suffix == "xlsx":
+        workbook = Workbook()
+        for row in rows:
+            workbook.active.append(row)
+        workbook.save(path)
+    else:
+        with open(path, "w", newline="") as f:
+            csv.writer(f).writerows(rows)
+
+    with open(path, "rb") as f:
+        chunks = list(iter_upload_chunks(f, chunk_size=3, filename=path.name))
+
+    assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+    assert list(chunks[0].columns) == ["code", "amount"]
+    assert chunks[2].iloc[0].tolist() == ["c6", 6]
+
+
+# 测试含空值的BIGINT列不经过浮点数，超过2^53的整数原样写入
+@pytest.mark.parametrize("source", ["records", "csv"])
+def test_bigint_column_with_gap_keeps_precision(tmp_path, source):
+    engine = create_engine(f"sqlite:///{tmp_path / 'big.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE big (id INTEGER PRIMARY KEY, value BIGINT, flag BOOLEAN)"))
+    table = Table("big", MetaData(), autoload_with=engine)
+    values = [1234567890123456789, None, 1234567890123456781, 2]
+    flags = ["true", "false", 0, "1.0"]
+    if source == "records":
+        chunks = iter_record_chunks(
+            [{"value": v, "flag": f} for v, f in zip(values, flags)], chunk_size=10
+        )
+    else:
+        path = tmp_path / "big.csv"
+        with open(path, "w", newline="") as f:
+            csv.writer(f).writerows([["value", "flag"]] + [["" if v is None else v, f] for v, f in zip(values, flags)])
+        with open(path, "rb") as f:
+            chunks = list(iter_upload_chunks(f, chunk_size=10, filename=path.name))
+
+    progress = BulkImporter(engine, table).run(chunks)
+
+    assert progress.inserted == 4 and progress.failed == 0
+    with engine.connect() as conn:
+        rows = conn.execute(select(table.c.value, table.c.flag).order_by(table.c.id)).fetchall()
+    assert [tuple(row) for row in rows] == list(zip(values, [True, False, False, True]))
+    engine.dispose()
+
+
+# 测试PostgreSQL使用COPY写入，特殊字符转义，空值写作\N
+def test_postgresql_uses_copy():
+    table = Table(
+        "orders",
+        MetaData(),
+        Column("id", Integer, primary_key=True),
+        Column("code", String(5), nullable=False),
+        Column("flag", TINYINT),
+        Column("amount", Numeric(10, 2)),
+        Column("created", DateTime),
+    )
+    engine = MagicMock()
+    conn = engine.begin.return_value.__enter__.return_value
+    conn.dialect.name, conn.dialect.driver = "postgresql", "psycopg2"
+    conn.dialect.identifier_preparer.quote = lambda name: f'"{name}"'
+    conn.dialect.identifier_preparer.format_table = lambda t: f'public."{t.name}"'
+    cursor = conn.connection.dbapi_connection.cursor.return_value
+    payloads = []
+    cursor.copy_expert.side_effect = lambda sql, buffer: payloads.append((sql, buffer.read()))
+
+    records = [
+        {"code": "a", "flag": True, "amount": "1.5", "created": "2025-01-02"},
+        {"code": "x\ty", "flag": 0, "amount": None, "created": None},
+    ]
+    progress = BulkImporter(engine, table).run(iter_record_chunks(records, 10))
+
+    assert progress.inserted == 2
+    sql, payload = payloads[0]
+    assert sql.startswith('COPY public."orders" ("code", "flag", "amount", "created") FROM STDIN')
+    assert payload.splitlines() == ["a\t1\t1.5\t2025-01-02T00:00:00", "x\\ty\t0\t\\N\t\\N"]
+    conn.execute.assert_not_called()
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def get(self, key):
+        return self.data.get(key)
+
+
+# 测试服务层导入部分失败时返回错误行，并记录导入进度
+def test_service_import_data_reports_errors_and_progress(orders, tmp_path):
+    database = MagicMock(url=f"sqlite:///{tmp_path}/", database_name="shop.db")
+    database.name = "shop"
+    table_info = MagicMock()
+    table_info.name = "orders"
+    redis = _FakeRedis()
+    with patch("parts.db_manage.service.db") as mock_db, patch(
+        "parts.db_manage.service.redis_client", redis
+    ), patch("parts.db_manage.db_manager.schema.engine_registry", EngineRegistry()), patch(
+        "parts.db_manage.db_manager.engine_registry.redis_client", redis
+    ):
+        mock_db.session.get.side_effect = lambda model, _id: (
+            database if model.__name__ == "DataBaseInfo" else table_info
+        )
+        service = DBManageService(MagicMock())
+        flag, errors, message = service.import_data(1, 2, RECORDS)
+        progress = service.get_import_progress(2)
+
+    assert not flag and message == "4行数据导入失败"
+    assert [error["row"] for error in errors] == [3, 4, 5, 7]
+    assert progress["status"] == "completed"
+    assert progress["inserted"] == 4 and progress["failed"] == 4
@@ -0,0 +1,141 @@
+import sqlite3
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import event, text
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from parts.db_manage.db_manager import DbManager  # noqa: E402
+from parts.db_manage.db_manager.engine_registry import EngineRegistry  # noqa: E402
+
+
+@pytest.fixture
+def registry():
+    registry = EngineRegistry()
+    with (
+        patch("parts.db_manage.db_manager.schema.engine_registry", registry),
+        patch("parts.db_manage.db_manager.engine_registry.redis_client", fakeredis.FakeRedis()),
+    ):
+        yield registry
+    registry.clear()
+
+
+@pytest.fixture
+def manager(tmp_path, registry):
+    with sqlite3.connect(tmp_path / "shop.db") as conn:
+        conn.execute("CREATE TABLE orders (id INTEGER PRIMARY KEY, flag TINYINT, note TEXT)")
+        conn.executemany(
+            "INSERT INTO orders (flag, note) VALUES (?, ?)",
+            [(i % 2, f"n{i}") for i in range(25)],
+        )
+    return DbManager({"endpoint": f"sqlite:///{tmp_path}/"})
+
+
+def _count_reflections(engine):
+    queries = []
+
+    def listener(conn, cursor, statement, *args):
+        if statement.startswith("PRAGMA"):
+            queries.append(statement)
+
+    event.listen(engine, "before_cursor_execute", listener)
+    return queries
+
+
+# 测试同一数据库复用同一个引擎，表定义只反射一次
+def test_select_table_data_reuses_engine_and_metadata(manager, registry):
+    engine = manager.get_engine("shop.db")
+    assert manager.get_engine("shop.db") is engine
+    reflections = _count_reflections(engine)
+
+    manager.select_table_data("shop.db", "orders", 1, 10)
+    reflected = len(reflections)
+    assert reflected > 0
+    for page in range(2, 4):
+        result = manager.select_table_data("shop.db", "orders", page, 10)
+    assert result["total"] == 25 and len(result["data"]) == 5
+    assert result["data"][0]["flag"] in (True, False)
+    # 后续翻页不再反射表结构
+    assert len(reflections) == reflected
+    assert registry.stats()["engines"] == 1
+    assert registry.stats()["checked_out"] == 0
+
+
+# 测试表结构变更后缓存的表定义失效
+def test_table_changes_invalidate_metadata(manager, registry):
+    manager.select_table_data("shop.db", "orders", 1, 10)
+    with manager.get_engine("shop.db").begin() as conn:
+        conn.execute(text("ALTER TABLE orders ADD COLUMN amount INTEGER"))
+    assert "amount" not in manager.build_table_def("shop.db", "orders").columns
+
+    ok, _ = manager.delete_table("shop.db", "missing")
+    assert ok
+    assert "amount" in manager.build_table_def("shop.db", "orders").columns
+
+
+# 测试表结构变更后其他进程中缓存的表定义同样失效
+def test_invalidation_reaches_other_processes(manager, registry):
+    other = EngineRegistry()
+    endpoint = manager.config["endpoint"]
+    before = other.reflect_table(endpoint, "shop.db", "orders")
+    assert other.reflect_table(endpoint, "shop.db", "orders") is before
+
+    with registry.get(endpoint, "shop.db").begin() as conn:
+        conn.execute(text("ALTER TABLE orders ADD COLUMN amount INTEGER"))
+    registry.invalidate_metadata(endpoint, "shop.db")
+
+    after = other.reflect_table(endpoint, "shop.db", "orders")
+    assert "amount" in after.columns
+    assert other.reflect_table(endpoint, "shop.db", "orders") is after
+    other.clear()
+
+
+# 测试空闲引擎和超出数量上限的引擎被释放，删除数据库前关闭连接池
+def test_idle_and_excess_engines_are_disposed(tmp_path, registry):
+    endpoint = f"sqlite:///{tmp_path}/"
+    with patch("parts.db_manage.db_manager.engine_registry.lazy_config") as config:
+        config.DB_ENGINE_POOL_SIZE = 2
+        config.DB_ENGINE_MAX_OVERFLOW = 0
+        config.DB_ENGINE_POOL_TIMEOUT = 1
+        config.DB_ENGINE_POOL_RECYCLE = 60
+        config.DB_ENGINE_IDLE_TIMEOUT = 60
+        config.DB_ENGINE_MAX_ENGINES = 2
+        first = registry.get(endpoint, "a.db")
+        with first.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            registry.get(endpoint, "b.db")
+            registry.get(endpoint, "c.db")
+            # a.db 有借出的连接，不会被释放
+            assert registry.get(endpoint, "a.db") is first
+        assert registry.stats()["engines"] == 2
+
+        registry.dispose(endpoint, "a.db")
+        assert registry.get(endpoint, "a.db") is not first
+
+        with patch("parts.db_manage.db_manager.engine_registry.time.monotonic", return_value=1e9):
+            registry.get(endpoint, "d.db")
+        assert registry.stats()["engines"] == 1
+
+
+# 测试fork出的子进程不复用父进程的引擎
+def test_engines_are_not_shared_across_fork(tmp_path, registry):
+    endpoint = f"sqlite:///{tmp_path}/"
+    engine = registry.get(endpoint, "a.db")
+    with patch("parts.db_manage.db_manager.engine_registry.os.getpid", return_value=-1):
+        assert registry.get(endpoint, "a.db") is not engine
+
+
+# 测试PostgreSQL重命名数据库前终止其他进程连接池持有的会话
+def test_rename_database_terminates_other_sessions(registry):
+    engine = MagicMock()
+    engine.dialect.name = "postgresql"
+    conn = engine.connect.return_value.__enter__.return_value
+    manager = DbManager({"endpoint": "postgresql://u:p@host/"})
+    with patch.object(DbManager, "get_engine", return_value=engine):
+        assert manager.update_database("shop", "store", "renamed")[0]
+
+    statements = [str(call.args[0]) for call in conn.execute.call_args_list]
+    assert "pg_terminate_backend" in statements[0]
+    assert conn.execute.call_args_list[0].args[1] == {"database_name": "shop"}
+    assert statements[1] == "ALTER DATABASE shop RENAME TO store"
@@ -0,0 +1,159 @@
+import sqlite3
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import (Column, DateTime, Integer, LargeBinary, MetaData,
+                        Numeric, String, Table, event)
+from sqlalchemy.dialects.mysql import TINYINT
+from sqlalchemy.types import NullType
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from parts.db_manage.db_manager import DbManager  # noqa: E402
+from parts.db_manage.db_manager.engine_registry import EngineRegistry  # noqa: E402
+from parts.db_manage.db_manager.row_browser import build_row_converter, encode_cursor  # noqa: E402
+
+ROWS = 23
+
+
+@pytest.fixture
+def manager(tmp_path):
+    with sqlite3.connect(tmp_path / "shop.db") as conn:
+        conn.execute("CREATE TABLE orders (id INTEGER PRIMARY KEY, flag TINYINT, note TEXT)")
+        conn.execute("CREATE TABLE lines (order_id INTEGER, line INTEGER, qty INTEGER, PRIMARY KEY (order_id, line))")
+        conn.execute("CREATE TABLE logs (message TEXT)")
+        conn.executemany(
+            "INSERT INTO orders (id, flag, note) VALUES (?, ?, ?)",
+            [(i * 3, i % 2, f"n{i}") for i in range(ROWS)],
+        )
+        conn.executemany(
+            "INSERT INTO lines VALUES (?, ?, ?)",
+            [(i // 4, i % 4, i) for i in range(ROWS)],
+        )
+        conn.executemany("INSERT INTO logs VALUES (?)", [(f"m{i}",) for i in range(ROWS)])
+    registry = EngineRegistry()
+    with (
+        patch("parts.db_manage.db_manager.schema.engine_registry", registry),
+        patch("parts.db_manage.db_manager.engine_registry.redis_client", fakeredis.FakeRedis()),
+    ):
+        yield DbManager({"endpoint": f"sqlite:///{tmp_path}/"})
+    registry.clear()
+
+
+def _browse_all(manager, table_name, limit=10):
+    pages, cursor = [], None
+    while True:
+        page = manager.browse_table_data("shop.db", table_name, limit, cursor=cursor)
+        pages.append(page)
+        cursor = page["next_cursor"]
+        if not page["has_more"]:
+            return pages
+
+
+# 测试游标分页按主键顺序遍历全表，深页查询不使用OFFSET，结果与页码分页一致
+def test_keyset_pages_match_offset_pages(manager):
+    statements = []
+    event.listen(
+        manager.get_engine("shop.db"),
+        "before_cursor_execute",
+        lambda conn, cursor, statement, parameters, *args: statements.append(
+            (statement, parameters)
+        ),
+    )
+
+    pages = _browse_all(manager, "orders")
+    page_queries = [(s, p) for s, p in statements if s.startswith("SELECT orders")]
+
+    assert [len(page["data"]) for page in pages] == [10, 10, 3]
+    assert pages[-1]["next_cursor"] is None
+    assert pages[0]["total"] == ROWS and not pages[0]["total_is_estimate"]
+    keyset_rows = [row for page in pages for row in page["data"]]
+    offset_rows = [
+        row
+        for page in (1, 2, 3)
+        for row in manager.select_table_data("shop.db", "orders", page, 10)["data"]
+    ]
+    assert keyset_rows == offset_rows
+    assert keyset_rows[1] == {"id": 3, "flag": True, "note": "n1"}
+    assert len(page_queries) == 3
+    # sqlite 总会生成 OFFSET 子句，游标分页的偏移量始终为0，后续页按主键定位
+    assert all(p[-1] == 0 for _, p in page_queries)
+    assert all("WHERE orders.id >" in s for s, _ in page_queries[1:])
+
+
+# 测试联合主键的游标分页，以及无主键的表退化为偏移游标
+@pytest.mark.parametrize("table_name", ["lines", "logs"])
+def test_keyset_composite_and_missing_primary_key(manager, table_name):
+    pages = _browse_all(manager, table_name, limit=4)
+    rows = [row for page in pages for row in page["data"]]
+    assert len(rows) == ROWS
+    assert len({tuple(row.values()) for row in rows}) == ROWS
+
+
+# 测试大表使用统计信息中的估算行数，小表和不支持估算的方言精确计数
+def test_browse_uses_estimated_count_for_large_tables(manager):
+    with patch.object(DbManager, "estimate_table_rows", return_value=5_000_000):
+        page = manager.browse_table_data("shop.db", "orders", 5)
+        assert page["total"] == 5_000_000 and page["total_is_estimate"]
+        exact = manager.browse_table_data("shop.db", "orders", 5, count_mode="exact")
+        assert exact["total"] == ROWS and not exact["total_is_estimate"]
+    with patch.object(DbManager, "estimate_table_rows", return_value=50):
+        assert manager.browse_table_data("shop.db", "orders", 5)["total"] == ROWS
+
+    # sqlite 没有估算行数的统计信息
+    with manager.get_engine("shop.db").connect() as conn:
+        assert manager.estimate_table_rows(conn, "orders") is None
+
+
+# 测试无效游标抛出ValueError
+@pytest.mark.parametrize(
+    "cursor", ["not-a-cursor!", encode_cursor({"after": [1, 2]}), encode_cursor({"after": ["x"]})]
+)
+def test_invalid_cursor_raises(manager, cursor):
+    with pytest.raises(ValueError, match="无效的游标"):
+        manager.browse_table_data("shop.db", "orders", 5, cursor=cursor)
+
+
+# 测试预编译的行转换与逐单元格转换结果一致
+def test_row_converter_converts_by_column_type():
+    table = Table(
+        "t",
+        MetaData(),
+        Column("id", Integer),
+        Column("flag", TINYINT),
+        Column("price", Numeric),
+        Column("raw", LargeBinary),
+        Column("name", String),
+        Column("created", DateTime),
+        Column("extra", NullType),
+    )
+    when = datetime(2025, 1, 2, 3, 4, 5)
+    key = uuid.uuid4()
+    rows = [
+        (1, 1, Decimal("1.5"), b"abc", "x", when, key),
+        (2, "0", None, None, None, None, when.date()),
+    ]
+
+    assert build_row_converter(table.columns)(rows) == [
+        {
+            "id": 1,
+            "flag": True,
+            "price": 1.5,
+            "raw": "abc",
+            "name": "x",
+            "created": "2025-01-02 03:04:05",
+            "extra": str(key),
+        },
+        {
+            "id": 2,
+            "flag": False,
+            "price": None,
+            "raw": None,
+            "name": None,
+            "created": None,
+            "extra": "2025-01-02",
+        },
+    ]
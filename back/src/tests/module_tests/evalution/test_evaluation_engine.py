@@ -0,0 +1,186 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event
+
+from parts.cost_audit.model import CostAudit
+from parts.evalution.engine import EvaluationEngine
+from parts.evalution.model import (Dimension, DimensionOption,
+                                   EvaluationDatasetData, EvaluationScore, Task)
+from parts.evalution.service import Service
+from utils.util_database import db
+
+
+class _FakeLLM:
+    def __init__(self, delay=0.0, fail_prompts=(), reply=None):
+        self.delay = delay
+        self.fail_prompts = set(fail_prompts)
+        self.reply = reply or (lambda prompt: f"answer:{prompt}")
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def forward(self, prompt):
+        with self._lock:
+            self.calls.append(prompt)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            if prompt in self.fail_prompts:
+                raise RuntimeError(f"bad prompt {prompt}")
+            return self.reply(prompt)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+# 测试并发上限、批量回调与吞吐量统计
+def test_engine_bounds_concurrency_and_batches_results():
+    llm = _FakeLLM(delay=0.05)
+    engine = EvaluationEngine(llm, concurrency=4, batch_size=5)
+    batches = []
+
+    start = time.monotonic()
+    progress = engine.run(((i, f"q{i}") for i in range(20)), lambda rows, _: batches.append(rows))
+    elapsed = time.monotonic() - start
+
+    assert llm.max_active == 4
+    assert elapsed < 20 * 0.05 / 2
+    assert [len(batch) for batch in batches] == [5, 5, 5, 5]
+    results = {r.key: r for batch in batches for r in batch}
+    assert results[3].success and results[3].output == "answer:q3"
+    assert progress["done"] == 20 and progress["rows_per_second"] > 0
+
+
+# 测试失败重试，以及失败数超过上限后停止提交新数据
+def test_engine_retries_and_stops_after_failures():
+    llm = _FakeLLM(fail_prompts={f"q{i}" for i in range(10)})
+    engine = EvaluationEngine(llm, concurrency=1, max_retries=1, max_failures=3)
+    results = []
+
+    progress = engine.run(((i, f"q{i}") for i in range(20)), lambda rows, _: results.extend(rows))
+
+    assert llm.calls[:2] == ["q0", "q0"]
+    assert progress["failed"] == 4
+    assert len(results) == 4
+    assert "bad prompt q0" in results[0].error
+
+
+# 测试超时的调用记为失败，不阻塞其他数据
+def test_engine_times_out_slow_calls():
+    llm = _FakeLLM(delay=0.5)
+    engine = EvaluationEngine(llm, concurrency=2, timeout=0.05, max_retries=0)
+    results = []
+
+    engine.run([(1, "slow")], lambda rows, _: results.extend(rows))
+
+    assert not results[0].success
+    assert "推理超时" in results[0].error
+
+
+# 测试在共享线程池中排队的时间不计入超时
+def test_engine_timeout_starts_when_call_runs():
+    llm = _FakeLLM(delay=0.1)
+    engine = EvaluationEngine(llm, concurrency=3, timeout=0.15, max_retries=0)
+    results = []
+
+    with patch.object(EvaluationEngine, "_executor", ThreadPoolExecutor(max_workers=1)) as pool:
+        engine.run(((i, f"q{i}") for i in range(3)), lambda rows, _: results.extend(rows))
+        pool.shutdown()
+
+    assert [r.success for r in results] == [True, True, True]
+
+
+# 测试超时后仍在执行的调用计入并发数，重试不会超出并发上限
+def test_engine_counts_abandoned_calls_against_concurrency():
+    llm = _FakeLLM(delay=0.2)
+    engine = EvaluationEngine(llm, concurrency=1, timeout=0.05, max_retries=1, max_failures=10)
+    results = []
+
+    engine.run([(1, "slow"), (2, "slow2")], lambda rows, _: results.extend(rows))
+
+    assert llm.max_active == 1
+    assert llm.calls == ["slow", "slow", "slow2", "slow2"]
+    assert [r.success for r in results] == [False, False]
+
+
+@pytest.fixture
+def evaluation_tables(app):
+    models = (Task, Dimension, DimensionOption, EvaluationDatasetData, EvaluationScore, CostAudit)
+    for model in models:
+        model.__table__.create(db.engine, checkfirst=True)
+    yield
+    db.session.rollback()
+    for model in reversed(models):
+        model.query.delete()
+    db.session.commit()
+
+
+# 测试AI测评跳过已打分数据，并按批写入分数和成本记录
+def test_ai_evaluation_resumes_and_writes_in_batches(evaluation_tables):
+    task = Task(
+        name="task",
+        evaluation_type="offline",
+        dataset_id=7,
+        evaluation_method="ai",
+        status="ai_evaluating",
+        prompt="{scene}{scene_descrp}{standard}{instruction}{output}{response}",
+        scene="",
+        scene_descrp="",
+        user_id="user",
+        tenant_id="tenant",
+        concurrency=4,
+    )
+    db.session.add(task)
+    db.session.flush()
+    dimension = Dimension(dimension_name="准确性", task_id=task.id, ai_base_score=5)
+    db.session.add(dimension)
+    db.session.flush()
+    rows = [
+        EvaluationDatasetData(
+            dataset_id=7,
+            instruction=f"q{i}",
+            output="o",
+            response="r",
+            is_evaluated=i < 3,
+        )
+        for i in range(12)
+    ]
+    db.session.add_all(rows)
+    db.session.commit()
+
+    # 工作线程中不能访问提交后过期的ORM属性
+    dimension_id = dimension.id
+    llm = _FakeLLM(
+        delay=0.01,
+        reply=lambda prompt: f"[{{'metric_id': {dimension_id}, 'metric_final_score': 4}}]",
+    )
+    commits = []
+    with patch.object(Service, "llm_model_start", return_value=llm), patch.object(
+        Task, "model", None
+    ), patch("parts.evalution.service.LogService"
+    ), patch("parts.evalution.engine.lazy_config") as config, patch(
+        "parts.evalution.service.redis_client"
+    ):
+        config.EVALUATION_CONCURRENCY = 8
+        config.EVALUATION_WORKER_POOL_SIZE = 32
+        config.EVALUATION_COMMIT_BATCH_SIZE = 5
+        listener = lambda session: commits.append(1)  # noqa: E731
+        event.listen(db.session, "after_commit", listener)
+        try:
+            Service().ai_evaluation_process(task.id)
+        finally:
+            event.remove(db.session, "after_commit", listener)
+
+    assert len(llm.calls) == 9
+    assert EvaluationScore.query.filter_by(task_id=task.id).count() == 9
+    assert EvaluationDatasetData.query.filter_by(dataset_id=7, is_evaluated=True).count() == 12
+    assert CostAudit.query.filter_by(task_id=task.id).count() == 9
+    # 两批数据各提交一次，再加上任务状态的提交
+    assert len(commits) == 3
+    assert db.session.get(Task, task.id).status == "ai_evaluated"
@@ -0,0 +1,137 @@
+import io
+import os
+import time
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.file_service import FileService
+from parts.knowledge_base.model import FileRecord, KnowledgeBase
+from utils.storage.blob_store import BlobStore, link_or_copy
+from utils.util_database import db
+
+
+# 测试相同内容只保存一份，物化路径与blob共享数据
+def test_put_stream_deduplicates_content(tmp_path):
+    store = BlobStore(str(tmp_path / "blobs"))
+    first = store.put_stream(io.BytesIO(b"hello" * 1000), str(tmp_path / "a" / "one.txt"))
+    second = store.put_stream(io.BytesIO(b"hello" * 1000), str(tmp_path / "b" / "two.txt"))
+
+    assert first == second == BlobStore.hash_file(str(tmp_path / "a" / "one.txt"))
+    assert os.listdir(os.path.join(store.root, first[:2])) == [first]
+    assert (tmp_path / "b" / "two.txt").read_bytes() == b"hello" * 1000
+    assert os.listdir(os.path.join(store.root, "tmp")) == []
+
+
+# 测试不支持reflink和硬链接时退化为复制
+def test_link_or_copy_falls_back_to_copy(tmp_path):
+    src = tmp_path / "src.bin"
+    src.write_bytes(b"data")
+    with patch("utils.storage.blob_store.fcntl.ioctl", side_effect=OSError), patch(
+        "utils.storage.blob_store.os.link", side_effect=OSError
+    ):
+        assert link_or_copy(str(src), str(tmp_path / "dst" / "copy.bin")) == "copy"
+    assert (tmp_path / "dst" / "copy.bin").read_bytes() == b"data"
+    assert link_or_copy(str(src), str(tmp_path / "link.bin")) in ("reflink", "hardlink")
+
+
+# 测试垃圾回收只删除无引用且超过宽限期的blob
+def test_collect_garbage_respects_references_and_age(tmp_path):
+    store = BlobStore(str(tmp_path / "blobs"))
+    kept = store.put_stream(io.BytesIO(b"kept"))
+    orphan = store.put_stream(io.BytesIO(b"orphan"))
+    recent = store.put_stream(io.BytesIO(b"recent"))
+    old = time.time() - 3600
+    for digest in (kept, orphan):
+        os.utime(store.path(digest), (old, old))
+
+    assert store.collect_garbage(lambda digests: {kept} & set(digests), min_age=60) == 1
+    assert store.exists(kept) and store.exists(recent)
+    assert not store.exists(orphan)
+
+
+@pytest.fixture
+def file_records(app):
+    FileRecord.__table__.create(db.engine, checkfirst=True)
+    KnowledgeBase.__table__.create(db.engine, checkfirst=True)
+    yield
+    db.session.rollback()
+    FileRecord.query.delete()
+    KnowledgeBase.query.delete()
+    db.session.commit()
+
+
+@pytest.fixture
+def file_service(tmp_path):
+    store = BlobStore(str(tmp_path / "blobs"))
+    dirs = (str(tmp_path / f"upload{i}") for i in range(100))
+    with patch("core.file_service.blob_store", store), patch(
+        "core.file_service.FileTools.create_knowledge_storage",
+        side_effect=lambda user_id: next(dirs),
+    ), patch("core.file_service.Tenant"), patch(
+        "parts.knowledge_base.model.TimeTools.get_china_now", return_value=datetime.now()
+    ):
+        yield FileService(MagicMock(id="user", current_tenant_id="tenant"))
+
+
+def _upload(service, content, filename="doc.txt"):
+    return service.upload_file(MagicMock(filename=filename, stream=io.BytesIO(content)))[0]
+
+
+# 测试上传相同内容的文件共享blob，删除记录后回收文件与blob
+def test_upload_delete_and_collect(file_records, tmp_path):
+    store = BlobStore(str(tmp_path / "blobs"))
+    service = FileService(MagicMock(id="user", current_tenant_id="tenant"))
+    dirs = iter([str(tmp_path / "k1"), str(tmp_path / "k2")])
+    with patch("core.file_service.blob_store", store), patch(
+        "core.file_service.FileTools.create_knowledge_storage",
+        side_effect=lambda user_id: next(dirs),
+    ), patch("core.file_service.Tenant"), patch(
+        "parts.knowledge_base.model.TimeTools.get_china_now", return_value=datetime.now()
+    ):
+        records = [
+            service.upload_file(MagicMock(filename="doc.txt", stream=io.BytesIO(b"same")))[0]
+            for _ in range(2)
+        ]
+        assert records[0].file_md5 == records[1].file_md5
+        assert records[0].file_path != records[1].file_path
+
+        service.batch_delete_files([records[0].id])
+        assert not os.path.exists(records[0].file_path)
+        assert open(records[1].file_path, "rb").read() == b"same"
+        assert FileService.collect_blob_garbage(min_age=0) == 0
+
+        service.batch_delete_files([records[1].id])
+        assert FileService.collect_blob_garbage(min_age=0) == 1
+        assert not store.exists(records[1].file_md5)
+
+
+# 测试早期相同md5的记录共用同一路径时，删除其中一条不会删除仍被引用的文件
+def test_delete_keeps_path_shared_by_older_record(file_records, file_service):
+    older = _upload(file_service, b"same")
+    newer = FileRecord.init_as_knowledge("user", "doc.txt", older.file_path, older.file_md5)
+    db.session.add(newer)
+    db.session.commit()
+
+    assert file_service.batch_delete_files([newer.id]) == 1
+    assert open(older.file_path, "rb").read() == b"same"
+
+    assert file_service.batch_delete_files([older.id]) == 1
+    assert not os.path.exists(older.file_path)
+
+
+# 测试已移入知识库目录的文件删除时只删除知识库中的路径，其他知识库的同内容文件不受影响
+def test_delete_file_moved_into_knowledge_base(file_records, file_service, tmp_path):
+    bases = [KnowledgeBase(user_id="user", name=name, path=str(tmp_path / name)) for name in ("kb1", "kb2")]
+    db.session.add_all(bases)
+    db.session.commit()
+    moved, other = _upload(file_service, b"same"), _upload(file_service, b"same")
+    file_service.add_knowledge_files(bases[0].id, [moved.id])
+    file_service.add_knowledge_files(bases[1].id, [other.id])
+    assert moved.file_path == os.path.join(bases[0].path, "doc.txt")
+
+    assert file_service.batch_delete_files([moved.id]) == 1
+    assert not os.path.exists(os.path.join(bases[0].path, "doc.txt"))
+    assert open(other.file_path, "rb").read() == b"same"
+    assert FileService.collect_blob_garbage(min_age=0) == 0
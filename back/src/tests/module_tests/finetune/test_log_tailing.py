@@ -0,0 +1,97 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flask import Flask
+
+from parts.finetune.finetune_service import FinetuneService
+from parts.finetune.task_manager import LOG_PATH, TaskManager
+from utils.storage.local_storage import LocalStorage
+from utils.util_storage import Storage
+
+
+class _FakeFT:
+    """模拟FT日志接口，可选择是否支持Range请求"""
+
+    def __init__(self, supports_range=True):
+        self.log = b""
+        self.supports_range = supports_range
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        range_header = (headers or {}).get("Range")
+        self.requests.append(range_header)
+        if range_header and self.supports_range:
+            start = int(range_header[len("bytes="):-1])
+            if start >= len(self.log):
+                return MagicMock(status_code=416, content=b"")
+            return MagicMock(status_code=206, content=self.log[start:])
+        return MagicMock(status_code=200, content=self.log)
+
+
+@pytest.fixture
+def log_storage(tmp_path, monkeypatch):
+    monkeypatch.setenv("STORAGE_LOCAL_PATH", str(tmp_path))
+    storage = Storage()
+    storage.storage_runner = LocalStorage(Flask(__name__))
+    with patch("parts.finetune.task_manager.storage", storage), patch(
+        "parts.finetune.finetune_service.storage", storage
+    ), patch("parts.finetune.task_manager.db"):
+        yield storage
+
+
+def _sync_rounds(ft, task, lines):
+    manager = TaskManager()
+    with patch("parts.finetune.task_manager.requests", ft):
+        for line in lines:
+            ft.log += line
+            assert manager.sync_task_log(task, "job")
+
+
+# 测试每次只追加新增日志，并通过Range请求只传输新增部分
+@pytest.mark.parametrize("supports_range", [True, False])
+def test_sync_appends_only_new_content(log_storage, supports_range):
+    ft = _FakeFT(supports_range)
+    task = MagicMock(id=1, log_path="")
+    lines = [f"step {i} loss 0.{i}\n".encode() * 40 for i in range(5)]
+
+    with patch.object(log_storage, "save", wraps=log_storage.save) as save:
+        _sync_rounds(ft, task, lines)
+        _sync_rounds(ft, task, [b""])
+
+    assert task.log_path == f"{LOG_PATH}1/finetune.log"
+    assert log_storage.load_once(task.log_path) == ft.log
+    # 只有第一次整体写入，之后都是追加
+    assert save.call_count == 1
+    if supports_range:
+        assert ft.requests[0] is None and all(ft.requests[1:])
+
+
+# 测试远端日志被重写时重新获取完整日志覆盖
+def test_sync_refetches_when_log_rewritten(log_storage):
+    ft = _FakeFT()
+    task = MagicMock(id=2, log_path="")
+    _sync_rounds(ft, task, [b"a" * 1000])
+
+    ft.log = b"b" * 1200
+    _sync_rounds(ft, task, [b""])
+    assert log_storage.load_once(task.log_path) == b"b" * 1200
+
+
+# 测试按范围和末尾读取日志，不截断多字节字符
+@patch("parts.finetune.finetune_service.db")
+def test_task_log_range_and_tail(mock_db, log_storage):
+    log_storage.save("finetune/log/3/finetune.log", "第一行\nsecond\n第三行\n".encode())
+    mock_db.session.query.return_value.get.return_value = MagicMock(
+        log_path="finetune/log/3/finetune.log"
+    )
+    service = FinetuneService(MagicMock())
+
+    first = service.task_log_range(3, offset=0, limit=4)
+    assert first["content"] == "第"
+    assert first["next_offset"] == 3
+    rest = service.task_log_range(3, offset=first["next_offset"])
+    assert first["content"] + rest["content"] == "第一行\nsecond\n第三行\n"
+    assert rest["next_offset"] == rest["size"]
+
+    tail = service.task_log_range(3, tail=14)
+    assert tail["content"] == "第三行\n"
@@ -0,0 +1,221 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+import pytz
+
+from parts.finetune.model import TaskStatus
+from parts.finetune.status_poller import FinetuneStatusPoller, status_poller
+from parts.finetune.task_manager import TaskManager
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, nx=False, ex=None):
+        with self._lock:
+            if nx and key in self.data:
+                return None
+            self.data[key] = value
+            return True
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+@pytest.fixture
+def fake_redis():
+    redis = _FakeRedis()
+    with patch("parts.finetune.status_poller.redis_client", redis):
+        yield redis
+
+
+def _poller(**kwargs):
+    options = dict(
+        concurrency=4,
+        round_timeout=5,
+        min_interval=10,
+        max_interval=100,
+        interval_ratio=0.1,
+        lock_ttl=60,
+    )
+    options.update(kwargs)
+    return FinetuneStatusPoller(**options)
+
+
+# 测试检查间隔：刚启动时最短，运行越久越长，失败后指数退避且不超过上限
+def test_next_interval_adapts_to_runtime_and_failures():
+    poller = _poller()
+    assert poller.next_interval(30) == 10
+    assert poller.next_interval(500) == 50
+    assert poller.next_interval(30, failures=2) == 40
+    assert poller.next_interval(5000) == 100
+    assert poller.next_interval(30, failures=50) == 100
+
+
+# 测试任务并发检查且不超过并发上限，本轮耗时取决于最慢的任务
+def test_poll_checks_jobs_concurrently(fake_redis):
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def check(task_id):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.2)
+        with lock:
+            active[0] -= 1
+
+    start = time.monotonic()
+    summary = _poller().poll([(i, 0) for i in range(8)], check)
+    elapsed = time.monotonic() - start
+
+    assert sorted(summary["checked"]) == list(range(8))
+    assert peak[0] == 4
+    assert elapsed < 8 * 0.2 / 2
+
+
+# 测试未到期的任务被跳过，失败的任务记录失败次数并推迟下次检查
+def test_poll_skips_not_due_and_backs_off_failures(fake_redis):
+    poller = _poller()
+    calls = []
+
+    def check(task_id):
+        calls.append(task_id)
+        if task_id == 2:
+            raise RuntimeError("ft service down")
+
+    summary = poller.poll([(1, 0), (2, 0)], check)
+    assert summary["checked"] == [1] and summary["failed"] == [2]
+    assert poller._load_state(2)["failures"] == 1
+    assert poller._load_state(2)["next_at"] - time.time() == pytest.approx(20, abs=1)
+
+    summary = poller.poll([(1, 0), (2, 0)], check)
+    assert sorted(summary["skipped"]) == [1, 2]
+    assert calls == [1, 2]
+
+
+# 测试卡住的任务超时后不阻塞本轮，且在完成前不会被重复检查
+def test_poll_times_out_stuck_job(fake_redis):
+    poller = _poller(round_timeout=0.2)
+    release = threading.Event()
+    calls = []
+
+    def check(task_id):
+        calls.append(task_id)
+        if task_id == "stuck":
+            release.wait(5)
+
+    start = time.monotonic()
+    summary = poller.poll([("stuck", 0), ("ok", 0)], check)
+    assert time.monotonic() - start < 2
+    assert summary["timed_out"] == ["stuck"] and summary["checked"] == ["ok"]
+
+    # 锁仍被后台线程持有，直接到期也不会重复检查
+    fake_redis.delete(poller._state_key("stuck"))
+    assert poller.poll([("stuck", 0)], check)["skipped"] == ["stuck"]
+
+    release.set()
+    for _ in range(50):
+        if poller._lock_key("stuck") not in fake_redis.data:
+            break
+        time.sleep(0.05)
+    assert poller._lock_key("stuck") not in fake_redis.data
+    assert calls == ["stuck", "ok"]
+
+
+# 测试所有工作线程都被卡住时本轮按时返回，排队中的任务被取消并释放锁，下一轮重新检查
+def test_poll_defers_queued_jobs_at_round_deadline(fake_redis):
+    poller = _poller(concurrency=1, round_timeout=0.2)
+    release = threading.Event()
+    calls = []
+
+    def check(task_id):
+        calls.append(task_id)
+        if task_id == "stuck":
+            release.wait(5)
+
+    start = time.monotonic()
+    summary = poller.poll([("stuck", 0), ("queued", 0)], check)
+    assert time.monotonic() - start < 2
+    assert summary["timed_out"] == ["stuck"] and summary["deferred"] == ["queued"]
+    assert poller._lock_key("queued") not in fake_redis.data
+    assert poller._load_state("queued") == {}
+
+    release.set()
+    assert poller.poll([("queued", 0)], check)["checked"] == ["queued"]
+    assert calls == ["stuck", "queued"]
+
+
+# 测试模型导出到 AMP 未完成时不等待，任务保持进行中，超过等待时长后按超时处理
+@patch("parts.finetune.task_manager.db")
+def test_amp_upload_wait_is_rescheduled(mock_db, monkeypatch):
+    monkeypatch.setenv("AMP_DOWNLOAD_PATH", "/tmp/amp")
+    manager = TaskManager()
+    task_db = MagicMock(id=1, target_model_name="m", task_job_info="{}")
+    task_db.task_job_info_dict = {"job_id": "j", "model_id_or_path": "m"}
+    with patch.object(
+        TaskManager, "get_ft_amp_upload_status", return_value=(True, "MODEL_EXPORTING")
+    ), patch.object(TaskManager, "update_task_status_to_db_ft") as update_status, patch.object(
+        TaskManager, "_prepare_download_path"
+    ), patch.object(
+        TaskManager, "_handle_upload_timeout"
+    ) as handle_timeout, patch(
+        "parts.finetune.task_manager.time.sleep"
+    ) as sleep:
+        assert manager._download_model_from_amp(task_db, "j") is False
+        update_status.assert_called_with(1, TaskStatus.IN_PROGRESS.value)
+        handle_timeout.assert_not_called()
+
+        task_db.task_job_info_dict["amp_upload_wait_since"] = time.time() - 21 * 60
+        assert manager._download_model_from_amp(task_db, "j") is True
+        handle_timeout.assert_called_once()
+    sleep.assert_not_called()
+
+
+# 测试定时任务只并发检查进行中的任务，每个任务在工作线程的独立上下文中处理
+@patch("parts.finetune.task_manager.db")
+def test_check_task_status_polls_in_progress_tasks(mock_db, fake_redis):
+    now = datetime(2025, 3, 1, 12, 0, 0)
+    mock_db.session.query.return_value.filter.return_value.all.return_value = [
+        (1, now - timedelta(minutes=1)),
+        (2, now - timedelta(hours=2)),
+        (3, now - timedelta(minutes=5)),
+    ]
+    tasks = {
+        task_id: MagicMock(id=task_id, status=status)
+        for task_id, status in (
+            (1, TaskStatus.IN_PROGRESS.value),
+            (2, TaskStatus.IN_PROGRESS.value),
+            # 查询之后已被其他进程更新为完成的任务
+            (3, TaskStatus.COMPLETED.value),
+        )
+    }
+    mock_db.session.get.side_effect = lambda model, task_id: tasks[task_id]
+
+    processed = []
+    manager = TaskManager()
+    china_now = pytz.timezone("Asia/Shanghai").localize(now)
+    with patch(
+        "parts.finetune.task_manager.TimeTools.get_china_now", return_value=china_now
+    ), patch.object(
+        TaskManager,
+        "_process_single_task",
+        lambda self, task_db: processed.append((task_db.id, threading.get_ident())),
+    ):
+        summary = manager.check_task_status()
+
+    assert sorted(task_id for task_id, _ in processed) == [1, 2]
+    assert threading.get_ident() not in {ident for _, ident in processed}
+    assert sorted(summary["checked"]) == [1, 2, 3]
+    mock_db.session.remove.assert_called()
+
+    # 运行两小时的任务检查间隔更长
+    assert status_poller._load_state(2)["next_at"] > status_poller._load_state(1)["next_at"]
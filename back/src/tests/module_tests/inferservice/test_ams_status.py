@@ -0,0 +1,97 @@
+import os
+import threading
+import time
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from parts.inferservice.ams_status import AmsStatusCache
+from parts.inferservice.service import InferService
+
+
+# 测试缺失的状态并发查询，之后在TTL内命中缓存
+def test_get_many_fetches_concurrently_then_caches():
+    cache = AmsStatusCache(ttl=60, refresh_interval=60, concurrency=16)
+    calls = []
+    lock = threading.Lock()
+
+    def slow_fetch(gid):
+        with lock:
+            calls.append(gid)
+        time.sleep(0.1)
+        return True, "Available", f"10.0.0.1:{gid}"
+
+    with patch.object(cache, "fetch", side_effect=slow_fetch):
+        start = time.monotonic()
+        result = cache.get_many([f"svc{i}" for i in range(16)])
+        assert time.monotonic() - start < 0.5
+        assert result["svc3"] == (True, "Available", "10.0.0.1:svc3")
+
+        cache.get_many(["svc1", "svc2"])
+        assert len(calls) == 16
+
+        cache.invalidate("svc1")
+        cache.get_many(["svc1", "svc2"])
+        assert calls[-1] == "svc1" and len(calls) == 17
+    cache.shutdown()
+
+
+# 测试后台线程刷新最近查询过的服务状态
+def test_background_refresh_updates_watched_services():
+    cache = AmsStatusCache(ttl=60, refresh_interval=0.05)
+    statuses = iter(["Unavailable"] + ["Available"] * 100)
+    with patch.object(cache, "fetch", side_effect=lambda gid: (True, next(statuses), "")):
+        assert cache.get_many(["svc"])["svc"][1] == "Unavailable"
+        time.sleep(0.2)
+        assert cache.get_many(["svc"])["svc"][1] == "Available"
+    cache.shutdown()
+
+
+# 测试状态查询复用连接池会话并替换本地地址
+def test_fetch_uses_pooled_session():
+    cache = AmsStatusCache()
+    response = MagicMock(status_code=200, text="")
+    response.json.return_value = {"status": "Available", "endpoint": "127.0.0.1:8000"}
+    with patch.dict(os.environ, {"AMS_ENDPOINT": "http://ams.local:9000"}), patch.object(
+        cache._http(), "get", return_value=response
+    ) as get:
+        assert cache.fetch("svc") == (True, "Available", "ams.local:8000")
+        cache.fetch("svc")
+    assert get.call_count == 2
+    assert cache._http().get_adapter("http://ams.local")._pool_maxsize == cache._concurrency
+
+
+# 测试列表状态汇总批量预取模型并按字典匹配端点
+@patch("parts.inferservice.service.TimeTools.now_datetime_china", return_value=datetime(2025, 1, 1))
+@patch("parts.inferservice.service.Lazymodel")
+def test_get_ams_service_status_prefetches_models(mock_lazymodel, _now):
+    models = [
+        MagicMock(id=1, model_from="local"),
+        MagicMock(id=2, model_from="finetune", model_key_ams="base-model"),
+    ]
+    mock_lazymodel.query.filter.return_value = models
+    services = [
+        MagicMock(gid="a", model_id=1, updated_time=datetime(2024, 12, 31)),
+        MagicMock(gid="b", model_id=2, updated_time=datetime(2024, 12, 31, 23, 59)),
+        MagicMock(gid="c", model_id=1),
+        MagicMock(gid=None, model_id=1),
+    ]
+    group = MagicMock(model_name="group-model", services=services)
+    local_models = [
+        {"model_name": "group-model", "endpoint": "/v1/chat"},
+        {"model_name": "base-model", "endpoint": "/generate"},
+    ]
+    statuses = {
+        "a": (True, "Available", "10.0.0.1:80"),
+        "b": (True, "Unavailable", "http://10.0.0.2/api"),
+        "c": (False, "", ""),
+    }
+    with patch("parts.inferservice.service.ams_local_model_list_ams", local_models), patch(
+        "parts.inferservice.service.ams_status_cache"
+    ) as cache:
+        cache.get_many.return_value = statuses
+        status, endpoint = InferService()._get_ams_service_status([group])
+
+    cache.get_many.assert_called_once_with(["a", "b", "c"])
+    assert mock_lazymodel.query.filter.call_count == 1
+    assert status == {"a": "Ready", "b": "Running", "c": "Cancelled"}
+    assert endpoint == {"a": "http://10.0.0.1:80/v1/chat", "b": "http://10.0.0.2/api", "c": ""}
@@ -0,0 +1,215 @@
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from parts.mcp.service import McpToolService  # noqa: E402
+from parts.mcp.session_pool import (McpServerSpec, McpSessionManager,  # noqa: E402
+                                    make_pooled_mcp_tool)
+
+SERVER = """
+import asyncio
+import os
+
+from mcp.server.fastmcp import FastMCP
+
+server = FastMCP("test")
+
+
+@server.tool()
+def pid() -> str:
+    \"\"\"返回服务进程号\"\"\"
+    return str(os.getpid())
+
+
+@server.tool()
+async def slow(seconds: float) -> str:
+    \"\"\"等待指定秒数\"\"\"
+    await asyncio.sleep(seconds)
+    return "done"
+
+
+@server.tool()
+def crash() -> str:
+    \"\"\"让服务进程退出\"\"\"
+    os._exit(1)
+
+
+server.run()
+"""
+
+
+@pytest.fixture
+def spec(tmp_path):
+    script = tmp_path / "server.py"
+    script.write_text(SERVER)
+    return McpServerSpec(
+        transport="STDIO", command_or_url=sys.executable, args=(str(script),), timeout=10
+    )
+
+
+@pytest.fixture
+def redis():
+    client = fakeredis.FakeRedis()
+    with patch("parts.mcp.session_pool.redis_client", client):
+        yield client
+
+
+def _manager():
+    return McpSessionManager(
+        idle_timeout=60, max_concurrency=2, max_sessions=4, health_interval=60, tools_ttl=60
+    )
+
+
+@pytest.fixture
+def manager(redis):
+    manager = _manager()
+    yield manager
+    manager.shutdown()
+
+
+def _pid(manager, spec):
+    return manager.call_tool_sync(spec, "pid", {}).content[0].text
+
+
+# 测试多次调用复用同一个STDIO子进程，工具列表只获取一次
+def test_calls_reuse_session_and_cache_tools(manager, spec):
+    pids = {_pid(manager, spec) for _ in range(5)}
+    assert len(pids) == 1
+
+    first = manager.list_tools_sync(spec)
+    with patch.object(manager, "_acquire", side_effect=AssertionError("re-handshake")):
+        assert manager.list_tools_sync(spec) is first
+    assert {tool.name for tool in first} == {"pid", "slow", "crash"}
+    assert manager.stats() == {"sessions": 1, "in_flight": 0, "cached_tools": 1}
+
+
+# 测试单个会话的并发请求数不超过上限
+def test_concurrency_limit(manager, spec):
+    _pid(manager, spec)
+    start = time.monotonic()
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda _: manager.call_tool_sync(spec, "slow", {"seconds": 0.3}), range(4)))
+    elapsed = time.monotonic() - start
+    assert all(r.content[0].text == "done" for r in results)
+    # 并发上限为2，4个请求至少需要两轮
+    assert 0.6 <= elapsed < 1.2
+
+
+# 测试空闲超时的会话被关闭，服务进程退出后下次调用自动重建会话
+def test_idle_sweep_and_recover_from_dead_process(manager, spec):
+    first = _pid(manager, spec)
+    manager._idle_timeout = 0
+    manager.run(manager.sweep())
+    assert manager.stats()["sessions"] == 0
+    manager._idle_timeout = 60
+
+    second = _pid(manager, spec)
+    assert second != first
+    with pytest.raises(Exception):
+        manager.call_tool_sync(spec, "crash", {})
+    for _ in range(50):
+        if manager.stats()["sessions"] == 0:
+            break
+        time.sleep(0.05)
+    assert _pid(manager, spec) not in (first, second)
+
+
+# 测试空闲较久的会话复用前先做健康检查
+def test_health_check_before_reuse(manager, spec):
+    first = _pid(manager, spec)
+    manager._health_interval = 0
+    pings = []
+    original = manager._ping
+
+    async def ping(entry):
+        pings.append(entry)
+        return await original(entry)
+
+    with patch.object(manager, "_ping", ping):
+        assert _pid(manager, spec) == first
+    assert len(pings) == 1
+
+
+# 测试工具调试通过会话管理器调用，不再每次新建客户端
+@patch("parts.mcp.service.mcp_session_manager")
+@patch("parts.mcp.service.McpServerService")
+def test_test_tool_uses_session_manager(mock_server_service, mock_manager):
+    server = MagicMock(
+        transport_type="STDIO", stdio_command="npx", stdio_arguments="-y  pkg", stdio_env={"K": "V"}, timeout=None
+    )
+    mock_server_service.return_value.get_by_id.return_value = server
+    tool = MagicMock()
+    tool.name = "search"
+    service = McpToolService(MagicMock())
+    with patch.object(service, "get_by_id", return_value=tool):
+        result = service.test_tool(1, 2, {"q": "x"})
+
+    assert result["status"] == 200
+    spec, name, arguments = mock_manager.call_tool_sync.call_args.args
+    assert spec == McpServerSpec("STDIO", "npx", ("-y", "pkg"), (("K", "V"),), (), 30)
+    assert (name, arguments) == ("search", {"q": "x"})
+
+
+# 测试MCPTool节点使用缓存的工具定义，调用在会话线程中执行
+def test_pooled_mcp_tool_node(manager, spec):
+    with patch("parts.mcp.session_pool.mcp_session_manager", manager):
+        tool = make_pooled_mcp_tool(spec.command_or_url, "slow", list(spec.args), timeout=10)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(tool(seconds=0))) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert tool.__name__ == "slow"
+    assert all("done" in result for result in results) and len(results) == 3
+    assert manager.stats()["sessions"] == 1
+
+
+def _server_record(spec):
+    return MagicMock(
+        transport_type="STDIO",
+        stdio_command=spec.command_or_url,
+        stdio_arguments=" ".join(spec.args),
+        stdio_env={},
+        timeout=spec.timeout,
+    )
+
+
+# 测试一个进程中的失效通过版本号使其他进程的会话和工具缓存失效
+def test_invalidation_reaches_other_processes(manager, spec):
+    other = _manager()
+    try:
+        first = _pid(manager, spec)
+        tools = manager.list_tools_sync(spec)
+
+        other.invalidate(_server_record(spec))
+
+        assert manager.list_tools_sync(spec) is not tools
+        assert _pid(manager, spec) != first
+        assert manager.stats()["sessions"] == 1
+    finally:
+        other.shutdown()
+
+
+# 测试失效的会话等正在进行的请求结束后才关闭，工具返回的错误不会关闭会话
+def test_retired_session_drains_in_flight_requests(manager, spec):
+    first = _pid(manager, spec)
+
+    async def failing(session):
+        raise ValueError("bad arguments")
+
+    with pytest.raises(ValueError):
+        manager.run(manager._request(spec, failing))
+    assert _pid(manager, spec) == first
+
+    slow = manager.submit(manager.call_tool(spec, "slow", {"seconds": 0.5}))
+    time.sleep(0.2)
+    manager.invalidate(_server_record(spec))
+    assert slow.result(5).content[0].text == "done"
+    assert _pid(manager, spec) != first
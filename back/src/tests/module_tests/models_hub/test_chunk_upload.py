@@ -0,0 +1,150 @@
+import hashlib
+import io
+import os
+import random
+import tarfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from parts.models_hub.chunk_upload import ChunkedUpload
+from parts.models_hub.service import ModelService
+
+CHUNK_SIZE = 1000
+
+
+def _split(data, chunk_size=CHUNK_SIZE):
+    return [data[i : i + chunk_size] for i in range(0, len(data), chunk_size)]
+
+
+# 测试分片乱序并发写入预分配文件，并可查询缺失分片续传
+def test_positional_chunks_resume_and_assemble(tmp_path):
+    data = random.Random(0).randbytes(CHUNK_SIZE * 7 + 123)
+    chunks = _split(data)
+    upload = ChunkedUpload(str(tmp_path / "model.bin_chunks"), "model.bin")
+    upload.prepare(len(chunks), CHUNK_SIZE, len(data))
+
+    first = [5, 0, 7, 2]
+    with ThreadPoolExecutor(4) as pool:
+        list(pool.map(lambda n: upload.write_chunk(n, io.BytesIO(chunks[n])), first))
+
+    status = upload.status()
+    assert status["uploaded"] == sorted(first)
+    assert status["missing"] == [1, 3, 4, 6]
+    with pytest.raises(ValueError, match="缺失分片"):
+        upload.assemble()
+
+    # 连接中断后重新初始化不会丢弃已上传的分片
+    upload.prepare(len(chunks), CHUNK_SIZE, len(data))
+    for n in status["missing"]:
+        record = upload.write_chunk(
+            n, io.BytesIO(chunks[n]), hashlib.sha256(chunks[n]).hexdigest()
+        )
+        assert record["size"] == len(chunks[n])
+
+    path = upload.assemble()
+    with open(path, "rb") as f:
+        assert f.read() == data
+
+
+# 测试校验值或大小不一致的分片被拒绝，且不计入已上传分片
+def test_rejects_corrupt_chunks(tmp_path):
+    data = b"x" * (CHUNK_SIZE * 2)
+    upload = ChunkedUpload(str(tmp_path / "chunks"), "model.bin")
+    upload.prepare(2, CHUNK_SIZE, len(data))
+
+    with pytest.raises(ValueError, match="校验失败"):
+        upload.write_chunk(0, io.BytesIO(data[:CHUNK_SIZE]), "0" * 64)
+    with pytest.raises(ValueError, match="大小不完整"):
+        upload.write_chunk(1, io.BytesIO(data[:10]))
+    with pytest.raises(ValueError, match="超出范围"):
+        upload.write_chunk(2, io.BytesIO(b""))
+    assert upload.status()["missing"] == [0, 1]
+
+
+# 测试同名文件以不同参数上传时拒绝请求，已上传的分片保持不变
+def test_rejects_mismatched_prepare(tmp_path):
+    data = b"y" * (CHUNK_SIZE * 3)
+    upload = ChunkedUpload(str(tmp_path / "chunks"), "model.bin")
+    upload.prepare(3, CHUNK_SIZE, len(data))
+    upload.write_chunk(0, io.BytesIO(data[:CHUNK_SIZE]))
+
+    with pytest.raises(ValueError, match="不同参数"):
+        upload.prepare(6, CHUNK_SIZE // 2, len(data))
+    with pytest.raises(ValueError, match="不同参数"):
+        upload.prepare(3)
+    assert upload.status()["uploaded"] == [0]
+
+    upload.cleanup()
+    assert upload.prepare(6, CHUNK_SIZE // 2, len(data))["total_chunks"] == 6
+
+
+# 测试未提供分片大小时单独保存分片，合并时按顺序拼接
+def test_separate_chunks_are_concatenated(tmp_path):
+    chunks = [b"a" * 10, b"b" * 7, b"c" * 3]
+    upload = ChunkedUpload(str(tmp_path / "chunks"), "model.bin")
+    upload.prepare(len(chunks))
+    for n in (2, 0, 1):
+        upload.write_chunk(n, io.BytesIO(chunks[n]))
+
+    with open(upload.assemble(), "rb") as f:
+        assert f.read() == b"".join(chunks)
+
+
+def _upload_archive(service):
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode="w:gz") as tar:
+        for name, content in (("model/config.json", b"{}"), ("model/weights.bin", b"w" * 5000)):
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+    data = archive.getvalue()
+    chunks = _split(data, 512)
+    for n, chunk in enumerate(chunks):
+        service.upload_file_chunk(
+            MagicMock(stream=io.BytesIO(chunk)),
+            "model.tar.gz",
+            "dir",
+            n,
+            len(chunks),
+            chunk_size=512,
+            total_size=len(data),
+        )
+
+
+# 测试合并接口直接使用已写好的文件并解压到模型目录
+@patch("parts.models_hub.service.db")
+@patch("parts.models_hub.service.FileRecord")
+def test_merge_file_chunks_extracts_archive(mock_file_record, mock_db, tmp_path):
+    service = ModelService(MagicMock(id="user"))
+    with patch.dict(os.environ, {"APP_MODEL_PATH": str(tmp_path)}):
+        _upload_archive(service)
+        assert service.get_uploaded_chunks("model.tar.gz", "dir")["missing"] == []
+        service.merge_file_chunks("model.tar.gz", "dir")
+
+    target_dir = mock_file_record.init_as_models_hub.call_args[0][2]
+    assert sorted(os.listdir(target_dir)) == ["config.json", "weights.bin"]
+    assert not any(name.endswith("_chunks") for name in os.listdir(os.path.dirname(target_dir)))
+
+
+# 测试解压失败后已上传的分片保持完整，可以重新合并
+@patch("parts.models_hub.service.db")
+@patch("parts.models_hub.service.FileRecord")
+def test_merge_file_chunks_can_retry_after_extract_failure(mock_file_record, mock_db, tmp_path):
+    service = ModelService(MagicMock(id="user"))
+    with patch.dict(os.environ, {"APP_MODEL_PATH": str(tmp_path)}):
+        _upload_archive(service)
+        with patch("parts.models_hub.service.extract_archive", side_effect=OSError("no space left")):
+            with pytest.raises(OSError):
+                service.merge_file_chunks("model.tar.gz", "dir")
+
+        upload = service._chunked_upload("model.tar.gz", "dir")
+        assert upload.status()["missing"] == []
+        assert not os.path.exists(os.path.join(upload.chunk_dir, "model.tar.gz"))
+
+        service.merge_file_chunks("model.tar.gz", "dir")
+
+    target_dir = mock_file_record.init_as_models_hub.call_args[0][2]
+    assert sorted(os.listdir(target_dir)) == ["config.json", "weights.bin"]
+    assert not os.path.exists(upload.chunk_dir)
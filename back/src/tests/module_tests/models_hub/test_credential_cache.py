@@ -0,0 +1,235 @@
+import uuid
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import event, insert
+
+from libs.http_exception import CommonError
+from parts.app.node_run.node_base import BaseRunContext
+from parts.models_hub.credential_cache import ModelCredentialCache
+from parts.models_hub.model import (Lazymodel, LazyModelConfigInfo,
+                                    LazymodelOnlineModels)
+from parts.models_hub.service import ModelService
+from utils.util_database import db
+
+TENANT = str(uuid.uuid4())
+OTHER_TENANT = str(uuid.uuid4())
+MODEL_COUNT = 30
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def incr(self, key):
+        self.data[key] = self.data.get(key, 0) + 1
+        return self.data[key]
+
+
+@pytest.fixture
+def credential_tables(app):
+    models = (Lazymodel, LazyModelConfigInfo, LazymodelOnlineModels)
+    for model in models:
+        model.__table__.create(db.engine, checkfirst=True)
+    db.session.execute(
+        insert(Lazymodel),
+        [
+            dict(
+                id=i,
+                model_icon="",
+                model_type="online",
+                model_name=f"model{i}",
+                model_path="",
+                model_from="",
+                user_id="user",
+                model_kind="OnlineLLM",
+                model_key=f"key{i}",
+                model_status=1,
+                prompt_keys="",
+                model_brand="sensenova" if i == 1 else "openai",
+                model_url="",
+            )
+            for i in range(1, MODEL_COUNT + 1)
+        ],
+    )
+    db.session.execute(
+        insert(LazymodelOnlineModels),
+        [
+            dict(model_id=i, model_name=f"name{i}", model_key=f"online{i}", tenant_id=TENANT, user_id="user")
+            for i in range(1, MODEL_COUNT + 1)
+        ],
+    )
+    db.session.execute(
+        insert(LazyModelConfigInfo),
+        [
+            dict(
+                model_id=i,
+                tenant_id=TENANT,
+                user_id="user",
+                api_key="ak:sk" if i == 1 else ("" if i == MODEL_COUNT else f"ak{i}"),
+            )
+            for i in range(1, MODEL_COUNT + 1)
+        ]
+        + [dict(model_id=2, tenant_id=OTHER_TENANT, user_id="user", api_key="other")],
+    )
+    db.session.commit()
+    yield
+    db.session.rollback()
+    for model in models:
+        model.query.delete()
+    db.session.commit()
+
+
+@pytest.fixture
+def fake_redis():
+    redis = _FakeRedis()
+    with patch("parts.models_hub.credential_cache.redis_client", redis):
+        yield redis
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(db.engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(db.engine, "before_cursor_execute", self)
+
+
+def _resolve_all(context):
+    resolver = context.credential_resolver
+    results = {}
+    for i in range(1, MODEL_COUNT):
+        online_id = resolver.get_model_id_by_name(f"online{i}")
+        results[i] = resolver.get_model_apikey_by_id(online_id)
+    return results
+
+
+# 测试一次转换中所有模型节点共享一个解析器，凭证只需两次查询即可全部加载
+def test_resolver_batch_loads_credentials(credential_tables, fake_redis):
+    cache = ModelCredentialCache(ttl=60)
+    with patch(
+        "parts.models_hub.credential_cache.model_credential_cache", cache
+    ), patch(
+        "parts.models_hub.credential_cache.current_credential_tenant_id",
+        return_value=TENANT,
+    ), _QueryCounter() as counter:
+        context = BaseRunContext()
+        assert context.credential_resolver is context.credential_resolver
+        results = _resolve_all(context)
+        resolver = context.credential_resolver
+
+        assert counter.count == 2
+        assert results[1] == {"api_key": "ak", "secret_key": "sk", "source": "sensenova"}
+        assert results[2] == {"api_key": "ak2", "source": "openai"}
+        assert resolver.get_model_apikey_by_id("5") == {"api_key": "ak5", "source": "openai"}
+        assert resolver.get_model_apikey_by_id(None) == {}
+        with pytest.raises(CommonError):
+            resolver.get_model_apikey_by_id(MODEL_COUNT)
+
+        # 后续转换命中租户缓存，不再查询数据库
+        _resolve_all(BaseRunContext())
+        assert counter.count == 2
+
+        # 快照中不存在的名称回退到数据库查询
+        assert resolver.get_model_id_by_name("missing") == ""
+        assert counter.count == 3
+
+
+# 测试api_key变更后版本号递增，其他进程中的缓存随之失效
+def test_cache_reloads_after_invalidation(credential_tables, fake_redis):
+    cache = ModelCredentialCache(ttl=60)
+    assert cache.get(TENANT).api_keys[3]["api_key"] == "ak3"
+
+    LazyModelConfigInfo.query.filter_by(model_id=3, tenant_id=TENANT).update({"api_key": "new"})
+    db.session.commit()
+    assert cache.get(TENANT).api_keys[3]["api_key"] == "ak3"
+
+    # 模拟另一个进程修改了api_key
+    ModelCredentialCache(ttl=60).invalidate(TENANT)
+    assert cache.get(TENANT).api_keys[3]["api_key"] == "new"
+    assert cache.get(OTHER_TENANT).api_keys == {2: {"api_key": "other", "source": "openai"}}
+
+
+# 测试快照只加载本租户已配置模型的名称，回退查询的结果不写回共享快照
+def test_snapshot_is_scoped_to_tenant_and_read_only(credential_tables, fake_redis):
+    cache = ModelCredentialCache(ttl=60)
+    assert cache.get(OTHER_TENANT).model_ids == {"online2": 2}
+
+    snapshot = cache.get(TENANT)
+    assert "online30" not in snapshot.model_ids
+    with patch(
+        "parts.models_hub.credential_cache.model_credential_cache", cache
+    ), patch(
+        "parts.models_hub.credential_cache.current_credential_tenant_id",
+        return_value=TENANT,
+    ):
+        resolver = BaseRunContext().credential_resolver
+        assert resolver.get_model_id_by_name("online30") == 30
+        assert resolver.get_model_id_by_name("missing") == ""
+
+    assert cache.get(TENANT) is snapshot
+    assert "online30" not in snapshot.model_ids
+    assert "missing" not in snapshot.model_ids
+
+
+# 测试清除api_key后使租户的凭证缓存失效
+@patch("parts.models_hub.service.model_credential_cache")
+@patch("parts.models_hub.service.db")
+@patch("parts.models_hub.service.Lazymodel")
+def test_clear_api_key_invalidates_cache(mock_lazymodel, mock_db, mock_cache):
+    mock_lazymodel.query.filter.return_value.all.return_value = [MagicMock(id=1)]
+    account = MagicMock(id="user", current_tenant_id=TENANT)
+
+    ModelService(account).clear_api_key("openai")
+
+    mock_cache.invalidate.assert_called_once_with(TENANT)
+
+
+# 测试其他租户新增的在线模型名称在快照未命中时从数据库解析
+def test_resolver_falls_back_to_db_for_new_names(credential_tables, fake_redis):
+    cache = ModelCredentialCache(ttl=60)
+    with patch(
+        "parts.models_hub.credential_cache.model_credential_cache", cache
+    ), patch(
+        "parts.models_hub.credential_cache.current_credential_tenant_id",
+        return_value=TENANT,
+    ):
+        assert BaseRunContext().credential_resolver.get_model_id_by_name("brand-new") == ""
+
+        db.session.add(
+            LazymodelOnlineModels(
+                model_id=7, model_name="", model_key="brand-new", tenant_id=OTHER_TENANT, user_id="other"
+            )
+        )
+        db.session.commit()
+
+        resolver = BaseRunContext().credential_resolver
+        assert resolver.get_model_id_by_name("brand-new") == 7
+        assert resolver.get_model_apikey_by_id(7) == {"api_key": "ak7", "source": "openai"}
+
+
+# 测试新增、删除在线模型后使租户的凭证缓存失效
+@patch("parts.models_hub.service.TimeTools.get_china_now", return_value=datetime(2025, 1, 1))
+@patch("parts.models_hub.service.model_credential_cache")
+def test_online_model_changes_invalidate_cache(mock_cache, _now, credential_tables):
+    account = MagicMock(id="user", current_tenant_id=TENANT)
+    Lazymodel.query.filter_by(id=3).update({"deleted_flag": 0})
+    db.session.commit()
+    service = ModelService(account)
+
+    service.save_online_model_list(3, [{"model_key": "extra", "can_finetune": 0}])
+    mock_cache.invalidate.assert_called_once_with(TENANT)
+
+    service.delete_online_model_list(3, ["extra"])
+    assert mock_cache.invalidate.call_count == 2
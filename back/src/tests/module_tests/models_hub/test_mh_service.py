@@ -1,3 +1,4 @@
+import io
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -213,10 +214,10 @@ def test_download_model(mock_lazymodel, mock_model_manager, mock_db, model_servi
 
 # 测试upload_file_chunk方法
 @patch("parts.models_hub.service.FileTools")
-def test_upload_file_chunk(mock_file_tools, model_service):
-    mock_file_tools.create_temp_storage.return_value = "/path/to/chunks"
+def test_upload_file_chunk(mock_file_tools, model_service, tmp_path):
+    mock_file_tools.create_temp_storage.return_value = str(tmp_path / "chunks")
     result = model_service.upload_file_chunk(
-        MagicMock(), "test_model", "test_dir", 0, 1
+        MagicMock(stream=io.BytesIO(b"chunk")), "test_model", "test_dir", 0, 1
     )
     assert result is not None
 
@@ -0,0 +1,134 @@
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from parts.models_hub.model_copy import ModelCopier
+from parts.models_hub.service import ModelService
+
+
+def _make_model(root, files):
+    for rel_path, size in files.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(os.urandom(size))
+    (root / "empty").mkdir(exist_ok=True)
+
+
+def _no_links():
+    # 模拟跨文件系统：reflink 与硬链接都不可用
+    return patch(
+        "utils.storage.blob_store.fcntl.ioctl", side_effect=OSError("unsupported")
+    ), patch("utils.storage.blob_store.os.link", side_effect=OSError("cross-device"))
+
+
+FILES = {"config.json": 100, "model-1.safetensors": 300_000, "sub/model-2.safetensors": 200_000}
+
+
+# 测试跨文件系统时并行分块复制，进度限流且模型大小在复制时统计
+def test_copy_tree_parallel_copy_with_throttled_progress(tmp_path):
+    src, dst = tmp_path / "src", tmp_path / "dst"
+    _make_model(src, FILES)
+    reports = []
+    copier = ModelCopier(workers=3, buffer_size=4096, progress_interval=60, allow_hardlink=True)
+
+    ioctl_patch, link_patch = _no_links()
+    with ioctl_patch, link_patch:
+        progress = copier.copy_tree(str(src), str(dst), on_progress=reports.append)
+
+    for rel_path in FILES:
+        assert (dst / rel_path).read_bytes() == (src / rel_path).read_bytes()
+        assert os.stat(dst / rel_path).st_mtime_ns == os.stat(src / rel_path).st_mtime_ns
+    assert (dst / "empty").is_dir()
+    assert progress.total_bytes == sum(FILES.values())
+    assert progress.copied_files == 3 and progress.done_bytes == progress.total_bytes
+    # 每个缓冲区都会更新进度，但在间隔内只发送首次和结束两次
+    assert len(reports) == 2
+    assert reports[-1].percent == 100
+    assert not list(dst.rglob("*.tmp"))
+
+
+# 测试允许硬链接时同一文件系统上优先使用链接，未变化的模型再次复制时直接跳过
+def test_copy_tree_links_and_skips_unchanged(tmp_path):
+    src, dst = tmp_path / "src", tmp_path / "dst"
+    _make_model(src, FILES)
+    copier = ModelCopier(workers=2, progress_interval=0, allow_hardlink=True)
+
+    first = copier.copy_tree(str(src), str(dst))
+    assert first.linked_files == 3 and first.copied_files == 0
+
+    with patch("utils.storage.blob_store.shutil.copyfile") as copyfile, patch(
+        "parts.models_hub.model_copy.link_or_copy"
+    ) as link:
+        second = copier.copy_tree(str(src), str(dst))
+    link.assert_not_called()
+    copyfile.assert_not_called()
+    assert second.skipped_files == 3 and second.total_bytes == first.total_bytes
+
+    # 源文件被替换后只更新变化的文件
+    (src / "config.json.new").write_bytes(b"changed")
+    os.replace(src / "config.json.new", src / "config.json")
+    os.utime(src / "config.json", (1, 1))
+    third = copier.copy_tree(str(src), str(dst))
+    assert third.skipped_files == 2
+    assert (dst / "config.json").read_bytes() == b"changed"
+
+
+# 测试默认不使用硬链接，修改源文件不会影响副本
+def test_copy_tree_does_not_hardlink_by_default(tmp_path):
+    src, dst = tmp_path / "src", tmp_path / "dst"
+    _make_model(src, FILES)
+
+    with patch("utils.storage.blob_store.fcntl.ioctl", side_effect=OSError("unsupported")):
+        progress = ModelCopier(workers=2, progress_interval=0).copy_tree(str(src), str(dst))
+
+    assert progress.copied_files == 3 and progress.linked_files == 0
+    assert os.stat(dst / "config.json").st_ino != os.stat(src / "config.json").st_ino
+    with open(src / "config.json", "r+b") as f:
+        f.write(b"edited")
+    assert not (dst / "config.json").read_bytes().startswith(b"edited")
+
+
+# 测试复制成功后按复制时统计的大小更新租户空间，并发送结束消息
+@patch("parts.models_hub.service.Tenant")
+@patch("parts.models_hub.service.send_ms")
+@patch("parts.models_hub.service.db")
+@patch("parts.models_hub.service.Lazymodel")
+def test_copy_model_reports_size_and_success(
+    mock_lazymodel, mock_db, mock_send_ms, mock_tenant, tmp_path, monkeypatch
+):
+    src = tmp_path / "src"
+    _make_model(src, FILES)
+    monkeypatch.setenv("EXIST_MODEL_PATH", str(tmp_path / "exist"))
+    model = MagicMock(tenant_id="tenant")
+    mock_lazymodel.query.get.return_value = model
+
+    ModelService(MagicMock()).copy_model(1, str(src), "copied")
+
+    assert (tmp_path / "exist" / "copied" / "sub" / "model-2.safetensors").exists()
+    assert model.model_path == str(tmp_path / "exist" / "copied")
+    mock_tenant.save_used_storage.assert_called_once_with("tenant", sum(FILES.values()))
+    last = mock_send_ms.call_args.kwargs["msg"]
+    assert last["is_end"] and last["percent"] == 100 and last["total"] == 3
+
+
+def _failing_sendfile(out_fd, in_fd, offset, count):
+    if offset:
+        raise OSError("disk full")
+    return count
+
+
+# 测试复制中途出错时抛出异常且不残留临时文件
+@pytest.mark.parametrize("workers", [1, 4])
+def test_copy_tree_propagates_errors(tmp_path, workers):
+    src, dst = tmp_path / "src", tmp_path / "dst"
+    _make_model(src, FILES)
+    copier = ModelCopier(workers=workers, buffer_size=4096)
+
+    ioctl_patch, link_patch = _no_links()
+    with ioctl_patch, link_patch, patch(
+        "parts.models_hub.model_copy.os.sendfile", side_effect=_failing_sendfile
+    ):
+        with pytest.raises(OSError, match="disk full"):
+            copier.copy_tree(str(src), str(dst))
+    assert not list(dst.rglob("*.tmp"))
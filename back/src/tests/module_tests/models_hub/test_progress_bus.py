@@ -0,0 +1,127 @@
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from parts.models_hub.websocket_handle import send_ms  # noqa: E402
+from parts.tools.websocket_handle import RealtimeMyLogger  # noqa: E402
+from utils.progress_bus import ProgressBus  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fake_redis():
+    client = fakeredis.FakeRedis()
+    with patch("utils.progress_bus.redis_client", client):
+        yield client
+
+
+@pytest.fixture
+def buses():
+    created = []
+
+    def make(**kwargs):
+        created.append(ProgressBus(**kwargs))
+        return created[-1]
+
+    yield make
+    for bus in created:
+        bus.close()
+
+
+class _Collector:
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, events):
+        self.batches.append(events)
+
+    @property
+    def events(self):
+        return [event for batch in self.batches for event in batch]
+
+    def wait_for(self, predicate, timeout=5):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if predicate(self.events):
+                return
+            time.sleep(0.02)
+        raise AssertionError(f"未在 {timeout}s 内收到期望的消息: {self.events}")
+
+
+# 测试其他进程发布的进度按间隔合并，只推送最新状态，结束消息立即送达
+def test_progress_is_coalesced_across_buses(buses):
+    publisher, subscriber = buses(interval=0.3), buses(interval=0.3)
+    collector = _Collector()
+    subscriber.subscribe("model_hub", "1", collector)
+    time.sleep(0.2)
+
+    for i in range(100):
+        publisher.publish("model_hub", "1", {"percent": i})
+    collector.wait_for(lambda events: events and events[-1]["percent"] == 99)
+    publisher.publish("model_hub", "1", {"percent": 100, "is_end": True}, final=True)
+    collector.wait_for(lambda events: events[-1].get("is_end"))
+
+    assert collector.events[0] == {"percent": 0}
+    assert len(collector.events) <= 4
+    assert publisher.stats()["pending"] == 0
+
+
+# 测试日志按批合并发送，不丢失也不乱序
+def test_log_entries_are_batched_without_loss(buses):
+    publisher, subscriber = buses(interval=0.2), buses(interval=0.2)
+    collector = _Collector()
+    subscriber.subscribe("tool_log", "7", collector, replay=False)
+    time.sleep(0.2)
+
+    for i in range(50):
+        publisher.append("tool_log", "7", {"msg": i})
+    collector.wait_for(lambda events: len(events) == 50)
+
+    assert [event["msg"] for event in collector.events] == list(range(50))
+    assert len(collector.batches) <= 3
+
+
+# 测试晚到的订阅者先收到缓存的日志和最新进度
+def test_late_subscriber_replays_cached_state(buses):
+    bus = buses(interval=0, history_size=3)
+    for i in range(5):
+        bus.append("tool_log", "9", {"msg": i})
+    bus.publish("model_hub", "9", {"percent": 40})
+    bus.publish("model_hub", "9", {"percent": 60})
+
+    logs, progress = _Collector(), _Collector()
+    bus.subscribe("tool_log", "9", logs)
+    bus.subscribe("model_hub", "9", progress)
+
+    assert logs.batches == [[{"msg": 2}, {"msg": 3}, {"msg": 4}]]
+    assert progress.batches == [[{"percent": 60}]]
+
+
+# 测试Redis不可用时在本进程内分发
+def test_falls_back_to_local_dispatch_without_redis(buses):
+    broken = MagicMock()
+    broken.pipeline.side_effect = ConnectionError("redis down")
+    broken.pubsub.side_effect = ConnectionError("redis down")
+    bus = buses(interval=0)
+    collector = _Collector()
+    with patch("utils.progress_bus.redis_client", broken):
+        bus.subscribe("model_hub", "3", collector)
+        bus.publish("model_hub", "3", {"percent": 10})
+        bus.close()
+    assert collector.events == [{"percent": 10}]
+
+
+# 测试send_ms以结束标记发布进度，只有工具日志会推送
+@patch("parts.tools.websocket_handle.progress_bus")
+@patch("parts.models_hub.websocket_handle.progress_bus")
+def test_websocket_senders_use_progress_bus(mock_hub_bus, mock_tool_bus):
+    send_ms("5", {"percent": 100, "is_end": True})
+    mock_hub_bus.publish.assert_called_once_with("model_hub", "5", {"percent": 100, "is_end": True}, final=True)
+
+    RealtimeMyLogger("logger_12").info("hello")
+    RealtimeMyLogger("werkzeug_12").info("ignored")
+    mock_tool_bus.append.assert_called_once()
+    assert mock_tool_bus.append.call_args.args[:2] == ("tool_log", "12")
+    assert mock_tool_bus.append.call_args.args[2]["msg"] == "hello"
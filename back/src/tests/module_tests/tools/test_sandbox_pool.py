@@ -0,0 +1,143 @@
+import time
+from unittest.mock import MagicMock, PropertyMock, patch
+
+import pytest
+
+from parts.tools.sandbox_pool import SandboxPool, SandboxTimeoutError, SandboxWorker
+from parts.tools.service import ToolService
+
+ECHO_CODE = """
+def echo(text):
+    print("echo", text)
+    return {"text": text, "pid": os.getpid()}
+"""
+
+
+@pytest.fixture
+def pool():
+    pool = SandboxPool(
+        size=1, max_calls=3, max_rss_mb=4096, call_timeout=5, start_timeout=30, preload="json", acquire_timeout=5
+    )
+    yield pool
+    pool.shutdown()
+
+
+def _echo(pool, text):
+    return pool.execute(ECHO_CODE, {"os": "os"}, {"text": text})
+
+
+# 测试工作进程被复用、每次调用在新的子进程中执行，输出随响应返回，达到调用次数上限后被替换
+def test_pool_reuses_and_recycles_workers(pool):
+    responses = [_echo(pool, f"hi{i}") for i in range(4)]
+
+    assert all(r["ok"] for r in responses)
+    assert responses[0]["result"]["text"] == "hi0"
+    assert responses[0]["output"] == ["echo hi0"]
+    pids = [r["result"]["pid"] for r in responses]
+    assert len(set(pids)) == 4
+    worker_pids = [r["worker_pid"] for r in responses]
+    assert worker_pids[0] == worker_pids[1] == worker_pids[2] != worker_pids[3]
+    assert pool.stats()["recycled"] == 1
+
+
+# 测试一次调用对模块和全局状态的修改不会泄漏到后续调用
+def test_pool_isolates_state_between_calls(pool):
+    leak = "def leak():\n    json.tenant_secret = 'a'\n    datetime.tenant = 'a'\n    return 1"
+    assert pool.execute(leak, {"json": "json", "datetime": "datetime"}, {})["ok"]
+
+    probe = "def probe():\n    return [hasattr(json, 'tenant_secret'), hasattr(datetime, 'tenant')]"
+    response = pool.execute(probe, {"json": "json", "datetime": "datetime"}, {})
+    assert response["ok"] and response["result"] == [False, False]
+
+
+# 测试用户代码的错误、sys.exit 与直接写 fd 1 都不会破坏协议，进程继续可用
+def test_pool_survives_errors_and_raw_output(pool):
+    pool._max_calls = 10
+    failing = pool.execute("def boom():\n    raise ValueError('bad input')", {}, {})
+    assert not failing["ok"] and failing["error"] == "bad input"
+    assert "ValueError" in failing["traceback"]
+
+    exiting = pool.execute("def bye():\n    sys.exit(3)", {"sys": "sys"}, {})
+    assert not exiting["ok"]
+
+    raw = pool.execute("def raw():\n    os.write(1, b'junk')\n    return 1", {"os": "os"}, {})
+    assert raw["ok"] and raw["result"] == 1
+
+    missing = pool.execute("def f():\n    return 2", {"x": "no_such_module"}, {})
+    assert missing["ok"] and "Error importing no_such_module" in missing["output"][0]
+
+    stdin = pool.execute("def read():\n    return sys.stdin.read()", {"sys": "sys"}, {})
+    assert stdin["ok"] and stdin["result"] == ""
+    assert pool.stats()["started"] == 1
+
+
+# 测试调用超时后只杀掉执行代码的子进程，工作进程继续服务
+def test_pool_kills_child_on_timeout(pool):
+    worker_pid = _echo(pool, "before")["worker_pid"]
+    pool._call_timeout = 0.5
+
+    start = time.monotonic()
+    with pytest.raises(SandboxTimeoutError):
+        pool.execute("def slow():\n    time.sleep(10)", {"time": "time"}, {})
+    assert time.monotonic() - start < 3
+
+    pool._call_timeout = 5
+    after = _echo(pool, "after")
+    assert after["ok"] and after["worker_pid"] == worker_pid
+    assert pool.stats()["timeouts"] == 1
+
+
+# 测试执行代码的子进程崩溃时返回失败响应，工作进程不受影响
+def test_pool_survives_crashed_child(pool):
+    worker_pid = _echo(pool, "before")["worker_pid"]
+    crashed = pool.execute("def crash():\n    os._exit(1)", {"os": "os"}, {})
+    assert not crashed["ok"] and "异常退出" in crashed["error"]
+    assert _echo(pool, "again")["worker_pid"] == worker_pid
+
+
+# 测试工作进程本身退出时抛出错误并补充新进程
+def test_pool_replaces_dead_worker(pool):
+    worker_pid = _echo(pool, "before")["worker_pid"]
+    pool._idle[0].process.kill()
+    pool._idle[0].process.wait()
+    with pytest.raises(RuntimeError, match="ide工具执行失败"):
+        # 进程在 _acquire 之后退出时由调用方感知
+        with patch.object(SandboxWorker, "alive", new_callable=PropertyMock, return_value=True):
+            _echo(pool, "dead")
+    assert _echo(pool, "again")["worker_pid"] != worker_pid
+
+
+# 测试池中没有空闲进程时等待有上限
+def test_pool_acquire_times_out_when_exhausted(pool):
+    pool._acquire_timeout = 0.3
+    worker = pool._acquire()
+    try:
+        start = time.monotonic()
+        with pytest.raises(SandboxTimeoutError, match="繁忙"):
+            _echo(pool, "blocked")
+        assert time.monotonic() - start < 2
+    finally:
+        pool._release(worker, retire=False)
+    assert _echo(pool, "free")["ok"]
+
+
+# 测试IDE工具调用通过沙箱池执行，输出写入工具日志并处理结果
+@patch("parts.tools.service.get_tool_logger")
+@patch("parts.tools.service.ide_sandbox_pool")
+def test_call_ide_tool_uses_sandbox_pool(mock_pool, mock_get_logger):
+    service = ToolService(MagicMock())
+    tool = MagicMock(id=1, tool_ide_code="import json\ndef f(a):\n    return a")
+    mock_pool.execute.return_value = {"ok": True, "result": {"a": 1}, "output": ["line"]}
+    with patch.object(service, "prepare_input_data", return_value={"a": 1}), patch.object(
+        service, "process_output", side_effect=lambda tool, result: result
+    ):
+        assert service.call_ide_tool(tool, {}, {}) == {"a": 1}
+
+        mock_pool.execute.assert_called_once_with(tool.tool_ide_code, {"json": "json"}, {"a": 1}, timeout=30)
+        logger = mock_get_logger.return_value
+        logger.info.assert_called_once_with("line")
+        logger.warning.assert_called_once_with("end")
+
+        mock_pool.execute.return_value = {"ok": False, "error": "bad", "traceback": "tb", "output": []}
+        with pytest.raises(RuntimeError, match="ide工具执行失败: bad"):
+            service.call_ide_tool(tool, {}, {})
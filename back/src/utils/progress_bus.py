@@ -0,0 +1,327 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Additional Notice:
+# When modifying, redistributing, or creating derivative works of this software,
+# you must retain the original LazyCraft logo and the GitHub link icon that directs
+# to the official repository: https://github.com/LazyAGI/LazyLLM
+
+"""跨进程的进度与日志推送总线
+
+WebSocket 连接只存在于接受它的 Web 进程中，而进度可能由其他 gunicorn 进程或
+Celery 任务产生。这里通过 Redis 发布/订阅转发事件：
+
+- ``publish`` 发送状态类消息（如下载进度），同一任务在间隔内只保留最新一条，
+  结束消息立即发送；
+- ``append`` 发送追加类消息（如工具日志），间隔内的消息合并为一批发送，不会丢弃；
+- 最新状态和最近的日志保存在 Redis 中，新订阅者先收到这些内容再接收实时消息；
+- 每个进程只有一个监听线程，按 ``(topic, key)`` 分发给本进程的订阅回调。
+
+Redis 不可用时退化为只在本进程内分发。
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from configs import lazy_config
+from utils.util_redis import redis_client
+
+CHANNEL_PREFIX = "progress:"
+# 监听连接断开后重连前的等待时间（秒）
+RECONNECT_DELAY = 1.0
+
+Callback = Callable[[list[dict[str, Any]]], None]
+
+
+@dataclass
+class _Slot:
+    """一个任务待发送的消息"""
+
+    last_sent: float = 0.0
+    state: Optional[dict] = None
+    entries: list = field(default_factory=list)
+
+    @property
+    def pending(self) -> bool:
+        return self.state is not None or bool(self.entries)
+
+
+class ProgressBus:
+    """进度推送总线
+
+    未显式传入的参数在使用时读取 ``lazy_config`` 中的 PROGRESS_BUS_* 配置。
+    订阅时先注册回调再读取缓存的状态，极端情况下新订阅者可能重复收到一条消息，
+    进度类消息重复展示不影响结果。
+    """
+
+    def __init__(
+        self,
+        interval: Optional[float] = None,
+        state_ttl: Optional[int] = None,
+        history_size: Optional[int] = None,
+    ):
+        self._interval = interval
+        self._state_ttl = state_ttl
+        self._history_size = history_size
+        self._cond = threading.Condition()
+        self._slots: dict[tuple[str, str], _Slot] = {}
+        self._subscribers: dict[tuple[str, str], dict[str, Callback]] = {}
+        self._flusher: Optional[threading.Thread] = None
+        self._listener: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._pid = os.getpid()
+
+    def _option(self, value, name):
+        return value if value is not None else getattr(lazy_config, name)
+
+    @property
+    def interval(self) -> float:
+        return self._option(self._interval, "PROGRESS_BUS_INTERVAL")
+
+    @property
+    def state_ttl(self) -> int:
+        return self._option(self._state_ttl, "PROGRESS_BUS_STATE_TTL")
+
+    @property
+    def history_size(self) -> int:
+        return self._option(self._history_size, "PROGRESS_BUS_HISTORY_SIZE")
+
+    @staticmethod
+    def channel(topic: str, key: str) -> str:
+        return f"{CHANNEL_PREFIX}{topic}:{key}"
+
+    def _state_key(self, topic: str, key: str) -> str:
+        return f"{self.channel(topic, key)}:state"
+
+    def _history_key(self, topic: str, key: str) -> str:
+        return f"{self.channel(topic, key)}:history"
+
+    def _check_fork(self) -> None:
+        # 父进程的线程不会被 fork 带到子进程，待发送的消息也由父进程负责
+        if self._pid == os.getpid():
+            return
+        self._slots, self._subscribers = {}, {}
+        self._flusher = self._listener = None
+        self._pid = os.getpid()
+
+    # ---------------- 发布 ----------------
+
+    def publish(self, topic: str, key: str, message: dict, final: bool = False) -> None:
+        """发送状态类消息，间隔内只保留最新一条，``final`` 为真时立即发送"""
+        self._offer(topic, str(key), state=message, final=final)
+
+    def append(self, topic: str, key: str, entry: dict) -> None:
+        """发送追加类消息，间隔内的消息合并为一批发送"""
+        self._offer(topic, str(key), entry=entry)
+
+    def _offer(self, topic, key, state=None, entry=None, final=False) -> None:
+        now = time.monotonic()
+        with self._cond:
+            self._check_fork()
+            slot = self._slots.setdefault((topic, key), _Slot())
+            if state is not None:
+                slot.state = state
+            if entry is not None:
+                slot.entries.append(entry)
+            if not final and now - slot.last_sent < self.interval:
+                self._start_flusher()
+                self._cond.notify()
+                return
+            batch = self._take(topic, key, slot, now, final)
+        self._send(topic, key, *batch)
+
+    def _take(self, topic, key, slot: _Slot, now: float, drop: bool = False):
+        state, entries = slot.state, slot.entries
+        slot.state, slot.entries, slot.last_sent = None, [], now
+        if drop:
+            self._slots.pop((topic, key), None)
+        return state, entries
+
+    def flush(self) -> None:
+        """立即发送所有合并中的消息"""
+        with self._cond:
+            batches = [
+                (topic, key, *self._take(topic, key, slot, time.monotonic()))
+                for (topic, key), slot in self._slots.items()
+                if slot.pending
+            ]
+        for topic, key, state, entries in batches:
+            self._send(topic, key, state, entries)
+
+    def _start_flusher(self) -> None:
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(target=self._flush_loop, name="progress-bus-flusher", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self._cond:
+                if self._pid != os.getpid():
+                    return
+                now = time.monotonic()
+                interval = self.interval
+                batches, wait = [], None
+                for (topic, key), slot in list(self._slots.items()):
+                    due = slot.last_sent + interval
+                    if not slot.pending:
+                        # 长时间没有新消息的任务不再保留合并状态
+                        if due <= now:
+                            del self._slots[(topic, key)]
+                    elif due <= now:
+                        batches.append((topic, key, *self._take(topic, key, slot, now)))
+                    else:
+                        wait = due - now if wait is None else min(wait, due - now)
+                if not batches:
+                    if not self._slots:
+                        self._flusher = None
+                        return
+                    self._cond.wait(wait if wait is not None else interval)
+                    continue
+            for topic, key, state, entries in batches:
+                self._send(topic, key, state, entries)
+
+    def _send(self, topic: str, key: str, state: Optional[dict], entries: list) -> None:
+        events = list(entries) + ([state] if state is not None else [])
+        if not events:
+            return
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            if state is not None:
+                pipe.setex(self._state_key(topic, key), self.state_ttl, json.dumps(state, default=str))
+            if entries:
+                history_key = self._history_key(topic, key)
+                pipe.rpush(history_key, *(json.dumps(entry, default=str) for entry in entries))
+                pipe.ltrim(history_key, -self.history_size, -1)
+                pipe.expire(history_key, self.state_ttl)
+            pipe.publish(self.channel(topic, key), json.dumps({"events": events}, default=str))
+            pipe.execute()
+        except Exception as e:
+            logging.warning(f"进度消息发布失败，仅在本进程内分发: {topic}:{key}: {e}")
+            self._dispatch(topic, key, events)
+
+    # ---------------- 订阅 ----------------
+
+    def subscribe(self, topic: str, key: str, callback: Callback, replay: bool = True) -> str:
+        """订阅任务消息，返回用于取消订阅的标识
+
+        ``callback`` 在监听线程中以事件列表调用。``replay`` 为真时先同步回放缓存的日志和最新状态。
+        """
+        key = str(key)
+        token = str(uuid.uuid4())
+        with self._cond:
+            self._check_fork()
+            self._subscribers.setdefault((topic, key), {})[token] = callback
+            self._start_listener()
+        if replay:
+            cached = self.cached_events(topic, key)
+            if cached:
+                self._deliver(callback, cached)
+        return token
+
+    def unsubscribe(self, topic: str, key: str, token: str) -> None:
+        key = str(key)
+        with self._cond:
+            callbacks = self._subscribers.get((topic, key))
+            if callbacks is None:
+                return
+            callbacks.pop(token, None)
+            if not callbacks:
+                del self._subscribers[(topic, key)]
+
+    def cached_events(self, topic: str, key: str) -> list[dict]:
+        """读取缓存的日志和最新状态"""
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.lrange(self._history_key(topic, key), 0, -1)
+            pipe.get(self._state_key(topic, key))
+            history, state = pipe.execute()
+        except Exception as e:
+            logging.warning(f"读取缓存的进度消息失败: {topic}:{key}: {e}")
+            return []
+        events = [json.loads(entry) for entry in history or []]
+        if state:
+            events.append(json.loads(state))
+        return events
+
+    def _start_listener(self) -> None:
+        if self._listener is None or not self._listener.is_alive():
+            self._stop.clear()
+            self._listener = threading.Thread(target=self._listen_loop, name="progress-bus-listener", daemon=True)
+            self._listener.start()
+
+    def _listen_loop(self) -> None:
+        pid = os.getpid()
+        while self._pid == pid and not self._stop.is_set():
+            pubsub = None
+            try:
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                while self._pid == pid and not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message["type"] == "pmessage":
+                        self._on_message(message["channel"], message["data"])
+            except Exception as e:
+                logging.warning(f"进度消息监听中断，稍后重连: {e}")
+                self._stop.wait(RECONNECT_DELAY)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def _on_message(self, channel, data) -> None:
+        if isinstance(channel, bytes):
+            channel = channel.decode("utf-8")
+        topic, _, key = channel[len(CHANNEL_PREFIX):].partition(":")
+        self._dispatch(topic, key, json.loads(data)["events"])
+
+    def _dispatch(self, topic: str, key: str, events: list[dict]) -> None:
+        with self._cond:
+            callbacks = list(self._subscribers.get((topic, key), {}).values())
+        for callback in callbacks:
+            self._deliver(callback, events)
+
+    @staticmethod
+    def _deliver(callback: Callback, events: list[dict]) -> None:
+        try:
+            callback(events)
+        except Exception as e:
+            logging.warning(f"推送进度消息失败: {e}")
+
+    def close(self) -> None:
+        """发送合并中的消息并停止监听线程"""
+        self.flush()
+        self._stop.set()
+        listener = self._listener
+        if listener is not None and listener is not threading.current_thread():
+            listener.join(RECONNECT_DELAY + 1)
+        self._listener = None
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "pending": sum(1 for slot in self._slots.values() if slot.pending),
+                "subscribers": sum(len(callbacks) for callbacks in self._subscribers.values()),
+            }
+
+
+progress_bus = ProgressBus()
@@ -141,3 +141,47 @@ class AbstractStorage(ABC):
             NotImplementedError: 子类必须实现此方法。
         """
         raise NotImplementedError
+
+    def size(self, filename) -> int:
+        """获取文件大小。
+
+        默认实现读取整个文件，具体存储应提供更高效的实现。
+
+        Args:
+            filename: 文件名。
+
+        Returns:
+            int: 文件字节数，文件不存在时返回 0。
+        """
+        if not self.exists(filename):
+            return 0
+        return len(self.load_once(filename))
+
+    def append(self, filename, data):
+        """向文件末尾追加数据，文件不存在时创建。
+
+        默认实现读出原内容后整体写回，具体存储应提供更高效的实现。
+
+        Args:
+            filename: 文件名。
+            data: 要追加的二进制数据。
+        """
+        existing = self.load_once(filename) if self.exists(filename) else b""
+        self.save(filename, existing + data)
+
+    def load_range(self, filename: str, offset: int, length=None) -> bytes:
+        """读取文件的一段内容。
+
+        默认实现读取整个文件后截取，具体存储应提供更高效的实现。
+
+        Args:
+            filename (str): 文件名。
+            offset (int): 起始字节偏移。
+            length (int, optional): 读取的字节数，默认读到文件末尾。
+
+        Returns:
+            bytes: 读取到的数据。
+        """
+        data = self.load_once(filename)
+        end = None if length is None else offset + length
+        return data[offset:end]
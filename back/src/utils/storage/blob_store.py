@@ -0,0 +1,258 @@
+# Copyright (c) 2025 SenseTime. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Additional Notice:
+# When modifying, redistributing, or creating derivative works of this software,
+# you must retain the original LazyCraft logo and the GitHub link icon that directs
+# to the official repository: https://github.com/LazyAGI/LazyLLM
+
+import fcntl
+import hashlib
+import logging
+import os
+import shutil
+import time
+import uuid
+from collections.abc import Callable, Iterable
+from typing import Optional
+
+from configs import lazy_config
+from libs.filetools import UPLOAD_BASE_PATH
+
+# linux/fs.h: _IOW(0x94, 9, int)，在支持的文件系统(btrfs/xfs)上创建写时复制的副本
+FICLONE = 0x40049409
+
+
+def link_or_copy(
+    src: str,
+    dst: str,
+    copy_function: Callable[[str, str], object] = shutil.copyfile,
+    allow_hardlink: bool = True,
+) -> str:
+    """把 src 的内容放到 dst，尽量不占用额外磁盘空间。
+
+    依次尝试 reflink（写时复制，修改副本不影响源文件）、硬链接，都不支持时
+    （如跨文件系统）退化为普通复制。dst 已存在时会被原子替换。
+
+    Args:
+        src (str): 源文件路径。
+        dst (str): 目标文件路径。
+        copy_function (Callable, optional): 退化为普通复制时使用的函数，参数为 (src, dst)。
+        allow_hardlink (bool, optional): 是否允许使用硬链接，默认为 True。
+
+    Returns:
+        str: 实际使用的方式，reflink、hardlink 或 copy。
+    """
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    tmp_path = f"{dst}.{uuid.uuid4().hex}.tmp"
+    try:
+        try:
+            with open(src, "rb") as infile, open(tmp_path, "wb") as outfile:
+                fcntl.ioctl(outfile.fileno(), FICLONE, infile.fileno())
+            method = "reflink"
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            try:
+                if not allow_hardlink:
+                    raise OSError("hardlink disabled")
+                os.link(src, tmp_path)
+                method = "hardlink"
+            except OSError:
+                copy_function(src, tmp_path)
+                method = "copy"
+        os.replace(tmp_path, dst)
+        return method
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class BlobStore:
+    """按内容寻址的文件存储。
+
+    文件以 MD5 为名保存在 ``<root>/<md5前两位>/<md5>``，与 ``FileRecord.file_md5``
+    一致，知识库等业务路径通过 :func:`link_or_copy` 物化，相同内容在磁盘上只保存一份。
+
+    引用关系以数据库记录为准，存储本身不维护计数：:meth:`collect_garbage` 通过回调
+    询问哪些 blob 仍被引用，并且只删除超过 ``BLOB_GC_MIN_AGE`` 未被写入或复用的 blob，
+    避免与正在进行的上传竞争。
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self._root = root
+
+    @property
+    def root(self) -> str:
+        return self._root or os.getenv(
+            "BLOB_STORE_PATH", os.path.join(UPLOAD_BASE_PATH, "blobs")
+        )
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    def exists(self, digest: str) -> bool:
+        return bool(digest) and os.path.exists(self.path(digest))
+
+    def _tmp_path(self) -> str:
+        tmp_dir = os.path.join(self.root, "tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        return os.path.join(tmp_dir, uuid.uuid4().hex)
+
+    def _publish(self, src: str, digest: str) -> None:
+        """把内容为 digest 的文件放入存储，已存在时只刷新修改时间"""
+        blob_path = self.path(digest)
+        if os.path.exists(blob_path):
+            # 刷新时间，使刚被复用的 blob 不会被垃圾回收
+            os.utime(blob_path)
+            return
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        link_or_copy(src, blob_path)
+
+    @staticmethod
+    def hash_file(file_path: str) -> str:
+        """以大块读取计算文件 MD5"""
+        buffer_size = lazy_config.BLOB_HASH_BUFFER_SIZE
+        digest = hashlib.md5()
+        with open(file_path, "rb") as f:
+            while block := f.read(buffer_size):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def put_stream(self, stream, target_path: Optional[str] = None) -> str:
+        """边接收边计算 MD5 写入存储，可选地物化到 target_path。
+
+        Args:
+            stream: 可读的二进制流，如上传文件的 ``FileStorage.stream``。
+            target_path (str, optional): 物化的目标路径。
+
+        Returns:
+            str: 内容的 MD5。
+        """
+        buffer_size = lazy_config.BLOB_HASH_BUFFER_SIZE
+        digest = hashlib.md5()
+        tmp_path = self._tmp_path()
+        try:
+            with open(tmp_path, "wb") as f:
+                while block := stream.read(buffer_size):
+                    f.write(block)
+                    digest.update(block)
+            file_md5 = digest.hexdigest()
+            self._publish(tmp_path, file_md5)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        if target_path:
+            self.materialize(file_md5, target_path)
+        return file_md5
+
+    def put_file(self, file_path: str, file_md5: Optional[str] = None) -> str:
+        """把已落盘的文件纳入存储，并把原路径替换为指向 blob 的链接。
+
+        Args:
+            file_path (str): 文件路径。
+            file_md5 (str, optional): 已知的 MD5，未提供时计算。
+
+        Returns:
+            str: 内容的 MD5。
+        """
+        file_md5 = file_md5 or self.hash_file(file_path)
+        blob_path = self.path(file_md5)
+        if os.path.exists(blob_path):
+            if not os.path.samefile(blob_path, file_path):
+                self.materialize(file_md5, file_path)
+            else:
+                os.utime(blob_path)
+        else:
+            self._publish(file_path, file_md5)
+        return file_md5
+
+    def materialize(self, digest: str, target_path: str) -> str:
+        """把 blob 物化到业务路径。
+
+        Returns:
+            str: 实际使用的方式，reflink、hardlink 或 copy。
+        """
+        return link_or_copy(self.path(digest), target_path)
+
+    def _iter_blobs(self) -> Iterable[tuple[str, os.stat_result]]:
+        if not os.path.isdir(self.root):
+            return
+        for prefix in os.scandir(self.root):
+            if not prefix.is_dir() or len(prefix.name) != 2:
+                continue
+            for entry in os.scandir(prefix.path):
+                if entry.is_file():
+                    yield entry.name, entry.stat()
+
+    def collect_garbage(
+        self,
+        referenced: Callable[[list[str]], set[str]],
+        min_age: Optional[float] = None,
+        batch_size: int = 500,
+    ) -> int:
+        """删除不再被引用的 blob。
+
+        Args:
+            referenced (Callable): 传入一批 MD5，返回其中仍被引用的部分。
+            min_age (float, optional): 只回收超过该秒数未被写入或复用的 blob，
+                默认为 ``BLOB_GC_MIN_AGE``。
+            batch_size (int, optional): 每次询问引用关系的 blob 数量。
+
+        Returns:
+            int: 删除的 blob 数量。
+        """
+        if min_age is None:
+            min_age = lazy_config.BLOB_GC_MIN_AGE
+        deadline = time.time() - min_age
+        removed = 0
+
+        def sweep(batch):
+            nonlocal removed
+            alive = referenced(batch)
+            for digest in batch:
+                if digest in alive:
+                    continue
+                blob_path = self.path(digest)
+                try:
+                    # 询问引用期间被复用的 blob 跳过
+                    if os.stat(blob_path).st_mtime > deadline:
+                        continue
+                    os.remove(blob_path)
+                    removed += 1
+                except FileNotFoundError:
+                    continue
+
+        batch = []
+        for digest, stat in self._iter_blobs():
+            if stat.st_mtime > deadline:
+                continue
+            batch.append(digest)
+            if len(batch) >= batch_size:
+                sweep(batch)
+                batch = []
+        if batch:
+            sweep(batch)
+
+        tmp_dir = os.path.join(self.root, "tmp")
+        if os.path.isdir(tmp_dir):
+            # 清理异常中断留下的临时文件
+            for entry in os.scandir(tmp_dir):
+                if entry.is_file() and entry.stat().st_mtime <= deadline:
+                    os.remove(entry.path)
+        logging.info(f"blob垃圾回收完成，删除 {removed} 个文件")
+        return removed
+
+
+blob_store = BlobStore()
@@ -185,3 +185,56 @@ class LocalStorage(AbstractStorage):
             filename = self.folder + "/" + filename
         if os.path.exists(filename):
             os.remove(filename)
+
+    def _full_path(self, filename):
+        if not self.folder or self.folder.endswith("/"):
+            return self.folder + filename
+        return self.folder + "/" + filename
+
+    def size(self, filename) -> int:
+        """获取本地文件大小。
+
+        Args:
+            filename: 相对于存储目录的文件名。
+
+        Returns:
+            int: 文件字节数，文件不存在时返回 0。
+        """
+        try:
+            return os.path.getsize(self._full_path(filename))
+        except FileNotFoundError:
+            return 0
+
+    def append(self, filename, data):
+        """向本地文件末尾追加数据，文件或目录不存在时自动创建。
+
+        Args:
+            filename: 相对于存储目录的文件名。
+            data: 要追加的二进制数据。
+        """
+        filename = self._full_path(filename)
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(filename, "ab") as f:
+            f.write(data)
+
+    def load_range(self, filename: str, offset: int, length=None) -> bytes:
+        """读取本地文件的一段内容，只读取需要的字节。
+
+        Args:
+            filename (str): 相对于存储目录的文件名。
+            offset (int): 起始字节偏移。
+            length (int, optional): 读取的字节数，默认读到文件末尾。
+
+        Returns:
+            bytes: 读取到的数据。
+
+        Raises:
+            FileNotFoundError: 当文件不存在时抛出。
+        """
+        filename = self._full_path(filename)
+        if not os.path.exists(filename):
+            raise FileNotFoundError("File not found")
+
+        with open(filename, "rb") as f:
+            f.seek(offset)
+            return f.read() if length is None else f.read(length)
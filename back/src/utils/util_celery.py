@@ -86,6 +86,7 @@ def init_app(app: Flask) -> Celery:
         "tasks.mail_reset_password_task",
         "tasks.inferservice_start_node_task",
         "tasks.cost_audit_stat_task",
+        "tasks.file_blob_gc_task",
     ]
 
     routing_rules = ({"tasks.*": {"queue": "celery"}},)
@@ -93,13 +94,20 @@ def init_app(app: Flask) -> Celery:
     periodic_tasks = {
         "check-status-every-10-seconds": {
             "task": "tasks.finetune_task.check_status",
-            "schedule": timedelta(seconds=60),
+            # 每轮只检查到期的任务，各任务的实际检查间隔由状态轮询调度器控制
+            "schedule": timedelta(seconds=15),
+            "options": {"expires": 15},
         },
         "cost-audit-daily-stat": {
             "task": "tasks.cost_audit_stat_task.daily_cost_audit_stat",
             "schedule": crontab(hour=1, minute=0),  # 每日凌晨1点运行
             "options": {"expires": 7200},
         },
+        "file-blob-gc-daily": {
+            "task": "tasks.file_blob_gc_task.collect_file_blob_garbage",
+            "schedule": crontab(hour=3, minute=0),  # 每日凌晨3点运行
+            "options": {"expires": 7200},
+        },
     }
 
     # 聚合所有conf更新，减少多次update调用
@@ -158,6 +158,39 @@ class Storage:
         """
         return self.storage_runner.delete(filename)
 
+    def size(self, filename) -> int:
+        """获取文件大小。
+
+        Args:
+            filename: 要查询的文件名。
+
+        Returns:
+            int: 文件字节数，文件不存在时返回 0。
+        """
+        return self.storage_runner.size(filename)
+
+    def append(self, filename, data):
+        """向文件末尾追加数据。
+
+        Args:
+            filename: 要追加的文件名，不存在时创建。
+            data: 要追加的二进制数据。
+        """
+        self.storage_runner.append(filename, data)
+
+    def load_range(self, filename: str, offset: int, length=None) -> bytes:
+        """读取文件的一段内容。
+
+        Args:
+            filename (str): 要读取的文件名。
+            offset (int): 起始字节偏移。
+            length (int, optional): 读取的字节数，默认读到文件末尾。
+
+        Returns:
+            bytes: 读取到的数据。
+        """
+        return self.storage_runner.load_range(filename, offset, length)
+
 
 storage = Storage()
 